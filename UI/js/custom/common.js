@@ -1,7 +1,7 @@
 
 // Simple GET request
 function apiGet(url) {
-    return fetch(window.API_BASE + url)
+    return fetch(window.API_BASE + url, { credentials: "include" })
         .then(r => {
             if (!r.ok) throw new Error("API GET failure");
             return r.json();
@@ -15,6 +15,7 @@ function apiPost(url, payload) {
 
     return fetch(window.API_BASE + url, {
         method: "POST",
+        credentials: "include",
         body: fd
     }).then(r => {
         if (!r.ok) throw new Error("API POST failure");
@@ -24,7 +25,7 @@ function apiPost(url, payload) {
 
 // DELETE request
 function apiDelete(url) {
-    return fetch(window.API_BASE + url, { method: "DELETE" })
+    return fetch(window.API_BASE + url, { method: "DELETE", credentials: "include" })
         .then(r => {
             if (!r.ok) throw new Error("API DELETE failure");
             return r.json();
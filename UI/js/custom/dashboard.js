@@ -3,7 +3,7 @@
 // SIMPLE API HELPERS
 // ------------------------
 function apiGet(url) {
-    return fetch(`${window.API_BASE}${url}`).then(res => {
+    return fetch(`${window.API_BASE}${url}`, { credentials: "include" }).then(res => {
         if (!res.ok) throw new Error("API GET failure: " + url);
         return res.json();
     });
@@ -12,6 +12,7 @@ function apiGet(url) {
 function apiPost(url, body) {
     return fetch(`${window.API_BASE}${url}`, {
         method: "POST",
+        credentials: "include",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(body)
     }).then(res => {
@@ -24,12 +25,10 @@ function apiPost(url, body) {
 // WEATHER WIDGET
 // ------------------------
 function loadWeather() {
-    const API_KEY = "6b4b1400888cfc29ec5a3d7dd73be8d6";
     const CITY = "Copenhagen";
-    const url = `https://api.openweathermap.org/data/2.5/weather?q=${CITY}&units=metric&appid=${API_KEY}`;
 
-    fetch(url)
-        .then(res => res.json())
+    // Served by the backend, which caches the OpenWeather response per city
+    apiGet(`/weather?city=${encodeURIComponent(CITY)}`)
         .then(data => {
             if (data.cod !== 200) {
                 $("#weatherContent").html("Failed to load weather.");
@@ -4,19 +4,20 @@
 // API HELPERS
 // -------------------------------
 function apiGet(path) {
-    return fetch(`${window.API_BASE}${path}`).then(res => res.json());
+    return fetch(`${window.API_BASE}${path}`, { credentials: "include" }).then(res => res.json());
 }
 
 function apiPost(path, body) {
     return fetch(`${window.API_BASE}${path}`, {
         method: "POST",
+        credentials: "include",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(body)
     }).then(res => res.json());
 }
 
 function apiDelete(path) {
-    return fetch(`${window.API_BASE}${path}`, { method: "DELETE" })
+    return fetch(`${window.API_BASE}${path}`, { method: "DELETE", credentials: "include" })
         .then(res => res.json());
 }
 
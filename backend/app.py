@@ -1,24 +1,48 @@
+from concurrent.futures import TimeoutError as FutureTimeout
+
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
+import os
 
 from .dao.products_dao import (
     get_all_products,
+    get_all_products_columns,
+    get_low_stock_products,
     insert_new_product,
     update_product,
     delete_product,
 )
 from .dao.uom_dao import get_all_uoms
-from .dao.order_dao import add_order
-from .dao.order_list_dao import get_all_orders, get_recent_orders
+from .dao.order_dao import add_order, delete_orders
+from .dao.order_list_dao import get_all_orders, get_all_orders_columns, get_recent_orders
 from .dao.order_details_dao import get_order_details
 from .db.sql_connection import get_sql_connection
 from .routes.calculations import calculations_bp
+from .routes.weather import weather_bp
+from .services.order_writer import (
+    OrderQueueFull,
+    validate_order,
+    writer_for,
+    write_behind_enabled,
+    write_timeout,
+)
+from .monitoring.metrics import init_metrics
+from .monitoring.profiling import init_profiling
+from .web.caching import cached_read, init_caching
+from .web.columnar import UnsupportedFormat, columnar_response, listing_format
+from .web.date_range import parse_date_range
+from .web.compression import init_compression
+from .web.idempotency import complete_later, idempotent
+from .web.read_routing import init_read_routing, read_connection
+from .web.stores import current_store_id, init_stores
+from .web.json_provider import FastJSONProvider
 
 # -------------------------------------------------------
 # Flask App Setup
 # -------------------------------------------------------
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 CORS(
     app,
@@ -34,14 +58,25 @@ CORS(
 )
 
 app.register_blueprint(calculations_bp, url_prefix="/api")
+app.register_blueprint(weather_bp)
+
+init_metrics(app)
+init_profiling(app)
+init_compression(app)
+init_read_routing(app)
+init_stores(app)
+init_caching(app)
 
 
 # -------------------------------------------------------
 # Helpers
 # -------------------------------------------------------
 def connection():
-    """Return a new SQL connection."""
-    return get_sql_connection()
+    """
+    Return a new SQL connection to the primary of the request's store;
+    read-only routes use read_connection().
+    """
+    return get_sql_connection(current_store_id())
 
 
 def parse_incoming_json():
@@ -77,8 +112,30 @@ def health():
 # -------------------------------------------------------
 @app.route("/getProducts", methods=["GET"])
 def api_get_products():
-    conn = connection()
-    products = get_all_products(conn)
+    try:
+        fmt = listing_format()
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 400
+
+    store_id = current_store_id()
+    if fmt is not None:
+        conn = read_connection()
+        columns, rows = get_all_products_columns(conn, store_id)
+        conn.close()
+        return columnar_response(columns, rows, fmt)
+
+    products = cached_read(
+        f"products:{store_id}",
+        lambda conn: get_all_products(conn, store_id),
+        depends=(f"products:{store_id}",),
+    )
+    return jsonify(products)
+
+
+@app.route("/lowStock", methods=["GET"])
+def api_low_stock():
+    conn = read_connection()
+    products = get_low_stock_products(conn, current_store_id())
     conn.close()
     return jsonify(products)
 
@@ -94,7 +151,7 @@ def api_add_product():
         return jsonify({"error": "Missing required fields"}), 400
 
     conn = connection()
-    new_id = insert_new_product(conn, product)
+    new_id = insert_new_product(conn, product, current_store_id())
     conn.close()
     return jsonify({"product_id": new_id}), 200
 
@@ -102,7 +159,7 @@ def api_add_product():
 def api_delete_product(product_id):
     conn = connection()
     try:
-        delete_product(conn, product_id)
+        delete_product(conn, product_id, current_store_id())
     except Exception as e:
         conn.close()
         return jsonify({"error": "Failed to delete product", "detail": str(e)}), 500
@@ -122,7 +179,7 @@ def api_update_product():
 
     conn = connection()
     try:
-        update_product(conn, product)
+        update_product(conn, product, current_store_id())
     except Exception as e:
         conn.close()
         return jsonify({"error": "Failed to update product", "detail": str(e)}), 500
@@ -136,9 +193,8 @@ def api_update_product():
 # -------------------------------------------------------
 @app.route("/getUOM", methods=["GET"])
 def api_get_uom():
-    conn = connection()
-    uoms = get_all_uoms(conn)
-    conn.close()
+    # Units only change when the database is initialized
+    uoms = cached_read("uom", get_all_uoms, depends=("uom",))
     return jsonify(uoms)
 
 
@@ -146,6 +202,7 @@ def api_get_uom():
 # ORDERS
 # -------------------------------------------------------
 @app.route("/addOrder", methods=["POST"])
+@idempotent
 def api_add_order():
     order_json = parse_incoming_json()
     if not order_json:
@@ -155,9 +212,16 @@ def api_add_order():
     if "customer_name" not in order_json or "order_details" not in order_json:
         return jsonify({"error": "Missing required fields"}), 400
 
+    if write_behind_enabled():
+        return add_order_write_behind(order_json)
+
     conn = connection()
     try:
-        order_id = add_order(conn, order_json)
+        order_id = add_order(conn, order_json, store_id=current_store_id())
+    except ValueError as e:
+        # Products or order of another store
+        conn.close()
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         app.logger.exception("Failed to add order")
         conn.close()
@@ -167,40 +231,97 @@ def api_add_order():
     return jsonify({"order_id": order_id}), 200
 
 
+def order_outcome(future):
+    if future.exception() is not None:
+        return 500, {"error": "Failed to add order", "detail": str(future.exception())}
+    return 200, {"order_id": future.result()}
+
+
+def add_order_write_behind(order_json):
+    """Queues the order for the group-commit writer and waits for its batch to commit."""
+    try:
+        validate_order(order_json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        store_id = current_store_id()
+        future = writer_for(store_id).submit(order_json, store_id)
+    except OrderQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+
+    try:
+        order_id = future.result(timeout=write_timeout())
+    except FutureTimeout:
+        # The order stays queued and may still be committed; a retry with the
+        # same Idempotency-Key gets the outcome once it is known
+        complete_later(future, order_outcome)
+        return jsonify({"error": "Timed out waiting for the order to be written"}), 504
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        app.logger.exception("Failed to add order")
+        return jsonify({"error": "Failed to add order", "detail": str(e)}), 500
+
+    return jsonify({"order_id": order_id}), 200
+
+
 @app.route("/getOrders", methods=["GET"])
 def api_get_orders():
-    conn = connection()
-    orders = get_all_orders(conn)
+    try:
+        fmt = listing_format()
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        start, end = parse_date_range(request.args)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid date range: {e}"}), 400
+
+    conn = read_connection()
+    if fmt is not None:
+        columns, rows = get_all_orders_columns(conn, start, end, current_store_id())
+        conn.close()
+        return columnar_response(columns, rows, fmt)
+
+    orders = get_all_orders(conn, start, end, current_store_id())
     conn.close()
     return jsonify(orders)
 
 
 @app.route("/getRecentOrders", methods=["GET"])
 def api_get_recent_orders():
-    conn = connection()
-    orders = get_recent_orders(conn, limit=5)
+    conn = read_connection()
+    orders = get_recent_orders(conn, limit=5, store_id=current_store_id())
     conn.close()
     return jsonify(orders)
 
 
 @app.route("/getOrder/<int:order_id>", methods=["GET"])
 def api_get_order(order_id):
-    conn = connection()
+    conn = read_connection()
     cursor = conn.cursor(dictionary=True)
 
-    cursor.execute("SELECT * FROM orders WHERE order_id = %s", (order_id,))
+    store_id = current_store_id()
+    cursor.execute("SELECT * FROM orders WHERE order_id = %s AND store_id = %s", (order_id, store_id))
     order = cursor.fetchone()
+    details_table = "order_details"
+    if not order:
+        # Orders of closed periods live in the archive (services/order_archiver.py)
+        cursor.execute("SELECT * FROM orders_archive WHERE order_id = %s AND store_id = %s", (order_id, store_id))
+        order = cursor.fetchone()
+        details_table = "order_details_archive"
     if not order:
         conn.close()
         return jsonify({"error": "Order not found"}), 404
 
     cursor.execute(
-        """
+        f"""
         SELECT od.order_id, od.product_id, od.quantity, od.total_price AS item_total,
                p.name AS product_name, u.uom_name
-        FROM order_details od
-        JOIN products p ON od.product_id = p.product_id
-        JOIN uom u ON p.uom_id = u.uom_id
+        FROM {details_table} od
+        LEFT JOIN products p ON od.product_id = p.product_id
+        LEFT JOIN uom u ON p.uom_id = u.uom_id
         WHERE od.order_id = %s
         """,
         (order_id,)
@@ -213,8 +334,8 @@ def api_get_order(order_id):
 
 @app.route("/getOrderDetails/<int:order_id>", methods=["GET"])
 def api_order_details(order_id):
-    conn = connection()
-    details = get_order_details(conn, order_id)
+    conn = read_connection()
+    details = get_order_details(conn, order_id, current_store_id())
     conn.close()
     return jsonify(details)
 
@@ -222,14 +343,65 @@ def api_order_details(order_id):
 @app.route("/deleteOrder/<int:order_id>", methods=["DELETE"])
 def api_delete_order(order_id):
     conn = connection()
-    cursor = conn.cursor()
+    try:
+        # Current or archived; another store's order is left alone
+        delete_orders(conn, [order_id], store_id=current_store_id())
+    finally:
+        conn.close()
+    return jsonify({"deleted": order_id})
 
-    cursor.execute("DELETE FROM order_details WHERE order_id = %s", (order_id,))
-    cursor.execute("DELETE FROM orders WHERE order_id = %s", (order_id,))
 
-    conn.commit()
-    conn.close()
-    return jsonify({"deleted": order_id})
+def parse_order_ids(value):
+    if not isinstance(value, list) or not value:
+        raise ValueError("'order_ids' must be a non-empty list")
+    if any(isinstance(v, bool) or not isinstance(v, int) for v in value):
+        raise ValueError("'order_ids' must be integers")
+    return value
+
+
+@app.route("/deleteOrders", methods=["POST"])
+@idempotent
+def api_delete_orders():
+    """
+    Body: {"order_ids": [...]} or {"from": ..., "to": ...}, plus an optional
+    "restore_stock": true to give the item quantities back to the products.
+    """
+    body = parse_incoming_json()
+    if not isinstance(body, dict):
+        return jsonify({"error": "Missing or invalid JSON"}), 400
+
+    try:
+        if "order_ids" in body:
+            if "from" in body or "to" in body:
+                raise ValueError("Pass either 'order_ids' or 'from' and 'to'")
+            order_ids, (start, end) = parse_order_ids(body["order_ids"]), (None, None)
+        else:
+            order_ids, (start, end) = None, parse_date_range(body)
+            if start is None or end is None:
+                raise ValueError("Pass either 'order_ids' or 'from' and 'to'")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = connection()
+    try:
+        totals = delete_orders(
+            conn, order_ids, start, end,
+            restore_stock=bool(body.get("restore_stock", False)),
+            chunk_size=int(os.getenv("ORDER_DELETE_CHUNK_SIZE", 500)),
+            store_id=current_store_id(),
+        )
+    except Exception as e:
+        app.logger.exception("Failed to delete orders")
+        return jsonify({"error": "Failed to delete orders", "detail": str(e)}), 500
+    finally:
+        conn.close()
+
+    return jsonify({
+        "deleted_orders": totals["orders"],
+        "deleted_items": totals["order_details"],
+        "restocked_products": totals["products_restocked"],
+        "chunks": totals["chunks"],
+    })
 
 
 # -------------------------------------------------------
@@ -0,0 +1,222 @@
+"""
+ASGI app for the read-only endpoints, backed by the async DAO layer:
+
+    uvicorn backend.asgi:app --port 5051
+
+Serves GET /getProducts, /getOrders (with its "from" / "to" range),
+/getRecentOrders and /getOrderDetails/<id> with the same responses as the
+Flask app. A single
+process holds many slow requests at once because waiting on MySQL does not
+tie up a thread; concurrency is bounded by the aiomysql pool instead.
+Requests are scoped to the store named by X-Store-Id like in the Flask
+app, with one pool per shard (see db/shards.py).
+"""
+
+import asyncio
+import re
+import urllib.parse
+
+from .db.async_connection import create_async_pool
+from .db.shards import default_store_id, shard_for, validate_store_id
+from .web.compression import compress, compression_enabled, min_bytes, negotiate
+from .web.date_range import parse_date_range
+from .web.json_provider import dumps_bytes
+from .dao.async_dao import (
+    get_all_products,
+    get_all_orders,
+    get_recent_orders,
+    get_order_details,
+)
+
+# Same origins as the Flask app's CORS setup
+ALLOWED_ORIGINS = {
+    "http://localhost:8000",
+    "http://127.0.0.1:8000"
+}
+
+# Keyed by shard, None for the default server
+_pools = {}
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool(shard=None):
+    async with _pool_lock:
+        if shard not in _pools:
+            host, port = shard if shard is not None else (None, None)
+            _pools[shard] = await create_async_pool(host, port)
+    return _pools[shard]
+
+
+async def close_pool():
+    async with _pool_lock:
+        for pool in _pools.values():
+            pool.close()
+            await pool.wait_closed()
+        _pools.clear()
+
+
+# -------------------------------------------------------
+# Handlers
+# -------------------------------------------------------
+async def products_handler(store_id, query):
+    async with (await get_pool(shard_for(store_id))).acquire() as conn:
+        return 200, await get_all_products(conn, store_id)
+
+
+async def orders_handler(store_id, query):
+    try:
+        start, end = parse_date_range(query)
+    except (TypeError, ValueError) as e:
+        return 400, {"error": f"Invalid date range: {e}"}
+
+    async with (await get_pool(shard_for(store_id))).acquire() as conn:
+        return 200, await get_all_orders(conn, start, end, store_id)
+
+
+async def recent_orders_handler(store_id, query):
+    async with (await get_pool(shard_for(store_id))).acquire() as conn:
+        return 200, await get_recent_orders(conn, limit=5, store_id=store_id)
+
+
+async def order_details_handler(store_id, query, order_id):
+    async with (await get_pool(shard_for(store_id))).acquire() as conn:
+        return 200, await get_order_details(conn, int(order_id), store_id)
+
+
+async def health_handler(store_id, query):
+    return 200, {"status": "ok"}
+
+
+ROUTES = [
+    (re.compile(r"^/health$"), health_handler),
+    (re.compile(r"^/getProducts$"), products_handler),
+    (re.compile(r"^/getOrders$"), orders_handler),
+    (re.compile(r"^/getRecentOrders$"), recent_orders_handler),
+    (re.compile(r"^/getOrderDetails/(\d+)$"), order_details_handler),
+]
+
+
+# -------------------------------------------------------
+# ASGI plumbing
+# -------------------------------------------------------
+def encode_json(body):
+    # Same encoder as the Flask app's JSON provider
+    return dumps_bytes(body)
+
+
+def store_id_of(scope):
+    """Store named by the X-Store-Id header, DEFAULT_STORE_ID without one."""
+    headers = dict(scope.get("headers") or [])
+    value = headers.get(b"x-store-id")
+    if value is None:
+        return default_store_id()
+    store_id = int(value)
+    validate_store_id(store_id)
+    return store_id
+
+
+def query_of(scope):
+    """Query string parameters, the first value of each."""
+    query = urllib.parse.parse_qs((scope.get("query_string") or b"").decode())
+    return {name: values[0] for name, values in query.items()}
+
+
+def cors_headers(scope):
+    headers = dict(scope.get("headers") or [])
+    origin = headers.get(b"origin", b"").decode()
+    if origin not in ALLOWED_ORIGINS:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode()),
+        (b"access-control-allow-credentials", b"true"),
+        (b"vary", b"Origin"),
+    ]
+
+
+def content_encoding(scope, payload):
+    """Negotiated encoding for a JSON payload, same rules as the Flask app."""
+    if not compression_enabled() or len(payload) < min_bytes():
+        return None
+    headers = dict(scope.get("headers") or [])
+    return negotiate(headers.get(b"accept-encoding", b"").decode())
+
+
+async def send_response(send, scope, status, body):
+    payload = encode_json(body)
+    headers = [(b"content-type", b"application/json"), *cors_headers(scope)]
+
+    encoding = content_encoding(scope, payload)
+    if compression_enabled():
+        headers.append((b"vary", b"Accept-Encoding"))
+    if encoding is not None:
+        payload = compress(payload, encoding)
+        headers.append((b"content-encoding", encoding.encode()))
+
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [*headers, (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    if scope["type"] != "http":
+        return
+
+    method = scope["method"]
+    path = scope["path"]
+
+    for pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            break
+    else:
+        await send_response(send, scope, 404, {"error": "Not found"})
+        return
+
+    if method == "OPTIONS":
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"access-control-allow-methods", b"GET, OPTIONS"),
+                (b"access-control-allow-headers", b"Content-Type, X-Store-Id"),
+                (b"content-length", b"0"),
+                *cors_headers(scope),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    if method not in ("GET", "HEAD"):
+        await send_response(send, scope, 405, {"error": "Method not allowed"})
+        return
+
+    try:
+        store_id = store_id_of(scope)
+    except ValueError:
+        await send_response(send, scope, 400, {"error": "X-Store-Id must be a positive integer"})
+        return
+
+    try:
+        status, body = await handler(store_id, query_of(scope), *match.groups())
+    except Exception as e:
+        status, body = 500, {"error": "Database request failed", "detail": str(e)}
+
+    await send_response(send, scope, status, body)
@@ -0,0 +1,93 @@
+"""
+Async variants of the read DAOs for the ASGI API (backend/asgi.py).
+
+They run the same SQL as the synchronous DAOs on an aiomysql connection
+and return the same row shapes, scoped to a store when store_id is given.
+"""
+
+from .products_dao import GET_ALL_PRODUCTS_QUERY, GET_STORE_PRODUCTS_QUERY, product_row_to_dict
+from .order_list_dao import (
+    ARCHIVE_BOUNDARY_QUERY,
+    ARCHIVED_RECENT_ORDERS_QUERY,
+    RECENT_ORDERS_QUERY,
+    STORE_ARCHIVE_BOUNDARY_QUERY,
+    orders_statement,
+    recent_orders_query,
+    validate_limit,
+    validate_range,
+)
+from .order_details_dao import (
+    ARCHIVED_ORDER_DETAILS_QUERY,
+    ORDER_DETAILS_QUERY,
+    STORE_ARCHIVED_ORDER_DETAILS_QUERY,
+    STORE_ORDER_DETAILS_QUERY,
+)
+
+
+async def _fetch_dicts(conn, query, params=None):
+    async with conn.cursor() as cursor:
+        await cursor.execute(query, params)
+        rows = await cursor.fetchall()
+        columns = [col[0] for col in cursor.description]
+
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def archive_boundary(conn, store_id=None):
+    # Not cached: the shared cache client would block the event loop
+    async with conn.cursor() as cursor:
+        if store_id is None:
+            await cursor.execute(ARCHIVE_BOUNDARY_QUERY)
+        else:
+            await cursor.execute(STORE_ARCHIVE_BOUNDARY_QUERY, (store_id,))
+        rows = await cursor.fetchall()
+
+    return rows[0][0] if rows else None
+
+
+async def get_all_products(conn, store_id=None):
+    async with conn.cursor() as cursor:
+        if store_id is None:
+            await cursor.execute(GET_ALL_PRODUCTS_QUERY)
+        else:
+            await cursor.execute(GET_STORE_PRODUCTS_QUERY, (store_id,))
+        rows = await cursor.fetchall()
+
+    return [product_row_to_dict(row) for row in rows]
+
+
+async def get_all_orders(conn, start=None, end=None, store_id=None):
+    """Orders placed in [start, end), newest first, archive included like the sync DAO."""
+    validate_range(start, end)
+    boundary = await archive_boundary(conn, store_id)
+
+    query, params = orders_statement(boundary, start, end, store_id)
+    return await _fetch_dicts(conn, query, params)
+
+
+async def get_recent_orders(conn, limit=5, store_id=None):
+    validate_limit(limit)
+    if store_id is None:
+        query, archived_query, scope = RECENT_ORDERS_QUERY, ARCHIVED_RECENT_ORDERS_QUERY, ()
+    else:
+        query, archived_query, scope = recent_orders_query("orders"), recent_orders_query("orders_archive"), (store_id,)
+
+    result = await _fetch_dicts(conn, query, (*scope, limit))
+
+    if len(result) < limit and await archive_boundary(conn, store_id) is not None:
+        result += await _fetch_dicts(conn, archived_query, (*scope, limit - len(result)))
+    return result
+
+
+async def get_order_details(conn, order_id, store_id=None):
+    if store_id is None:
+        query, archived_query, params = ORDER_DETAILS_QUERY, ARCHIVED_ORDER_DETAILS_QUERY, (order_id,)
+    else:
+        query, archived_query = STORE_ORDER_DETAILS_QUERY, STORE_ARCHIVED_ORDER_DETAILS_QUERY
+        params = (order_id, store_id)
+
+    result = await _fetch_dicts(conn, query, params)
+
+    if not result and await archive_boundary(conn, store_id) is not None:
+        result = await _fetch_dicts(conn, archived_query, params)
+    return result
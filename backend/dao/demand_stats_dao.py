@@ -0,0 +1,245 @@
+from datetime import date, datetime, timedelta
+
+# -------------------------------------------------------
+# PRODUCT DEMAND STATISTICS
+#
+# product_demand_stats keeps running sums of daily units sold per product
+# (days without sales count as 0) up to and including `updated_through`.
+# Each refresh only scans orders placed after the oldest watermark and
+# before today, so today's partial sales are never folded in twice.
+# Archived orders (services/order_archiver.py) count like current ones.
+#
+# Every writer holds the row of demand_stats_lock for its whole transaction,
+# taken before it reads the statistics it rewrites. A refresh that read the
+# rows before a rebuild or a delete therefore can't write them back after it.
+# -------------------------------------------------------
+
+WATERMARK_QUERY = "SELECT MIN(updated_through) FROM product_demand_stats"
+
+WRITE_STATS_QUERY = """
+    REPLACE INTO product_demand_stats
+        (product_id, days_observed, units_sum, units_sq_sum, mean, variance, updated_through)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        # SQLite returns DATE() and MIN() of dates as text
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def daily_sales_query(lower_bound):
+    """Units sold per product and day, over the current and archived orders."""
+    parts = [
+        f"""
+        SELECT od.product_id, DATE(o.datetime) AS sale_date, od.quantity AS units
+        FROM {details} od
+        JOIN {orders} o ON o.order_id = od.order_id
+        WHERE o.datetime < %s {lower_bound}
+        """
+        for orders, details in (("orders", "order_details"), ("orders_archive", "order_details_archive"))
+    ]
+    return f"""
+        SELECT product_id, sale_date, SUM(units) AS units
+        FROM ({"UNION ALL".join(parts)}) sales
+        GROUP BY product_id, sale_date
+    """
+
+
+def lock_demand_stats(cursor):
+    """
+    Locks the statistics until the caller's transaction ends. Call it right
+    after BEGIN: as the first statement is a write, MySQL locks the row and
+    SQLite takes its write lock before anything is read.
+    """
+    cursor.execute("UPDATE demand_stats_lock SET generation = generation + 1 WHERE lock_id = 1")
+    if cursor.rowcount == 0:
+        # Cleared by initialize_sql or never created
+        cursor.execute("INSERT INTO demand_stats_lock (lock_id, generation) VALUES (1, 1)")
+
+
+def _stats_row(product_id, days_observed, units_sum, units_sq_sum, through):
+    mean = units_sum / days_observed
+    variance = max(units_sq_sum / days_observed - mean * mean, 0.0)
+    return (product_id, days_observed, units_sum, units_sq_sum, mean, variance, through)
+
+
+def _fold_days(cursor, through):
+    """Folds the complete days up to `through` into the statistics; returns the rows written."""
+    cursor.execute(WATERMARK_QUERY)
+    watermark = _as_date(cursor.fetchall()[0][0])
+    if watermark is not None and watermark >= through:
+        # Another refresh got there first
+        return 0
+
+    cursor.execute("""
+        SELECT product_id, days_observed, units_sum, units_sq_sum, updated_through
+        FROM product_demand_stats
+    """)
+    stats = {
+        row[0]: {
+            "days_observed": row[1],
+            "units_sum": row[2],
+            "units_sq_sum": row[3],
+            "updated_through": _as_date(row[4]),
+        }
+        for row in cursor.fetchall()
+    }
+
+    # One grouped pass over the new part of the history
+    params = [through + timedelta(days=1)]
+    lower_bound = ""
+    if watermark is not None:
+        lower_bound = "AND o.datetime >= %s"
+        params.append(watermark + timedelta(days=1))
+
+    cursor.execute(daily_sales_query(lower_bound), tuple(params) * 2)
+
+    daily = {}
+    for (product_id, sale_date, units) in cursor.fetchall():
+        daily.setdefault(product_id, []).append((_as_date(sale_date), float(units)))
+
+    rows = []
+    for product_id in set(stats) | set(daily):
+        current = stats.get(product_id)
+        sales = daily.get(product_id, [])
+
+        if current is not None:
+            since = current["updated_through"]
+            sales = [(d, u) for (d, u) in sales if d > since]
+            days_observed = current["days_observed"] + (through - since).days
+            units_sum = current["units_sum"]
+            units_sq_sum = current["units_sq_sum"]
+        else:
+            # A product's history starts on its first day with sales
+            first_day = min(d for (d, _) in sales)
+            days_observed = (through - first_day).days + 1
+            units_sum = 0.0
+            units_sq_sum = 0.0
+
+        for (_, units) in sales:
+            units_sum += units
+            units_sq_sum += units * units
+
+        rows.append(_stats_row(product_id, days_observed, units_sum, units_sq_sum, through))
+
+    if rows:
+        cursor.executemany(WRITE_STATS_QUERY, rows)
+    return len(rows)
+
+
+def _in_transaction(connection, work):
+    cursor = connection.cursor()
+    cursor.execute("BEGIN")
+    try:
+        lock_demand_stats(cursor)
+        result = work(cursor)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return result
+
+
+def refresh_demand_stats(connection, through=None):
+    """
+    Folds all complete days up to `through` (default: yesterday) into
+    product_demand_stats. Returns the number of rows written.
+    """
+    if through is None:
+        through = date.today() - timedelta(days=1)
+
+    cursor = connection.cursor()
+
+    # Cheap check first, without the lock: most calls find every product up to date
+    cursor.execute(WATERMARK_QUERY)
+    watermark = _as_date(cursor.fetchall()[0][0])
+    if watermark is not None and watermark >= through:
+        return 0
+
+    return _in_transaction(connection, lambda c: _fold_days(c, through))
+
+
+def rebuild_demand_stats(connection, through=None):
+    """
+    Recomputes product_demand_stats from the full order history, archive
+    included, in one transaction: readers keep seeing the old statistics
+    until the new ones are committed.
+    """
+    if through is None:
+        through = date.today() - timedelta(days=1)
+
+    def rebuild(cursor):
+        cursor.execute("DELETE FROM product_demand_stats")
+        return _fold_days(cursor, through)
+
+    return _in_transaction(connection, rebuild)
+
+
+def subtract_orders(connection, order_ids, tables=("orders", "order_details")):
+    """
+    Takes the items of the given orders (in the (orders, details) tables)
+    out of the statistics of their products, for days already folded in.
+    Runs in the caller's transaction,
+    after lock_demand_stats() and before the orders are deleted. Returns the
+    number of products whose statistics changed. A product keeps the days
+    it was observed even when its first sale is deleted.
+    """
+    orders, details = tables
+    placeholders = ",".join(["%s"] * len(order_ids))
+    cursor = connection.cursor()
+
+    cursor.execute(f"""
+        SELECT od.product_id, DATE(o.datetime) AS sale_date, SUM(od.quantity) AS units
+        FROM {details} od
+        JOIN {orders} o ON o.order_id = od.order_id
+        WHERE od.order_id IN ({placeholders})
+        GROUP BY od.product_id, DATE(o.datetime)
+    """, tuple(order_ids))
+    removed = {}
+    for (product_id, sale_date, units) in cursor.fetchall():
+        removed.setdefault(product_id, {})[_as_date(sale_date)] = float(units)
+    if not removed:
+        return 0
+
+    product_list = ",".join(["%s"] * len(removed))
+    cursor.execute(f"""
+        SELECT product_id, days_observed, units_sum, units_sq_sum, updated_through
+        FROM product_demand_stats
+        WHERE product_id IN ({product_list})
+    """, tuple(removed))
+    stats = {row[0]: row for row in cursor.fetchall()}
+    if not stats:
+        return 0
+
+    # Whole-day totals of the affected days, to correct the sums of squares
+    days = [d for product_id in stats for d in removed[product_id]]
+    stats_list = ",".join(["%s"] * len(stats))
+    cursor.execute(f"""
+        SELECT product_id, sale_date, units FROM ({daily_sales_query("AND o.datetime >= %s")}) daily
+        WHERE product_id IN ({stats_list})
+    """, (max(days) + timedelta(days=1), min(days)) * 2 + tuple(stats))
+    totals = {(row[0], _as_date(row[1])): float(row[2]) for row in cursor.fetchall()}
+
+    rows = []
+    for product_id, (_, days_observed, units_sum, units_sq_sum, updated_through) in stats.items():
+        updated_through = _as_date(updated_through)
+        changed = False
+        for day, units in removed[product_id].items():
+            if day > updated_through:
+                continue    # not folded in yet
+            total = totals.get((product_id, day), units)
+            units_sum -= units
+            units_sq_sum -= total * total - (total - units) ** 2
+            changed = True
+        if changed:
+            rows.append(_stats_row(product_id, days_observed, max(units_sum, 0.0), max(units_sq_sum, 0.0),
+                                   updated_through))
+
+    if rows:
+        cursor.executemany(WRITE_STATS_QUERY, rows)
+    return len(rows)
@@ -0,0 +1,76 @@
+# -------------------------------------------------------
+# IDEMPOTENCY KEYS
+#
+# One row per (Idempotency-Key, endpoint). A row without status_code is a
+# claim: the request is still running. Once the response is stored, retries
+# with the same key are answered from the row.
+# -------------------------------------------------------
+
+
+def get_idempotency_record(connection, key, endpoint):
+    cursor = connection.cursor(dictionary=True)
+
+    cursor.execute("""
+        SELECT request_hash, status_code, content_type, response_body, created_at
+        FROM idempotency_keys
+        WHERE idempotency_key = %s AND endpoint = %s
+    """, (key, endpoint))
+    return cursor.fetchone()
+
+
+def claim_idempotency_key(connection, key, endpoint, request_hash, now):
+    """
+    Inserts the claim row. Returns False when the key is already taken,
+    e.g. by a concurrent request that claimed it first.
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+            INSERT INTO idempotency_keys (idempotency_key, endpoint, request_hash, created_at)
+            VALUES (%s, %s, %s, %s)
+        """, (key, endpoint, request_hash, now))
+    except Exception:
+        # Duplicate primary key; anything else is re-raised
+        if get_idempotency_record(connection, key, endpoint) is None:
+            raise
+        return False
+
+    connection.commit()
+    return True
+
+
+def save_idempotent_response(connection, key, endpoint, status_code, content_type, body):
+    cursor = connection.cursor()
+
+    cursor.execute("""
+        UPDATE idempotency_keys
+        SET status_code = %s, content_type = %s, response_body = %s
+        WHERE idempotency_key = %s AND endpoint = %s
+    """, (status_code, content_type, body, key, endpoint))
+
+    connection.commit()
+    return cursor.rowcount
+
+
+def release_idempotency_key(connection, key, endpoint):
+    """Drops the row so the request can be executed again."""
+    cursor = connection.cursor()
+
+    cursor.execute(
+        "DELETE FROM idempotency_keys WHERE idempotency_key = %s AND endpoint = %s",
+        (key, endpoint)
+    )
+
+    connection.commit()
+    return cursor.rowcount
+
+
+def delete_expired_idempotency_keys(connection, cutoff):
+    """Deletes keys created before `cutoff` (uses the created_at index)."""
+    cursor = connection.cursor()
+
+    cursor.execute("DELETE FROM idempotency_keys WHERE created_at < %s", (cutoff,))
+
+    connection.commit()
+    return cursor.rowcount
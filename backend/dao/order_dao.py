@@ -1,11 +1,65 @@
 from datetime import datetime
 
-def add_order(connection, order):
+from .demand_stats_dao import lock_demand_stats, subtract_orders
+from ..db.prepared import statement_cursor
+
+# Run once per order item, so they go through prepared statements
+INSERT_ORDER_ITEM_QUERY = """
+    INSERT INTO order_details (order_id, product_id, quantity, total_price)
+    VALUES (%s, %s, %s, %s)
+"""
+
+REDUCE_STOCK_QUERY = """
+    UPDATE products
+    SET quantity = quantity - %s
+    WHERE product_id = %s
+"""
+
+# Store-scoped orders (see db/shards.py)
+INSERT_STORE_ORDER_ITEM_QUERY = """
+    INSERT INTO order_details (order_id, product_id, quantity, total_price, store_id)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def check_store_products(connection, product_ids, store_id):
+    """Raises ValueError unless every product belongs to the store."""
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+
+    cursor = connection.cursor()
+    placeholders = ",".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"SELECT product_id FROM products WHERE store_id = %s AND product_id IN ({placeholders})",
+        (store_id, *product_ids)
+    )
+    missing = set(product_ids) - {row[0] for row in cursor.fetchall()}
+    if missing:
+        raise ValueError(f"Products not in store {store_id}: {sorted(missing)}")
+
+
+def add_order(connection, order, commit=True, store_id=None):
+    """
+    Inserts the order, or replaces it when order_id is set, and returns its id.
+    With commit=False the caller owns the transaction (see services/order_writer.py).
+    With store_id the order and its products must belong to that store
+    (ValueError otherwise).
+    """
+    if store_id is not None:
+        check_store_products(connection, [int(item["product_id"]) for item in order["order_details"]], store_id)
+
     cursor = connection.cursor(dictionary=True)
 
     if order.get("order_id"):
         order_id = int(order["order_id"])
 
+        if store_id is not None:
+            cursor.execute("SELECT store_id FROM orders WHERE order_id = %s", (order_id,))
+            row = cursor.fetchone()
+            if row is None or row["store_id"] != store_id:
+                raise ValueError(f"Order {order_id} not found in store {store_id}")
+
         # Get previous items for quantity restore
         cursor.execute(
             "SELECT product_id, quantity FROM order_details WHERE order_id = %s",
@@ -35,6 +89,18 @@ def add_order(connection, order):
             order_id
         ))
 
+    elif store_id is not None:
+        cursor.execute("""
+            INSERT INTO orders (customer_name, total_price, datetime, store_id)
+            VALUES (%s, %s, %s, %s)
+        """, (
+            order["customer_name"],
+            float(order["total_price"]),
+            datetime.now(),
+            store_id
+        ))
+        order_id = cursor.lastrowid
+
     else:
         cursor.execute("""
             INSERT INTO orders (customer_name, total_price, datetime)
@@ -47,26 +113,151 @@ def add_order(connection, order):
         order_id = cursor.lastrowid
 
 
+    item_query = INSERT_ORDER_ITEM_QUERY if store_id is None else INSERT_STORE_ORDER_ITEM_QUERY
+    item_scope = () if store_id is None else (store_id,)
+    insert_item = statement_cursor(connection, item_query)
+    reduce_stock = statement_cursor(connection, REDUCE_STOCK_QUERY)
+
     for item in order["order_details"]:
-        cursor.execute("""
-            INSERT INTO order_details (order_id, product_id, quantity, total_price)
-            VALUES (%s, %s, %s, %s)
-        """, (
+        insert_item.execute(item_query, (
             order_id,
             int(item["product_id"]),
             float(item["quantity"]),
-            float(item["total_price"])
+            float(item["total_price"]),
+            *item_scope
         ))
 
         # Reduce stock
-        cursor.execute("""
-            UPDATE products
-            SET quantity = quantity - %s
-            WHERE product_id = %s
-        """, (
+        reduce_stock.execute(REDUCE_STOCK_QUERY, (
             float(item["quantity"]),
             int(item["product_id"])
         ))
 
-    connection.commit()
+    if commit:
+        connection.commit()
     return order_id
+
+
+# -------------------------------------------------------
+# BULK DELETE
+#
+# Orders are deleted in chunks of ids, each chunk with one set-based
+# statement per table in its own transaction. A failing chunk is rolled
+# back alone; the chunks before it stay deleted. The same transaction takes
+# the deleted items out of the learned demand (see demand_stats_dao.py).
+# -------------------------------------------------------
+# Current and archived orders (see services/order_archiver.py)
+ORDER_TABLES = [("orders", "order_details"), ("orders_archive", "order_details_archive")]
+
+
+def _range_chunk_query(orders, by_store):
+    store = "store_id = %s AND " if by_store else ""
+    return f"""
+        SELECT order_id FROM {orders}
+        WHERE {store}datetime >= %s AND datetime < %s
+        ORDER BY order_id
+        LIMIT %s
+    """
+
+
+def _restore_stock_query(details, placeholders):
+    # One UPDATE per chunk: every product gets back the summed quantity of its items
+    return f"""
+        UPDATE products
+        SET quantity = quantity + (
+            SELECT SUM(od.quantity) FROM {details} od
+            WHERE od.order_id IN ({placeholders}) AND od.product_id = products.product_id
+        )
+        WHERE product_id IN (
+            SELECT product_id FROM {details} WHERE order_id IN ({placeholders})
+        )
+    """
+
+
+def _delete_chunk(connection, order_ids, restore_stock, store_id=None, tables=ORDER_TABLES[0]):
+    """Deletes one chunk in a transaction and returns (orders, items, products restocked)."""
+    orders_table, details_table = tables
+    if store_id is not None or orders_table != "orders":
+        # Another store's orders are left alone, and most ids are not archived
+        order_ids = _stored_orders(connection, order_ids, store_id, orders_table)
+        if not order_ids:
+            return 0, 0, 0
+    placeholders = ",".join(["%s"] * len(order_ids))
+    params = tuple(order_ids)
+
+    cursor = connection.cursor()
+    cursor.execute("BEGIN")
+    try:
+        lock_demand_stats(cursor)
+        subtract_orders(connection, order_ids, tables)
+        restocked = 0
+        if restore_stock:
+            cursor.execute(_restore_stock_query(details_table, placeholders), params * 2)
+            restocked = cursor.rowcount
+        cursor.execute(f"DELETE FROM {details_table} WHERE order_id IN ({placeholders})", params)
+        items = cursor.rowcount
+        cursor.execute(f"DELETE FROM {orders_table} WHERE order_id IN ({placeholders})", params)
+        orders = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return orders, items, restocked
+
+
+def _stored_orders(connection, order_ids, store_id, orders_table="orders"):
+    """The ids present in the table (and of the store, with store_id)."""
+    placeholders = ",".join(["%s"] * len(order_ids))
+    store = "" if store_id is None else "store_id = %s AND "
+    scope = () if store_id is None else (store_id,)
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT order_id FROM {orders_table} WHERE {store}order_id IN ({placeholders})",
+        scope + tuple(order_ids)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _range_chunks(connection, start, end, chunk_size, store_id=None, orders_table="orders"):
+    query = _range_chunk_query(orders_table, store_id is not None)
+    scope = () if store_id is None else (store_id,)
+    cursor = connection.cursor()
+    while True:
+        cursor.execute(query, scope + (start, end, chunk_size))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        if not order_ids:
+            return
+        yield order_ids
+
+
+def delete_orders(connection, order_ids=None, start=None, end=None, restore_stock=False, chunk_size=500,
+                  store_id=None):
+    """
+    Deletes the given orders, or those placed in [start, end), with their
+    items, whether they are current or archived; with store_id only orders
+    of that store. With restore_stock the item quantities go back to the
+    products.
+    Returns {"orders": n, "order_details": n, "products_restocked": n, "chunks": n}.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if (order_ids is None) == (start is None or end is None):
+        raise ValueError("Pass either order_ids or both start and end")
+
+    totals = {"orders": 0, "order_details": 0, "products_restocked": 0, "chunks": 0}
+    for tables in ORDER_TABLES:
+        if order_ids is not None:
+            ids = list(dict.fromkeys(order_ids))
+            chunks = (ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size))
+        else:
+            chunks = _range_chunks(connection, start, end, chunk_size, store_id, tables[0])
+
+        for chunk in chunks:
+            orders, items, restocked = _delete_chunk(connection, chunk, restore_stock, store_id, tables)
+            if tables is not ORDER_TABLES[0] and not orders:
+                continue    # no archived orders among these ids
+            totals["orders"] += orders
+            totals["order_details"] += items
+            totals["products_restocked"] += restocked
+            totals["chunks"] += 1
+    return totals
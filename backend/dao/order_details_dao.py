@@ -1,25 +1,67 @@
-def get_order_details(conn, order_id):
-    cursor = conn.cursor(dictionary=True)
-
-    query = """
-        SELECT 
-            o.order_id,
-            o.customer_name,
-            o.total_price,
-            o.datetime,
-            od.product_id,
-            p.name AS product_name,
-            p.uom_id,
-            u.uom_name,
-            od.quantity,
-            od.total_price AS item_total
-        FROM orders o
-        JOIN order_details od ON o.order_id = od.order_id
-        JOIN products p ON od.product_id = p.product_id
-        JOIN uom u ON p.uom_id = u.uom_id
-        WHERE o.order_id = %s
-    """
-
-    cursor.execute(query, (order_id,))
+from ..db.prepared import statement_cursor
+from .order_list_dao import archive_boundary
+
+ORDER_DETAILS_QUERY = """
+    SELECT 
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime,
+        od.product_id,
+        p.name AS product_name,
+        p.uom_id,
+        u.uom_name,
+        od.quantity,
+        od.total_price AS item_total
+    FROM orders o
+    JOIN order_details od ON o.order_id = od.order_id
+    JOIN products p ON od.product_id = p.product_id
+    JOIN uom u ON p.uom_id = u.uom_id
+    WHERE o.order_id = %s
+"""
+
+# Archived order items may refer to products deleted since, hence LEFT JOINs
+ARCHIVED_ORDER_DETAILS_QUERY = """
+    SELECT
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime,
+        od.product_id,
+        p.name AS product_name,
+        p.uom_id,
+        u.uom_name,
+        od.quantity,
+        od.total_price AS item_total
+    FROM orders_archive o
+    JOIN order_details_archive od ON o.order_id = od.order_id
+    LEFT JOIN products p ON od.product_id = p.product_id
+    LEFT JOIN uom u ON p.uom_id = u.uom_id
+    WHERE o.order_id = %s
+"""
+
+
+# Scoped to one store (see db/shards.py): another store's order has no details
+STORE_ORDER_DETAILS_QUERY = ORDER_DETAILS_QUERY + "      AND o.store_id = %s\n"
+STORE_ARCHIVED_ORDER_DETAILS_QUERY = ARCHIVED_ORDER_DETAILS_QUERY + "      AND o.store_id = %s\n"
+
+
+def get_order_details(conn, order_id, store_id=None):
+    if store_id is None:
+        query, archived_query, params = ORDER_DETAILS_QUERY, ARCHIVED_ORDER_DETAILS_QUERY, (order_id,)
+    else:
+        query, archived_query = STORE_ORDER_DETAILS_QUERY, STORE_ARCHIVED_ORDER_DETAILS_QUERY
+        params = (order_id, store_id)
+
+    cursor = statement_cursor(conn, query, dictionary=True)
+
+    cursor.execute(query, params)
     rows = cursor.fetchall()
+
+    # Not a current order: it may have been archived
+    if not rows and archive_boundary(conn, store_id) is not None:
+        archived = statement_cursor(conn, archived_query, dictionary=True)
+        archived.execute(archived_query, params)
+        rows = archived.fetchall()
+
     return rows
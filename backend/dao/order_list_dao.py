@@ -1,44 +1,212 @@
 import datetime
+from functools import lru_cache
 
-def get_all_orders(conn):
-    cursor = conn.cursor(dictionary=True)
-
-    query = """
-        SELECT 
-            o.order_id,
-            o.customer_name,
-            o.total_price,
-            o.datetime
-        FROM orders o
-        ORDER BY o.datetime DESC
+from ..db.prepared import statement_cursor
+from ..services.cache import shared_cache, store_namespaces
+
+ALL_ORDERS_QUERY = """
+    SELECT 
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime
+    FROM orders o
+    ORDER BY o.datetime DESC
+"""
+
+RECENT_ORDERS_QUERY = """
+    SELECT 
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime
+    FROM orders o
+    ORDER BY o.datetime DESC
+    LIMIT %s
+"""
+
+ARCHIVED_RECENT_ORDERS_QUERY = """
+    SELECT
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime
+    FROM orders_archive o
+    ORDER BY o.datetime DESC
+    LIMIT %s
+"""
+
+# -------------------------------------------------------
+# ARCHIVE
+#
+# Orders of closed periods are moved to orders_archive by
+# services/order_archiver.py. Everything in the archive is older than
+# everything in orders, so the archive is only read when a requested range
+# starts at or before its newest order, or is bounded by "to" alone. A
+# listing without a range includes the archive as soon as it holds orders,
+# as it did before the archiver moved them.
+# -------------------------------------------------------
+# Rather than MAX(datetime), which SQLite returns as text
+ARCHIVE_BOUNDARY_QUERY = "SELECT datetime FROM orders_archive ORDER BY datetime DESC LIMIT 1"
+STORE_ARCHIVE_BOUNDARY_QUERY = """
+    SELECT datetime FROM orders_archive WHERE store_id = %s ORDER BY datetime DESC LIMIT 1
+"""
+
+
+def _load_archive_boundary(conn, store_id):
+    cursor = conn.cursor()
+
+    if store_id is None:
+        cursor.execute(ARCHIVE_BOUNDARY_QUERY)
+    else:
+        cursor.execute(STORE_ARCHIVE_BOUNDARY_QUERY, (store_id,))
+    rows = cursor.fetchall()
+
+    return rows[0][0] if rows else None
+
+
+def archive_boundary(conn, store_id=None):
     """
+    Datetime of the newest archived order (of the store), None while there
+    is none. A store's boundary is cached until its orders change.
+    """
+    if store_id is None:
+        return _load_archive_boundary(conn, None)
+
+    def load():
+        boundary = _load_archive_boundary(conn, store_id)
+        return boundary.isoformat() if boundary is not None else None
+
+    cached = shared_cache.get_or_load(f"archive_boundary:{store_id}", load, store_namespaces(store_id))
+    return datetime.datetime.fromisoformat(cached) if cached is not None else None
+
+
+def reaches_archive(boundary, start, end=None):
+    """Whether orders in [start, end) may be archived; both bounds are optional."""
+    if boundary is None:
+        return False
+    if start is not None:
+        return start <= boundary
+    return True
+
+
+@lru_cache(maxsize=None)
+def orders_range_query(has_start, has_end, archive, by_store=False):
+    """
+    Orders newest first, optionally of one store and within [start, end),
+    with the archive appended by UNION ALL. Built once per shape, so the
+    same string object is reused (see db/prepared.py).
+    """
+    conditions = []
+    if by_store:
+        conditions.append("store_id = %s")
+    if has_start:
+        conditions.append("datetime >= %s")
+    if has_end:
+        conditions.append("datetime < %s")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    tables = ["orders", "orders_archive"] if archive else ["orders"]
+    parts = [
+        f"SELECT order_id, customer_name, total_price, datetime FROM {table} {where}"
+        for table in tables
+    ]
+    return "\nUNION ALL\n".join(parts) + "\nORDER BY datetime DESC"
+
+
+@lru_cache(maxsize=None)
+def recent_orders_query(table):
+    """RECENT_ORDERS_QUERY of one store, on orders or orders_archive."""
+    return f"""
+    SELECT
+        o.order_id,
+        o.customer_name,
+        o.total_price,
+        o.datetime
+    FROM {table} o
+    WHERE o.store_id = %s
+    ORDER BY o.datetime DESC
+    LIMIT %s
+"""
+
+
+def _range_params(start, end, archive, store_id=None):
+    params = tuple(value for value in (store_id, start, end) if value is not None)
+    return params * 2 if archive else params
 
-    cursor.execute(query)
-    result = cursor.fetchall()
-        
-    return result
 
+def orders_statement(boundary, start, end, store_id=None):
+    """(query, params) listing the orders in [start, end), given the archive boundary."""
+    archive = reaches_archive(boundary, start, end)
+    if start is None and end is None and store_id is None and not archive:
+        return ALL_ORDERS_QUERY, None
 
-def get_recent_orders(conn, limit=5):
-    cursor = conn.cursor(dictionary=True)
+    query = orders_range_query(start is not None, end is not None, archive, store_id is not None)
+    return query, _range_params(start, end, archive, store_id)
 
+
+def _orders_statement(conn, start, end, store_id=None):
+    return orders_statement(archive_boundary(conn, store_id), start, end, store_id)
+
+
+def validate_limit(limit):
     if not isinstance(limit, int) or limit < 0:
         raise ValueError("limit must be a non-negative integer")
 
-    # NOTE: limit = 0 must be passed directly to SQL
 
-    query = """
-        SELECT 
-            o.order_id,
-            o.customer_name,
-            o.total_price,
-            o.datetime
-        FROM orders o
-        ORDER BY o.datetime DESC
-        LIMIT %s
-    """
+def validate_range(start, end):
+    for value in (start, end):
+        if value is not None and not isinstance(value, datetime.datetime):
+            raise ValueError("start and end must be datetimes")
+    if start is not None and end is not None and start >= end:
+        raise ValueError("start must be before end")
+
+
+def get_all_orders(conn, start=None, end=None, store_id=None):
+    """Orders placed in [start, end), newest first; both bounds are optional."""
+    validate_range(start, end)
+    query, params = _orders_statement(conn, start, end, store_id)
 
-    cursor.execute(query, (limit,))
+    cursor = statement_cursor(conn, query, dictionary=True)
+
+    cursor.execute(query, params)
     result = cursor.fetchall()
 
-    return result
\ No newline at end of file
+    return result
+
+
+def get_all_orders_columns(conn, start=None, end=None, store_id=None):
+    """Column names and the row tuples as fetched, for the columnar formats."""
+    validate_range(start, end)
+    query, params = _orders_statement(conn, start, end, store_id)
+
+    cursor = statement_cursor(conn, query)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    return [col[0] for col in cursor.description], rows
+
+
+def get_recent_orders(conn, limit=5, store_id=None):
+    if store_id is None:
+        query, archived_query, scope = RECENT_ORDERS_QUERY, ARCHIVED_RECENT_ORDERS_QUERY, ()
+    else:
+        query, archived_query, scope = recent_orders_query("orders"), recent_orders_query("orders_archive"), (store_id,)
+
+    cursor = statement_cursor(conn, query, dictionary=True)
+
+    validate_limit(limit)
+
+    # NOTE: limit = 0 must be passed directly to SQL
+
+    cursor.execute(query, (*scope, limit))
+    result = cursor.fetchall()
+
+    # Only fewer than `limit` orders in the hot table: continue in the archive
+    if len(result) < limit and archive_boundary(conn, store_id) is not None:
+        archived = statement_cursor(conn, archived_query, dictionary=True)
+        archived.execute(archived_query, (*scope, limit - len(result)))
+        result = list(result) + archived.fetchall()
+
+    return result
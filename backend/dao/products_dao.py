@@ -1,49 +1,146 @@
+from ..db.prepared import statement_cursor
 from ..db.sql_connection import get_sql_connection
 
 # -------------------------------------------------------
 # GET ALL PRODUCTS
 # -------------------------------------------------------
-def get_all_products(connection):
+GET_ALL_PRODUCTS_QUERY = """
+    SELECT 
+        p.product_id,
+        p.name,
+        p.uom_id,
+        p.price_per_unit,
+        p.selling_price,
+        p.quantity,
+        u.uom_name
+    FROM products p
+    INNER JOIN uom u ON p.uom_id = u.uom_id
+    ORDER BY p.product_id ASC
+"""
 
-    cursor = connection.cursor()
 
-    query = (
-        """
-        SELECT 
-            p.product_id,
-            p.name,
-            p.uom_id,
-            p.price_per_unit,
-            p.selling_price,
-            p.quantity,
-            u.uom_name
-        FROM products p
-        INNER JOIN uom u ON p.uom_id = u.uom_id
-        ORDER BY p.product_id ASC
-        """
-    )
+def product_row_to_dict(row):
+    (product_id, name, uom_id, price_per_unit, selling_price, quantity, uom_name) = row
+    return {
+        "product_id": product_id,
+        "name": name,
+        "uom_id": uom_id,
+        "price_per_unit": float(price_per_unit),
+        "selling_price": float(selling_price),
+        "quantity": quantity,
+        "uom_name": uom_name
+    }
+
+
+# Same listing for one store (see db/shards.py)
+GET_STORE_PRODUCTS_QUERY = """
+    SELECT
+        p.product_id,
+        p.name,
+        p.uom_id,
+        p.price_per_unit,
+        p.selling_price,
+        p.quantity,
+        u.uom_name
+    FROM products p
+    INNER JOIN uom u ON p.uom_id = u.uom_id
+    WHERE p.store_id = %s
+    ORDER BY p.product_id ASC
+"""
+
+
+def _execute_listing(connection, query, store_query, store_id, dictionary=False):
+    """Runs the all-stores query, or its store-scoped twin when store_id is given."""
+    if store_id is None:
+        cursor = statement_cursor(connection, query, dictionary=dictionary)
+        cursor.execute(query)
+    else:
+        cursor = statement_cursor(connection, store_query, dictionary=dictionary)
+        cursor.execute(store_query, (store_id,))
+    return cursor
+
 
-    cursor.execute(query)
+def get_all_products(connection, store_id=None):
+
+    cursor = _execute_listing(connection, GET_ALL_PRODUCTS_QUERY, GET_STORE_PRODUCTS_QUERY, store_id)
 
     response = []
-    for (product_id, name, uom_id, price_per_unit, selling_price, quantity, uom_name) in cursor:
-        response.append({
-            "product_id": product_id,
-            "name": name,
-            "uom_id": uom_id,
-            "price_per_unit": float(price_per_unit),
-            "selling_price": float(selling_price),
-            "quantity": quantity,
-            "uom_name": uom_name
-        })
+    for row in cursor:
+        response.append(product_row_to_dict(row))
 
     return response
 
 
+def get_all_products_columns(connection, store_id=None):
+    """Column names and the row tuples as fetched, for the columnar formats."""
+    cursor = _execute_listing(connection, GET_ALL_PRODUCTS_QUERY, GET_STORE_PRODUCTS_QUERY, store_id)
+
+    rows = cursor.fetchall()
+
+    return [col[0] for col in cursor.description], rows
+
+
+# -------------------------------------------------------
+# LOW STOCK
+#
+# A product needs restocking once its quantity is at or below its
+# reorder_threshold. The condition is written as the indexed expression
+# (idx_products_stock_margin), so only the matching rows are read.
+# -------------------------------------------------------
+LOW_STOCK_QUERY = """
+    SELECT
+        p.product_id,
+        p.name,
+        p.quantity,
+        p.reorder_threshold,
+        u.uom_name
+    FROM products p
+    INNER JOIN uom u ON p.uom_id = u.uom_id
+    WHERE (p.quantity - p.reorder_threshold) <= 0
+    ORDER BY (p.quantity - p.reorder_threshold) ASC, p.product_id ASC
+"""
+
+# Served by idx_products_store_stock_margin
+STORE_LOW_STOCK_QUERY = """
+    SELECT
+        p.product_id,
+        p.name,
+        p.quantity,
+        p.reorder_threshold,
+        u.uom_name
+    FROM products p
+    INNER JOIN uom u ON p.uom_id = u.uom_id
+    WHERE p.store_id = %s AND (p.quantity - p.reorder_threshold) <= 0
+    ORDER BY (p.quantity - p.reorder_threshold) ASC, p.product_id ASC
+"""
+
+
+def get_low_stock_products(connection, store_id=None):
+    """Products at or below their reorder threshold, largest shortfall first."""
+    cursor = _execute_listing(connection, LOW_STOCK_QUERY, STORE_LOW_STOCK_QUERY, store_id, dictionary=True)
+
+    rows = cursor.fetchall()
+
+    for row in rows:
+        row["reorder_quantity"] = row["reorder_threshold"] - row["quantity"]
+    return rows
+
+
+def parse_reorder_threshold(product):
+    """The product's reorder_threshold as int, None when it is not given."""
+    if product.get("reorder_threshold") is None:
+        return None
+
+    threshold = int(product["reorder_threshold"])
+    if threshold < 0:
+        raise ValueError("Reorder threshold cannot be negative")
+    return threshold
+
+
 # -------------------------------------------------------
 # INSERT NEW PRODUCT
 # -------------------------------------------------------
-def insert_new_product(connection, product):
+def insert_new_product(connection, product, store_id=None):
     cursor = connection.cursor()
 
     quantity = int(product["quantity"])
@@ -74,6 +171,19 @@ def insert_new_product(connection, product):
         int(product["quantity"])
     )
 
+    # Optional columns; without them the column defaults apply
+    # (threshold 0: only when out of stock; store 1)
+    extra = {"reorder_threshold": parse_reorder_threshold(product), "store_id": store_id}
+    extra = {column: value for column, value in extra.items() if value is not None}
+    if extra:
+        columns = ", ".join(["name", "uom_id", "price_per_unit", "selling_price", "quantity", *extra])
+        placeholders = ", ".join(["%s"] * (5 + len(extra)))
+        query = f"""
+            INSERT INTO products ({columns})
+            VALUES ({placeholders})
+        """
+        data += tuple(extra.values())
+
     cursor.execute(query, data)
     connection.commit()
 
@@ -83,12 +193,17 @@ def insert_new_product(connection, product):
 # -------------------------------------------------------
 # DELETE PRODUCT
 # -------------------------------------------------------
-def delete_product(connection, product_id):
+def delete_product(connection, product_id, store_id=None):
     cursor = connection.cursor()
 
     # Delete product — order_details cleanup happens in app.py
-    query = "DELETE FROM products WHERE product_id = %s"
-    cursor.execute(query, (product_id,))
+    if store_id is None:
+        cursor.execute("DELETE FROM products WHERE product_id = %s", (product_id,))
+    else:
+        cursor.execute(
+            "DELETE FROM products WHERE product_id = %s AND store_id = %s",
+            (product_id, store_id)
+        )
 
     connection.commit()
     return cursor.rowcount
@@ -97,7 +212,7 @@ def delete_product(connection, product_id):
 # -------------------------------------------------------
 # UPDATE PRODUCT
 # -------------------------------------------------------
-def update_product(connection, product):
+def update_product(connection, product, store_id=None):
     cursor = connection.cursor()
 
     quantity = int(product["quantity"])
@@ -115,15 +230,23 @@ def update_product(connection, product):
     else:
         selling_price = float(selling_price)
 
-    query = """
+    # Without a threshold the stored one is kept
+    threshold = parse_reorder_threshold(product)
+    set_threshold, extra = "", ()
+    if threshold is not None:
+        set_threshold, extra = ",\n            reorder_threshold = %s", (threshold,)
+    # Another store's product is not touched (rowcount 0)
+    in_store = "" if store_id is None else " AND store_id = %s"
+
+    query = f"""
         UPDATE products
         SET 
             name = %s,
             uom_id = %s,
             price_per_unit = %s,
             selling_price = %s,
-            quantity = %s
-        WHERE product_id = %s
+            quantity = %s{set_threshold}
+        WHERE product_id = %s{in_store}
     """
 
     data = (
@@ -132,7 +255,9 @@ def update_product(connection, product):
         float(product["price_per_unit"]),
         selling_price,
         int(product["quantity"]),
-        int(product["product_id"])
+        *extra,
+        int(product["product_id"]),
+        *(() if store_id is None else (store_id,))
     )
 
     cursor.execute(query, data)
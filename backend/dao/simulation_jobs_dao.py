@@ -0,0 +1,53 @@
+# -------------------------------------------------------
+# SIMULATION JOBS
+#
+# Status, progress and result of the background revenue simulations
+# (services/simulation_jobs.py), shared by every worker process so that
+# a job can be polled on another worker than the one running it.
+# The result is stored as JSON text.
+# -------------------------------------------------------
+
+JOB_COLUMNS = ("job_id", "status", "progress", "submitted_at", "started_at", "finished_at", "result", "error")
+
+
+def insert_job(connection, job):
+    cursor = connection.cursor()
+
+    cursor.execute(f"""
+        INSERT INTO simulation_jobs ({", ".join(JOB_COLUMNS)})
+        VALUES ({", ".join(["%s"] * len(JOB_COLUMNS))})
+    """, tuple(job[column] for column in JOB_COLUMNS))
+
+    connection.commit()
+
+
+def update_job(connection, job_id, fields):
+    columns = [column for column in JOB_COLUMNS if column in fields and column != "job_id"]
+    if not columns:
+        return 0
+
+    cursor = connection.cursor()
+    cursor.execute(
+        f"UPDATE simulation_jobs SET {', '.join(f'{c} = %s' for c in columns)} WHERE job_id = %s",
+        (*(fields[c] for c in columns), job_id)
+    )
+
+    connection.commit()
+    return cursor.rowcount
+
+
+def get_job(connection, job_id):
+    cursor = connection.cursor(dictionary=True)
+
+    cursor.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM simulation_jobs WHERE job_id = %s", (job_id,))
+    return cursor.fetchone()
+
+
+def delete_finished_jobs(connection, cutoff):
+    """Deletes jobs finished before `cutoff` (uses the finished_at index)."""
+    cursor = connection.cursor()
+
+    cursor.execute("DELETE FROM simulation_jobs WHERE finished_at < %s", (cutoff,))
+
+    connection.commit()
+    return cursor.rowcount
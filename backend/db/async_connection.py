@@ -0,0 +1,37 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+async def create_async_pool(host=None, port=None):
+    """
+    Creates an aiomysql connection pool from the same MYSQL_* variables
+    as get_sql_connection. Pool bounds come from MYSQL_ASYNC_POOL_MIN/MAX.
+    host/port override MYSQL_HOST/MYSQL_PORT for a store shard (see db/shards.py).
+    """
+    try:
+        import aiomysql
+    except ImportError:
+        raise RuntimeError("aiomysql is required for the async API: pip install aiomysql")
+
+    # Validate required variables
+    if not os.getenv("MYSQL_USER"):
+        raise ValueError("Missing MYSQL_USER in .env file")
+
+    if not os.getenv("MYSQL_PASSWORD"):
+        raise ValueError("Missing MYSQL_PASSWORD in .env file")
+
+    if not os.getenv("MYSQL_DB"):
+        raise ValueError("Missing MYSQL_DB in .env file")
+
+    return await aiomysql.create_pool(
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        host=host or os.getenv("MYSQL_HOST", "127.0.0.1"),
+        port=port or int(os.getenv("MYSQL_PORT", 3306)),
+        db=os.getenv("MYSQL_DB"),
+        minsize=int(os.getenv("MYSQL_ASYNC_POOL_MIN", 1)),
+        maxsize=int(os.getenv("MYSQL_ASYNC_POOL_MAX", 20)),
+        autocommit=True
+    )
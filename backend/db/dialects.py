@@ -0,0 +1,322 @@
+"""
+Database dialects behind get_sql_connection().
+
+DB_BACKEND selects the dialect:
+  - mysql  (default) production target, configured by the MYSQL_* variables.
+           Connections come from a per-process pool of MYSQL_POOL_SIZE
+           (default 10, 0 disables pooling); when it is exhausted a
+           regular connection is opened instead.
+           MYSQL_REPLICA_HOSTS lists read replicas ("host[:port],...",
+           same credentials and database) for get_read_connection();
+           each replica gets its own pool. STORE_SHARDS places stores
+           on other servers, see shards.py.
+  - sqlite embedded stand-in for benchmarks, CI and local runs without a
+           MySQL server. SQLITE_PATH is a database file, or ":memory:"
+           (default) for an in-memory database shared by all connections
+           of the process.
+
+The DAOs keep writing MySQL-flavoured SQL with %s placeholders and use
+cursor(dictionary=True); the SQLite connection adapter below translates
+both, so the same DAO code runs on either backend.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
+
+
+def replica_hosts():
+    """MYSQL_REPLICA_HOSTS ("host[:port],...") as a list of (host, port)."""
+    hosts = []
+    for entry in os.getenv("MYSQL_REPLICA_HOSTS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        hosts.append((host, int(port) if port else 3306))
+    return hosts
+
+
+class MySQLDialect:
+    name = "mysql"
+    # Column definition of an auto-increment primary key in CREATE TABLE
+    auto_id = "INT NOT NULL AUTO_INCREMENT PRIMARY KEY"
+
+    def __init__(self):
+        # Pool name -> (pid, pool)
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._next_replica = 0
+
+    def _config(self):
+        # Validate required variables
+        if not os.getenv("MYSQL_USER"):
+            raise ValueError("Missing MYSQL_USER in .env file")
+
+        if not os.getenv("MYSQL_PASSWORD"):
+            raise ValueError("Missing MYSQL_PASSWORD in .env file")
+
+        if not os.getenv("MYSQL_DB"):
+            raise ValueError("Missing MYSQL_DB in .env file")
+
+        return {
+            "user": os.getenv("MYSQL_USER"),
+            "password": os.getenv("MYSQL_PASSWORD"),
+            "host": os.getenv("MYSQL_HOST", "127.0.0.1"),
+            "database": os.getenv("MYSQL_DB"),
+            "autocommit": True,
+        }
+
+    def _get_pool(self, config, size, name="primary"):
+        from mysql.connector import pooling
+
+        with self._lock:
+            pid, pool = self._pools.get(name, (None, None))
+            # A pool inherited through fork() shares its sockets with the parent
+            if pool is None or pid != os.getpid():
+                pool = pooling.MySQLConnectionPool(
+                    pool_name=f"gsm_{os.getpid()}_{name}",
+                    pool_size=size,
+                    # Resetting the session would deallocate the prepared
+                    # statements cached on the connection (see prepared.py)
+                    pool_reset_session=False,
+                    # A result left unread by a failed request must not break
+                    # the next user of the pooled connection
+                    consume_results=True,
+                    **config,
+                )
+                self._pools[name] = (os.getpid(), pool)
+        return pool
+
+    def _connect(self, config, name):
+        import mysql.connector
+        from mysql.connector.errors import PoolError
+
+        size = int(os.getenv("MYSQL_POOL_SIZE", 10))
+        if size > 0:
+            try:
+                # close() returns the connection to the pool
+                return self._get_pool(config, size, name).get_connection()
+            except PoolError:
+                pass
+
+        return mysql.connector.connect(**config)
+
+    def connect(self):
+        return self._connect(self._config(), "primary")
+
+    def connect_shard(self, host, port):
+        """A connection to a store shard (see shards.py); each shard has its own pool."""
+        return self._connect({**self._config(), "host": host, "port": port}, f"shard_{host}_{port}")
+
+    def connect_replica(self):
+        """
+        A connection to the next read replica, round robin. Replicas that
+        cannot be reached are skipped; without any, the primary is used.
+        """
+        from mysql.connector.errors import Error
+
+        replicas = replica_hosts()
+        if not replicas:
+            return self.connect()
+
+        config = self._config()
+        with self._lock:
+            first = self._next_replica
+            self._next_replica += 1
+
+        for offset in range(len(replicas)):
+            index = (first + offset) % len(replicas)
+            host, port = replicas[index]
+            try:
+                return self._connect({**config, "host": host, "port": port}, f"replica{index}")
+            except Error as e:
+                logger.warning("Read replica %s:%s unavailable: %s", host, port, e)
+
+        return self.connect()
+
+    def reset_sequences(self, cursor, tables):
+        for table in tables:
+            cursor.execute(f"ALTER TABLE {table} AUTO_INCREMENT = 1")
+
+    def create_index(self, cursor, name, table, columns):
+        # MySQL has no CREATE INDEX IF NOT EXISTS
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+    def add_column(self, cursor, table, column, definition):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (table, column))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# -------------------------------------------------------
+# SQLite
+# -------------------------------------------------------
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def translate_sql(operation):
+    """Rewrites MySQL-style placeholders (%s, %(name)s, %%) for sqlite3."""
+    def replace(match):
+        if match.group(0) == "%%":
+            return "%"
+        return f":{match.group(1)}" if match.group(1) else "?"
+    return _PLACEHOLDER.sub(replace, operation)
+
+
+def _dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+# DATETIME/DATE columns round-trip as datetime/date objects, like mysql-connector
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None):
+        if params is None:
+            return self._cursor.execute(operation)
+        return self._cursor.execute(translate_sql(operation), params)
+
+    def executemany(self, operation, seq_params):
+        return self._cursor.executemany(translate_sql(operation), seq_params)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLiteConnection:
+    """Makes a sqlite3 connection look like a mysql-connector one to the DAOs."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, dictionary=False, **kwargs):
+        cursor = self._connection.cursor()
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return SQLiteCursor(cursor)
+
+    def is_connected(self):
+        try:
+            self._connection.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class SQLiteDialect:
+    name = "sqlite"
+    auto_id = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def __init__(self, path=None):
+        self.path = path if path is not None else os.getenv("SQLITE_PATH", ":memory:")
+        self._lock = threading.Lock()
+        self._ready = False
+        self._anchor = None
+        self._memory_name = f"gsm_{uuid.uuid4().hex}"
+
+    def _target(self):
+        if self.path == ":memory:":
+            # A named shared-cache database lives as long as one connection to it is open
+            return f"file:{self._memory_name}?mode=memory&cache=shared", True
+        return self.path, False
+
+    def _open(self):
+        target, uri = self._target()
+        raw = sqlite3.connect(
+            target,
+            uri=uri,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,       # autocommit, as on MySQL
+            check_same_thread=False,
+            timeout=30,
+        )
+        raw.execute("PRAGMA foreign_keys = ON")
+        if not uri:
+            raw.execute("PRAGMA journal_mode = WAL")
+        return SQLiteConnection(raw)
+
+    def connect(self):
+        # The schema is created on first use, so an empty file or memory database just works
+        with self._lock:
+            if not self._ready:
+                from .schema import create_tables
+
+                first = self._open()
+                create_tables(first.cursor(), self)
+                if self.path == ":memory:":
+                    self._anchor = first
+                else:
+                    first.close()
+                self._ready = True
+        return self._open()
+
+    def connect_replica(self):
+        # One embedded database: reads and writes share it
+        return self.connect()
+
+    def connect_shard(self, host, port):
+        # Likewise shared by all stores, which store_id keeps apart
+        return self.connect()
+
+    def reset_sequences(self, cursor, tables):
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_sequence'")
+        if cursor.fetchone():
+            cursor.executemany("DELETE FROM sqlite_sequence WHERE name = %s", [(t,) for t in tables])
+
+    def create_index(self, cursor, name, table, columns):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    def add_column(self, cursor, table, column, definition):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+DIALECTS = {
+    "mysql": MySQLDialect,
+    "sqlite": SQLiteDialect,
+}
+
+_dialect = None
+_dialect_lock = threading.Lock()
+
+
+def get_dialect():
+    """The dialect selected by DB_BACKEND, created once per process."""
+    global _dialect
+
+    name = os.getenv("DB_BACKEND", "mysql").lower()
+    with _dialect_lock:
+        if _dialect is None or _dialect.name != name:
+            if name not in DIALECTS:
+                raise ValueError(f"Unknown DB_BACKEND '{name}', expected one of: {', '.join(DIALECTS)}")
+            _dialect = DIALECTS[name]()
+    return _dialect
@@ -1,12 +1,30 @@
 """
-Creates the grocery_store database, tables, and seeds initial data.
+Creates the MYSQL_DB database (default grocery_store), tables, and seeds
+initial data. This clears every table of the default database first.
+
+    python -m backend.db.initialize_sql             # create, clear and seed
+    python -m backend.db.initialize_sql --migrate   # upgrade, keep all rows
+
+--migrate only adds what an existing database lacks (tables, columns from
+ADDED_COLUMNS and INDEXES, see schema.py) and never clears or seeds, so it
+is the way to upgrade a database holding live data.
+
+With DB_BACKEND=sqlite the SQLite database at SQLITE_PATH is provisioned
+instead of MySQL.
 """
 
+import argparse
 import mysql.connector
 from mysql.connector import Error
 import os
+import sys
 from dotenv import load_dotenv
 
+from .dialects import get_dialect
+from .schema import create_tables, clear_tables
+from .shards import all_shards
+from ..services.cache import shared_cache, store_namespaces
+
 load_dotenv()
 
 # -----------------------------------
@@ -18,6 +36,8 @@ MYSQL_CONFIG = {
     "password": os.getenv("MYSQL_PASSWORD"),
     "port": int(os.getenv("MYSQL_PORT", 3306))
 }
+# The database the app connects to; shards use the same name (see shards.py)
+DATABASE = os.getenv("MYSQL_DB", "grocery_store")
 
 
 # -----------------------------------
@@ -30,10 +50,11 @@ UOMS = [
 ]
 
 PRODUCTS = [
-    ("Apple", 1, 1.50, 3.00, 100),
-    ("Orange", 1, 3.00, 6.00, 80),
-    ("Toothpaste", 2, 10.00, 20.00, 40),
-    ("Milk", 3, 6.00, 12.00, 50)
+    # name, uom_id, price_per_unit, selling_price, quantity, reorder_threshold
+    ("Apple", 1, 1.50, 3.00, 100, 20),
+    ("Orange", 1, 3.00, 6.00, 80, 20),
+    ("Toothpaste", 2, 10.00, 20.00, 40, 10),
+    ("Milk", 3, 6.00, 12.00, 50, 10)
 ]
 
 ORDERS = [
@@ -52,10 +73,134 @@ ORDER_DETAILS = [
 ]
 
 
+# -----------------------------------
+# PROVISIONING
+# -----------------------------------
+def seed(cursor):
+    print("Seeding UOMs...")
+    cursor.executemany("INSERT INTO uom (uom_name) VALUES (%s)", UOMS)
+    print("UOMs inserted")
+
+    print("Seeding products...")
+    cursor.executemany("""
+        INSERT INTO products (name, uom_id, price_per_unit, selling_price, quantity, reorder_threshold)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, PRODUCTS)
+    print("Products inserted")
+
+    print("Seeding orders...")
+    cursor.executemany("""
+        INSERT INTO orders (customer_name, total_price, datetime)
+        VALUES (%s, %s, %s)
+    """, ORDERS)
+    print("Orders inserted")
+
+    print("Seeding order details...")
+    cursor.executemany("""
+        INSERT INTO order_details (order_id, product_id, quantity, total_price)
+        VALUES (%s, %s, %s, %s)
+    """, ORDER_DETAILS)
+    print("Order details inserted")
+
+
+def create_lock_rows(cursor):
+    """
+    Row locked by the writers of product_demand_stats. They create it on
+    first use too, but two first writers at once could deadlock on MySQL.
+    """
+    cursor.execute("SELECT COUNT(*) FROM demand_stats_lock")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("INSERT INTO demand_stats_lock (lock_id, generation) VALUES (1, 0)")
+
+
+def stored_store_ids(cursor):
+    """Stores with products or orders in the database."""
+    cursor.execute("SELECT store_id FROM products UNION SELECT store_id FROM orders")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def provision(conn, dialect):
+    """
+    Creates the tables, clears them, resets the counters and seeds the data,
+    then publishes a change to the cache for every store it replaced or seeded.
+    """
+    cursor = conn.cursor()
+
+    print("Creating tables...")
+    create_tables(cursor, dialect, verbose=True)
+    conn.commit()
+
+    replaced = stored_store_ids(cursor)
+
+    print("\nResetting tables (safe)...")
+    clear_tables(cursor, dialect)
+    conn.commit()
+    print("All tables cleared and counters reset\n")
+
+    seed(cursor)
+    create_lock_rows(cursor)
+    conn.commit()
+    stores = replaced | stored_store_ids(cursor)
+    cursor.close()
+
+    for store_id in sorted(stores):
+        shared_cache.bump(*store_namespaces(store_id))
+    shared_cache.bump("uom")
+
+
+def migrate(conn, dialect):
+    """Creates missing tables, columns and indexes; keeps every row."""
+    cursor = conn.cursor()
+
+    print("Upgrading tables...")
+    create_tables(cursor, dialect, verbose=True)
+    create_lock_rows(cursor)
+    conn.commit()
+    cursor.close()
+
+
+def prepare_shards(dialect):
+    """
+    Creates or upgrades the tables on every store shard (STORE_SHARDS).
+    Shards hold live store data, so unlike the default database they are
+    neither cleared nor seeded.
+    """
+    for host, port in all_shards()[1:]:
+        print(f"\nPreparing shard {host}:{port}...")
+        conn = mysql.connector.connect(**{**MYSQL_CONFIG, "host": host, "port": port})
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{DATABASE}`")
+            cursor.execute(f"USE `{DATABASE}`")
+            create_tables(cursor, dialect, verbose=True)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+
 # -----------------------------------
 # MAIN SCRIPT
 # -----------------------------------
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create, clear and seed the database")
+    parser.add_argument("--migrate", action="store_true",
+                        help="only add missing tables, columns and indexes; keep all data")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup = migrate if args.migrate else provision
+    dialect = get_dialect()
+    if dialect.name == "sqlite":
+        print(f"{'Upgrading' if args.migrate else 'Provisioning'} SQLite database {dialect.path}...")
+        conn = dialect.connect()
+        setup(conn, dialect)
+        conn.close()
+        print("\n🎉 DATABASE INITIALIZATION COMPLETE — everything is ready!")
+        return
+
     print("Connecting to MySQL...")
 
     conn = None
@@ -69,129 +214,20 @@ def main():
         # -----------------------------------
         # Create database
         # -----------------------------------
-        print("Ensuring database `grocery_store` exists...")
-        cursor.execute("CREATE DATABASE IF NOT EXISTS grocery_store")
-        cursor.execute("USE grocery_store")
+        print(f"Ensuring database `{DATABASE}` exists...")
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{DATABASE}`")
+        cursor.execute(f"USE `{DATABASE}`")
         print("Database ready\n")
 
-        # -----------------------------------
-        # Create tables
-        # -----------------------------------
-        print("Creating tables...")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS uom (
-                uom_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-                uom_name VARCHAR(45) NOT NULL
-            );
-        """)
-        print("Table `uom` ready")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                product_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                uom_id INT NOT NULL,
-                price_per_unit DOUBLE NOT NULL,
-                selling_price DOUBLE NOT NULL DEFAULT 0,
-                quantity INT NOT NULL DEFAULT 0,
-                FOREIGN KEY (uom_id) REFERENCES uom(uom_id)
-            );
-        """)
-        print("Table `products` ready")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS orders (
-                order_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-                customer_name VARCHAR(100),
-                total_price DOUBLE NOT NULL,
-                datetime DATETIME NOT NULL
-            );
-        """)
-        print("Table `orders` ready")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS order_details (
-                id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
-                order_id INT NOT NULL,
-                product_id INT NOT NULL,
-                quantity DOUBLE NOT NULL,
-                total_price DOUBLE NOT NULL,
-                FOREIGN KEY (order_id) REFERENCES orders(order_id),
-                FOREIGN KEY (product_id) REFERENCES products(product_id)
-            );
-        """)
-        print("Table `order_details` ready\n")
-
-        conn.commit()
-
-        # -----------------------------------
-        # CLEAR existing data (reset)
-        # -----------------------------------
-        print("Resetting tables (safe)...")
-
-        cursor.execute("DELETE FROM order_details")
-        cursor.execute("DELETE FROM orders")
-        cursor.execute("DELETE FROM products")
-        cursor.execute("DELETE FROM uom")
-        conn.commit()
-
-        # RESET AUTO_INCREMENT
-        cursor.execute("ALTER TABLE uom AUTO_INCREMENT = 1")
-        cursor.execute("ALTER TABLE products AUTO_INCREMENT = 1")
-        cursor.execute("ALTER TABLE orders AUTO_INCREMENT = 1")
-        cursor.execute("ALTER TABLE order_details AUTO_INCREMENT = 1")
-        conn.commit()
-
-        print("All tables cleared and counters reset\n")
-
-
-        # -----------------------------------
-        # SEED UOMs
-        # -----------------------------------
-        print("Seeding UOMs...")
-        cursor.executemany("INSERT INTO uom (uom_name) VALUES (%s)", UOMS)
-        conn.commit()
-        print("UOMs inserted")
-
-        # -----------------------------------
-        # SEED Products
-        # -----------------------------------
-        print("Seeding products...")
-        cursor.executemany("""
-            INSERT INTO products (name, uom_id, price_per_unit, selling_price, quantity)
-            VALUES (%s, %s, %s, %s, %s)
-        """, PRODUCTS)
-        conn.commit()
-        print("Products inserted")
-
-        # -----------------------------------
-        # SEED Orders
-        # -----------------------------------
-        print("Seeding orders...")
-        cursor.executemany("""
-            INSERT INTO orders (customer_name, total_price, datetime)
-            VALUES (%s, %s, %s)
-        """, ORDERS)
-        conn.commit()
-        print("Orders inserted")
-
-        # -----------------------------------
-        # SEED Order Details
-        # -----------------------------------
-        print("Seeding order details...")
-        cursor.executemany("""
-            INSERT INTO order_details (order_id, product_id, quantity, total_price)
-            VALUES (%s, %s, %s, %s)
-        """, ORDER_DETAILS)
-        conn.commit()
-        print("Order details inserted")
+        setup(conn, dialect)
+        prepare_shards(dialect)
 
         print("\n🎉 DATABASE INITIALIZATION COMPLETE — everything is ready!")
 
     except Error as e:
         print("\n❌ ERROR initializing database:")
         print(e)
+        return 1
 
     finally:
         if conn is not None and conn.is_connected():
@@ -201,4 +237,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Thin wrappers around a DB-API connection and its cursors that time every
+statement and report it to registered observers.
+
+A statement is timed from execute() until its result is consumed (fetchall,
+exhausted iteration, fetchone returning None, the next execute, or closing
+the cursor/connection, or dropping the cursor), so the reported time covers fetching the rows too.
+
+get_sql_connection() returns wrapped connections, so every DAO and the raw
+SQL in the routes are covered without changing them. Closing one rolls back
+a transaction left open: pooled MySQL connections keep their session (see
+dialects.py), so it would otherwise carry over to the next request.
+"""
+
+import logging
+import time
+import weakref
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecord:
+    """One finished statement as seen by observers."""
+
+    __slots__ = ("operation", "params", "seconds", "rows", "connection")
+
+    def __init__(self, operation, params, connection):
+        self.operation = operation
+        self.params = params
+        self.seconds = 0.0
+        self.rows = 0
+        self.connection = connection
+
+
+# Called as observer(record) after each statement finishes
+_observers: List[Callable[[QueryRecord], None]] = []
+
+
+def add_query_observer(observer: Callable[[QueryRecord], None]):
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def remove_query_observer(observer: Callable[[QueryRecord], None]):
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def _notify(record):
+    for observer in _observers:
+        observer(record)
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor, raw_connection):
+        self._cursor = cursor
+        self._raw_connection = raw_connection
+        self._record = None
+
+    def _start(self, operation, params):
+        self._finish()
+        self._record = QueryRecord(operation, params, self._raw_connection)
+
+    def _finish(self):
+        record, self._record = self._record, None
+        if record is not None:
+            _notify(record)
+
+    def _timed(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if self._record is not None:
+                self._record.seconds += time.perf_counter() - started
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._start(operation, params)
+        if params is not None:
+            args = (params, *args)
+        try:
+            return self._timed(self._cursor.execute, operation, *args, **kwargs)
+        except Exception:
+            self._finish()
+            raise
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._start(operation, seq_params)
+        try:
+            return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+        finally:
+            self._finish()
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._record is not None:
+            self._record.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(self._cursor.fetchmany, *args)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        iterator = iter(self._cursor)
+        while True:
+            try:
+                row = self._timed(next, iterator)
+            except StopIteration:
+                self._finish()
+                return
+            if self._record is not None:
+                self._record.rows += 1
+            yield row
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __del__(self):
+        # Cursors dropped without close() still report their statement
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursors = weakref.WeakSet()
+
+    @property
+    def raw_connection(self):
+        return self._connection
+
+    def cursor(self, *args, **kwargs):
+        return self.wrap_cursor(self._connection.cursor(*args, **kwargs))
+
+    def wrap_cursor(self, cursor, cursor_class=InstrumentedCursor):
+        """Instruments a cursor obtained from the raw connection."""
+        cursor = cursor_class(cursor, self._connection)
+        self._cursors.add(cursor)
+        return cursor
+
+    def _finish_cursors(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+
+    def commit(self):
+        self._finish_cursors()
+        record = QueryRecord("COMMIT", None, self._connection)
+        started = time.perf_counter()
+        try:
+            return self._connection.commit()
+        finally:
+            record.seconds = time.perf_counter() - started
+            _notify(record)
+
+    def close(self):
+        self._finish_cursors()
+        if getattr(self._connection, "in_transaction", False) is True:
+            try:
+                self._connection.rollback()
+            except Exception as e:
+                # The pool reconnects a broken connection before handing it out
+                logger.warning("Rollback on close failed: %s", e)
+        return self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
@@ -0,0 +1,90 @@
+"""
+Server-side prepared statements for the hot DAO queries.
+
+The listing, order details and add_order statements run with the same SQL
+text on every request. statement_cursor() hands out a cursor on which that
+SQL is prepared once per physical MySQL connection and then only executed,
+so the server skips parsing and planning it again. The cursors are cached
+on the connection itself, which lives in the connection pool (see
+dialects.MySQLDialect) and is reused across requests.
+
+Anything else gets a plain cursor from connection.cursor(): SQLite
+(sqlite3 keeps its own statement cache), one-off connections opened when
+the pool is exhausted (preparing would only add a round trip), test
+doubles, or MYSQL_PREPARED=0.
+
+mysql-connector only skips re-preparing when it is given the very same
+string object again, so callers pass module-level query constants.
+"""
+
+import os
+
+try:
+    from mysql.connector.pooling import PooledMySQLConnection
+except ImportError:  # SQLite-only installs
+    PooledMySQLConnection = None
+
+from .instrumented import InstrumentedConnection, InstrumentedCursor
+
+# Attribute holding (server connection id, {(sql, dictionary): cursor}) on the physical connection
+_CACHE_ATTR = "_gsm_prepared"
+
+
+def prepared_enabled():
+    return os.getenv("MYSQL_PREPARED", "1").lower() not in ("0", "false", "no")
+
+
+class PreparedCursor(InstrumentedCursor):
+    """An instrumented cursor whose underlying prepared cursor outlives it."""
+
+    def close(self):
+        # Keep the statement prepared for the next request
+        self._finish()
+
+
+def pooled_connection(connection):
+    """The driver connection behind a pooled connection, None if it is not pooled."""
+    raw = connection.raw_connection
+    if PooledMySQLConnection is None or not isinstance(raw, PooledMySQLConnection):
+        return None
+    # The proxy handed out by the pool wraps its long-lived connection
+    return raw._cnx
+
+
+def statement_cursor(connection, operation, dictionary=False):
+    """
+    Cursor to run `operation` on, prepared server-side when possible.
+
+    Rows come back as from connection.cursor(dictionary=...). The result of
+    the previous execute() on the same statement must have been consumed,
+    which the DAOs do by fetching everything.
+    """
+    kwargs = {"dictionary": True} if dictionary else {}
+    if not isinstance(connection, InstrumentedConnection) or not prepared_enabled():
+        return connection.cursor(**kwargs)
+
+    raw = pooled_connection(connection)
+    if raw is None:
+        return connection.cursor(**kwargs)
+
+    session = getattr(raw, "connection_id", None)
+    cached = getattr(raw, _CACHE_ATTR, None)
+    if cached is None or cached[0] != session:
+        # New or reconnected session: statements prepared before are gone
+        cached = (session, {})
+        setattr(raw, _CACHE_ATTR, cached)
+
+    statements = cached[1]
+    key = (operation, dictionary)
+    cursor = statements.get(key)
+    if cursor is None:
+        cursor = raw.cursor(prepared=True, **kwargs)
+        statements[key] = cursor
+    return connection.wrap_cursor(cursor, PreparedCursor)
+
+
+def prepared_statement_count(connection):
+    """Statements cached on the connection's current session."""
+    raw = pooled_connection(connection)
+    cached = getattr(raw, _CACHE_ATTR, None)
+    return len(cached[1]) if cached else 0
@@ -0,0 +1,139 @@
+"""
+Per-statement query statistics and slow-query log.
+
+Statements are grouped by fingerprint: literals and placeholders become "?",
+IN lists collapse to "IN (...)" and whitespace is normalised, so the same
+query with different values is counted once.
+
+Statements slower than SLOW_QUERY_MS (default 200) are logged on the
+"backend.slow_query" logger with the shape of their parameters (types only,
+never values) and, for SELECTs, the EXPLAIN plan. EXPLAIN runs at most once
+per fingerprint every SLOW_QUERY_EXPLAIN_INTERVAL seconds (default 60).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+from .instrumented import add_query_observer
+
+logger = logging.getLogger("backend.slow_query")
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def params_shape(params):
+    """Describes parameters without their values, e.g. '(int, str, float)'."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (list, tuple, dict)):
+            return f"{len(params)} x {params_shape(params[0])}"
+        return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+    return type(params).__name__
+
+
+class QueryStats:
+    def __init__(self, slow_threshold=0.2, explain_interval=60.0):
+        self.slow_threshold = slow_threshold
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._last_explain = {}
+
+    def record(self, record):
+        fp = fingerprint(record.operation)
+
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                stats = {"fingerprint": fp, "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "rows": 0}
+                self._stats[fp] = stats
+            stats["calls"] += 1
+            stats["total_seconds"] += record.seconds
+            stats["max_seconds"] = max(stats["max_seconds"], record.seconds)
+            stats["rows"] += record.rows
+
+        if record.seconds >= self.slow_threshold:
+            self._log_slow(fp, record)
+
+    def _log_slow(self, fp, record):
+        plan = None
+        if fp.upper().startswith("SELECT") and record.connection is not None:
+            now = time.monotonic()
+            with self._lock:
+                due = now - self._last_explain.get(fp, float("-inf")) >= self.explain_interval
+                if due:
+                    self._last_explain[fp] = now
+            if due:
+                plan = explain(record.connection, record.operation, record.params)
+
+        logger.warning(
+            "Slow query %.1f ms, %d rows, params %s: %s%s",
+            record.seconds * 1000,
+            record.rows,
+            params_shape(record.params),
+            fp,
+            f"\nEXPLAIN: {plan}" if plan else ""
+        )
+
+    def top(self, limit=10, sort="total"):
+        """Slowest fingerprints, ordered by total, max or avg seconds."""
+        keys = {
+            "total": lambda s: s["total_seconds"],
+            "max": lambda s: s["max_seconds"],
+            "avg": lambda s: s["total_seconds"] / s["calls"],
+        }
+        if sort not in keys:
+            raise ValueError("sort must be one of: total, max, avg")
+
+        with self._lock:
+            rows = [dict(s) for s in self._stats.values()]
+
+        for s in rows:
+            s["avg_seconds"] = s["total_seconds"] / s["calls"]
+        return sorted(rows, key=keys[sort], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._last_explain.clear()
+
+
+def explain(connection, operation, params):
+    """Runs EXPLAIN for a statement on the raw connection; returns rows or the error."""
+    try:
+        cursor = connection.cursor()
+        if params is None:
+            cursor.execute(f"EXPLAIN {operation}")
+        else:
+            cursor.execute(f"EXPLAIN {operation}", params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Exception as e:
+        return f"unavailable ({e})"
+
+
+query_stats = QueryStats(
+    slow_threshold=float(os.getenv("SLOW_QUERY_MS", 200)) / 1000,
+    explain_interval=float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 60)),
+)
+
+add_query_observer(query_stats.record)
@@ -0,0 +1,167 @@
+"""
+Table definitions shared by initialize_sql and the SQLite dialect.
+
+The DDL is written once; `{auto_id}` is replaced by the dialect's
+auto-increment primary key column definition.
+"""
+
+# In dependency order: referenced tables first
+TABLES = [
+    ("uom", """
+        CREATE TABLE IF NOT EXISTS uom (
+            uom_id {auto_id},
+            uom_name VARCHAR(45) NOT NULL
+        );
+    """),
+    ("products", """
+        CREATE TABLE IF NOT EXISTS products (
+            product_id {auto_id},
+            name VARCHAR(100) NOT NULL,
+            uom_id INT NOT NULL,
+            price_per_unit DOUBLE NOT NULL,
+            selling_price DOUBLE NOT NULL DEFAULT 0,
+            quantity INT NOT NULL DEFAULT 0,
+            reorder_threshold INT NOT NULL DEFAULT 0,
+            store_id INT NOT NULL DEFAULT 1,
+            FOREIGN KEY (uom_id) REFERENCES uom(uom_id)
+        );
+    """),
+    ("orders", """
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id {auto_id},
+            customer_name VARCHAR(100),
+            total_price DOUBLE NOT NULL,
+            datetime DATETIME NOT NULL,
+            store_id INT NOT NULL DEFAULT 1
+        );
+    """),
+    ("order_details", """
+        CREATE TABLE IF NOT EXISTS order_details (
+            id {auto_id},
+            order_id INT NOT NULL,
+            product_id INT NOT NULL,
+            quantity DOUBLE NOT NULL,
+            total_price DOUBLE NOT NULL,
+            store_id INT NOT NULL DEFAULT 1,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        );
+    """),
+    # Closed periods moved out of orders / order_details by the archiver.
+    # Same columns, but ids are copied rather than generated and archived
+    # items keep their product_id even if the product is deleted later.
+    ("orders_archive", """
+        CREATE TABLE IF NOT EXISTS orders_archive (
+            order_id INT NOT NULL PRIMARY KEY,
+            customer_name VARCHAR(100),
+            total_price DOUBLE NOT NULL,
+            datetime DATETIME NOT NULL,
+            store_id INT NOT NULL DEFAULT 1
+        );
+    """),
+    ("order_details_archive", """
+        CREATE TABLE IF NOT EXISTS order_details_archive (
+            id INT NOT NULL PRIMARY KEY,
+            order_id INT NOT NULL,
+            product_id INT NOT NULL,
+            quantity DOUBLE NOT NULL,
+            total_price DOUBLE NOT NULL,
+            store_id INT NOT NULL DEFAULT 1,
+            FOREIGN KEY (order_id) REFERENCES orders_archive(order_id)
+        );
+    """),
+    ("product_demand_stats", """
+        CREATE TABLE IF NOT EXISTS product_demand_stats (
+            product_id INT NOT NULL PRIMARY KEY,
+            days_observed INT NOT NULL,
+            units_sum DOUBLE NOT NULL,
+            units_sq_sum DOUBLE NOT NULL,
+            mean DOUBLE NOT NULL,
+            variance DOUBLE NOT NULL,
+            updated_through DATE NOT NULL
+        );
+    """),
+    # One row, locked by every writer of product_demand_stats (see demand_stats_dao.py)
+    ("demand_stats_lock", """
+        CREATE TABLE IF NOT EXISTS demand_stats_lock (
+            lock_id INT NOT NULL PRIMARY KEY,
+            generation INT NOT NULL
+        );
+    """),
+    ("idempotency_keys", """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            idempotency_key VARCHAR(255) NOT NULL,
+            endpoint VARCHAR(100) NOT NULL,
+            request_hash CHAR(64) NOT NULL,
+            status_code INT,
+            content_type VARCHAR(100),
+            response_body MEDIUMTEXT,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (idempotency_key, endpoint)
+        );
+    """),
+    ("simulation_jobs", """
+        CREATE TABLE IF NOT EXISTS simulation_jobs (
+            job_id CHAR(32) NOT NULL PRIMARY KEY,
+            status VARCHAR(16) NOT NULL,
+            progress DOUBLE NOT NULL DEFAULT 0,
+            submitted_at DOUBLE NOT NULL,
+            started_at DOUBLE,
+            finished_at DOUBLE,
+            result MEDIUMTEXT,
+            error TEXT
+        );
+    """),
+]
+
+# (table, column, definition) of columns added to existing tables. Tables
+# created before a column existed get it from create_tables.
+ADDED_COLUMNS = [
+    ("products", "reorder_threshold", "INT NOT NULL DEFAULT 0"),
+    # Multi-store (see shards.py); existing rows belong to store 1
+    ("products", "store_id", "INT NOT NULL DEFAULT 1"),
+    ("orders", "store_id", "INT NOT NULL DEFAULT 1"),
+    ("order_details", "store_id", "INT NOT NULL DEFAULT 1"),
+    ("orders_archive", "store_id", "INT NOT NULL DEFAULT 1"),
+    ("order_details_archive", "store_id", "INT NOT NULL DEFAULT 1"),
+]
+
+# (index name, table, columns), created after the tables. MySQL replaces the
+# implicit index of a foreign key by an explicit one on the same column.
+INDEXES = [
+    ("idx_orders_datetime", "orders", "datetime"),
+    ("idx_order_details_order_id", "order_details", "order_id"),
+    ("idx_orders_archive_datetime", "orders_archive", "datetime"),
+    ("idx_order_details_archive_order_id", "order_details_archive", "order_id"),
+    ("idx_idempotency_keys_created_at", "idempotency_keys", "created_at"),
+    ("idx_simulation_jobs_finished_at", "simulation_jobs", "finished_at"),
+    # Expression index for /lowStock (dao/products_dao.py LOW_STOCK_QUERY)
+    ("idx_products_stock_margin", "products", "(quantity - reorder_threshold)"),
+    # Store-scoped listings
+    ("idx_products_store_stock_margin", "products", "store_id, (quantity - reorder_threshold)"),
+    ("idx_orders_store_datetime", "orders", "store_id, datetime"),
+    ("idx_orders_archive_store_datetime", "orders_archive", "store_id, datetime"),
+]
+
+# Tables with an auto-increment id, reset by initialize_sql
+AUTO_ID_TABLES = ["uom", "products", "orders", "order_details"]
+
+
+def create_tables(cursor, dialect, verbose=False):
+    for name, ddl in TABLES:
+        cursor.execute(ddl.format(auto_id=dialect.auto_id))
+        if verbose:
+            print(f"Table `{name}` ready")
+    for table, column, definition in ADDED_COLUMNS:
+        dialect.add_column(cursor, table, column, definition)
+    for name, table, columns in INDEXES:
+        dialect.create_index(cursor, name, table, columns)
+        if verbose:
+            print(f"Index `{name}` ready")
+
+
+def clear_tables(cursor, dialect):
+    """Deletes all rows (children first) and restarts the id counters."""
+    for name, _ in reversed(TABLES):
+        cursor.execute(f"DELETE FROM {name}")
+    dialect.reset_sequences(cursor, AUTO_ID_TABLES)
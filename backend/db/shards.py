@@ -0,0 +1,58 @@
+"""
+Stores and their database shards.
+
+One deployment serves several stores. Products, orders and order items
+carry a store_id, and every DAO call made for a request is scoped to that
+request's store (see web/stores.py).
+
+STORE_SHARDS maps stores to the MySQL server holding their data:
+
+    STORE_SHARDS="1=db-a,2=db-a,3=db-b:3307"
+
+Shards use the same credentials and database name (MYSQL_*) as the
+default server. Stores that are not listed live on the default server
+(MYSQL_HOST), so a single-database deployment needs no configuration.
+A store is moved to a new shard by copying its rows and changing its
+entry. SQLite has a single embedded database: all stores share it, kept
+apart by store_id alone.
+
+DEFAULT_STORE_ID (default 1) is the store of requests that name none.
+"""
+
+import os
+
+
+def default_store_id():
+    return int(os.getenv("DEFAULT_STORE_ID", 1))
+
+
+def validate_store_id(store_id):
+    if isinstance(store_id, bool) or not isinstance(store_id, int) or store_id < 1:
+        raise ValueError("store_id must be a positive integer")
+
+
+def store_shards():
+    """STORE_SHARDS as {store_id: (host, port)}."""
+    shards = {}
+    for entry in os.getenv("STORE_SHARDS", "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        store, _, target = entry.partition("=")
+        host, _, port = target.strip().partition(":")
+        if not host:
+            raise ValueError(f"STORE_SHARDS entry '{entry}' has no host")
+        shards[int(store)] = (host, int(port) if port else 3306)
+    return shards
+
+
+def shard_for(store_id):
+    """(host, port) of the store's shard, None for the default server."""
+    if store_id is None:
+        return None
+    return store_shards().get(store_id)
+
+
+def all_shards():
+    """Every database holding store data: None (the default server) and each shard."""
+    return [None] + sorted(set(store_shards().values()))
@@ -1,24 +1,30 @@
-import mysql.connector
-import os
 from dotenv import load_dotenv
 
+from .dialects import get_dialect
+from .instrumented import InstrumentedConnection
+from .shards import shard_for
+
 load_dotenv()
 
-def get_sql_connection():
-    # Validate required variables
-    if not os.getenv("MYSQL_USER"):
-        raise ValueError("Missing MYSQL_USER in .env file")
+def get_sql_connection(store_id=None):
+    # MySQL unless DB_BACKEND=sqlite, see dialects.py. A store mapped by
+    # STORE_SHARDS gets its shard, see shards.py
+    return get_shard_connection(shard_for(store_id))
+
 
-    if not os.getenv("MYSQL_PASSWORD"):
-        raise ValueError("Missing MYSQL_PASSWORD in .env file")
+def get_shard_connection(shard):
+    """Connection to a shard from shards.all_shards(); None is the default server."""
+    dialect = get_dialect()
+    if shard is None:
+        return InstrumentedConnection(dialect.connect())
+    return InstrumentedConnection(dialect.connect_shard(*shard))
 
-    if not os.getenv("MYSQL_DB"):
-        raise ValueError("Missing MYSQL_DB in .env file")
 
-    return mysql.connector.connect(
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        host=os.getenv("MYSQL_HOST", "127.0.0.1"),
-        database=os.getenv("MYSQL_DB"),
-        autocommit=True
-    )
+def get_read_connection(store_id=None):
+    # A read replica when MYSQL_REPLICA_HOSTS is set, otherwise the primary.
+    # Replicas may lag behind: use it for reads that tolerate that.
+    # Shards have no replicas and are read directly.
+    shard = shard_for(store_id)
+    if shard is not None:
+        return get_shard_connection(shard)
+    return InstrumentedConnection(get_dialect().connect_replica())
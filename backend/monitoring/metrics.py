@@ -0,0 +1,417 @@
+"""
+Per-route request metrics in Prometheus text format, served at /metrics.
+
+Recorded per Flask route (the URL rule, e.g. /getOrder/<int:order_id>):
+  - gsm_http_requests_total{route, method, status}        counter
+  - gsm_http_requests_in_flight{route}                    gauge
+  - gsm_http_request_duration_seconds{route, method}      histogram
+  - gsm_http_request_db_seconds{route, method}            histogram
+  - gsm_http_request_serialization_seconds{route, method} histogram
+
+SQL statistics per statement fingerprint are served at /metrics/queries.
+
+Updates are guarded by a lock, so threaded servers are safe. With several
+worker processes set METRICS_DIR to a directory shared by the workers:
+each process periodically writes its snapshot there and /metrics merges
+all of them (counters of exited workers are kept, their in-flight gauges
+are dropped). A worker also writes its snapshot when it exits. Sharing
+needs fcntl file locks; where they are missing (Windows) each process
+reports its own metrics.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from flask import Blueprint, Response, g, has_request_context, jsonify, request
+
+from ..db.instrumented import add_query_observer
+from ..db.query_stats import query_stats
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HISTOGRAMS = {
+    "gsm_http_request_duration_seconds": "Time spent handling the request.",
+    "gsm_http_request_db_seconds": "Time spent in database calls per request.",
+    "gsm_http_request_serialization_seconds": "Time spent serializing JSON responses per request.",
+}
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}        # (route, method, status) -> count
+        self._in_flight = {}       # route -> count
+        self._histograms = {name: {} for name in HISTOGRAMS}   # name -> (route, method) -> [buckets..., sum, count]
+
+    def request_started(self, route):
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 0) + 1
+
+    def request_finished(self, route, method, status, duration, db_time, serialization_time):
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 1) - 1
+
+            key = (route, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            self._observe("gsm_http_request_duration_seconds", (route, method), duration)
+            self._observe("gsm_http_request_db_seconds", (route, method), db_time)
+            self._observe("gsm_http_request_serialization_seconds", (route, method), serialization_time)
+
+    def _observe(self, name, labels, value):
+        series = self._histograms[name].get(labels)
+        if series is None:
+            series = [0] * (len(self.buckets) + 2)
+            self._histograms[name][labels] = series
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self):
+        """JSON-serializable copy of the current values."""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "requests": [[list(k), v] for k, v in self._requests.items()],
+                "in_flight": [[k, v] for k, v in self._in_flight.items()],
+                "histograms": {
+                    name: [[list(k), list(v)] for k, v in series.items()]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+
+def merge_snapshots(snapshots):
+    requests, in_flight = {}, {}
+    histograms = {name: {} for name in HISTOGRAMS}
+
+    for snap in snapshots:
+        for key, value in snap["requests"]:
+            requests[tuple(key)] = requests.get(tuple(key), 0) + value
+        for route, value in snap["in_flight"]:
+            in_flight[route] = in_flight.get(route, 0) + value
+        for name, series in snap["histograms"].items():
+            for key, values in series:
+                current = histograms[name].get(tuple(key))
+                histograms[name][tuple(key)] = (
+                    list(values) if current is None else [a + b for a, b in zip(current, values)]
+                )
+
+    return requests, in_flight, histograms
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus(snapshots, buckets=BUCKETS):
+    requests, in_flight, histograms = merge_snapshots(snapshots)
+    lines = [
+        "# HELP gsm_http_requests_total Total HTTP requests.",
+        "# TYPE gsm_http_requests_total counter",
+    ]
+    for (route, method, status), value in sorted(requests.items()):
+        lines.append(f"gsm_http_requests_total{_labels(route=route, method=method, status=status)} {value}")
+
+    lines += [
+        "# HELP gsm_http_requests_in_flight Requests currently being handled.",
+        "# TYPE gsm_http_requests_in_flight gauge",
+    ]
+    for route, value in sorted(in_flight.items()):
+        lines.append(f"gsm_http_requests_in_flight{_labels(route=route)} {value}")
+
+    for name, help_text in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (route, method), values in sorted(histograms[name].items()):
+            for bound, count in zip(buckets, values):
+                lines.append(f"{name}_bucket{_labels(route=route, method=method, le=bound)} {count}")
+            lines.append(f"{name}_bucket{_labels(route=route, method=method, le='+Inf')} {values[-1]}")
+            lines.append(f"{name}_sum{_labels(route=route, method=method)} {values[-2]}")
+            lines.append(f"{name}_count{_labels(route=route, method=method)} {values[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------------
+# Multi-process snapshots
+# -------------------------------------------------------
+RETIRED = "metrics_retired.json"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_into(total, snap):
+    """Adds the counters and histograms of snap to total (gauges are not kept)."""
+    requests, _, histograms = merge_snapshots([total, snap])
+    total["requests"] = [[list(k), v] for k, v in requests.items()]
+    total["histograms"] = {
+        name: [[list(k), v] for k, v in series.items()] for name, series in histograms.items()
+    }
+    return total
+
+
+class SnapshotStore:
+    """
+    Shares per-process snapshots through files in a directory.
+
+    Files are keyed by a random id per process, so a worker that reuses the
+    pid of an exited one never overwrites its counters. Snapshots of exited
+    workers (their pid is gone, or a newer process holds it) are folded
+    into metrics_retired.json and their files removed.
+    """
+
+    def __init__(self, directory, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        self._identity = None   # (pid, process id, started at)
+        os.makedirs(directory, exist_ok=True)
+
+    def identity(self):
+        # Renewed after a fork, so every worker gets its own file
+        if self._identity is None or self._identity[0] != os.getpid():
+            self._identity = (os.getpid(), uuid.uuid4().hex, time.time())
+            self._last_flush = 0.0
+        return self._identity
+
+    def _own_snapshot(self, registry):
+        _, process_id, started_at = self.identity()
+        return {**registry.snapshot(), "process_id": process_id, "started_at": started_at}
+
+    def _write(self, name, snap):
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snap, f)
+        os.replace(tmp, path)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def maybe_flush(self, registry, force=False):
+        self.identity()
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+
+        snap = self._own_snapshot(registry)
+        self._write(f"metrics_{snap['process_id']}.json", snap)
+
+    def _worker_snapshots(self):
+        snapshots = {}
+        for name in os.listdir(self.directory):
+            if name == RETIRED or not (name.startswith("metrics_") and name.endswith(".json")):
+                continue
+            snap = self._read(name)
+            if snap is not None:
+                snapshots[name] = snap
+        return snapshots
+
+    @staticmethod
+    def _exited(snapshots, own_pid):
+        newest = {}
+        for snap in snapshots.values():
+            pid = snap["pid"]
+            newest[pid] = max(newest.get(pid, 0), snap.get("started_at", 0))
+
+        exited = []
+        for name, snap in snapshots.items():
+            pid = snap["pid"]
+            if pid == own_pid or not _pid_alive(pid) or snap.get("started_at", 0) < newest[pid]:
+                exited.append(name)
+        return exited
+
+    def _retire(self, names):
+        import fcntl
+
+        # One process at a time folds files into the retired totals
+        with open(os.path.join(self.directory, ".retire.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired = self._read(RETIRED) or {"pid": 0, "requests": [], "in_flight": [], "histograms": {}}
+            for name in names:
+                snap = self._read(name)
+                if snap is not None:
+                    _merge_into(retired, snap)
+            self._write(RETIRED, retired)
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load_all(self, registry):
+        own = self._own_snapshot(registry)
+        snapshots = self._worker_snapshots()
+        snapshots.pop(f"metrics_{own['process_id']}.json", None)
+
+        exited = self._exited(snapshots, own["pid"])
+        if exited:
+            self._retire(exited)
+            snapshots = {name: snap for name, snap in snapshots.items() if name not in exited}
+
+        retired = self._read(RETIRED)
+        return [own, *snapshots.values(), *([retired] if retired else [])]
+
+
+# -------------------------------------------------------
+# Flask integration
+# -------------------------------------------------------
+registry = MetricsRegistry()
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _file_locks_available():
+    try:
+        import fcntl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _snapshot_store():
+    directory = os.getenv("METRICS_DIR")
+    if not directory:
+        return None
+    if not _file_locks_available():
+        if not getattr(_snapshot_store, "warned", False):
+            logger.warning("METRICS_DIR is ignored: file locks are not available on this platform")
+            _snapshot_store.warned = True
+        return None
+    store = getattr(_snapshot_store, "store", None)
+    if store is None or store.directory != directory:
+        store = SnapshotStore(directory, float(os.getenv("METRICS_FLUSH_SECONDS", 1)))
+        _snapshot_store.store = store
+    return store
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _record_db_time(record):
+    if has_request_context() and "metrics_start" in g:
+        g.metrics_db_time += record.seconds
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_db_time = 0.0
+    g.metrics_serialization_time = 0.0
+    g.metrics_route = _route()
+    registry.request_started(g.metrics_route)
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    if "metrics_start" not in g:
+        return
+
+    status = g.get("metrics_status", 500) if exc is None else 500
+    registry.request_finished(
+        g.metrics_route,
+        request.method,
+        status,
+        time.perf_counter() - g.metrics_start,
+        g.metrics_db_time,
+        g.metrics_serialization_time,
+    )
+
+    store = _snapshot_store()
+    if store is not None:
+        store.maybe_flush(registry)
+
+
+def _timed_dumps(dumps):
+    def wrapper(obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return dumps(obj, **kwargs)
+        finally:
+            if has_request_context() and "metrics_start" in g:
+                g.metrics_serialization_time += time.perf_counter() - started
+    return wrapper
+
+
+def flush_metrics():
+    """Writes this process's snapshot now, e.g. before a worker exits."""
+    store = _snapshot_store()
+    if store is not None:
+        store.maybe_flush(registry, force=True)
+
+
+# Teardown flushes at most once per interval: a recycled worker would lose
+# the counts of its last requests otherwise
+atexit.register(flush_metrics)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    store = _snapshot_store()
+    snapshots = store.load_all(registry) if store is not None else [registry.snapshot()]
+    return Response(render_prometheus(snapshots), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route("/metrics/queries", methods=["GET"])
+def slow_queries_endpoint():
+    """
+    Top-N SQL fingerprints of this worker process.
+    GET /metrics/queries?limit=10&sort=total|max|avg
+    """
+    limit = request.args.get("limit", 10, type=int)
+    if limit < 1:
+        return jsonify({"error": "'limit' must be a positive integer"}), 400
+
+    try:
+        top = query_stats.top(limit, request.args.get("sort", "total"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"queries": top}), 200
+
+
+def init_metrics(app):
+    """Registers the request hooks and the /metrics endpoint on the app."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    app.json.dumps = _timed_dumps(app.json.dumps)
+    if hasattr(app.json, "dumpb"):
+        # Providers that build responses from bytes (see web/json_provider.py)
+        app.json.dumpb = _timed_dumps(app.json.dumpb)
+    add_query_observer(_record_db_time)
+
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,266 @@
+"""
+Opt-in request profiling with cProfile.
+
+Off unless PROFILING_ENABLED=1. When enabled, a request is profiled if it
+carries an "X-Profile" header or is picked by PROFILING_SAMPLE_RATE (0.0 -
+1.0, default 0). The header must equal PROFILING_TOKEN when one is set;
+without a token it is only honoured from the local host, and never for a
+request that came through a proxy (X-Forwarded-For, X-Real-IP or
+Forwarded set): behind a reverse proxy every client connects from the
+local host, so set a token there. The /profiles
+endpoints follow the same rule (token in the X-Profile header). Each profile
+is written to PROFILING_DIR as a .prof file (pstats format) next to a .json
+file with the route, method, status, duration and timestamp; only the
+newest PROFILING_MAX_FILES profiles are kept (default 100).
+
+    GET /profiles                     list stored profiles, newest first
+    GET /profiles/<name>              download the .prof file
+    GET /profiles/<name>?format=text  top functions by cumulative time
+
+A downloaded profile opens with `python -m pstats <file>` or snakeviz.
+Only one request is profiled at a time per process; other requests that
+would be profiled meanwhile run normally.
+
+From Python 3.12 cProfile records the calls of every thread while it is
+enabled, so with a threaded server (gunicorn gthread) a profile also holds
+the work of requests running alongside it. Each profile's metadata counts
+those as "overlapping_requests"; profile with one thread per worker when
+it must be exact.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from flask import Blueprint, abort, g, jsonify, request, send_file
+
+PROFILE_HEADER = "X-Profile"
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "gsm_profiles")
+_NAME = re.compile(r"^[\w.-]+\.prof$")
+_LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+_PROXY_HEADERS = ("X-Forwarded-For", "X-Real-IP", "Forwarded")
+
+# cProfile sees every thread from 3.12 on (sys.monitoring)
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+profiling_bp = Blueprint("profiling", __name__)
+
+# cProfile allows a single active profiler per interpreter
+_profiler_lock = threading.Lock()
+
+# Requests started and running in this process, to count overlaps with a profile
+_requests_lock = threading.Lock()
+_requests = {"started": 0, "running": 0}
+
+
+def profiling_enabled():
+    return os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def profile_dir():
+    return os.getenv("PROFILING_DIR", DEFAULT_DIR)
+
+
+def is_authorized(headers, token=None, local=True):
+    """The X-Profile header carries the token, or the caller is on the local host."""
+    if token:
+        return hmac.compare_digest(headers.get(PROFILE_HEADER, ""), token)
+    return local
+
+
+def should_profile(headers, sample_rate=None, token=None, rand=random.random, local=True):
+    """Decides whether a request is profiled from its headers or sampling."""
+    value = headers.get(PROFILE_HEADER)
+    if value:
+        if token:
+            return is_authorized(headers, token)
+        return local and value.lower() in ("1", "true", "yes")
+
+    if sample_rate is None:
+        sample_rate = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    return sample_rate > 0 and rand() < sample_rate
+
+
+def _slug(route):
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+def save_profile(profiler, directory, route, method, status, duration, max_files=100,
+                 overlapping_requests=0):
+    """Writes the profile and its metadata; returns the .prof file name."""
+    os.makedirs(directory, exist_ok=True)
+
+    now = time.time()
+    name = f"{int(now * 1000)}_{os.getpid()}_{method}_{_slug(route)}.prof"
+    profiler.dump_stats(os.path.join(directory, name))
+
+    meta = {
+        "name": name,
+        "route": route,
+        "method": method,
+        "status": status,
+        "duration_ms": round(duration * 1000, 3),
+        "timestamp": now,
+        "overlapping_requests": overlapping_requests,
+        "all_threads": PROFILES_ALL_THREADS,
+    }
+    with open(os.path.join(directory, name[:-5] + ".json"), "w") as f:
+        json.dump(meta, f)
+
+    _prune(directory, max_files)
+    return name
+
+
+def _prune(directory, max_files):
+    profiles = sorted(n for n in os.listdir(directory) if _NAME.match(n))
+    for name in profiles[:-max_files] if max_files > 0 else []:
+        for path in (name, name[:-5] + ".json"):
+            try:
+                os.remove(os.path.join(directory, path))
+            except OSError:
+                pass
+
+
+def list_profiles(directory):
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+
+    return sorted(profiles, key=lambda p: p["timestamp"], reverse=True)
+
+
+def profile_as_text(path, limit=40):
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+# -------------------------------------------------------
+# Flask integration
+# -------------------------------------------------------
+def _is_local():
+    # A proxy on the same host makes every client look local
+    if any(name in request.headers for name in _PROXY_HEADERS):
+        return False
+    return request.remote_addr in _LOCAL_ADDRESSES
+
+
+def _request_started():
+    with _requests_lock:
+        _requests["started"] += 1
+        _requests["running"] += 1
+        g.profiling_counted = True
+        return _requests["started"], _requests["running"]
+
+
+def _before_request():
+    if not profiling_enabled() or request.blueprint == "profiling":
+        return
+    started, running = _request_started()
+    if not should_profile(request.headers, token=os.getenv("PROFILING_TOKEN"), local=_is_local()):
+        return
+    if not _profiler_lock.acquire(blocking=False):
+        return
+
+    g.profiler = cProfile.Profile()
+    g.profile_start = time.perf_counter()
+    # Requests already running, and the count to compare with when done
+    g.profile_overlap = (running - 1, started)
+    try:
+        g.profiler.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) is already active
+        g.pop("profiler")
+        _profiler_lock.release()
+
+
+def _after_request(response):
+    if "profiler" in g:
+        g.profile_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    if g.pop("profiling_counted", False):
+        with _requests_lock:
+            _requests["running"] -= 1
+            started = _requests["started"]
+
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+
+    try:
+        profiler.disable()
+        already_running, started_before = g.profile_overlap
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        save_profile(
+            profiler,
+            profile_dir(),
+            route,
+            request.method,
+            g.get("profile_status", 500) if exc is None else 500,
+            time.perf_counter() - g.profile_start,
+            int(os.getenv("PROFILING_MAX_FILES", 100)),
+            already_running + started - started_before,
+        )
+    finally:
+        _profiler_lock.release()
+
+
+def _check_access():
+    if not profiling_enabled():
+        abort(404)
+    if not is_authorized(request.headers, os.getenv("PROFILING_TOKEN"), _is_local()):
+        abort(403)
+
+
+@profiling_bp.route("/profiles", methods=["GET"])
+def profiles_endpoint():
+    _check_access()
+    return jsonify(list_profiles(profile_dir())), 200
+
+
+@profiling_bp.route("/profiles/<name>", methods=["GET"])
+def profile_download_endpoint(name):
+    _check_access()
+    if not _NAME.match(name):
+        return jsonify({"error": "Invalid profile name"}), 400
+
+    path = os.path.join(profile_dir(), name)
+    if not os.path.isfile(path):
+        return jsonify({"error": "Profile not found"}), 404
+
+    if request.args.get("format") == "text":
+        limit = request.args.get("limit", 40, type=int)
+        return profile_as_text(path, limit), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+
+def init_profiling(app):
+    """Registers the profiling hooks and the /profiles endpoints on the app."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    app.register_blueprint(profiling_bp)
@@ -1,88 +1,239 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 import mysql.connector
-from datetime import datetime
+import math
+import os
+from datetime import date, datetime
 from ..db.sql_connection import get_sql_connection
+from ..dao.demand_stats_dao import refresh_demand_stats
 
-from ..services.revenue_calculator import calculate_revenue_and_profit
+from ..services.parallel_revenue import run_revenue_simulation
+from ..services.revenue_analytic import calculate_expected_revenue_and_profit
 from ..services.inventory_spend import calculate_monthly_inventory_spend
+from ..services.simulation_jobs import revenue_jobs, JobQueueFull
+from ..services.cache import shared_cache
+from ..web.caching import store_namespaces
+from ..web.read_routing import read_connection, read_only
+from ..web.stores import current_store_id
 
 calculations_bp = Blueprint("calculations", __name__)
 
+# Products with less order history than this keep the default demand model
+DEMAND_MIN_DAYS = int(os.getenv("DEMAND_MIN_DAYS", 7))
+
+REVENUE_MODES = ("sampled", "analytic")
+
 
 
 # ---------------------------------------------------
-# REVENUE + PROFIT SIMULATION ENDPOINT
+# REVENUE HELPERS
 # ---------------------------------------------------
-@calculations_bp.route("/calc/revenue", methods=["POST"])
-def revenue_endpoint():
+def parse_revenue_payload(data):
     """
-    Expected payload:
-    {
-        "product_ids": [1, 2, 3],
-        "days": 7,
-        "seed": 123   (optional)
-    }
+    Validates a revenue simulation payload.
+    Returns (params, None) when valid, otherwise (None, error_message).
     """
 
-    data = request.get_json() or {}
-
-
     # Validate product_ids
     product_ids = data.get("product_ids")
     if not isinstance(product_ids, list) or len(product_ids) == 0:
-        return jsonify({"error": "'product_ids' must be a non-empty list"}), 400
+        return None, "'product_ids' must be a non-empty list"
 
     if not all(isinstance(x, int) and x > 0 for x in product_ids):
-        return jsonify({"error": "'product_ids' must contain positive integers only"}), 400
+        return None, "'product_ids' must contain positive integers only"
 
     # Validate days
     days = data.get("days", 7)
     if not isinstance(days, int) or days < 1 or days > 365:
-        return jsonify({"error": "'days' must be an integer between 1 and 365"}), 400
+        return None, "'days' must be an integer between 1 and 365"
 
 
     # Validate seed
     seed = data.get("seed")
     if seed is not None:
         if not isinstance(seed, int) or seed < 0:
-            return jsonify({"error": "'seed' must be a positive integer"}), 400
+            return None, "'seed' must be a positive integer"
+
+    # Validate mode
+    mode = data.get("mode", "sampled")
+    if mode not in REVENUE_MODES:
+        return None, "'mode' must be 'sampled' or 'analytic'"
+
+    return {"product_ids": product_ids, "days": days, "seed": seed, "mode": mode}, None
+
+
+def revenue_cache_key(params, store_id):
+    """
+    Cache key of a reproducible simulation, None for a random one (sampled
+    without a seed). Learned demand changes with each completed day, so the
+    date is part of the key.
+    """
+    if params["mode"] == "sampled" and params["seed"] is None:
+        return None
+    ids = ",".join(map(str, sorted(set(params["product_ids"]))))
+    return f"revenue:{store_id}:{date.today()}:{params['mode']}:{params['days']}:{params['seed']}:{ids}"
+
+
+def cached_revenue(params, store_id):
+    """
+    simulate_revenue() for the store's products, None when none match.
+    Reproducible results are shared through the cache until the store's
+    products or orders change.
+    """
+    def run():
+        products = fetch_revenue_products(params["product_ids"], store_id, from_primary=key is not None)
+        return simulate_revenue(products, params) if products else None
+
+    key = revenue_cache_key(params, store_id) if shared_cache.enabled else None
+    if key is None:
+        return run()
+    return shared_cache.get_or_load(key, run, depends=store_namespaces(store_id))
+
+
+def simulate_revenue(products, params, progress=None):
+    """Runs the simulation in the requested mode."""
+    if params["mode"] == "analytic":
+        return calculate_expected_revenue_and_profit(products, days=params["days"], progress=progress)
+
+    return run_revenue_simulation(products, days=params["days"], seed=params["seed"], progress=progress)
 
 
-    # Fetch product data
-    conn = get_sql_connection()
+def fetch_revenue_products(product_ids, store_id, from_primary=False):
+    """
+    Fetch the stock and price columns the simulation needs, plus learned
+    daily demand for products with at least DEMAND_MIN_DAYS of history.
+    Products of other stores are left out.
+    """
+    # Incremental: a no-op unless a new complete day of orders exists.
+    # It writes, so it runs on the primary; the product fetch is a read.
+    primary = get_sql_connection(store_id)
+    try:
+        refresh_demand_stats(primary)
+    finally:
+        primary.close()
+
+    conn = get_sql_connection(store_id) if from_primary else read_connection()
     cursor = conn.cursor(dictionary=True)
 
     placeholders = ",".join(["%s"] * len(product_ids))
     query = f"""
         SELECT 
-            product_id,
-            name,
-            quantity,
-            price_per_unit,
-            selling_price
-        FROM products
-        WHERE product_id IN ({placeholders})
+            p.product_id,
+            p.name,
+            p.quantity,
+            p.price_per_unit,
+            p.selling_price,
+            s.mean AS demand_mean,
+            s.variance AS demand_variance
+        FROM products p
+        LEFT JOIN product_demand_stats s
+            ON s.product_id = p.product_id AND s.days_observed >= %s
+        WHERE p.store_id = %s AND p.product_id IN ({placeholders})
     """
 
-    cursor.execute(query, product_ids)
+    cursor.execute(query, [DEMAND_MIN_DAYS, store_id, *product_ids])
     products = cursor.fetchall()
 
     cursor.close()
     conn.close()
 
+    for p in products:
+        variance = p.pop("demand_variance")
+        p["demand_std"] = math.sqrt(variance) if variance is not None else None
+
+    return products
+
+
+# ---------------------------------------------------
+# REVENUE + PROFIT SIMULATION ENDPOINT
+# ---------------------------------------------------
+@calculations_bp.route("/calc/revenue", methods=["POST"])
+@read_only
+def revenue_endpoint():
+    """
+    Expected payload:
+    {
+        "product_ids": [1, 2, 3],
+        "days": 7,
+        "seed": 123,          (optional)
+        "mode": "sampled"     (optional, "analytic" returns expected values)
+    }
+    """
+
+    data = request.get_json() or {}
+
+    params, error = parse_revenue_payload(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = cached_revenue(params, current_store_id())
+
+    if result is None:
+        return jsonify({"error": "No matching products found"}), 400
+
+    return jsonify(result), 200
+
+
+# ---------------------------------------------------
+# ASYNC REVENUE SIMULATION JOBS
+# ---------------------------------------------------
+@calculations_bp.route("/calc/revenue/jobs", methods=["POST"])
+@read_only
+def revenue_job_submit():
+    """
+    Same payload as /calc/revenue, but the simulation runs in the background.
+    Responds 202 with the job id; poll /calc/revenue/jobs/<job_id> for the result.
+    """
+
+    data = request.get_json() or {}
+
+    params, error = parse_revenue_payload(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    products = fetch_revenue_products(params["product_ids"], current_store_id())
+
     if not products:
         return jsonify({"error": "No matching products found"}), 400
 
-    # Run calculation
-    result = calculate_revenue_and_profit(products, days=days, seed=seed)
+    try:
+        job_id = revenue_jobs.submit(simulate_revenue, products, params)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
 
-    return jsonify(result), 200
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for("calculations.revenue_job_status", job_id=job_id)
+    }), 202
+
+
+@calculations_bp.route("/calc/revenue/jobs/<job_id>", methods=["GET"])
+def revenue_job_status(job_id):
+    job = revenue_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    response = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "submitted_at": job["submitted_at"],
+        "finished_at": job["finished_at"],
+    }
+
+    if job["status"] == "done":
+        response["result"] = job["result"]
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+
+    return jsonify(response), 200
 
 
 # ---------------------------------------------------
 # MONTHLY INVENTORY SPEND ENDPOINT
 # ---------------------------------------------------
 @calculations_bp.route("/calc/spend", methods=["POST"])
+@read_only
 def spend_endpoint():
     """
     {
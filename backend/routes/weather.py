@@ -0,0 +1,58 @@
+import os
+from flask import Blueprint, request, jsonify
+
+from ..services.weather import WeatherCache, WeatherUnavailable, fetch_openweather
+
+weather_bp = Blueprint("weather", __name__)
+
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
+WEATHER_DEFAULT_CITY = os.getenv("WEATHER_DEFAULT_CITY", "Copenhagen")
+
+
+def _fetch(city):
+    return fetch_openweather(
+        OPENWEATHER_URL,
+        OPENWEATHER_API_KEY,
+        city,
+        timeout=float(os.getenv("WEATHER_TIMEOUT_SECONDS", 3))
+    )
+
+
+weather_cache = WeatherCache(
+    _fetch,
+    ttl=float(os.getenv("WEATHER_TTL_SECONDS", 600)),
+    stale_ttl=float(os.getenv("WEATHER_STALE_SECONDS", 3600)),
+    max_entries=int(os.getenv("WEATHER_MAX_CITIES", 1000)),
+    negative_ttl=float(os.getenv("WEATHER_NOT_FOUND_SECONDS", 60)),
+)
+
+
+# ---------------------------------------------------
+# WEATHER PROXY ENDPOINT
+# ---------------------------------------------------
+@weather_bp.route("/weather", methods=["GET"])
+def weather_endpoint():
+    """
+    GET /weather?city=Copenhagen
+
+    Returns the OpenWeather current-weather payload for the city,
+    served from a shared cache (X-Cache: HIT, STALE or MISS).
+    """
+
+    if not OPENWEATHER_API_KEY:
+        return jsonify({"error": "Weather is not configured (missing OPENWEATHER_API_KEY)"}), 503
+
+    city = request.args.get("city", WEATHER_DEFAULT_CITY).strip()
+    if not city or len(city) > 100:
+        return jsonify({"error": "'city' must be between 1 and 100 characters"}), 400
+
+    try:
+        status, body, cache_state = weather_cache.get(city)
+    except WeatherUnavailable as e:
+        return jsonify({"error": str(e)}), 502
+
+    response = jsonify(body)
+    response.status_code = status
+    response.headers["X-Cache"] = cache_state
+    return response
@@ -0,0 +1,135 @@
+"""
+Production server entry point:
+
+    python -m backend.serve --workers 4 --threads 8
+
+Runs the Flask app under gunicorn with several worker processes, each with
+a thread pool. The app is imported once in the master before forking and
+the garbage collector is frozen afterwards, so the imported code and data
+stay in pages shared by all workers instead of being copied by GC writes.
+Workers are recycled after a number of requests to bound memory growth.
+Each worker's revenue process pool (services/parallel_revenue.py) gets
+its share of the CPUs, REVENUE_PROCESSES = CPU count // workers (at least
+1, which runs simulations in the worker itself), unless REVENUE_PROCESSES
+is set: otherwise every worker would start one process per CPU.
+Several workers only share a cache through CACHE_URL; a per-process cache
+(CACHE_TTL_SECONDS without CACHE_URL) is reported at startup, since a write
+served by one worker is not seen by the caches of the others (see
+services/cache.py).
+
+Every option can also be set through the environment (GSM_BIND, GSM_WORKERS,
+GSM_THREADS, GSM_MAX_REQUESTS, GSM_MAX_REQUESTS_JITTER, GSM_TIMEOUT).
+"""
+
+import argparse
+import gc
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers():
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GSM backend under a production WSGI server")
+    parser.add_argument("--bind", default=os.getenv("GSM_BIND", "0.0.0.0:5050"),
+                        help="host:port to listen on (default 0.0.0.0:5050)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("GSM_WORKERS", default_workers())),
+                        help="worker processes (default 2 x CPU + 1)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("GSM_THREADS", 4)),
+                        help="threads per worker (default 4)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("GSM_MAX_REQUESTS", 10000)),
+                        help="recycle a worker after this many requests, 0 disables (default 10000)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("GSM_MAX_REQUESTS_JITTER", 1000)),
+                        help="random extra requests so workers do not restart together (default 1000)")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("GSM_TIMEOUT", 60)),
+                        help="seconds before a silent worker is killed (default 60)")
+    return parser.parse_args(argv)
+
+
+def worker_exit(server, worker):
+    """gunicorn hook: a recycled worker keeps the metrics of its last requests."""
+    from .monitoring.metrics import flush_metrics
+
+    flush_metrics()
+
+
+def build_options(args):
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "preload_app": True,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "timeout": args.timeout,
+        "worker_exit": worker_exit,
+    }
+
+
+def revenue_processes(workers):
+    """Simulation processes per worker, so that all workers together use each CPU once."""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def configure_revenue_pool(options):
+    """Sets REVENUE_PROCESSES for the workers; must run before load_app()."""
+    os.environ.setdefault("REVENUE_PROCESSES", str(revenue_processes(options["workers"])))
+    return int(os.environ["REVENUE_PROCESSES"])
+
+
+def cache_warning(options):
+    """Why the cache configuration is unsafe for these options, or None."""
+    if options["workers"] < 2 or os.getenv("CACHE_URL"):
+        return None
+    if float(os.getenv("CACHE_TTL_SECONDS", 0)) <= 0:
+        return None
+    return (f"CACHE_TTL_SECONDS is set without CACHE_URL: each of the {options['workers']} workers "
+            "keeps its own cache and may serve data changed through another worker. "
+            "Set CACHE_URL to share the cache, or unset CACHE_TTL_SECONDS to turn it off.")
+
+
+def load_app():
+    """Import the app in the master and freeze everything it allocated."""
+    from .app import app
+
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def main(argv=None):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("gunicorn is required for the production server: pip install gunicorn")
+
+    class GSMApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = build_options(parse_args(argv))
+    print(f"Starting GSM API on {options['bind']} "
+          f"({options['workers']} workers x {options['threads']} threads)")
+    print(f"Revenue simulations: {configure_revenue_pool(options)} processes per worker")
+    warning = cache_warning(options)
+    if warning is not None:
+        logger.warning(warning)
+    GSMApplication(load_app(), options).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Two-level cache for data that every worker process serves: an in-process
+L1 in front of an optional shared L2 on a Redis-protocol server.
+
+Entries name the namespaces they were built from (e.g. "products:1").
+Each namespace has a version counter in L2; a write publishes a change by
+incrementing it (bump), which makes every entry built from the older
+version unreachable in every worker at once. Lookups read the current
+versions in one round trip, so no worker serves data older than the last
+published write, while the value itself comes from L1 when that worker
+already holds it for those versions, from L2 when another worker built it,
+and from the loader otherwise.
+
+Caching is opt-in: it is off unless CACHE_URL names the shared tier.
+Setting CACHE_TTL_SECONDS without CACHE_URL caches in the process with
+versions kept in the process, which is only consistent for a single
+process: writes served by one worker are not seen by the others. When L2
+cannot be reached, or answers a command with an error, lookups go straight
+to the loader until it answers again. Bumps made meanwhile are kept and
+published before the worker reads from L2 again, so entries built before
+them are not served once L2 is back; a worker that exits during the outage
+loses its pending bumps, and the entries expire with their TTL.
+
+Configuration:
+  - CACHE_URL          redis://[:password@]host[:port][/db] of the shared tier
+  - CACHE_TTL_SECONDS  lifetime of an entry, default 300 with CACHE_URL and
+                       0 (caching off) without it
+  - CACHE_LOCAL_MAX    entries kept in each process's L1, default 1024
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from .resp import CacheUnavailable, RespClient, RespError
+from ..web.json_provider import dumps_bytes, loads
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """
+    Values are shared between requests and must be treated as read-only.
+    Values that cannot be encoded as JSON are not cached in L2.
+    """
+
+    def __init__(self, shared: Optional[RespClient] = None, ttl: float = 300, local_max: int = 1024,
+                 prefix: str = "gsm:", retry_after: float = 5, clock: Callable[[], float] = time.monotonic):
+        if local_max < 0:
+            raise ValueError("local_max must not be negative")
+
+        self.shared = shared
+        self.ttl = ttl
+        self.local_max = local_max
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self.clock = clock
+
+        self._local: "OrderedDict[str, Tuple[Tuple[int, ...], float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}  # without a shared tier
+        self._pending = set()                # bumps not published to L2 yet
+        self._down_until = None
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "bypassed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _version_key(self, namespace):
+        return f"{self.prefix}v:{namespace}"
+
+    def _data_key(self, key, versions):
+        return f"{self.prefix}{key}@{'.'.join(map(str, versions))}"
+
+    def _shared_down(self) -> bool:
+        with self._lock:
+            return self._down_until is not None and self.clock() < self._down_until
+
+    def _mark_down(self, error):
+        with self._lock:
+            if self._down_until is None:
+                logger.warning("Shared cache unavailable, bypassing the cache: %s", error)
+            self._down_until = self.clock() + self.retry_after
+            # Bumps published meanwhile may be missed: drop what L1 holds
+            self._local.clear()
+
+    def _mark_up(self):
+        if self._down_until is not None:
+            with self._lock:
+                if self._down_until is not None:
+                    logger.info("Shared cache reachable again")
+                    self._down_until = None
+
+    def _recover(self):
+        """Publishes the bumps skipped during an outage; raises while L2 still fails."""
+        with self._lock:
+            pending = sorted(self._pending)
+        if pending:
+            self._incr(pending)
+            with self._lock:
+                self._pending.difference_update(pending)
+        self._mark_up()
+
+    def _incr(self, namespaces):
+        replies = self.shared.pipeline([("INCR", self._version_key(ns)) for ns in namespaces])
+        errors = [r for r in replies if isinstance(r, RespError)]
+        if errors:
+            raise errors[0]
+
+    def versions(self, namespaces: Sequence[str]) -> Tuple[int, ...]:
+        """Current version of each namespace (0 until its first bump)."""
+        if not namespaces:
+            return ()
+        if self.shared is None:
+            with self._lock:
+                return tuple(self._versions.get(ns, 0) for ns in namespaces)
+        values = self.shared.mget([self._version_key(ns) for ns in namespaces])
+        return tuple(int(v) if v is not None else 0 for v in values)
+
+    def bump(self, *namespaces: str):
+        """
+        Publishes a change: entries built from these namespaces are no longer
+        served. Never raises for L2 failures, as the write is already done.
+        """
+        if not namespaces:
+            return
+        if self.shared is None:
+            with self._lock:
+                for ns in namespaces:
+                    self._versions[ns] = self._versions.get(ns, 0) + 1
+            return
+        if self._shared_down():
+            with self._lock:
+                self._pending.update(namespaces)
+            return
+        try:
+            if self._down_until is not None:
+                self._recover()
+            self._incr(namespaces)
+        except (CacheUnavailable, RespError) as e:
+            # Retried on recovery; an extra INCR only invalidates more
+            with self._lock:
+                self._pending.update(namespaces)
+            self._mark_down(e)
+            return
+        self._mark_up()
+
+    def _local_get(self, key, versions):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return False, None
+            entry_versions, expires_at, value = entry
+            if entry_versions != versions or expires_at <= self.clock():
+                del self._local[key]
+                return False, None
+            self._local.move_to_end(key)
+            return True, value
+
+    def _local_put(self, key, versions, value, ttl):
+        if self.local_max == 0:
+            return
+        with self._lock:
+            self._local[key] = (versions, self.clock() + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max:
+                self._local.popitem(last=False)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], depends: Sequence[str] = (),
+                    ttl: Optional[float] = None) -> Any:
+        """
+        Cached value of `key`, built by loader() on a miss. `depends` names
+        the namespaces whose bumps invalidate it.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or (self.shared is not None and self._shared_down()):
+            self._count("bypassed")
+            return loader()
+
+        try:
+            if self.shared is not None and self._down_until is not None:
+                self._recover()
+            versions = self.versions(depends)
+            hit, value = self._local_get(key, versions)
+            if hit:
+                self._count("local_hits")
+                return value
+
+            if self.shared is not None:
+                data_key = self._data_key(key, versions)
+                payload = self.shared.get(data_key)
+                if payload is not None:
+                    value = loads(payload)
+                    self._local_put(key, versions, value, ttl)
+                    self._count("shared_hits")
+                    return value
+        except (CacheUnavailable, RespError) as e:
+            self._mark_down(e)
+            self._count("bypassed")
+            return loader()
+
+        self._count("misses")
+        value = loader()
+        self._local_put(key, versions, value, ttl)
+
+        if self.shared is not None:
+            try:
+                self.shared.set(data_key, dumps_bytes(value), ttl)
+            except TypeError:
+                pass
+            except (CacheUnavailable, RespError) as e:
+                self._mark_down(e)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "local_entries": len(self._local)}
+
+    def clear(self):
+        """Empties L1 and forgets local versions; L2 entries expire on their own."""
+        with self._lock:
+            self._local.clear()
+            self._versions.clear()
+
+
+def store_namespaces(store_id) -> Tuple[str, str]:
+    """Namespaces a write to the store invalidates: its products and its orders."""
+    return (f"products:{store_id}", f"orders:{store_id}")
+
+
+def cache_from_env() -> TieredCache:
+    url = os.getenv("CACHE_URL")
+    return TieredCache(
+        shared=RespClient.from_url(url) if url else None,
+        ttl=float(os.getenv("CACHE_TTL_SECONDS", 300 if url else 0)),
+        local_max=int(os.getenv("CACHE_LOCAL_MAX", 1024)),
+    )
+
+
+shared_cache = cache_from_env()
@@ -0,0 +1,139 @@
+"""
+Moves orders of closed periods out of the hot tables:
+
+    python -m backend.services.order_archiver --keep-months 12
+    python -m backend.services.order_archiver --keep-months 12 --dry-run
+
+Periods are calendar months. Orders placed before the first day of the
+month `--keep-months` months before the current one are copied to
+orders_archive / order_details_archive and deleted from orders /
+order_details, `--chunk-size` orders per transaction so that locks stay
+short and an interrupted run loses nothing. Running it again continues
+where it stopped. The order DAOs read the archive when a requested range
+reaches it (see dao/order_list_dao.py).
+
+Defaults come from ORDER_ARCHIVE_KEEP_MONTHS (12) and
+ORDER_ARCHIVE_CHUNK_SIZE (500). Meant to run from cron, e.g. monthly.
+With STORE_SHARDS set, every shard is archived in turn.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime
+
+from ..db.shards import all_shards
+from ..db.sql_connection import get_shard_connection
+from .cache import shared_cache, store_namespaces
+
+
+def archive_cutoff(today, keep_months):
+    """First day of the month `keep_months` months before today's month."""
+    if keep_months < 0:
+        raise ValueError("keep_months must not be negative")
+    months = today.year * 12 + (today.month - 1) - keep_months
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def count_orders_before(conn, cutoff):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM orders WHERE datetime < %s", (cutoff,))
+    return cursor.fetchall()[0][0]
+
+
+def _archive_chunk(conn, order_ids):
+    """Copies and deletes one chunk of orders in a single transaction."""
+    placeholders = ",".join(["%s"] * len(order_ids))
+    params = tuple(order_ids)
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute(f"""
+            INSERT INTO orders_archive (order_id, customer_name, total_price, datetime, store_id)
+            SELECT order_id, customer_name, total_price, datetime, store_id
+            FROM orders WHERE order_id IN ({placeholders})
+        """, params)
+        cursor.execute(f"""
+            INSERT INTO order_details_archive (id, order_id, product_id, quantity, total_price, store_id)
+            SELECT id, order_id, product_id, quantity, total_price, store_id
+            FROM order_details WHERE order_id IN ({placeholders})
+        """, params)
+        details = cursor.rowcount
+        cursor.execute(f"DELETE FROM order_details WHERE order_id IN ({placeholders})", params)
+        cursor.execute(f"DELETE FROM orders WHERE order_id IN ({placeholders})", params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return details
+
+
+def archive_orders_before(conn, cutoff, chunk_size=500, progress=None):
+    """
+    Archives every order placed before `cutoff`, oldest ids first. Each
+    chunk publishes a change to the cache for the stores it moved.
+    Returns {"orders": n, "order_details": n, "chunks": n}.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    totals = {"orders": 0, "order_details": 0, "chunks": 0}
+    cursor = conn.cursor()
+    while True:
+        cursor.execute(
+            "SELECT order_id, store_id FROM orders WHERE datetime < %s ORDER BY order_id LIMIT %s",
+            (cutoff, chunk_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return totals
+
+        order_ids = [row[0] for row in rows]
+        totals["order_details"] += _archive_chunk(conn, order_ids)
+        for store_id in {row[1] for row in rows}:
+            shared_cache.bump(*store_namespaces(store_id))
+        totals["orders"] += len(order_ids)
+        totals["chunks"] += 1
+        if progress is not None:
+            progress(totals)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Move orders of closed months to the archive tables")
+    parser.add_argument("--keep-months", type=int, default=int(os.getenv("ORDER_ARCHIVE_KEEP_MONTHS", 12)),
+                        help="full months kept in the hot tables besides the current one (default 12)")
+    parser.add_argument("--chunk-size", type=int, default=int(os.getenv("ORDER_ARCHIVE_CHUNK_SIZE", 500)),
+                        help="orders moved per transaction (default 500)")
+    parser.add_argument("--dry-run", action="store_true", help="only count the orders that would move")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cutoff = archive_cutoff(date.today(), args.keep_months)
+
+    # Every database holding store data (see db/shards.py)
+    for shard in all_shards():
+        label = "default database" if shard is None else f"shard {shard[0]}:{shard[1]}"
+        conn = get_shard_connection(shard)
+        try:
+            if args.dry_run:
+                print(f"{label}: {count_orders_before(conn, cutoff)} orders placed before "
+                      f"{cutoff:%Y-%m-%d} would be archived")
+                continue
+
+            totals = archive_orders_before(
+                conn, cutoff, args.chunk_size,
+                progress=lambda t: print(f"  {t['orders']} orders archived...", flush=True),
+            )
+        finally:
+            conn.close()
+
+        print(f"{label}: archived {totals['orders']} orders ({totals['order_details']} items) placed before "
+              f"{cutoff:%Y-%m-%d} in {totals['chunks']} chunks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from ..dao.order_dao import add_order
+from ..db.shards import shard_for
+from ..db.sql_connection import get_shard_connection
+from .cache import shared_cache, store_namespaces
+
+
+class OrderQueueFull(Exception):
+    """Raised when the write-behind queue has no room for another order."""
+
+
+def validate_order(order: Dict[str, Any]):
+    """
+    Checks everything add_order converts, so an order only fails in the
+    writer for database reasons. Raises ValueError with a client-facing message.
+    """
+    if not isinstance(order.get("customer_name"), str) or not order["customer_name"].strip():
+        raise ValueError("customer_name must be a non-empty string")
+
+    items = order.get("order_details")
+    if not isinstance(items, list):
+        raise ValueError("order_details must be a list")
+
+    try:
+        float(order["total_price"])
+        if order.get("order_id"):
+            int(order["order_id"])
+        for item in items:
+            int(item["product_id"])
+            float(item["quantity"])
+            float(item["total_price"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid order field: {e}") from e
+
+
+class OrderWriter:
+    """
+    Write-behind ingestion for /addOrder with group commit.
+
+    Orders are queued by submit() and written by a single background thread
+    in batches: after the first order arrives it waits at most `max_wait`
+    seconds for up to `max_batch` orders, writes them all in one transaction
+    and commits once. Each order runs under its own savepoint, so an order
+    that fails is rolled back alone and the rest of the batch still commits.
+
+    submit() returns a Future that resolves to the order id after the
+    batch's COMMIT, so a client is never told about an order that is not
+    durable yet. Each order is written for the store it was submitted for
+    (see add_order), `store_id` when it names none. The commit publishes a
+    change to the cache for every store written, also when the request that
+    submitted the order has already given up waiting.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_batch: int = 50,
+                 max_wait: float = 0.01, max_queue: int = 1000, store_id: Optional[int] = None):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.connect = connect
+        self.store_id = store_id
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._stats = {"orders": 0, "failed": 0, "batches": 0, "largest_batch": 0}
+
+    def _ensure_thread(self):
+        # Started lazily so that forking servers start the thread in the worker
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, order: Dict[str, Any], store_id: Optional[int] = None) -> Future:
+        future = Future()
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((order, future, self.store_id if store_id is None else store_id))
+        except queue.Full:
+            raise OrderQueueFull("Too many orders are waiting to be written, try again later")
+        return future
+
+    def _next_batch(self) -> List:
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopping = True
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._next_batch()
+            if not batch:
+                break
+            self.write_batch(batch)
+
+    def write_batch(self, batch):
+        """Writes [(order, future, store_id), ...] in one transaction and resolves the futures."""
+        written = []
+        try:
+            conn = self.connect()
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            for order, future, store_id in batch:
+                cursor.execute("SAVEPOINT order_item")
+                try:
+                    order_id = add_order(conn, order, commit=False, store_id=store_id)
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT order_item")
+                    future.set_exception(e)
+                    continue
+                cursor.execute("RELEASE SAVEPOINT order_item")
+                written.append((future, order_id, store_id))
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            # Nothing of the batch was committed
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            written = []
+        finally:
+            conn.close()
+
+        stores = {store_id for _, _, store_id in written}
+        for store_id in stores:
+            shared_cache.bump(*store_namespaces(store_id))
+        for future, order_id, _ in written:
+            future.set_result(order_id)
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["orders"] += len(written)
+            self._stats["failed"] += len(batch) - len(written)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def shutdown(self, wait: bool = True):
+        """Writes what is already queued, then stops the thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            thread.join()
+        self._thread = None
+
+
+def write_behind_enabled():
+    return os.getenv("ORDER_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+
+
+def write_timeout():
+    return float(os.getenv("ORDER_WRITE_TIMEOUT", 10))
+
+
+def _create_writer(shard):
+    return OrderWriter(
+        lambda: get_shard_connection(shard),
+        max_batch=int(os.getenv("ORDER_BATCH_MAX", 50)),
+        max_wait=float(os.getenv("ORDER_BATCH_WAIT_MS", 10)) / 1000,
+        max_queue=int(os.getenv("ORDER_QUEUE_SIZE", 1000)),
+    )
+
+
+# One writer per database, so a batch commits on a single server. Shards
+# come from STORE_SHARDS, which bounds the number of writer threads however
+# many store ids clients send.
+order_writer = _create_writer(None)
+_writers = {None: order_writer}
+_writers_lock = threading.Lock()
+
+
+def writer_for(store_id):
+    """Writer of the shard holding the store; submit the order with its store_id."""
+    shard = shard_for(store_id)
+    with _writers_lock:
+        if shard not in _writers:
+            _writers[shard] = _create_writer(shard)
+        return _writers[shard]
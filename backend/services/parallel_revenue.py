@@ -0,0 +1,105 @@
+"""
+Runs revenue simulations for large catalogs across CPU cores.
+
+The simulation is pure Python, so threads cannot use more than one core.
+Products are split into the same fixed-size chunks as the serial calculator
+and each chunk is simulated in a persistent process pool with its own RNG
+stream, so a seeded run gives identical results with or without the pool.
+"""
+
+import atexit
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable
+
+from .revenue_calculator import (
+    calculate_revenue_and_profit,
+    validate_simulation_args,
+    chunk_products,
+    chunk_seed,
+    simulate_chunk,
+    summarize_details,
+)
+
+# Number of worker processes; 0 or 1 disables the pool
+REVENUE_PROCESSES = int(os.getenv("REVENUE_PROCESSES", os.cpu_count() or 1))
+
+# Catalogs smaller than this are cheaper to simulate in-process
+REVENUE_PARALLEL_MIN_PRODUCTS = int(os.getenv("REVENUE_PARALLEL_MIN_PRODUCTS", 500))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """
+    Return the shared process pool, creating it on first use.
+    A pool inherited through fork belongs to the parent, so it is recreated per pid.
+    """
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=REVENUE_PROCESSES, mp_context=context)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_pid = None
+
+
+atexit.register(shutdown_pool)
+
+
+def run_revenue_simulation(
+        products: List[Dict[str, Any]],
+        days: int = 7,
+        seed: int | None = None,
+        progress: Callable[[int, int], None] | None = None
+) -> Dict[str, Any]:
+    """
+    Same contract as calculate_revenue_and_profit, using the process pool
+    when the catalog is large enough to benefit from it.
+    """
+
+    if REVENUE_PROCESSES <= 1 or len(products) < REVENUE_PARALLEL_MIN_PRODUCTS:
+        return calculate_revenue_and_profit(products, days=days, seed=seed, progress=progress)
+
+    validate_simulation_args(days, seed)
+
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    chunks = chunk_products(products)
+    pool = _get_pool()
+
+    futures = {
+        pool.submit(simulate_chunk, chunk, days, chunk_seed(seed, index)): index
+        for index, chunk in enumerate(chunks)
+    }
+
+    results = [None] * len(chunks)
+    done = 0
+    for future in as_completed(futures):
+        index = futures[future]
+        results[index] = future.result()
+
+        done += len(chunks[index])
+        if progress is not None:
+            progress(done, len(products))
+
+    details = [d for chunk_details in results for d in chunk_details]
+    return summarize_details(details)
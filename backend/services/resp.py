@@ -0,0 +1,173 @@
+"""
+Minimal client for the Redis protocol (RESP2), enough for the shared cache
+tier (services/cache.py): GET, SET with expiry, MGET, INCR, DEL and PING.
+
+It speaks to Redis, Valkey, KeyDB or the stand-in server in
+services/resp_server.py. There is one socket per process, opened on first
+use and reopened after a fork or a failure; threads share it under a lock.
+"""
+
+import os
+import socket
+import threading
+import urllib.parse
+from typing import Any, List, Optional, Sequence
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+class CacheUnavailable(ConnectionError):
+    """The server cannot be reached or the connection broke."""
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def read_reply(stream) -> Any:
+    """Reads one reply; error replies are returned as RespError instances."""
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise CacheUnavailable("Connection closed by the server")
+
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RespError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise CacheUnavailable("Connection closed by the server")
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise CacheUnavailable(f"Unexpected reply type {kind!r}")
+
+
+class RespClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 0.5):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._conn = None  # (pid, socket, reader)
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 0.5) -> "RespClient":
+        """redis://[:password@]host[:port][/db]"""
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme '{parsed.scheme}'")
+        db = parsed.path.strip("/")
+        return cls(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=urllib.parse.unquote(parsed.password) if parsed.password else None,
+            timeout=timeout,
+        )
+
+    def _connect(self):
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise CacheUnavailable(f"Cannot reach {self.host}:{self.port}: {e}") from e
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (os.getpid(), sock, sock.makefile("rb"))
+
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        for command in setup:
+            reply = self._round_trip(conn, [command])[0]
+            if isinstance(reply, RespError):
+                self._close(conn)
+                raise reply
+        return conn
+
+    def _round_trip(self, conn, commands):
+        _, sock, reader = conn
+        try:
+            sock.sendall(b"".join(encode_command(*command) for command in commands))
+            return [read_reply(reader) for _ in commands]
+        except OSError as e:
+            raise CacheUnavailable(str(e)) from e
+
+    @staticmethod
+    def _close(conn):
+        for closable in (conn[2], conn[1]):
+            try:
+                closable.close()
+            except OSError:
+                pass
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Sends the commands in one write and returns their replies in order."""
+        with self._lock:
+            # A socket inherited from the parent process is never reused
+            if self._conn is None or self._conn[0] != os.getpid():
+                self._conn = self._connect()
+            try:
+                return self._round_trip(self._conn, commands)
+            except CacheUnavailable:
+                self._close(self._conn)
+                self._conn = None
+                raise
+
+    def execute(self, *args) -> Any:
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def ping(self) -> bool:
+        return self.execute("PING") == "PONG"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute("GET", key)
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self.execute("MGET", *keys)
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        if ttl is None:
+            return self.execute("SET", key, value)
+        return self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def incr(self, key: str) -> int:
+        return self.execute("INCR", key)
+
+    def delete(self, *keys: str) -> int:
+        return self.execute("DEL", *keys)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._close(self._conn)
+                self._conn = None
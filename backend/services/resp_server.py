@@ -0,0 +1,254 @@
+"""
+Stand-in for Redis, for development and tests:
+
+    python -m backend.services.resp_server --port 6390
+
+An in-memory key/value server speaking the Redis protocol, with the
+commands the shared cache uses (PING, GET, SET with EX/PX/NX, MGET, INCR,
+DEL, EXISTS, FLUSHDB, plus AUTH and SELECT which are accepted and ignored).
+Keys expire on access and in periodic sweeps. It holds nothing on disk and
+is not meant to replace Redis in production.
+"""
+
+import argparse
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .resp import RespError, read_reply
+
+SWEEP_EVERY = 1000  # writes between sweeps of expired keys
+
+
+def encode_reply(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class Store:
+    """The keyspace: key -> (value, expires_at or None)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self._data[key]
+            return None
+        return entry
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            now = self.clock()
+            for key in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    def execute(self, args):
+        if not args:
+            return RespError("ERR empty command")
+        name, args = args[0].upper(), args[1:]
+        handler = getattr(self, f"cmd_{name.decode(errors='replace').lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{name.decode(errors='replace')}'")
+        try:
+            with self._lock:
+                return handler(*args)
+        except TypeError:
+            return RespError(f"ERR wrong number of arguments for '{name.decode().lower()}' command")
+        except ValueError:
+            return RespError("ERR value is not an integer or out of range")
+
+    def cmd_ping(self, message=None):
+        return "PONG" if message is None else message
+
+    def cmd_auth(self, *credentials):
+        return "OK"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_get(self, key):
+        entry = self._live(key)
+        return None if entry is None else entry[0]
+
+    def cmd_mget(self, *keys):
+        if not keys:
+            raise TypeError
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        expires_at, only_new = None, False
+        options = list(options)
+        while options:
+            option = options.pop(0).upper()
+            if option in (b"EX", b"PX") and options:
+                amount = int(options.pop(0))
+                if amount <= 0:
+                    return RespError("ERR invalid expire time in 'set' command")
+                expires_at = self.clock() + (amount if option == b"EX" else amount / 1000)
+            elif option == b"NX":
+                only_new = True
+            else:
+                return RespError("ERR syntax error")
+
+        if only_new and self._live(key) is not None:
+            return None
+        self._data[key] = (value, expires_at)
+        self._wrote()
+        return "OK"
+
+    def cmd_incr(self, key):
+        entry = self._live(key)
+        value = int(entry[0]) + 1 if entry is not None else 1
+        self._data[key] = (str(value).encode(), entry[1] if entry is not None else None)
+        self._wrote()
+        return value
+
+    def cmd_del(self, *keys):
+        if not keys:
+            raise TypeError
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    def cmd_exists(self, *keys):
+        if not keys:
+            raise TypeError
+        return sum(self._live(key) is not None for key in keys)
+
+    def cmd_flushdb(self, *mode):
+        self._data.clear()
+        return "OK"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (OSError, ValueError):
+                return
+            if not isinstance(command, list):
+                self.wfile.write(encode_reply(RespError("ERR commands must be arrays of bulk strings")))
+                return
+            if command and command[0].upper() == b"QUIT":
+                self.wfile.write(encode_reply("OK"))
+                return
+            self.wfile.write(encode_reply(self.server.store.execute(command)))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.store = Store()
+        self.connections = set()
+        self.lock = threading.Lock()
+
+
+class RespServer:
+    """
+    Runs the stand-in on a background thread. Port 0 picks a free port;
+    `url` is what CACHE_URL should be set to.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port), _Handler)
+        self._thread = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"redis://{host}:{port}/0"
+
+    @property
+    def store(self) -> Store:
+        return self._server.store
+
+    def start(self) -> "RespServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="resp-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def drop_connections(self):
+        """Closes every client connection, as a server restart would."""
+        with self._server.lock:
+            connections = list(self._server.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="In-memory stand-in for Redis (development and tests)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=6390, help="port to listen on (default 6390)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = RespServer(args.host, args.port)
+    print(f"Cache stand-in listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
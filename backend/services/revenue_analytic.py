@@ -0,0 +1,118 @@
+"""
+Expected-value revenue projection without sampling.
+
+The sampled model sells D = max(0, int(X)) units a day, X ~ Normal(mean, std),
+capped by the remaining stock. For integer stock s:
+
+    E[min(D, s)] = sum_{j=1..s} P(D >= j) = sum_{j=1..s} P(X >= j)
+
+so one pass over the normal tail gives a prefix-sum table and every day
+after that is a constant-time lookup. The remaining stock is carried as its
+expected value (interpolating between integer stock levels), which is exact
+while stock does not bind and a close upper bound once it does.
+"""
+
+import math
+from typing import List, Dict, Any, Callable
+
+from .revenue_calculator import (
+    DEFAULT_DEMAND_MEAN,
+    DEFAULT_DEMAND_STD,
+    summarize_details,
+)
+
+# Tail probabilities beyond mean + TAIL_STDS * std are treated as zero
+TAIL_STDS = 10
+
+
+def expected_sales_table(mean: float, std: float) -> List[float]:
+    """
+    Returns C where C[s] = E[min(D, s)] for s = 0..len(C)-1.
+    For larger stock levels C[-1] (= E[D]) applies.
+    """
+    max_units = max(0, math.ceil(mean + TAIL_STDS * std))
+
+    table = [0.0]
+    for j in range(1, max_units + 1):
+        if std > 0:
+            tail = 0.5 * math.erfc((j - mean) / (std * math.sqrt(2)))
+        else:
+            tail = 1.0 if mean >= j else 0.0
+        table.append(table[-1] + tail)
+
+    return table
+
+
+def expected_sales(table: List[float], stock: float) -> float:
+    """E[min(D, stock)] for a possibly fractional expected stock level."""
+    if stock <= 0:
+        return 0.0
+    if stock >= len(table) - 1:
+        return table[-1]
+
+    low = int(stock)
+    frac = stock - low
+    return table[low] + frac * (table[low + 1] - table[low])
+
+
+def calculate_expected_revenue_and_profit(
+        products: List[Dict[str, Any]],
+        days: int = 7,
+        progress: Callable[[int, int], None] | None = None
+) -> Dict[str, Any]:
+    """
+    Same input and response shape as calculate_revenue_and_profit, with
+    expected (fractional) units instead of one sampled path.
+    """
+
+    # Validate days
+    if not isinstance(days, int) or days <= 0:
+        raise ValueError("days must be a positive integer")
+
+    details = []
+
+    for p in products:
+        buy_price = p["price_per_unit"]
+        sell_price = p["selling_price"]
+
+        mean = p.get("demand_mean")
+        std = p.get("demand_std")
+        if mean is None or std is None:
+            mean, std = DEFAULT_DEMAND_MEAN, DEFAULT_DEMAND_STD
+
+        table = expected_sales_table(mean, std)
+        stock = float(p["quantity"])
+        sold_total = 0.0
+
+        for day in range(days):
+            # Stock no longer binds: every remaining day sells E[D]
+            if stock >= len(table) - 1 + (days - day) * table[-1]:
+                sold_total += (days - day) * table[-1]
+                stock -= (days - day) * table[-1]
+                break
+
+            sold_today = expected_sales(table, stock)
+            sold_total += sold_today
+            stock -= sold_today
+
+        revenue = sold_total * sell_price
+        cost = sold_total * buy_price
+        profit = revenue - cost
+
+        details.append({
+            "product": p["name"],
+            "sold_units": round(sold_total, 2),
+            "initial_stock": p["quantity"],
+            "remaining_stock": round(stock, 2),
+            "revenue": round(revenue, 2),
+            "cost": round(cost, 2),
+            "profit": round(profit, 2),
+            "profit_margin_percent": round((profit / revenue * 100), 2) if revenue > 0 else 0,
+        })
+
+        if progress is not None:
+            progress(len(details), len(products))
+
+    result = summarize_details(details)
+    result["summary"]["total_units_sold"] = round(result["summary"]["total_units_sold"], 2)
+    return result
@@ -1,24 +1,26 @@
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable
 from collections import OrderedDict
 
-def generate_random_sales(stock: int, mean: float = 5, std: float = 2) -> int:
+# Products are simulated in fixed-size chunks, each with its own RNG stream,
+# so a seeded result is the same whether chunks run serially or in parallel.
+CHUNK_SIZE = 250
+
+# Daily demand used for products without learned demand statistics
+DEFAULT_DEMAND_MEAN = 5
+DEFAULT_DEMAND_STD = 2
+
+
+def generate_random_sales(stock: int, mean: float = DEFAULT_DEMAND_MEAN, std: float = DEFAULT_DEMAND_STD, rng: random.Random | None = None) -> int:
     """
     Simulator for random daily sales
     """
-    sales = max(0, int(random.gauss(mean, std)))
+    gauss = rng.gauss if rng is not None else random.gauss
+    sales = max(0, int(gauss(mean, std)))
     return min(sales, stock)
 
 
-def calculate_revenue_and_profit(
-        products: List[Dict[str, Any]],
-        days: int = 7,
-        seed: int | None = None
-) -> Dict[str, Any]:
-    """
-    Products must include name, quantity (stock), price_per_unit (buying price) and selling_price (sell price)
-    """
-
+def validate_simulation_args(days, seed):
     # Validate days
     if not isinstance(days, int) or days <= 0:
         raise ValueError("days must be a positive integer")
@@ -27,25 +29,49 @@ def calculate_revenue_and_profit(
     if seed is not None:
         if not isinstance(seed, int) or seed <= 0:
             raise ValueError("seed must be a positive integer or None")
-        random.seed(seed)
 
-    total_revenue = 0
-    total_cost = 0
-    total_units_sold = 0
+
+def chunk_products(products: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE) -> List[List[Dict[str, Any]]]:
+    return [products[i:i + chunk_size] for i in range(0, len(products), chunk_size)]
+
+
+def chunk_seed(seed: int, index: int) -> str:
+    """
+    Seed for the RNG stream of one chunk. String seeds are hashed with SHA-512
+    by random.Random, so neighbouring chunks get unrelated streams.
+    """
+    return f"{seed}:{index}"
+
+
+def simulate_chunk(
+        products: List[Dict[str, Any]],
+        days: int,
+        seed: str,
+        on_product: Callable[[], None] | None = None
+) -> List[Dict[str, Any]]:
+    """
+    Simulates daily sales for one chunk of products and returns the per-product details.
+    Products may carry demand_mean / demand_std learned from order history.
+    """
+    rng = random.Random(seed)
     details = []
 
-    # make calculations for each product
     for p in products:
         stock = p["quantity"]
         buy_price = p["price_per_unit"]
         sell_price = p["selling_price"]
         name = p["name"]
 
+        mean = p.get("demand_mean")
+        std = p.get("demand_std")
+        if mean is None or std is None:
+            mean, std = DEFAULT_DEMAND_MEAN, DEFAULT_DEMAND_STD
+
         sold_total = 0
 
         # Generate daily sales
         for _ in range(days):
-            sales_today = generate_random_sales(stock)
+            sales_today = generate_random_sales(stock, mean, std, rng=rng)
             sold_total += sales_today
             stock -= sales_today
 
@@ -54,10 +80,6 @@ def calculate_revenue_and_profit(
         cost = sold_total * buy_price
         profit = revenue - cost
 
-        total_revenue += revenue
-        total_cost += cost
-        total_units_sold += sold_total
-
         details.append({
             "product": name,
             "sold_units": sold_total,
@@ -69,8 +91,27 @@ def calculate_revenue_and_profit(
             "profit_margin_percent": round((profit / revenue * 100), 2) if revenue > 0 else 0,
         })
 
+        if on_product is not None:
+            on_product()
+
+    return details
+
+
+def summarize_details(details: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the response (summary + details) from per-product details.
+    """
+    total_revenue = 0
+    total_cost = 0
+    total_units_sold = 0
+
+    for d in details:
+        total_revenue += d["revenue"]
+        total_cost += d["cost"]
+        total_units_sold += d["sold_units"]
+
     total_profit = total_revenue - total_cost
-    
+
     summary = OrderedDict([
         ("total_revenue", round(total_revenue, 2)),
         ("total_cost", round(total_cost, 2)),
@@ -82,4 +123,41 @@ def calculate_revenue_and_profit(
     return OrderedDict([
         ("summary", summary),
         ("details", details)
-    ])
\ No newline at end of file
+    ])
+
+
+def calculate_revenue_and_profit(
+        products: List[Dict[str, Any]],
+        days: int = 7,
+        seed: int | None = None,
+        progress: Callable[[int, int], None] | None = None
+) -> Dict[str, Any]:
+    """
+    Products must include name, quantity (stock), price_per_unit (buying price) and selling_price (sell price)
+
+    If progress is given it is called with (products_done, products_total) after each product.
+    """
+
+    validate_simulation_args(days, seed)
+
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    details = []
+    done = 0
+
+    def on_product():
+        nonlocal done
+        done += 1
+        progress(done, len(products))
+
+    # make calculations for each chunk of products
+    for index, chunk in enumerate(chunk_products(products)):
+        details.extend(simulate_chunk(
+            chunk,
+            days,
+            chunk_seed(seed, index),
+            on_product if progress is not None else None
+        ))
+
+    return summarize_details(details)
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..dao.simulation_jobs_dao import delete_finished_jobs, get_job, insert_job, update_job
+from ..db.sql_connection import get_sql_connection
+from ..web.json_provider import dumps_bytes, loads
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has no room for another simulation."""
+
+
+class MemoryJobStore:
+    """Job state in this process only: enough for a single worker and for tests."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def update(self, job_id: str, fields: Dict[str, Any]):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def purge(self, cutoff: float):
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items()
+                           if job["finished_at"] is not None and job["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+
+class DatabaseJobStore:
+    """
+    Job state in the simulation_jobs table, so any worker process can
+    answer a poll for a job another worker runs.
+    """
+
+    def __init__(self, connect: Callable[[], Any]):
+        self.connect = connect
+
+    def _run(self, fn, *args):
+        conn = self.connect()
+        try:
+            return fn(conn, *args)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(fields):
+        if fields.get("result") is not None:
+            fields = {**fields, "result": dumps_bytes(fields["result"]).decode()}
+        return fields
+
+    def create(self, job: Dict[str, Any]):
+        self._run(insert_job, self._encode(job))
+
+    def update(self, job_id: str, fields: Dict[str, Any]):
+        self._run(update_job, job_id, self._encode(fields))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._run(get_job, job_id)
+        if job is not None and job["result"] is not None:
+            job["result"] = loads(job["result"])
+        return job
+
+    def purge(self, cutoff: float):
+        self._run(delete_finished_jobs, cutoff)
+
+
+class SimulationJobManager:
+    """
+    Runs long simulations on a background executor and keeps their status,
+    progress and result around for `result_ttl` seconds after they finish.
+
+    At most `max_workers` jobs run at once and at most `max_queue` jobs may
+    be waiting or running in this process; further submissions raise
+    JobQueueFull. Job state lives in `store` (in-process by default);
+    progress is written at most every `progress_interval` seconds. A job
+    whose worker process dies is left "running" and has to be resubmitted.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32, result_ttl: float = 600,
+                 store=None, progress_interval: float = 0):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < max_workers:
+            raise ValueError("max_queue must be at least max_workers")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.store = store if store is not None else MemoryJobStore()
+        self.progress_interval = progress_interval
+
+        self._pending = set()  # queued or running in this process
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        # Created lazily so that forking servers start their threads in the worker
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="simulation-job"
+            )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Queue fn(*args, progress=callback, **kwargs) and return the job id.
+        The callback takes (done, total) and updates the job's progress.
+        """
+        now = time.time()
+        self.store.purge(now - self.result_ttl)
+
+        with self._lock:
+            if len(self._pending) >= self.max_queue:
+                raise JobQueueFull("Too many simulation jobs are queued, try again later")
+
+            job_id = uuid.uuid4().hex
+            self._pending.add(job_id)
+
+        try:
+            self.store.create({
+                "job_id": job_id,
+                "status": "queued",
+                "progress": 0.0,
+                "submitted_at": now,
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            })
+            with self._lock:
+                executor = self._get_executor()
+            executor.submit(self._run, job_id, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending.discard(job_id)
+            raise
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            self.store.update(job_id, {"status": "running", "started_at": time.time()})
+            last_write = [0.0]
+
+            def progress(done, total):
+                now = time.monotonic()
+                if total > 0 and now - last_write[0] >= self.progress_interval:
+                    last_write[0] = now
+                    self.store.update(job_id, {"progress": round(done / total, 4)})
+
+            try:
+                result = fn(*args, progress=progress, **kwargs)
+            except Exception as e:
+                self.store.update(job_id, {"status": "failed", "error": str(e), "finished_at": time.time()})
+                return
+
+            self.store.update(job_id, {"status": "done", "progress": 1.0, "result": result,
+                                       "finished_at": time.time()})
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if job["finished_at"] is not None and time.time() - job["finished_at"] > self.result_ttl:
+            return None
+        return job
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+revenue_jobs = SimulationJobManager(
+    max_workers=int(os.getenv("REVENUE_JOB_WORKERS", 2)),
+    max_queue=int(os.getenv("REVENUE_JOB_QUEUE_SIZE", 32)),
+    result_ttl=float(os.getenv("REVENUE_JOB_TTL_SECONDS", 600)),
+    store=DatabaseJobStore(get_sql_connection),
+    progress_interval=float(os.getenv("REVENUE_JOB_PROGRESS_SECONDS", 0.5)),
+)
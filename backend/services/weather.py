@@ -0,0 +1,131 @@
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherUnavailable(Exception):
+    """Raised when upstream failed and there is nothing cached to fall back on."""
+
+
+def fetch_openweather(base_url: str, api_key: str, city: str, timeout: float) -> Tuple[int, Dict[str, Any]]:
+    """
+    Calls the OpenWeather current-weather API and returns (status, body).
+    4xx answers (unknown city, bad key) are returned; network errors and 5xx raise.
+    """
+    query = urllib.parse.urlencode({"q": city, "units": "metric", "appid": api_key})
+
+    try:
+        with urllib.request.urlopen(f"{base_url}?{query}", timeout=timeout) as res:
+            return res.status, json.loads(res.read())
+    except urllib.error.HTTPError as e:
+        if e.code >= 500:
+            raise
+        return e.code, json.loads(e.read() or b"{}")
+
+
+class _Fetch(threading.Event):
+    """An upstream call in flight; `result` is (status, body), None if it failed."""
+    result = None
+
+
+class WeatherCache:
+    """
+    Per-city cache in front of the upstream weather API.
+
+    - younger than `ttl`: served from cache
+    - older, but within `stale_ttl` more: served stale while one background
+      request refreshes it
+    - missing or expired: fetched once, concurrent callers wait for that fetch
+
+    Only 200 answers are kept for `ttl`; a 404 (unknown city) is kept for
+    `negative_ttl` and never served stale, and other statuses (e.g. 401 for
+    a bad key) are not cached. At most `max_entries` cities are kept, the
+    least recently used is dropped first.
+    """
+
+    def __init__(self, fetch: Callable[[str], Tuple[int, Dict[str, Any]]], ttl: float = 600,
+                 stale_ttl: float = 3600, clock: Callable[[], float] = time.monotonic,
+                 max_entries: int = 1000, negative_ttl: float = 60):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+
+        # key -> (fetched_at, status, body)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, _Fetch] = {}
+        self._lock = threading.Lock()
+
+    def _fresh_for(self, status: int) -> float:
+        return self.ttl if status == 200 else self.negative_ttl
+
+    def get(self, city: str) -> Tuple[int, Dict[str, Any], str]:
+        """Returns (status, body, cache_state) where cache_state is HIT, STALE or MISS."""
+        key = city.strip().lower()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            age = self.clock() - entry[0] if entry else None
+
+            if entry and age < self._fresh_for(entry[1]):
+                self._entries.move_to_end(key)
+                return entry[1], entry[2], "HIT"
+
+            if entry and entry[1] == 200 and age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._inflight[key] = _Fetch()
+                    threading.Thread(target=self._refresh, args=(key, city), daemon=True).start()
+                return entry[1], entry[2], "STALE"
+
+            fetch = self._inflight.get(key)
+            owner = fetch is None
+            if owner:
+                fetch = self._inflight[key] = _Fetch()
+
+        if owner:
+            self._refresh(key, city)
+        else:
+            # Another request is already fetching this city
+            fetch.wait()
+
+        if fetch.result is None:
+            raise WeatherUnavailable("Weather service unavailable")
+        status, body = fetch.result
+        return status, body, "MISS" if owner else "HIT"
+
+    def _refresh(self, key: str, city: str):
+        fetch = self._inflight[key]
+        try:
+            fetch.result = self.fetch(city)
+            status, body = fetch.result
+            with self._lock:
+                if status == 200 or (status == 404 and self.negative_ttl > 0):
+                    self._entries[key] = (self.clock(), status, body)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        except Exception as e:
+            # Waiting callers get WeatherUnavailable or the stale entry
+            logger.warning("Weather refresh for %r failed: %s", city, e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key)
+            fetch.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,38 @@
+"""
+Shared cache for the Flask API (see services/cache.py).
+
+Read endpoints serve hot data through cached_read(). On a miss the data is
+loaded on the primary of the request's store: a lagging replica could
+otherwise put rows older than the last write under the new version.
+Every successful write request (as defined in web/read_routing.py)
+publishes a change to the products and orders of its store once the
+handler has committed.
+"""
+
+from ..db.sql_connection import get_sql_connection
+from ..services.cache import shared_cache, store_namespaces
+from .read_routing import is_write_request, read_connection
+from .stores import current_store_id
+
+
+def cached_read(key, load, depends):
+    """load(conn) through the cache; `depends` as in TieredCache.get_or_load."""
+    def loader():
+        # Uncached reads keep going to replicas
+        conn = get_sql_connection(current_store_id()) if shared_cache.enabled else read_connection()
+        try:
+            return load(conn)
+        finally:
+            conn.close()
+
+    return shared_cache.get_or_load(key, loader, depends)
+
+
+def _publish_writes(response):
+    if response.status_code < 400 and is_write_request():
+        shared_cache.bump(*store_namespaces(current_store_id()))
+    return response
+
+
+def init_caching(app):
+    app.after_request(_publish_writes)
@@ -0,0 +1,65 @@
+"""
+Compact formats for the listing endpoints.
+
+By default listings are JSON arrays of objects, which repeat every key on
+every row. Clients can ask for a column header plus row arrays instead:
+
+  - ?format=columnar                 JSON {"columns": [...], "rows": [[...], ...]}
+  - ?format=msgpack, or an Accept header preferring application/msgpack
+                                     the same structure as MessagePack
+
+Rows are the cursor's tuples, so no per-row dict is ever built. MessagePack
+needs the msgpack package; without it only the JSON variant is offered.
+"""
+
+from flask import current_app, request
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from .json_provider import json_default
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+FORMATS = ("json", "columnar", "msgpack")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def listing_format():
+    """
+    Format requested for a listing: None for the default list of objects,
+    "columnar" or "msgpack". Raises UnsupportedFormat for unknown values.
+    """
+    fmt = request.args.get("format")
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise UnsupportedFormat(f"format must be one of: {', '.join(FORMATS)}")
+        if fmt == "msgpack" and msgpack is None:
+            raise UnsupportedFormat("msgpack format is not available on this server")
+        return None if fmt == "json" else fmt
+
+    accept = request.headers.get("Accept")
+    if accept and msgpack is not None:
+        best = parse_accept_header(accept, MIMEAccept).best_match(["application/json", *MSGPACK_TYPES])
+        if best in MSGPACK_TYPES:
+            return "msgpack"
+    return None
+
+
+def columnar_response(columns, rows, fmt):
+    body = {"columns": columns, "rows": rows}
+
+    if fmt == "msgpack":
+        data = msgpack.packb(body, default=json_default, use_bin_type=True, datetime=False)
+        response = current_app.response_class(data, mimetype="application/msgpack")
+    else:
+        response = current_app.json.response(body)
+
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,145 @@
+"""
+Negotiated response compression (brotli or gzip).
+
+Responses are compressed when the client accepts an encoding we support,
+the content type is compressible and the body is at least
+COMPRESS_MIN_BYTES (default 1024). Brotli is preferred when the brotli
+package is installed, gzip otherwise. Streamed responses are compressed
+chunk by chunk as they are sent.
+
+Configuration:
+  - COMPRESS_ENABLED        set to 0 to disable (default 1)
+  - COMPRESS_MIN_BYTES      smallest body worth compressing (default 1024)
+  - COMPRESS_GZIP_LEVEL     1 (fast) - 9 (small), default 6
+  - COMPRESS_BROTLI_QUALITY 0 (fast) - 11 (small), default 4
+"""
+
+import os
+import zlib
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+    "image/svg+xml",
+}
+
+
+def compression_enabled():
+    return os.getenv("COMPRESS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def min_bytes():
+    return int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+
+
+def supported_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding):
+    """Best encoding from an Accept-Encoding header value, or None."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(supported_encodings())
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+class Compressor:
+    """Incremental compressor with the same interface for both encodings."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=int(os.getenv("COMPRESS_BROTLI_QUALITY", 4)))
+        else:
+            # wbits 31 = gzip container
+            self._compressor = zlib.compressobj(int(os.getenv("COMPRESS_GZIP_LEVEL", 6)), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self):
+        """Emits everything buffered so far (used between streamed chunks)."""
+        if self.encoding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress(data, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, encoding):
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+# -------------------------------------------------------
+# Flask integration
+# -------------------------------------------------------
+def _after_request(response):
+    if not compression_enabled() or not is_compressible(response.mimetype):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or request.method == "HEAD"
+    ):
+        return response
+
+    encoding = negotiate(request.headers.get("Accept-Encoding"))
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_bytes():
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    if response.headers.get("ETag"):
+        # The compressed body is a different representation
+        etag, weak = response.get_etag()
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
+
+
+def init_compression(app):
+    """Registers response compression on the app."""
+    app.after_request(_after_request)
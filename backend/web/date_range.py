@@ -0,0 +1,42 @@
+"""
+The "from" / "to" date range of the order endpoints, shared by the Flask
+app (query string or JSON body) and the ASGI app (query string).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+
+def _parse(value):
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        # Stored datetimes are naive: compare in UTC
+        moment = moment.astimezone(timezone.utc)
+    return moment
+
+
+def parse_date_range(values):
+    """
+    "from" and "to" of a mapping as a [start, end) datetime pair; either may
+    be None. Dates (YYYY-MM-DD) are whole days, so to=2025-01-31 includes
+    that day. Values with a UTC offset are converted to UTC; mixing them
+    with values without one is rejected. Raises ValueError.
+    """
+    start = end = None
+    if values.get("from"):
+        start = _parse(values["from"])
+    if values.get("to"):
+        value = values["to"]
+        end = _parse(value)
+        if len(value) == 10:
+            end += timedelta(days=1)
+
+    if start is not None and end is not None:
+        if (start.tzinfo is None) != (end.tzinfo is None):
+            raise ValueError("'from' and 'to' must both have a UTC offset or both have none")
+        if start >= end:
+            raise ValueError("'from' must be before 'to'")
+
+    return (
+        start.replace(tzinfo=None) if start is not None else None,
+        end.replace(tzinfo=None) if end is not None else None,
+    )
@@ -0,0 +1,214 @@
+"""
+Idempotency keys for write endpoints.
+
+A client that may retry a write sends an Idempotency-Key header (any
+unique string of at most 255 characters, e.g. a UUID). The first request
+with a key claims it in the idempotency_keys table, runs, and stores its
+response there. Retries with the same key get the stored response back,
+marked with "Idempotent-Replayed: true", without running the write again:
+
+  - 409 while the first request is still running
+  - 422 when the key is reused with a different request (method, path, store or body)
+
+5xx responses are not stored, so the request can be retried for real.
+Keys expire after IDEMPOTENCY_TTL_HOURS (default 24).
+
+A claim whose response was never stored (the worker died, or storing the
+response failed after the write committed) is never run again under the
+same key, since its write may have gone through: retries keep getting 409,
+and after IDEMPOTENCY_LOCK_SECONDS (default 60) the answer says the outcome
+is unknown, so the client can check and retry with a new key.
+
+Requests without the header are not affected.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, g, jsonify, request
+
+from ..dao.idempotency_dao import (
+    claim_idempotency_key,
+    delete_expired_idempotency_keys,
+    get_idempotency_record,
+    release_idempotency_key,
+    save_idempotent_response,
+)
+from ..db.sql_connection import get_sql_connection
+from .json_provider import dumps_bytes
+from .stores import current_store_id
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Expired keys are deleted at most this often per process
+PURGE_INTERVAL = 300
+
+logger = logging.getLogger(__name__)
+
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def key_ttl():
+    return timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", 24)))
+
+
+def lock_timeout():
+    return timedelta(seconds=float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60)))
+
+
+def request_hash():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b"\0" + request.full_path.encode() + b"\0")
+    # The same body sent for another store is a different request
+    digest.update(f"{current_store_id()}\0".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _purge_expired(conn, now):
+    global _last_purge
+
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PURGE_INTERVAL:
+            return
+        _last_purge = time.monotonic()
+    delete_expired_idempotency_keys(conn, now - key_ttl())
+
+
+def _replay(record):
+    response = current_app.response_class(
+        record["response_body"],
+        status=record["status_code"],
+        mimetype=record["content_type"],
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _claim(conn, key, endpoint, digest, now):
+    """None when this request may run, otherwise the response to send."""
+    record = get_idempotency_record(conn, key, endpoint)
+
+    if record is not None and record["created_at"] < now - key_ttl():
+        release_idempotency_key(conn, key, endpoint)
+        record = None
+
+    if record is None:
+        if claim_idempotency_key(conn, key, endpoint, digest, now):
+            return None
+        # A concurrent request with the same key got there first
+        record = get_idempotency_record(conn, key, endpoint)
+
+    if record is not None and record["request_hash"] != digest:
+        return jsonify({"error": f"{HEADER} was already used for a different request"}), 422
+    if record is not None and record["status_code"] is None and record["created_at"] < now - lock_timeout():
+        return jsonify({
+            "error": f"The request with this {HEADER} did not finish and may have been applied; "
+                     f"check its outcome before retrying with a new {HEADER}"
+        }), 409
+    if record is None or record["status_code"] is None:
+        return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409
+    return _replay(record)
+
+
+def _store(key, endpoint, response):
+    conn = get_sql_connection()
+    try:
+        if response.status_code >= 500:
+            release_idempotency_key(conn, key, endpoint)
+        else:
+            save_idempotent_response(
+                conn, key, endpoint, response.status_code,
+                response.mimetype, response.get_data(as_text=True),
+            )
+    finally:
+        conn.close()
+
+
+def _release_quietly(key, endpoint):
+    try:
+        conn = get_sql_connection()
+        try:
+            release_idempotency_key(conn, key, endpoint)
+        finally:
+            conn.close()
+    except Exception:
+        logger.exception("Could not release %s %r", endpoint, key)
+
+
+def idempotent(view):
+    """Makes a write route safe to retry with an Idempotency-Key header."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters"}), 400
+
+        endpoint = request.endpoint
+        now = datetime.now()
+        conn = get_sql_connection()
+        try:
+            _purge_expired(conn, now)
+            outcome = _claim(conn, key, endpoint, request_hash(), now)
+        finally:
+            conn.close()
+        if outcome is not None:
+            return outcome
+
+        g.idempotency_claim = (key, endpoint)
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release_quietly(key, endpoint)
+            raise
+
+        if not g.get("idempotency_deferred"):
+            try:
+                _store(key, endpoint, response)
+            except Exception:
+                # The write itself succeeded: the claim stays, so a retry cannot repeat it
+                logger.exception("Could not store the response for %s %r", endpoint, key)
+        return response
+
+    return wrapper
+
+
+def complete_later(future, build):
+    """
+    For a view that answers before its work is done (a write-behind order
+    that timed out): keeps the current key claimed and stores
+    build(future) -> (status, payload) as its response once `future` is done.
+    """
+    claim = g.get("idempotency_claim")
+    if claim is None:
+        return
+    g.idempotency_deferred = True
+    key, endpoint = claim
+
+    def done(f):
+        status, payload = build(f)
+        if status >= 500:
+            _release_quietly(key, endpoint)
+            return
+        try:
+            conn = get_sql_connection()
+            try:
+                save_idempotent_response(conn, key, endpoint, status, "application/json",
+                                         dumps_bytes(payload).decode())
+            finally:
+                conn.close()
+        except Exception:
+            logger.exception("Could not store the response for %s %r", endpoint, key)
+
+    future.add_done_callback(done)
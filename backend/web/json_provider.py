@@ -0,0 +1,80 @@
+"""
+JSON provider used for every API response (jsonify and returned dicts).
+
+Serializes with orjson when it is installed and falls back to the standard
+library otherwise. Both write:
+  - datetime / date as ISO 8601 ("2025-01-01T10:00:00", "2025-01-01")
+  - Decimal as a string, like Flask's default provider
+  - keys in insertion order (the DAO column order), compact separators
+
+Unlike Flask's default provider, keys are not sorted. NaN and Infinity
+become null with orjson; the standard library writes them as NaN and
+Infinity, which strict JSON parsers reject.
+
+Responses are built from bytes directly, without the str round trip of
+Flask's default provider.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def json_default(o):
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=json_default, option=_OPTIONS)
+
+    def loads(s):
+        return orjson.loads(s)
+else:
+    def dumps_bytes(obj):
+        return json.dumps(obj, default=json_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(s):
+        return json.loads(s)
+
+
+class FastJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Explicit json.dumps options (e.g. indent) are honoured by the stdlib path
+            kwargs.setdefault("default", json_default)
+            return json.dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def dumpb(self, obj):
+        return dumps_bytes(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj) + b"\n", mimetype="application/json")
@@ -0,0 +1,81 @@
+"""
+Read/write splitting for the Flask API.
+
+Read-only endpoints open their connection with read_connection(), which
+goes to a read replica when MYSQL_REPLICA_HOSTS is set (see
+db/dialects.py); writes keep using the primary.
+
+Replicas apply writes with a delay, so a client that just placed or
+edited an order could read the old state back. A successful write
+(POST, PUT, PATCH or DELETE answered below 400) therefore sets the
+gsm_primary_until cookie, and reads from that client go to the primary
+until it expires. POST routes that only compute (the /calc endpoints)
+are marked @read_only and set no cookie.
+
+Configuration:
+  - READ_YOUR_WRITES_SECONDS  length of that window, default 5 (0 disables the cookie)
+"""
+
+import math
+import os
+import time
+
+from flask import current_app, has_request_context, request
+
+from ..db.sql_connection import get_read_connection, get_sql_connection
+from .stores import current_store_id
+
+COOKIE = "gsm_primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def read_your_writes_window():
+    return float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+
+def reads_from_primary():
+    """True within the read-your-writes window of the current client."""
+    if not has_request_context():
+        return False
+    try:
+        return float(request.cookies.get(COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_connection():
+    """Connection for a read-only request: a replica unless the client just wrote."""
+    if reads_from_primary():
+        return get_sql_connection(current_store_id())
+    return get_read_connection(current_store_id())
+
+
+def read_only(view):
+    """Marks a POST route that does not write, so its clients keep reading from replicas."""
+    view.read_only = True
+    return view
+
+
+def is_write_request():
+    """True for a write (POST, PUT, PATCH or DELETE) to a route not marked @read_only."""
+    if request.method not in WRITE_METHODS:
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    return not getattr(view, "read_only", False)
+
+
+def _mark_write(response):
+    window = read_your_writes_window()
+    if window > 0 and response.status_code < 400 and is_write_request():
+        response.set_cookie(
+            COOKIE,
+            f"{time.time() + window:.3f}",
+            max_age=math.ceil(window),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def init_read_routing(app):
+    app.after_request(_mark_write)
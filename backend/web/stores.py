@@ -0,0 +1,39 @@
+"""
+Store of the current request.
+
+Clients name their store with an X-Store-Id header (or a ?store_id= query
+parameter, e.g. for links); requests without one belong to
+DEFAULT_STORE_ID. Routes pass current_store_id() to the DAOs and open
+their connections on the store's shard (see db/shards.py).
+"""
+
+from flask import g, has_request_context, jsonify, request
+
+from ..db.shards import default_store_id, validate_store_id
+
+HEADER = "X-Store-Id"
+
+
+def current_store_id():
+    if not has_request_context():
+        return default_store_id()
+    return g.get("store_id", default_store_id())
+
+
+def _select_store():
+    value = request.headers.get(HEADER) or request.args.get("store_id")
+    if value is None:
+        g.store_id = default_store_id()
+        return None
+
+    try:
+        store_id = int(value)
+        validate_store_id(store_id)
+    except ValueError:
+        return jsonify({"error": f"{HEADER} must be a positive integer"}), 400
+    g.store_id = store_id
+    return None
+
+
+def init_stores(app):
+    app.before_request(_select_store)
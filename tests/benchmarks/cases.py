@@ -0,0 +1,244 @@
+"""
+Benchmark cases for the hot paths of the backend.
+
+Each case is a factory registered over a parameter grid. The factory does
+the setup (building input data) and returns the zero-argument callable
+that is timed, so data generation never counts towards the result.
+"""
+
+import random
+from datetime import datetime
+from decimal import Decimal
+
+from backend.dao.order_details_dao import ORDER_DETAILS_QUERY
+from backend.dao.order_list_dao import RECENT_ORDERS_QUERY
+from backend.dao.products_dao import GET_ALL_PRODUCTS_QUERY, get_all_products, get_all_products_columns
+from backend.db.dialects import MySQLDialect, SQLiteDialect
+from backend.services.inventory_spend import calculate_monthly_inventory_spend
+from backend.services.revenue_calculator import calculate_revenue_and_profit
+
+# name -> (factory, params)
+BENCHMARKS = {}
+
+
+
+class SkipBenchmark(Exception):
+    """Raised by a factory whose case cannot run here (e.g. no MySQL server)."""
+
+
+CATEGORIES = ["Fruit", "Vegetables", "Dairy", "Bakery", "Meat", "Drinks"]
+
+
+def register(group, grid):
+    def decorator(factory):
+        for params in grid:
+            name = group + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+            BENCHMARKS[name] = (factory, params)
+        return factory
+    return decorator
+
+
+def make_products(count, rng):
+    return [
+        {
+            "product_id": i,
+            "name": f"Product {i}",
+            "quantity": rng.randint(0, 1000),
+            "price_per_unit": round(rng.uniform(0.5, 20), 2),
+            "selling_price": round(rng.uniform(1, 30), 2),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def make_product_rows(count, rng):
+    # Shaped like the rows mysql-connector returns for GET_ALL_PRODUCTS_QUERY
+    return [
+        (i, f"Product {i}", 1 + i % 3,
+         Decimal(f"{rng.uniform(0.5, 20):.2f}"), Decimal(f"{rng.uniform(1, 30):.2f}"),
+         rng.randint(0, 1000), ["kg", "each", "litre"][i % 3])
+        for i in range(1, count + 1)
+    ]
+
+
+PRODUCT_COLUMNS = ["product_id", "name", "uom_id", "price_per_unit", "selling_price", "quantity", "uom_name"]
+
+
+class RowsConnection:
+    """In-memory connection whose cursor yields pre-built rows."""
+
+    def __init__(self, rows, columns=PRODUCT_COLUMNS):
+        self.rows = rows
+        self.description = [(name,) for name in columns]
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, operation, params=None):
+        pass
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+# -------------------------------------------------------
+# Services
+# -------------------------------------------------------
+@register("revenue", [
+    {"products": products, "days": days}
+    for products in (10, 100, 1000)
+    for days in (7, 30, 90)
+])
+def revenue_case(products, days):
+    items = make_products(products, random.Random(1))
+    return lambda: calculate_revenue_and_profit(items, days=days, seed=1)
+
+
+@register("spend", [{"orders": n} for n in (1_000, 10_000, 100_000, 1_000_000)])
+def spend_case(orders):
+    rng = random.Random(1)
+    # A pool of dates shared by all orders keeps the 1M case's memory low
+    dates = [datetime(2024, month, day) for month in (5, 6, 7) for day in range(1, 29)]
+    items = [
+        {
+            "date": rng.choice(dates),
+            "qty": rng.randint(1, 50),
+            "cost": round(rng.uniform(0.5, 20), 2),
+            "category": rng.choice(CATEGORIES),
+        }
+        for _ in range(orders)
+    ]
+    return lambda: calculate_monthly_inventory_spend(items, 2024, 6)
+
+
+# -------------------------------------------------------
+# DAO row mapping and serialization
+# -------------------------------------------------------
+@register("get_all_products", [{"rows": n} for n in (100, 1_000, 10_000)])
+def products_mapping_case(rows):
+    connection = RowsConnection(make_product_rows(rows, random.Random(1)))
+    return lambda: get_all_products(connection)
+
+
+@register("get_all_products_sqlite", [{"rows": n} for n in (100, 1_000, 10_000)])
+def products_sqlite_case(rows):
+    # Full DAO path including the query, on the embedded database
+    connection = SQLiteDialect(":memory:").connect()
+    cursor = connection.cursor()
+    cursor.executemany("INSERT INTO uom (uom_name) VALUES (%s)", [("kg",), ("each",), ("litre",)])
+    cursor.executemany(
+        "INSERT INTO products (product_id, name, uom_id, price_per_unit, selling_price, quantity) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [(r[0], r[1], r[2], float(r[3]), float(r[4]), r[5]) for r in make_product_rows(rows, random.Random(1))],
+    )
+    return lambda: get_all_products(connection)
+
+
+def make_orders(count, rng):
+    # Shaped like get_all_orders() rows
+    return [
+        {
+            "order_id": i,
+            "customer_name": f"Customer {i}",
+            "total_price": round(rng.uniform(5, 500), 2),
+            "datetime": datetime(2025, 1, 1 + i % 28, rng.randint(8, 20), rng.randint(0, 59)),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def json_response(payload, provider):
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+
+    from backend.app import app
+
+    if provider == "flask_default":
+        app = Flask(__name__)
+        app.json = DefaultJSONProvider(app)
+
+    def build():
+        with app.app_context():
+            return app.json.response(payload).get_data()
+    return build
+
+
+@register("products_json", [
+    {"rows": n, "provider": provider}
+    for n in (100, 1_000, 10_000)
+    for provider in ("app", "flask_default")
+])
+def products_json_case(rows, provider):
+    products = get_all_products(RowsConnection(make_product_rows(rows, random.Random(1))))
+    return json_response(products, provider)
+
+
+@register("orders_json", [
+    {"rows": n, "provider": provider}
+    for n in (100, 1_000, 10_000)
+    for provider in ("app", "flask_default")
+])
+def orders_json_case(rows, provider):
+    return json_response(make_orders(rows, random.Random(1)), provider)
+
+
+@register("products_listing", [
+    {"rows": n, "format": fmt}
+    for n in (1_000, 10_000)
+    for fmt in ("objects", "columnar", "msgpack")
+])
+def products_listing_case(rows, format):
+    # DAO call plus response body, as /getProducts?format=... does it
+    from backend.app import app
+    from backend.web.columnar import columnar_response
+
+    connection = RowsConnection(make_product_rows(rows, random.Random(1)))
+
+    def build():
+        with app.test_request_context("/getProducts"):
+            if format == "objects":
+                return app.json.response(get_all_products(connection)).get_data()
+            columns, data = get_all_products_columns(connection)
+            return columnar_response(columns, data, format).get_data()
+    return build
+
+
+# -------------------------------------------------------
+# MySQL text vs prepared protocol
+# -------------------------------------------------------
+PROTOCOL_QUERIES = {
+    "products": (GET_ALL_PRODUCTS_QUERY, None),
+    "recent_orders": (RECENT_ORDERS_QUERY, (5,)),
+    "order_details": (ORDER_DETAILS_QUERY, "first_order"),
+}
+
+
+@register("mysql_protocol", [
+    {"query": query, "protocol": protocol}
+    for query in PROTOCOL_QUERIES
+    for protocol in ("text", "prepared")
+])
+def mysql_protocol_case(query, protocol):
+    # Needs the MYSQL_* settings of a seeded database; skipped otherwise
+    try:
+        connection = MySQLDialect().connect()
+    except Exception as e:
+        raise SkipBenchmark(f"no MySQL connection ({e})")
+
+    sql, params = PROTOCOL_QUERIES[query]
+    if params == "first_order":
+        cursor = connection.cursor()
+        cursor.execute("SELECT MIN(order_id) FROM orders")
+        params = cursor.fetchone()
+        cursor.close()
+
+    # The prepared cursor is reused, as statement_cursor() does per pooled connection
+    cursor = connection.cursor(prepared=True) if protocol == "prepared" else connection.cursor()
+
+    def run():
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    return run
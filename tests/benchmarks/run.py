@@ -0,0 +1,194 @@
+"""
+Runs the microbenchmarks and compares them with a stored baseline:
+
+    python -m tests.benchmarks.run                           # run all, compare with this machine's baseline
+    python -m tests.benchmarks.run -k revenue --output out.json
+    python -m tests.benchmarks.run --save-baseline           # refresh this machine's baseline
+
+Each case is timed with timeit: the loop count is calibrated so one sample
+takes at least 0.2 s, and the median time per call over --repeat samples is
+reported. The exit code is 1 when a case is slower than the baseline by
+more than --threshold (default 0.25, i.e. 25 %).
+
+Baselines are kept per machine in baselines/<machine id>.json, the id
+being BENCHMARK_MACHINE (e.g. a CI runner class) or derived from the OS,
+architecture, CPU count and Python version. A baseline recorded on another
+machine is not compared against.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import timeit
+
+from .cases import BENCHMARKS, SkipBenchmark
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def measure(fn, repeat=5):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, number)
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(selected, repeat=5, out=sys.stdout):
+    results = {}
+    for name in selected:
+        factory, params = BENCHMARKS[name]
+        try:
+            fn = factory(**params)
+        except SkipBenchmark as e:
+            print(f"{name:50s}      skipped: {e}", file=out)
+            continue
+        results[name] = {"params": params, **measure(fn, repeat)}
+        del fn
+        print(f"{name:50s} {results[name]['median'] * 1000:12.3f} ms", file=out)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns (name, baseline median, current median, ratio) for every regression."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["median"], result["median"], ratio))
+    return regressions
+
+
+def machine_id():
+    configured = os.getenv("BENCHMARK_MACHINE")
+    if configured:
+        return re.sub(r"[^\w.-]+", "-", configured)
+    return "-".join([
+        platform.system().lower(),
+        platform.machine(),
+        f"{os.cpu_count()}cpu",
+        f"{platform.python_implementation().lower()}{'.'.join(platform.python_version_tuple()[:2])}",
+    ])
+
+
+def default_baseline():
+    return os.path.join(BASELINE_DIR, f"{machine_id()}.json")
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def _memory_gb():
+    try:
+        return round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2 ** 30, 1)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def metadata():
+    return {
+        "machine_id": machine_id(),
+        "hardware": f"{os.cpu_count()} x {_cpu_model() or 'unknown CPU'}, {_memory_gb()} GB RAM",
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GSM backend microbenchmarks")
+    parser.add_argument("-k", "--filter", default="",
+                        help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed samples per case (default 5)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline",
+                        help="baseline JSON to compare against (default tests/benchmarks/baselines/<machine id>.json)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a case counts as a regression (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    parser.add_argument("--any-machine", action="store_true",
+                        help="compare even with a baseline recorded on another machine")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.baseline = args.baseline or default_baseline()
+    selected = [name for name in BENCHMARKS if args.filter in name]
+
+    if args.list:
+        print("\n".join(selected))
+        return 0
+
+    report = {"meta": metadata(), "results": run_benchmarks(selected, args.repeat)}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            baseline["results"] = previous.get("results", {})
+            if "note" in previous.get("meta", {}):
+                baseline["meta"]["note"] = previous["meta"]["note"]
+        baseline["results"].update(report["results"])
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, nothing to compare")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    recorded_on = baseline.get("meta", {}).get("machine_id")
+    if recorded_on != report["meta"]["machine_id"] and not args.any_machine:
+        print(f"Baseline {args.baseline} was recorded on {recorded_on or 'an unknown machine'}, "
+              f"this is {report['meta']['machine_id']}: timings are not comparable, skipping the comparison")
+        return 0
+
+    regressions = compare(report["results"], baseline, args.threshold)
+    for name, base, current, ratio in regressions:
+        print(f"REGRESSION {name}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"No regressions above {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,8 @@ root_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_path))
 
 from backend.app import app
+from backend.db.dialects import get_dialect
+from backend.db.initialize_sql import provision
 from backend.db.sql_connection import get_sql_connection
 from dotenv import load_dotenv
 
@@ -14,6 +16,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def sqlite_database():
+    """
+    With DB_BACKEND=sqlite the suite runs hermetically: the embedded
+    database is created and seeded once per session, no MySQL needed.
+    """
+    dialect = get_dialect()
+    if dialect.name == "sqlite":
+        conn = dialect.connect()
+        provision(conn, dialect)
+        conn.close()
+    yield
+
+
 @pytest.fixture(scope="session")
 def flask_app():
     """
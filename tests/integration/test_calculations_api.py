@@ -1,5 +1,10 @@
 import pytest
 import json
+import time
+
+from backend.db.sql_connection import get_sql_connection
+from backend.routes import calculations
+from backend.services.simulation_jobs import DatabaseJobStore, SimulationJobManager
 
 # Expected structure for Revenue calculation response
 EXPECTED_REVENUE_SUMMARY_SCHEMA = {
@@ -244,6 +249,177 @@ class TestRevenueCalculationEndpoint:
         assert result1["summary"] == result2["summary"], "Same seed should produce same results"
 
 
+    def test_revenue_analytic_mode_returns_expected_values(self, client):
+        """
+        Checks that mode=analytic returns the same structure with expected (fractional) units.
+        """
+        payload = {
+            "product_ids": [1],
+            "days": 7,
+            "mode": "analytic"
+        }
+
+        response = client.post(
+            "/api/calc/revenue",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        result = response.get_json()
+
+        assert "summary" in result
+        assert isinstance(result["summary"]["total_units_sold"], (int, float))
+        for detail in result["details"]:
+            assert 0 <= detail["sold_units"] <= detail["initial_stock"]
+
+    @pytest.mark.parametrize("invalid_mode", ["exact", "", 1, None])
+    def test_revenue_calculation_with_invalid_mode_returns_400(self, client, invalid_mode):
+        """
+        Parameterized test: Checks that /api/calc/revenue rejects unknown modes.
+        """
+        payload = {
+            "product_ids": [1],
+            "days": 7,
+            "mode": invalid_mode
+        }
+
+        response = client.post(
+            "/api/calc/revenue",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+
+        assert response.status_code == 400
+
+
+class TestRevenueJobEndpoints:
+    """Integration tests for the asynchronous revenue simulation jobs."""
+
+    def test_revenue_job_completes_with_result(self, client):
+        """
+        Checks that a submitted job returns 202 and eventually exposes the simulation result.
+        """
+        payload = {
+            "product_ids": [1],
+            "days": 7,
+            "seed": 123
+        }
+
+        response = client.post(
+            "/api/calc/revenue/jobs",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+
+        assert response.status_code == 202
+        submitted = response.get_json()
+        assert "job_id" in submitted
+        assert submitted["status_url"].endswith(submitted["job_id"])
+
+        deadline = time.time() + 10
+        job = None
+        while time.time() < deadline:
+            job = client.get(submitted["status_url"]).get_json()
+            if job["status"] in ("done", "failed"):
+                break
+            time.sleep(0.05)
+
+        assert job["status"] == "done", f"Job did not finish: {job}"
+        assert job["progress"] == 1.0
+        assert "summary" in job["result"]
+        assert "details" in job["result"]
+
+    def test_revenue_job_can_be_polled_on_another_worker(self, client, monkeypatch):
+        """
+        Checks that a job submitted to one worker is answered by a worker
+        that did not run it, as under gunicorn with several processes.
+        """
+        payload = {
+            "product_ids": [1],
+            "days": 7,
+            "seed": 123
+        }
+
+        response = client.post(
+            "/api/calc/revenue/jobs",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+        assert response.status_code == 202
+        status_url = response.get_json()["status_url"]
+
+        other_worker = SimulationJobManager(store=DatabaseJobStore(get_sql_connection))
+        monkeypatch.setattr(calculations, "revenue_jobs", other_worker)
+
+        deadline = time.time() + 10
+        job = None
+        while time.time() < deadline:
+            response = client.get(status_url)
+            assert response.status_code == 200
+            job = response.get_json()
+            if job["status"] in ("done", "failed"):
+                break
+            time.sleep(0.05)
+
+        assert job["status"] == "done", f"Job did not finish: {job}"
+        assert "summary" in job["result"]
+
+    def test_revenue_job_with_invalid_payload_returns_400(self, client):
+        """
+        Checks that job submission validates the payload before queueing.
+        """
+        payload = {
+            "product_ids": [],
+            "days": 7
+        }
+
+        response = client.post(
+            "/api/calc/revenue/jobs",
+            data=json.dumps(payload),
+            content_type="application/json"
+        )
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+    def test_unknown_revenue_job_returns_404(self, client):
+        """
+        Checks that polling an unknown job id returns 404.
+        """
+        response = client.get("/api/calc/revenue/jobs/does-not-exist")
+
+        assert response.status_code == 404
+        assert "error" in response.get_json()
+
+
+class TestRevenueCache:
+    """Integration tests for cached revenue results."""
+
+    def revenue(self, client, product_id):
+        response = client.post("/api/calc/revenue", json={"product_ids": [product_id], "days": 7, "mode": "analytic"})
+        assert response.status_code == 200
+        return response.get_json()["summary"]["total_revenue"]
+
+    def test_product_update_invalidates_cached_result(self, client, cleanup_products, monkeypatch):
+        from backend.services.cache import shared_cache
+
+        # Caching is off without CACHE_URL unless asked for
+        monkeypatch.setattr(shared_cache, "ttl", 300)
+        product = {"name": "Cache Test", "uom_id": 1, "price_per_unit": 1.0, "selling_price": 2.0, "quantity": 50}
+        product_id = client.post("/addProduct", json=product).get_json()["product_id"]
+        cleanup_products([product_id])
+
+        before = self.revenue(client, product_id)
+        hits = shared_cache.stats()["local_hits"]
+        assert self.revenue(client, product_id) == before
+        assert shared_cache.stats()["local_hits"] == hits + 1
+
+        client.post("/updateProduct", json={**product, "product_id": product_id, "selling_price": 4.0})
+
+        assert self.revenue(client, product_id) == pytest.approx(before * 2)
+
+
 class TestInventorySpendCalculationEndpoint:
     """Integration tests for inventory spend calculation endpoint."""
 
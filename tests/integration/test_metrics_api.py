@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import MagicMock
+
+from backend.db.instrumented import InstrumentedConnection
+from backend.services.cache import shared_cache
+
+
+class TestMetricsEndpoint:
+    """Integration tests for request metrics exposed at /metrics."""
+
+    def test_metrics_endpoint_returns_prometheus_text(self, client):
+        """
+        Checks that /metrics responds with the Prometheus text format.
+        """
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert "# TYPE gsm_http_requests_total counter" in response.get_data(as_text=True)
+
+    def test_requests_are_counted_per_route_and_status(self, client):
+        """
+        Checks that handled requests show up with their route and status labels.
+        """
+        client.get("/health")
+        client.get("/getOrder/abc")   # no matching rule
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        assert 'gsm_http_requests_total{route="/health",method="GET",status="200"}' in text
+        assert 'route="<unmatched>",method="GET",status="404"' in text
+        assert 'gsm_http_request_duration_seconds_count{route="/health",method="GET"}' in text
+
+    def test_db_and_serialization_time_are_recorded(self, client, monkeypatch):
+        """
+        Checks that time inside DB calls and JSON serialization is split out.
+        """
+        from backend.web import read_routing
+
+        raw = MagicMock()
+        raw.cursor.return_value.__iter__.return_value = [(1, "Apple", 1, 1.5, 3.0, 10, "kg")]
+        # Uncached, /getProducts reads through the replica routing
+        monkeypatch.setattr(shared_cache, "ttl", 0)
+        monkeypatch.setattr(read_routing, "get_read_connection", lambda store_id=None: InstrumentedConnection(raw))
+
+        response = client.get("/getProducts")
+        assert response.status_code == 200
+
+        text = client.get("/metrics").get_data(as_text=True)
+        assert 'gsm_http_request_db_seconds_count{route="/getProducts",method="GET"}' in text
+        assert 'gsm_http_request_serialization_seconds_count{route="/getProducts",method="GET"}' in text
+
+
+class TestQueryStatsEndpoint:
+    """Integration tests for the per-fingerprint SQL statistics at /metrics/queries."""
+
+    def test_queries_of_a_request_are_listed(self, client, monkeypatch):
+        """
+        Checks that statements run by a route show up grouped by fingerprint.
+        """
+        from backend.db.query_stats import query_stats
+        from backend.web import read_routing
+
+        query_stats.reset()
+        raw = MagicMock()
+        raw.cursor.return_value.__iter__.return_value = [(1, "Apple", 1, 1.5, 3.0, 10, "kg")]
+        # Uncached, /getProducts reads through the replica routing
+        monkeypatch.setattr(shared_cache, "ttl", 0)
+        monkeypatch.setattr(read_routing, "get_read_connection", lambda store_id=None: InstrumentedConnection(raw))
+
+        client.get("/getProducts")
+        client.get("/getProducts")
+
+        response = client.get("/metrics/queries?limit=5&sort=max")
+        assert response.status_code == 200
+
+        [entry] = [q for q in response.get_json()["queries"] if "FROM products" in q["fingerprint"]]
+        assert entry["calls"] == 2
+        assert entry["rows"] == 2
+
+    @pytest.mark.parametrize("query", ["limit=0", "sort=rows"])
+    def test_invalid_arguments_are_rejected(self, client, query):
+        """
+        EP - non-positive limit and unknown sort key
+        """
+        response = client.get(f"/metrics/queries?{query}")
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
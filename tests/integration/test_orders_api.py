@@ -1,6 +1,6 @@
 import pytest
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Expected structure for Order response
 EXPECTED_ORDER_SCHEMA = {
@@ -281,3 +281,409 @@ class TestOrdersEndpoint:
             assert "product_id" in detail
             assert "quantity" in detail
             assert isinstance(detail["quantity"], (int, float))
+
+
+class TestOrdersColumnarFormat:
+    """Integration tests for the compact listing formats of /getOrders."""
+
+    def test_columnar_matches_default_listing(self, client):
+        """
+        Checks that columns + rows carry the same data as the list of objects.
+        """
+        objects = client.get("/getOrders").get_json()
+        body = client.get("/getOrders?format=columnar").get_json()
+
+        assert body["columns"] == ["order_id", "customer_name", "total_price", "datetime"]
+        assert [dict(zip(body["columns"], row)) for row in body["rows"]] == objects
+
+    def test_msgpack_format(self, client):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.get("/getOrders?format=msgpack")
+
+        assert response.status_code == 200
+        assert msgpack.unpackb(response.get_data())["columns"][0] == "order_id"
+
+
+class TestOrderWriteBehind:
+    """Integration tests for /addOrder with ORDER_WRITE_BEHIND=1 (group commit)."""
+
+    @pytest.fixture(autouse=True)
+    def write_behind(self, monkeypatch):
+        monkeypatch.setenv("ORDER_WRITE_BEHIND", "1")
+
+    def test_concurrent_orders_are_committed_in_batches(self, flask_app, db_conn, cleanup_orders):
+        """
+        Checks that every client gets the id of a committed order, with fewer
+        commits than orders.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        from backend.services.order_writer import order_writer
+
+        order = {
+            "customer_name": "Burst",
+            "total_price": 2.00,
+            "order_details": [{"product_id": 1, "quantity": 1, "total_price": 2.00}],
+        }
+        before = order_writer.stats()
+
+        def post(_):
+            return flask_app.test_client().post("/addOrder", json=order)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(post, range(16)))
+
+        assert [r.status_code for r in responses] == [200] * 16
+        order_ids = [r.get_json()["order_id"] for r in responses]
+        cleanup_orders(order_ids)
+        assert len(set(order_ids)) == 16
+
+        cursor = db_conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM orders WHERE order_id IN (" + ",".join(["%s"] * 16) + ")",
+            order_ids,
+        )
+        assert cursor.fetchone()[0] == 16
+
+        after = order_writer.stats()
+        assert after["orders"] - before["orders"] == 16
+        assert after["batches"] - before["batches"] < 16
+
+    def test_invalid_order_is_rejected_before_queueing(self, client):
+        """
+        Checks that field errors are reported as 400 without reaching the writer.
+        """
+        response = client.post("/addOrder", json={
+            "customer_name": "John Doe",
+            "total_price": 5.00,
+            "order_details": [{"product_id": "apple", "quantity": 1, "total_price": 5.00}],
+        })
+
+        assert response.status_code == 400
+        assert "Invalid order field" in response.get_json()["error"]
+
+
+class TestAddOrderIdempotency:
+    """Integration tests for retried /addOrder requests with an Idempotency-Key."""
+
+    ORDER = {
+        "customer_name": "Retry Terminal",
+        "total_price": 3.00,
+        "order_details": [{"product_id": 1, "quantity": 1, "total_price": 3.00}],
+    }
+
+    def stock(self, db_conn):
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT quantity FROM products WHERE product_id = 1")
+        return cursor.fetchone()[0]
+
+    def test_retry_returns_same_order_without_writing_again(self, client, db_conn, cleanup_orders):
+        """
+        Checks that a retried order is answered from the stored response and
+        decrements stock only once.
+        """
+        import uuid
+
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        stock_before = self.stock(db_conn)
+
+        first = client.post("/addOrder", json=self.ORDER, headers=headers)
+        retry = client.post("/addOrder", json=self.ORDER, headers=headers)
+
+        assert first.status_code == retry.status_code == 200
+        cleanup_orders([first.get_json()["order_id"]])
+        assert retry.get_json() == first.get_json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert self.stock(db_conn) == stock_before - 1
+
+    def test_key_reused_for_different_order_returns_422(self, client, cleanup_orders):
+        import uuid
+
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+        first = client.post("/addOrder", json=self.ORDER, headers=headers)
+        cleanup_orders([first.get_json()["order_id"]])
+        other = client.post("/addOrder", json={**self.ORDER, "customer_name": "Someone else"}, headers=headers)
+
+        assert other.status_code == 422
+
+
+    def test_retry_after_failed_response_store_does_not_add_a_second_order(
+            self, client, db_conn, cleanup_orders, monkeypatch):
+        """
+        Checks that when the order commits but its response cannot be
+        stored, a retry with the same key (even after the lock timeout) is
+        refused instead of writing the order again.
+        """
+        import uuid
+        from backend.web import idempotency
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(idempotency, "save_idempotent_response", fail)
+        monkeypatch.setenv("IDEMPOTENCY_LOCK_SECONDS", "0")
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        customer = f"Retry {headers['Idempotency-Key'][:8]}"
+        order = {**self.ORDER, "customer_name": customer}
+
+        first = client.post("/addOrder", json=order, headers=headers)
+        assert first.status_code == 200
+        cleanup_orders([first.get_json()["order_id"]])
+
+        retry = client.post("/addOrder", json=order, headers=headers)
+
+        assert retry.status_code == 409
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM orders WHERE customer_name = %s", (customer,))
+        assert cursor.fetchone()[0] == 1
+
+class TestOrdersArchive:
+    """Integration tests for date ranges and orders moved to the archive."""
+
+    ARCHIVED_ID = 900001
+
+    @pytest.fixture
+    def archived_order(self, db_conn):
+        cursor = db_conn.cursor()
+        cursor.execute(
+            "INSERT INTO orders_archive (order_id, customer_name, total_price, datetime) VALUES (%s, %s, %s, %s)",
+            (self.ARCHIVED_ID, "Archived Customer", 6.0, datetime(2001, 5, 4, 10, 30)),
+        )
+        cursor.execute(
+            "INSERT INTO order_details_archive (id, order_id, product_id, quantity, total_price) "
+            "VALUES (%s, %s, 1, 2, 6.0)",
+            (self.ARCHIVED_ID, self.ARCHIVED_ID),
+        )
+        db_conn.commit()
+        yield self.ARCHIVED_ID
+        cursor.execute("DELETE FROM order_details_archive WHERE order_id = %s", (self.ARCHIVED_ID,))
+        cursor.execute("DELETE FROM orders_archive WHERE order_id = %s", (self.ARCHIVED_ID,))
+        db_conn.commit()
+
+    def test_range_reaching_the_archive_includes_archived_orders(self, client, archived_order):
+        response = client.get("/getOrders?from=2001-05-04&to=2001-05-04")
+
+        assert response.status_code == 200
+        assert [o["order_id"] for o in response.get_json()] == [archived_order]
+
+    def test_recent_range_leaves_archived_orders_out(self, client, archived_order):
+        orders = client.get("/getOrders?from=2002-01-01").get_json()
+
+        assert archived_order not in [o["order_id"] for o in orders]
+
+    def test_listing_without_range_includes_archived_orders(self, client, archived_order):
+        orders = client.get("/getOrders").get_json()
+
+        assert [o["order_id"] for o in orders][-1] == archived_order
+
+    def test_archived_order_can_be_fetched(self, client, archived_order):
+        response = client.get(f"/getOrder/{archived_order}")
+
+        assert response.status_code == 200
+        order = response.get_json()
+        assert order["customer_name"] == "Archived Customer"
+        assert [item["quantity"] for item in order["items"]] == [2]
+
+    @pytest.mark.parametrize("request_args", [
+        ("delete", "/deleteOrder/{id}", None),
+        ("post", "/deleteOrders", {"from": "2001-05-04", "to": "2001-05-04"}),
+    ])
+    def test_archived_order_can_be_deleted(self, client, db_conn, archived_order, request_args):
+        method, path, body = request_args
+        response = getattr(client, method)(path.format(id=archived_order), json=body)
+
+        assert response.status_code == 200
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM orders_archive WHERE order_id = %s", (archived_order,))
+        assert cursor.fetchone()[0] == 0
+
+    @pytest.mark.parametrize("query", [
+        "from=yesterday",
+        "from=2025-02-01&to=2025-01-01",
+        "from=2025-01-01T10:00&to=2025-01-01T10:00",
+        "from=2025-01-01T10:00:00%2B02:00&to=2025-01-31",    # offset on one bound only
+    ])
+    def test_invalid_range_returns_400(self, client, query):
+        response = client.get(f"/getOrders?{query}")
+
+        assert response.status_code == 400
+        assert "Invalid date range" in response.get_json()["error"]
+
+
+class TestBulkDeleteOrders:
+    """Integration tests for /deleteOrders."""
+
+    def create_orders(self, client, cleanup_orders, count):
+        order_ids = []
+        for _ in range(count):
+            response = client.post("/addOrder", json={
+                "customer_name": "Bulk Delete",
+                "total_price": 2.00,
+                "order_details": [{"product_id": 1, "quantity": 2, "total_price": 2.00}],
+            })
+            order_ids.append(response.get_json()["order_id"])
+        cleanup_orders(order_ids)
+        return order_ids
+
+    def stock(self, db_conn):
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT quantity FROM products WHERE product_id = 1")
+        return cursor.fetchone()[0]
+
+    def test_delete_by_ids_restores_stock(self, client, db_conn, cleanup_orders):
+        stock_before = self.stock(db_conn)
+        order_ids = self.create_orders(client, cleanup_orders, 3)
+
+        response = client.post("/deleteOrders", json={"order_ids": order_ids, "restore_stock": True})
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "deleted_orders": 3, "deleted_items": 3, "restocked_products": 1, "chunks": 1,
+        }
+        assert self.stock(db_conn) == stock_before
+        cursor = db_conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM orders WHERE customer_name = 'Bulk Delete'")
+        assert cursor.fetchone()[0] == 0
+
+    def test_bulk_delete_subtracts_demand_stats(self, client, db_conn, cleanup_orders):
+        from backend.dao.demand_stats_dao import rebuild_demand_stats
+
+        order_ids = self.create_orders(client, cleanup_orders, 2)
+        cursor = db_conn.cursor()
+        cursor.execute(
+            f"UPDATE orders SET datetime = %s WHERE order_id IN ({order_ids[0]}, {order_ids[1]})",
+            (datetime.now() - timedelta(days=1),),
+        )
+        db_conn.commit()
+        rebuild_demand_stats(db_conn)
+
+        def units_sum():
+            cursor.execute("SELECT units_sum FROM product_demand_stats WHERE product_id = 1")
+            return cursor.fetchone()[0]
+
+        before = units_sum()
+        response = client.post("/deleteOrders", json={"order_ids": order_ids[:1]})
+
+        assert response.status_code == 200
+        assert units_sum() == pytest.approx(before - 2)
+
+    def test_delete_by_range(self, client, db_conn, cleanup_orders):
+        order_ids = self.create_orders(client, cleanup_orders, 2)
+        cursor = db_conn.cursor()
+        cursor.execute(
+            f"UPDATE orders SET datetime = %s WHERE order_id IN ({order_ids[0]}, {order_ids[1]})",
+            (datetime(2001, 3, 3, 9, 0),),
+        )
+        db_conn.commit()
+
+        response = client.post("/deleteOrders", json={"from": "2001-03-03", "to": "2001-03-03"})
+
+        assert response.get_json()["deleted_orders"] == 2
+
+    @pytest.mark.parametrize("body", [
+        {},
+        {"order_ids": []},
+        {"order_ids": ["1"]},
+        {"order_ids": [True]},
+        {"from": "2025-01-01"},
+        {"from": "2025-02-01", "to": "2025-01-01"},
+        {"order_ids": [1], "from": "2025-01-01", "to": "2025-02-01"},
+    ])
+    def test_invalid_selection_returns_400(self, client, body):
+        response = client.post("/deleteOrders", json=body)
+
+        assert response.status_code == 400
+
+
+class TestReadYourWrites:
+    """Integration tests for the read-your-writes window after a write."""
+
+    def test_order_write_pins_reads_to_primary(self, client, cleanup_orders, monkeypatch):
+        from backend.web import read_routing
+
+        replica_reads = []
+        real = read_routing.get_read_connection
+        monkeypatch.setattr(read_routing, "get_read_connection",
+                            lambda store_id=None: replica_reads.append(1) or real(store_id))
+
+        client.get("/getRecentOrders")
+        assert len(replica_reads) == 1
+
+        response = client.post("/addOrder", json={
+            "customer_name": "Replica Test",
+            "total_price": 3.00,
+            "order_details": [{"product_id": 1, "quantity": 1, "total_price": 3.00}],
+        })
+        order_id = response.get_json()["order_id"]
+        cleanup_orders([order_id])
+        assert "gsm_primary_until" in response.headers["Set-Cookie"]
+
+        assert client.get(f"/getOrder/{order_id}").status_code == 200
+        assert len(replica_reads) == 1
+
+
+class TestStores:
+    """Integration tests for store scoping via X-Store-Id."""
+
+    STORE = {"X-Store-Id": "2"}
+
+    def add_store_product(self, client, cleanup_products):
+        response = client.post("/addProduct", headers=self.STORE, json={
+            "name": "Store Test", "uom_id": 1, "price_per_unit": 1.0, "quantity": 10,
+        })
+        product_id = response.get_json()["product_id"]
+        cleanup_products([product_id])
+        return product_id
+
+    def test_products_and_orders_stay_in_their_store(self, client, cleanup_products, cleanup_orders):
+        product_id = self.add_store_product(client, cleanup_products)
+
+        response = client.post("/addOrder", headers=self.STORE, json={
+            "customer_name": "Store Test",
+            "total_price": 2.0,
+            "order_details": [{"product_id": product_id, "quantity": 2, "total_price": 2.0}],
+        })
+        assert response.status_code == 200
+        order_id = response.get_json()["order_id"]
+        cleanup_orders([order_id])
+
+        store_products = [p["product_id"] for p in client.get("/getProducts", headers=self.STORE).get_json()]
+        assert store_products == [product_id]
+        assert product_id not in [p["product_id"] for p in client.get("/getProducts").get_json()]
+
+        assert [o["order_id"] for o in client.get("/getOrders", headers=self.STORE).get_json()] == [order_id]
+        assert client.get(f"/getOrder/{order_id}", headers=self.STORE).status_code == 200
+        assert client.get(f"/getOrder/{order_id}").status_code == 404
+        assert client.get(f"/getOrderDetails/{order_id}").get_json() == []
+
+    def test_order_with_another_stores_product_returns_400(self, client, cleanup_products):
+        product_id = self.add_store_product(client, cleanup_products)
+
+        response = client.post("/addOrder", json={
+            "customer_name": "Store Test",
+            "total_price": 1.0,
+            "order_details": [{"product_id": product_id, "quantity": 1, "total_price": 1.0}],
+        })
+
+        assert response.status_code == 400
+
+    def test_delete_order_of_another_store_is_ignored(self, client, db_conn, cleanup_orders):
+        response = client.post("/addOrder", json={
+            "customer_name": "Store Test",
+            "total_price": 1.0,
+            "order_details": [{"product_id": 1, "quantity": 1, "total_price": 1.0}],
+        })
+        order_id = response.get_json()["order_id"]
+        cleanup_orders([order_id])
+
+        client.delete(f"/deleteOrder/{order_id}", headers=self.STORE)
+
+        assert client.get(f"/getOrder/{order_id}").status_code == 200
+
+    @pytest.mark.parametrize("value", ["0", "abc", "-3"])
+    def test_invalid_store_returns_400(self, client, value):
+        response = client.get("/getProducts", headers={"X-Store-Id": value})
+
+        assert response.status_code == 400
@@ -241,3 +241,89 @@ class TestProductsEndpoint:
                 assert "uom_name" in uom, "Missing 'uom_name' field"
                 assert isinstance(uom["uom_id"], int), "uom_id is not an integer"
                 assert isinstance(uom["uom_name"], str), "uom_name is not a string"
+
+
+class TestProductsColumnarFormat:
+    """Integration tests for the compact listing formats of /getProducts."""
+
+    def test_columnar_matches_default_listing(self, client):
+        """
+        Checks that columns + rows carry the same data as the list of objects.
+        """
+        objects = client.get("/getProducts").get_json()
+        response = client.get("/getProducts?format=columnar")
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["columns"] == ["product_id", "name", "uom_id", "price_per_unit",
+                                   "selling_price", "quantity", "uom_name"]
+        assert [dict(zip(body["columns"], row)) for row in body["rows"]] == objects
+
+    def test_msgpack_via_accept_header(self, client):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.get("/getProducts", headers={"Accept": "application/msgpack"})
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/msgpack"
+        body = msgpack.unpackb(response.get_data())
+        assert len(body["rows"]) == len(client.get("/getProducts").get_json())
+
+    def test_unknown_format_returns_400(self, client):
+        response = client.get("/getProducts?format=xml")
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+
+class TestLowStockEndpoint:
+    """Integration tests for /lowStock and reorder thresholds."""
+
+    def add_product(self, client, cleanup_products, quantity, threshold):
+        response = client.post("/addProduct", json={
+            "name": "Low Stock Test", "uom_id": 1, "price_per_unit": 1.0,
+            "quantity": quantity, "reorder_threshold": threshold,
+        })
+        product_id = response.get_json()["product_id"]
+        cleanup_products([product_id])
+        return product_id
+
+    def low_stock_ids(self, client):
+        response = client.get("/lowStock")
+        assert response.status_code == 200
+        return [p["product_id"] for p in response.get_json()]
+
+    def test_product_at_or_below_threshold_is_listed(self, client, cleanup_products):
+        below = self.add_product(client, cleanup_products, quantity=3, threshold=10)
+        at = self.add_product(client, cleanup_products, quantity=10, threshold=10)
+        above = self.add_product(client, cleanup_products, quantity=11, threshold=10)
+
+        listed = self.low_stock_ids(client)
+
+        assert below in listed and at in listed and above not in listed
+        assert listed.index(below) < listed.index(at)
+
+    def test_order_pushing_stock_below_threshold_lists_product(self, client, cleanup_products, cleanup_orders):
+        product_id = self.add_product(client, cleanup_products, quantity=12, threshold=10)
+        assert product_id not in self.low_stock_ids(client)
+
+        response = client.post("/addOrder", json={
+            "customer_name": "Low Stock Test",
+            "total_price": 3.0,
+            "order_details": [{"product_id": product_id, "quantity": 3, "total_price": 3.0}],
+        })
+        cleanup_orders([response.get_json()["order_id"]])
+
+        product = next(p for p in client.get("/lowStock").get_json() if p["product_id"] == product_id)
+        assert product["quantity"] == 9
+        assert product["reorder_quantity"] == 1
+
+    def test_update_without_threshold_keeps_it(self, client, cleanup_products):
+        product_id = self.add_product(client, cleanup_products, quantity=3, threshold=10)
+
+        client.post("/updateProduct", json={
+            "product_id": product_id, "name": "Low Stock Test", "uom_id": 1,
+            "price_per_unit": 1.0, "quantity": 4,
+        })
+
+        assert product_id in self.low_stock_ids(client)
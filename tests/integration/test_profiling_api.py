@@ -0,0 +1,103 @@
+import pytest
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILING_ENABLED", "1")
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+    monkeypatch.delenv("PROFILING_TOKEN", raising=False)
+    monkeypatch.delenv("PROFILING_SAMPLE_RATE", raising=False)
+    return tmp_path
+
+
+class TestProfilingEndpoints:
+    """Integration tests for on-demand request profiling."""
+
+    def test_endpoints_hidden_when_disabled(self, client, monkeypatch):
+        """
+        Checks that /profiles does not exist unless profiling is enabled.
+        """
+        monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+
+        assert client.get("/profiles").status_code == 404
+
+    def test_requests_without_header_are_not_profiled(self, client, profiling):
+        client.get("/health")
+
+        assert client.get("/profiles").get_json() == []
+
+    def test_profiled_request_can_be_listed_and_downloaded(self, client, profiling):
+        """
+        Checks the full flow: profile a request, list it, download it as
+        pstats data and as text.
+        """
+        response = client.get("/health", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+
+        [entry] = client.get("/profiles").get_json()
+        assert entry["route"] == "/health"
+        assert entry["method"] == "GET"
+        assert entry["status"] == 200
+
+        download = client.get(f"/profiles/{entry['name']}")
+        assert download.status_code == 200
+        assert download.mimetype == "application/octet-stream"
+
+        text = client.get(f"/profiles/{entry['name']}?format=text")
+        assert "function calls" in text.get_data(as_text=True)
+
+    def test_token_is_required_when_configured(self, client, profiling, monkeypatch):
+        monkeypatch.setenv("PROFILING_TOKEN", "s3cret")
+        token = {"X-Profile": "s3cret"}
+
+        client.get("/health", headers={"X-Profile": "1"})
+        assert client.get("/profiles", headers=token).get_json() == []
+
+        client.get("/health", headers=token)
+        [entry] = client.get("/profiles", headers=token).get_json()
+
+        assert client.get("/profiles").status_code == 403
+        assert client.get("/profiles", headers={"X-Profile": "wrong"}).status_code == 403
+        assert client.get(f"/profiles/{entry['name']}").status_code == 403
+
+    def test_remote_callers_need_a_token(self, client, profiling):
+        """
+        Checks that without PROFILING_TOKEN only the local host may trigger
+        profiles or read them.
+        """
+        remote = {"REMOTE_ADDR": "203.0.113.7"}
+
+        client.get("/health", headers={"X-Profile": "1"}, environ_base=remote)
+        assert client.get("/profiles", environ_base=remote).status_code == 403
+        assert client.get("/profiles").get_json() == []
+
+    @pytest.mark.parametrize("header", ["X-Forwarded-For", "X-Real-IP", "Forwarded"])
+    def test_proxied_requests_are_not_local(self, client, profiling, header):
+        """
+        Checks that a reverse proxy on the local host does not let its
+        clients profile without PROFILING_TOKEN.
+        """
+        proxied = {header: "203.0.113.7"}
+
+        client.get("/health", headers={"X-Profile": "1", **proxied})
+        assert client.get("/profiles", headers=proxied).status_code == 403
+        assert client.get("/profiles").get_json() == []
+
+    def test_profile_counts_overlapping_requests(self, client, profiling):
+        response = client.get("/health", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+
+        [entry] = client.get("/profiles").get_json()
+        assert entry["overlapping_requests"] == 0
+        assert "all_threads" in entry
+
+    @pytest.mark.parametrize("name,status", [
+        ("missing.prof", 404),
+        ("..%2Fsecret.prof", 404),
+        ("notes.txt", 400),
+    ])
+    def test_invalid_downloads(self, client, profiling, name, status):
+        """
+        EP - unknown profile, path traversal attempt and wrong extension
+        """
+        assert client.get(f"/profiles/{name}").status_code == status
@@ -1,7 +1,8 @@
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import requests
+import time
 
 # Expected structure for OpenWeather API response
 EXPECTED_WEATHER_RESPONSE_SCHEMA = {
@@ -29,50 +30,51 @@ EXPECTED_WEATHER_CONDITION_SCHEMA = {
 }
 
 
+@pytest.fixture
+def mock_weather_response():
+    """
+    Fixture that provides a mock OpenWeather API response.
+    """
+    return {
+        "cod": 200,
+        "coord": {"lon": 12.5683, "lat": 55.6761},
+        "weather": [
+            {
+                "id": 500,
+                "main": "Rain",
+                "description": "light rain",
+                "icon": "10d"
+            }
+        ],
+        "main": {
+            "temp": 15.5,
+            "feels_like": 14.8,
+            "temp_min": 14.2,
+            "temp_max": 16.8,
+            "pressure": 1013,
+            "humidity": 72
+        },
+        "clouds": {"all": 75},
+        "wind": {"speed": 3.5},
+        "visibility": 10000,
+        "dt": 1640088000,
+        "sys": {
+            "type": 2,
+            "id": 2019646,
+            "country": "DK",
+            "sunrise": 1640046000,
+            "sunset": 1640075000
+        },
+        "timezone": 3600,
+        "id": 2618426,
+        "name": "Copenhagen",
+        "base": "stations"
+    }
+
+
 class TestWeatherAPI:
     """Integration tests for external weather API integration."""
 
-    @pytest.fixture
-    def mock_weather_response(self):
-        """
-        Fixture that provides a mock OpenWeather API response.
-        """
-        return {
-            "cod": 200,
-            "coord": {"lon": 12.5683, "lat": 55.6761},
-            "weather": [
-                {
-                    "id": 500,
-                    "main": "Rain",
-                    "description": "light rain",
-                    "icon": "10d"
-                }
-            ],
-            "main": {
-                "temp": 15.5,
-                "feels_like": 14.8,
-                "temp_min": 14.2,
-                "temp_max": 16.8,
-                "pressure": 1013,
-                "humidity": 72
-            },
-            "clouds": {"all": 75},
-            "wind": {"speed": 3.5},
-            "visibility": 10000,
-            "dt": 1640088000,
-            "sys": {
-                "type": 2,
-                "id": 2019646,
-                "country": "DK",
-                "sunrise": 1640046000,
-                "sunset": 1640075000
-            },
-            "timezone": 3600,
-            "id": 2618426,
-            "name": "Copenhagen",
-            "base": "stations"
-        }
-
     def test_weather_api_response_has_valid_structure(self, mock_weather_response):
         """
         Checks that a valid OpenWeather API response has the expected structure.
@@ -301,3 +303,123 @@ class TestWeatherAPI:
             assert "main" in resp
             assert "weather" in resp
             assert resp["cod"] == 200
+
+
+class TestWeatherProxyEndpoint:
+    """Integration tests for the backend /weather proxy against a local stand-in server."""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch, mock_weather_response):
+        """
+        Starts a local HTTP server that answers like OpenWeather and points
+        the /weather endpoint at it with a fresh cache.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import urlparse, parse_qs
+        import threading
+        from backend.routes import weather
+        from backend.services.weather import WeatherCache
+
+        state = {"calls": [], "delay": 0}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                state["calls"].append(query)
+                time.sleep(state["delay"])
+
+                if query.get("appid") != ["test_key"]:
+                    status, body = 401, {"cod": 401, "message": "Invalid API key"}
+                elif query["q"][0] == "InvalidCity":
+                    status, body = 404, {"cod": "404", "message": "city not found"}
+                else:
+                    status, body = 200, dict(mock_weather_response, name=query["q"][0])
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        monkeypatch.setattr(weather, "OPENWEATHER_URL", f"http://127.0.0.1:{server.server_port}/data/2.5/weather")
+        monkeypatch.setattr(weather, "OPENWEATHER_API_KEY", "test_key")
+        monkeypatch.setenv("WEATHER_TIMEOUT_SECONDS", "0.3")
+        monkeypatch.setattr(weather, "weather_cache", WeatherCache(weather._fetch, ttl=60, stale_ttl=300))
+
+        yield state
+
+        server.shutdown()
+        server.server_close()
+
+    def test_weather_endpoint_returns_upstream_payload(self, client, upstream):
+        """
+        Checks that /weather proxies the OpenWeather payload with metric units.
+        """
+        response = client.get("/weather?city=Copenhagen")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["cod"] == 200
+        assert data["name"] == "Copenhagen"
+        assert "temp" in data["main"]
+        assert upstream["calls"][0]["units"] == ["metric"]
+
+    def test_weather_endpoint_fetches_once_per_ttl(self, client, upstream):
+        """
+        Checks that repeated requests for a city are served from the cache.
+        """
+        first = client.get("/weather?city=Copenhagen")
+        second = client.get("/weather?city=Copenhagen")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert len(upstream["calls"]) == 1
+
+    def test_weather_endpoint_caches_per_city(self, client, upstream):
+        """
+        Checks that each city has its own cache entry.
+        """
+        client.get("/weather?city=Copenhagen")
+        response = client.get("/weather?city=London")
+
+        assert response.get_json()["name"] == "London"
+        assert len(upstream["calls"]) == 2
+
+    def test_weather_endpoint_passes_through_404(self, client, upstream):
+        """
+        Checks that an unknown city returns the upstream 404.
+        """
+        response = client.get("/weather?city=InvalidCity")
+
+        assert response.status_code == 404
+        assert response.get_json()["cod"] != 200
+
+    def test_weather_endpoint_times_out_on_slow_upstream(self, client, upstream):
+        """
+        Checks that a slow upstream returns 502 instead of blocking the request.
+        """
+        upstream["delay"] = 1
+
+        started = time.time()
+        response = client.get("/weather?city=Copenhagen")
+
+        assert response.status_code == 502
+        assert time.time() - started < 0.9
+
+    def test_weather_endpoint_without_api_key_returns_503(self, client, upstream, monkeypatch):
+        """
+        Checks that the endpoint reports missing configuration.
+        """
+        from backend.routes import weather
+        monkeypatch.setattr(weather, "OPENWEATHER_API_KEY", None)
+
+        response = client.get("/weather?city=Copenhagen")
+
+        assert response.status_code == 503
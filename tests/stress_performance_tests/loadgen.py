@@ -0,0 +1,293 @@
+"""
+Pure-Python load generator with the same five scenarios as gsm_stress_plan.jmx,
+for running stress tests without a JVM:
+
+    python -m tests.stress_performance_tests.loadgen                     # all scenarios, full plan
+    python -m tests.stress_performance_tests.loadgen -s S1 -s S2 --duration 30
+    python -m tests.stress_performance_tests.loadgen --scale 0.2 --output results.json
+
+Each virtual user is a thread with its own keep-alive HTTP connection. Users
+start evenly over the ramp-up time and loop over their scenario's requests
+until the duration ends (or for a fixed number of loops, like S4). Selected
+scenarios run at the same time, as in the JMeter plan. At the end the
+throughput, error count and p50/p95/p99 latency are printed per endpoint.
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+import uuid
+
+CONNECT_TIMEOUT = 5
+RESPONSE_TIMEOUT = 15
+
+
+class Scenario:
+    def __init__(self, name, title, users, ramp, requests, duration=None, loops=None):
+        self.name = name
+        self.title = title
+        self.users = users
+        self.ramp = ramp
+        self.duration = duration
+        self.loops = loops
+        self.requests = requests    # [(label, method, path, body_fn or None)]
+
+
+def build_scenarios(product_ids=(1, 2, 3), revenue_days=7, spend_year=2025, spend_month=1):
+    """Scenarios S1 - S5 with the users, timings and payloads of the JMeter plan."""
+    product_ids = list(product_ids)
+
+    def revenue(days, seed):
+        return lambda: {"product_ids": product_ids, "days": days, "seed": seed}
+
+    def spend(orders):
+        return lambda: {"year": spend_year, "month": spend_month, "orders": orders}
+
+    def new_order():
+        return {
+            "customer_name": f"PerfUser-{uuid.uuid4()}",
+            "total_price": 25.0,
+            "order_details": [
+                {"product_id": 1, "quantity": 2, "total_price": 10.0},
+                {"product_id": 2, "quantity": 1, "total_price": 15.0},
+            ],
+        }
+
+    return {
+        "S1": Scenario("S1", "Read Heavy - Catalog & Orders", users=50, ramp=30, duration=300, requests=[
+            ("GET /getProducts", "GET", "/getProducts", None),
+            ("GET /getRecentOrders", "GET", "/getRecentOrders", None),
+        ]),
+        "S2": Scenario("S2", "Revenue Calc CPU", users=20, ramp=10, duration=180, requests=[
+            ("POST /api/calc/revenue", "POST", "/api/calc/revenue", revenue(revenue_days, 42)),
+        ]),
+        "S3": Scenario("S3", "Spend Calc Longevity", users=10, ramp=10, duration=600, requests=[
+            ("POST /api/calc/spend", "POST", "/api/calc/spend", spend([
+                {"date": "2025-01-01T10:00:00", "qty": 5, "cost": 10.0, "category": "Fruit"},
+                {"date": "2025-01-15T14:00:00", "qty": 3, "cost": 20.0, "category": "Vegetable"},
+                {"date": "2025-01-20T16:00:00", "qty": 2, "cost": 8.0, "category": "Bakery"},
+            ])),
+        ]),
+        "S4": Scenario("S4", "Order Create Burst", users=15, ramp=5, loops=5, requests=[
+            ("POST /addOrder", "POST", "/addOrder", new_order),
+        ]),
+        "S5": Scenario("S5", "Mixed Soak", users=5, ramp=5, duration=900, requests=[
+            ("GET /getProducts (soak)", "GET", "/getProducts", None),
+            ("POST /api/calc/revenue (soak)", "POST", "/api/calc/revenue", revenue(3, 7)),
+            ("POST /api/calc/spend (soak)", "POST", "/api/calc/spend", spend([
+                {"date": "2025-01-05T10:00:00", "qty": 4, "cost": 9.0, "category": "Fruit"},
+                {"date": "2025-01-06T11:00:00", "qty": 2, "cost": 12.0, "category": "Vegetable"},
+            ])),
+        ]),
+    }
+
+
+# -------------------------------------------------------
+# Results
+# -------------------------------------------------------
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}   # label -> [latencies]
+        self._errors = {}    # label -> count
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self._samples.setdefault(label, []).append(seconds)
+            if not ok:
+                self._errors[label] = self._errors.get(label, 0) + 1
+
+    def summary(self, elapsed):
+        with self._lock:
+            samples = {label: sorted(values) for label, values in self._samples.items()}
+            errors = dict(self._errors)
+
+        rows = []
+        for label, values in samples.items():
+            rows.append({
+                "endpoint": label,
+                "requests": len(values),
+                "errors": errors.get(label, 0),
+                "throughput": len(values) / elapsed if elapsed > 0 else 0.0,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            })
+        return rows
+
+
+def format_summary(rows, elapsed):
+    header = f"{'Endpoint':34s} {'Requests':>9s} {'Errors':>7s} {'Req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+    lines = [f"Elapsed {elapsed:.1f} s", header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['endpoint']:34s} {r['requests']:9d} {r['errors']:7d} {r['throughput']:8.1f} "
+            f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f}"
+        )
+    return "\n".join(lines)
+
+
+# -------------------------------------------------------
+# Virtual users
+# -------------------------------------------------------
+class Client:
+    """One keep-alive connection; reconnects after errors."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._conn = None
+
+    def request(self, method, path, body=None):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=CONNECT_TIMEOUT)
+            self._conn.connect()
+            self._conn.sock.settimeout(RESPONSE_TIMEOUT)
+
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        data = json.dumps(body).encode() if body is not None else None
+        try:
+            self._conn.request(method, path, body=data, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+            return response.status
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def run_user(scenario, client, recorder, start_at, stop_at, stop_event):
+    if stop_event.wait(max(0.0, start_at - time.monotonic())):
+        return
+
+    loops = 0
+    try:
+        while not stop_event.is_set():
+            if scenario.loops is not None and loops >= scenario.loops:
+                return
+            if stop_at is not None and time.monotonic() >= stop_at:
+                return
+
+            for label, method, path, body_fn in scenario.requests:
+                started = time.perf_counter()
+                try:
+                    status = client.request(method, path, body_fn() if body_fn else None)
+                    ok = status < 400
+                except Exception:
+                    ok = False
+                recorder.record(label, time.perf_counter() - started, ok)
+            loops += 1
+    finally:
+        client.close()
+
+
+def run(scenarios, host, port, recorder=None, stop_event=None):
+    """Runs the scenarios concurrently; returns (recorder, elapsed seconds)."""
+    recorder = recorder or Recorder()
+    stop_event = stop_event or threading.Event()
+    begin = time.monotonic()
+
+    threads = []
+    for scenario in scenarios:
+        stop_at = begin + scenario.duration if scenario.duration is not None else None
+        for i in range(scenario.users):
+            start_at = begin + scenario.ramp * i / scenario.users
+            thread = threading.Thread(
+                target=run_user,
+                args=(scenario, Client(host, port), recorder, start_at, stop_at, stop_event),
+                name=f"{scenario.name}-user-{i + 1}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    return recorder, time.monotonic() - begin
+
+
+# -------------------------------------------------------
+# CLI
+# -------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GSM stress scenarios S1-S5 without JMeter")
+    parser.add_argument("-s", "--scenario", action="append", choices=["S1", "S2", "S3", "S4", "S5"],
+                        help="scenario to run, repeatable (default: all)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5050, help="backend port (default 5050, as in app.py and backend.serve)")
+    parser.add_argument("--users", type=int, help="users per scenario (default: as in the JMeter plan)")
+    parser.add_argument("--ramp", type=float, help="ramp-up seconds per scenario")
+    parser.add_argument("--duration", type=float, help="duration in seconds for the timed scenarios")
+    parser.add_argument("--loops", type=int, help="loops per user for S4")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply the plan's users, ramp-up and duration, e.g. 0.1 for a quick dev run")
+    parser.add_argument("--product-ids", default="1,2,3", help="comma list for the revenue payloads")
+    parser.add_argument("--revenue-days", type=int, default=7)
+    parser.add_argument("--spend-year", type=int, default=2025)
+    parser.add_argument("--spend-month", type=int, default=1)
+    parser.add_argument("--output", help="also write the summary as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def configure(args):
+    scenarios = build_scenarios(
+        [int(p) for p in args.product_ids.split(",") if p.strip()],
+        args.revenue_days, args.spend_year, args.spend_month,
+    )
+    selected = [scenarios[name] for name in (args.scenario or sorted(scenarios))]
+
+    for s in selected:
+        s.users = args.users if args.users is not None else max(1, round(s.users * args.scale))
+        s.ramp = args.ramp if args.ramp is not None else s.ramp * args.scale
+        if s.duration is not None:
+            s.duration = args.duration if args.duration is not None else s.duration * args.scale
+        if s.loops is not None and args.loops is not None:
+            s.loops = args.loops
+    return selected
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = configure(args)
+
+    for s in scenarios:
+        length = f"{s.duration:.0f} s" if s.duration is not None else f"{s.loops} loops"
+        print(f"{s.name} {s.title}: {s.users} users, ramp {s.ramp:.0f} s, {length}")
+
+    recorder, elapsed = run(scenarios, args.host, args.port)
+    rows = recorder.summary(elapsed)
+    print(format_summary(rows, elapsed))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"elapsed": elapsed, "endpoints": rows}, f, indent=2)
+
+    return 1 if any(r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
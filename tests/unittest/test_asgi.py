@@ -0,0 +1,261 @@
+import asyncio
+import json
+from datetime import datetime
+import pytest
+
+from backend import asgi
+
+
+# ---------------------------------------------------------
+# Helpers: drive the ASGI app without a server
+# ---------------------------------------------------------
+def call(path, method="GET", headers=(), query=b""):
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "query_string": query}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+
+    start, body = sent
+    return start["status"], dict(start["headers"]), body["body"]
+
+
+class FakePool:
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return object()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    async def get_pool(shard=None):
+        return FakePool()
+
+    monkeypatch.setattr(asgi, "get_pool", get_pool)
+    return monkeypatch
+
+
+# ---------------------------------------------------------
+# EP: routing
+# ---------------------------------------------------------
+def test_health():
+    status, headers, body = call("/health")
+    assert status == 200
+    assert json.loads(body) == {"status": "ok"}
+
+
+def test_get_products_uses_async_dao(fake_db):
+    async def products(conn, store_id=None):
+        return [{"product_id": 1, "name": "Apple"}]
+
+    fake_db.setattr(asgi, "get_all_products", products)
+
+    status, headers, body = call("/getProducts")
+
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    assert json.loads(body) == [{"product_id": 1, "name": "Apple"}]
+
+
+def test_order_details_passes_integer_id(fake_db):
+    seen = []
+
+    async def details(conn, order_id, store_id=None):
+        seen.append(order_id)
+        return []
+
+    fake_db.setattr(asgi, "get_order_details", details)
+
+    status, _, _ = call("/getOrderDetails/42")
+
+    assert status == 200
+    assert seen == [42]
+
+
+def test_datetimes_encoded_as_iso_like_flask(fake_db):
+    async def orders(conn, start=None, end=None, store_id=None):
+        return [{"datetime": datetime(2025, 1, 1, 10, 0, 0)}]
+
+    fake_db.setattr(asgi, "get_all_orders", orders)
+
+    _, _, body = call("/getOrders")
+
+    assert json.loads(body) == [{"datetime": "2025-01-01T10:00:00"}]
+
+
+def test_get_orders_passes_the_date_range(fake_db):
+    seen = []
+
+    async def orders(conn, start=None, end=None, store_id=None):
+        seen.append((start, end, store_id))
+        return []
+
+    fake_db.setattr(asgi, "get_all_orders", orders)
+
+    status, _, _ = call("/getOrders", query=b"from=2025-01-01&to=2025-01-31")
+
+    assert status == 200
+    assert seen == [(datetime(2025, 1, 1), datetime(2025, 2, 1), 1)]
+
+
+@pytest.mark.parametrize("query", [
+    b"from=yesterday",
+    b"from=2025-02-01&to=2025-01-01",
+    b"from=2025-01-01T00:00:00%2B02:00&to=2025-01-31",     # offset on one bound only
+])
+def test_get_orders_invalid_range_returns_400(fake_db, query):
+    status, _, body = call("/getOrders", query=query)
+
+    assert status == 400
+    assert "Invalid date range" in json.loads(body)["error"]
+
+
+# ---------------------------------------------------------
+# Decision table: errors
+# ---------------------------------------------------------
+@pytest.mark.parametrize("path,method,expected", [
+    ("/unknown", "GET", 404),
+    ("/getOrderDetails/abc", "GET", 404),
+    ("/getProducts", "POST", 405),
+])
+def test_error_statuses(path, method, expected):
+    status, _, _ = call(path, method)
+    assert status == expected
+
+
+def test_database_failure_returns_500(fake_db):
+    async def failing(conn, limit=5, store_id=None):
+        raise RuntimeError("connection lost")
+
+    fake_db.setattr(asgi, "get_recent_orders", failing)
+
+    status, _, body = call("/getRecentOrders")
+
+    assert status == 500
+    assert json.loads(body)["detail"] == "connection lost"
+
+
+# ---------------------------------------------------------
+# Decision table: store scope
+# ---------------------------------------------------------
+def test_store_header_selects_store_and_shard(monkeypatch):
+    monkeypatch.setenv("STORE_SHARDS", "2=db-b:3307")
+    shards, stores = [], []
+
+    async def get_pool(shard=None):
+        shards.append(shard)
+        return FakePool()
+
+    async def products(conn, store_id=None):
+        stores.append(store_id)
+        return []
+
+    monkeypatch.setattr(asgi, "get_pool", get_pool)
+    monkeypatch.setattr(asgi, "get_all_products", products)
+
+    call("/getProducts")
+    call("/getProducts", headers=[(b"x-store-id", b"2")])
+
+    assert stores == [1, 2]
+    assert shards == [None, ("db-b", 3307)]
+
+
+@pytest.mark.parametrize("value", [b"0", b"abc"])
+def test_invalid_store_returns_400(value):
+    status, _, _ = call("/getProducts", headers=[(b"x-store-id", value)])
+    assert status == 400
+
+
+# ---------------------------------------------------------
+# CORS
+# ---------------------------------------------------------
+@pytest.mark.parametrize("origin,allowed", [
+    (b"http://localhost:8000", True),
+    (b"http://evil.example", False),
+])
+def test_cors_origin(origin, allowed):
+    _, headers, _ = call("/health", headers=[(b"origin", origin)])
+    assert (headers.get(b"access-control-allow-origin") == origin) is allowed
+
+
+def test_preflight():
+    status, headers, _ = call("/getProducts", "OPTIONS", [(b"origin", b"http://127.0.0.1:8000")])
+    assert status == 200
+    assert b"GET" in headers[b"access-control-allow-methods"]
+
+
+# ---------------------------------------------------------
+# EP: compression
+# ---------------------------------------------------------
+def test_large_responses_are_compressed(fake_db):
+    import gzip
+
+    async def orders(conn, start=None, end=None, store_id=None):
+        return [{"order_id": i, "customer_name": "Customer"} for i in range(200)]
+
+    fake_db.setattr(asgi, "get_all_orders", orders)
+
+    _, headers, body = call("/getOrders", headers=[(b"accept-encoding", b"gzip")])
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert len(json.loads(gzip.decompress(body))) == 200
+
+
+def test_small_responses_are_not_compressed():
+    _, headers, body = call("/health", headers=[(b"accept-encoding", b"gzip")])
+
+    assert b"content-encoding" not in headers
+    assert json.loads(body) == {"status": "ok"}
+
+
+# ---------------------------------------------------------
+# Decision table: /getOrders matches the Flask app
+# ---------------------------------------------------------
+@pytest.mark.parametrize("query", [
+    "",
+    "from=2024-06-01",
+    "from=2025-01-01&to=2025-01-31",
+    "to=2024-01-01",
+    "from=2025-01-01T10:00:00%2B02:00&to=2025-01-02T00:00:00Z",
+    "from=2025-01-01T10:00:00%2B02:00&to=2025-01-31",
+    "from=2025-02-01&to=2025-01-01",
+])
+def test_get_orders_range_matches_flask_app(fake_db, monkeypatch, query):
+    """Both apps parse the range alike and list the same statement, archive included"""
+    from unittest.mock import MagicMock
+
+    from backend import app as flask_module
+    from backend.dao.order_list_dao import orders_statement
+
+    boundary = datetime(2024, 12, 31, 18, 0)
+    flask_calls, asgi_calls = [], []
+
+    def flask_orders(conn, start=None, end=None, store_id=None):
+        flask_calls.append(orders_statement(boundary, start, end, store_id))
+        return []
+
+    async def asgi_orders(conn, start=None, end=None, store_id=None):
+        asgi_calls.append(orders_statement(boundary, start, end, store_id))
+        return []
+
+    monkeypatch.setattr(flask_module, "get_all_orders", flask_orders)
+    monkeypatch.setattr(flask_module, "read_connection", MagicMock)
+    fake_db.setattr(asgi, "get_all_orders", asgi_orders)
+
+    flask_response = flask_module.app.test_client().get(f"/getOrders?{query}")
+    asgi_status, _, asgi_body = call("/getOrders", query=query.encode())
+
+    assert asgi_status == flask_response.status_code
+    assert json.loads(asgi_body) == flask_response.get_json()
+    assert asgi_calls == flask_calls
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from backend.dao import async_dao
+from backend.dao.order_list_dao import orders_statement
+
+
+# ---------------------------------------------------------
+# Fake aiomysql connection + cursor
+# ---------------------------------------------------------
+class FakeCursor:
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.description = [(c,) for c in columns]
+        self.executed = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows=(), columns=()):
+        self.cursor_obj = FakeCursor(list(rows), columns)
+
+    def cursor(self):
+        return self.cursor_obj
+
+
+@pytest.fixture(autouse=True)
+def archive(monkeypatch):
+    """Empty archive unless a test sets archive.boundary."""
+    class State:
+        boundary = None
+
+    async def boundary(conn, store_id=None):
+        return State.boundary
+    monkeypatch.setattr(async_dao, "archive_boundary", boundary)
+    return State
+
+
+# ---------------------------------------------------------
+# EP: products are mapped like the sync DAO
+# ---------------------------------------------------------
+def test_get_all_products_maps_rows():
+    conn = FakeConnection([(1, "Apple", 1, 2.5, 5.0, 100, "kg")])
+
+    products = asyncio.run(async_dao.get_all_products(conn))
+
+    assert products == [{
+        "product_id": 1,
+        "name": "Apple",
+        "uom_id": 1,
+        "price_per_unit": 2.5,
+        "selling_price": 5.0,
+        "quantity": 100,
+        "uom_name": "kg",
+    }]
+    query, params = conn.cursor_obj.executed[0]
+    assert "INNER JOIN uom" in query
+    assert params is None
+
+
+def test_get_all_orders_builds_dicts_from_description():
+    conn = FakeConnection(
+        [(1, "Alice", 15.0, "2025-01-01")],
+        ["order_id", "customer_name", "total_price", "datetime"]
+    )
+
+    orders = asyncio.run(async_dao.get_all_orders(conn))
+
+    assert orders == [{"order_id": 1, "customer_name": "Alice", "total_price": 15.0, "datetime": "2025-01-01"}]
+    assert "ORDER BY o.datetime DESC" in conn.cursor_obj.executed[0][0]
+
+
+def test_get_recent_orders_passes_limit():
+    conn = FakeConnection([], ["order_id"])
+
+    assert asyncio.run(async_dao.get_recent_orders(conn, limit=3)) == []
+
+    query, params = conn.cursor_obj.executed[0]
+    assert "LIMIT %s" in query
+    assert params == (3,)
+
+
+@pytest.mark.parametrize("limit", [-1, "abc", None])
+def test_get_recent_orders_invalid_limit(limit):
+    """Decision table - same validation as the sync DAO"""
+    with pytest.raises(ValueError):
+        asyncio.run(async_dao.get_recent_orders(FakeConnection(), limit=limit))
+
+
+def test_get_order_details_filters_by_id():
+    conn = FakeConnection([(5, "Apple")], ["order_id", "product_name"])
+
+    rows = asyncio.run(async_dao.get_order_details(conn, 5))
+
+    assert rows == [{"order_id": 5, "product_name": "Apple"}]
+    assert conn.cursor_obj.executed[0][1] == (5,)
+
+
+# ---------------------------------------------------------
+# Decision table: archived orders
+# ---------------------------------------------------------
+@pytest.mark.parametrize("start,end,reads_archive", [
+    (None, None, True),                                  # unbounded listing: everything
+    (datetime(2024, 6, 1), None, True),
+    (datetime(2025, 1, 1), datetime(2025, 2, 1), False),
+    (None, datetime(2024, 1, 1), True),
+])
+def test_get_all_orders_reads_archive_like_the_sync_dao(archive, start, end, reads_archive):
+    archive.boundary = datetime(2024, 12, 31, 18, 0)
+    conn = FakeConnection([], ["order_id"])
+
+    asyncio.run(async_dao.get_all_orders(conn, start, end))
+
+    query, params = conn.cursor_obj.executed[0]
+    assert ("UNION ALL" in query) is reads_archive
+    assert (query, params) == orders_statement(archive.boundary, start, end)
+
+
+def test_get_all_orders_rejects_invalid_range():
+    with pytest.raises(ValueError):
+        asyncio.run(async_dao.get_all_orders(FakeConnection(), datetime(2025, 2, 1), datetime(2025, 1, 1)))
+
+
+def test_get_order_details_falls_back_to_archive(archive):
+    archive.boundary = datetime(2024, 12, 31, 18, 0)
+    conn = FakeConnection([], ["order_id"])
+
+    asyncio.run(async_dao.get_order_details(conn, 5))
+
+    assert [q for q, _ in conn.cursor_obj.executed] == [
+        async_dao.ORDER_DETAILS_QUERY, async_dao.ARCHIVED_ORDER_DETAILS_QUERY,
+    ]
+
+
+# ---------------------------------------------------------
+# EP: store scope
+# ---------------------------------------------------------
+def test_store_scoped_reads_pass_the_store(archive):
+    archive.boundary = datetime(2024, 12, 31, 18, 0)
+    conn = FakeConnection([], ["order_id"])
+
+    asyncio.run(async_dao.get_all_products(conn, store_id=2))
+    asyncio.run(async_dao.get_all_orders(conn, start=datetime(2024, 6, 1), store_id=2))
+    asyncio.run(async_dao.get_order_details(conn, 5, store_id=2))
+
+    assert [params for _, params in conn.cursor_obj.executed] == [
+        (2,), (2, datetime(2024, 6, 1)) * 2, (5, 2), (5, 2),
+    ]
+    assert "p.store_id = %s" in conn.cursor_obj.executed[0][0]
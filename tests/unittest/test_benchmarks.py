@@ -0,0 +1,112 @@
+import io
+import json
+
+import pytest
+
+from tests.benchmarks.cases import BENCHMARKS, SkipBenchmark
+from tests.benchmarks.run import compare, machine_id, main, measure, run_benchmarks
+
+
+def result(median):
+    return {"median": median, "min": median, "loops": 1, "repeat": 1}
+
+
+# ---------------------------------------------------------
+# BVA: regression threshold
+# ---------------------------------------------------------
+@pytest.mark.parametrize("current,regressed", [
+    (0.0100, False),   # unchanged
+    (0.0125, False),   # exactly at the threshold
+    (0.0126, True),    # just above
+    (0.0050, False),   # faster
+])
+def test_compare_threshold(current, regressed):
+    baseline = {"results": {"case": result(0.010)}}
+
+    regressions = compare({"case": result(current)}, baseline, threshold=0.25)
+
+    assert bool(regressions) is regressed
+
+
+def test_cases_missing_from_baseline_are_skipped():
+    assert compare({"new": result(1.0)}, {"results": {}}, 0.25) == []
+
+
+# ---------------------------------------------------------
+# White-box: runner
+# ---------------------------------------------------------
+def test_measure_reports_time_per_call():
+    stats = measure(lambda: sum(range(100)), repeat=3)
+
+    assert stats["repeat"] == 3
+    assert stats["loops"] >= 1
+    assert 0 < stats["min"] <= stats["median"]
+
+
+@pytest.mark.parametrize("name", [
+    "revenue[products=10,days=7]",
+    "spend[orders=1000]",
+    "get_all_products[rows=100]",
+    "products_json[rows=100,provider=app]",
+    "orders_json[rows=100,provider=flask_default]",
+])
+def test_smallest_case_of_each_group_runs(name):
+    factory, params = BENCHMARKS[name]
+    assert factory(**params)() is not None
+
+
+def test_cases_that_cannot_run_are_skipped(monkeypatch):
+    def factory():
+        raise SkipBenchmark("no MySQL connection")
+
+    monkeypatch.setitem(BENCHMARKS, "needs_mysql", (factory, {}))
+    out = io.StringIO()
+
+    assert run_benchmarks(["needs_mysql"], repeat=1, out=out) == {}
+    assert "skipped: no MySQL connection" in out.getvalue()
+
+
+def test_main_saves_and_compares_baseline(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    args = ["-k", "revenue[products=10,days=7]", "--repeat", "1", "--baseline", str(baseline)]
+
+    assert main(args + ["--save-baseline"]) == 0
+    saved = json.loads(baseline.read_text())
+    assert list(saved["results"]) == ["revenue[products=10,days=7]"]
+
+    assert main(args + ["--threshold", "100"]) == 0
+    assert "No regressions" in capsys.readouterr().out
+
+
+# ---------------------------------------------------------
+# Decision table: baselines of other machines
+# ---------------------------------------------------------
+def test_baseline_of_another_machine_is_not_compared(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({
+        "meta": {"machine_id": "elsewhere"},
+        "results": {"revenue[products=10,days=7]": result(1e-9)},
+    }))
+    args = ["-k", "revenue[products=10,days=7]", "--repeat", "1", "--baseline", str(baseline)]
+
+    assert main(args) == 0
+    assert "not comparable" in capsys.readouterr().out
+
+    assert main(args + ["--any-machine"]) == 1
+
+
+def test_machine_id_can_name_a_runner_class(monkeypatch):
+    monkeypatch.setenv("BENCHMARK_MACHINE", "github ubuntu-latest")
+    assert machine_id() == "github-ubuntu-latest"
+
+    monkeypatch.delenv("BENCHMARK_MACHINE")
+    assert "cpu" in machine_id()
+
+
+def test_saved_baseline_notes_the_hardware(tmp_path):
+    baseline = tmp_path / "baselines" / "here.json"
+    main(["-k", "revenue[products=10,days=7]", "--repeat", "1", "--baseline", str(baseline), "--save-baseline"])
+
+    meta = json.loads(baseline.read_text())["meta"]
+    assert meta["machine_id"] == machine_id()
+    assert "GB RAM" in meta["hardware"]
@@ -0,0 +1,249 @@
+import pytest
+from flask import Flask, jsonify
+
+from backend.db import initialize_sql
+from backend.db.dialects import SQLiteDialect
+from backend.services.cache import TieredCache, cache_from_env, store_namespaces
+from backend.services.resp import CacheUnavailable, RespClient
+from backend.services.resp_server import RespServer
+from backend.web import caching
+from backend.web.read_routing import read_only
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+def worker(server, **kwargs):
+    """A TieredCache as one worker process would have it."""
+    return TieredCache(shared=RespClient.from_url(server.url), **kwargs)
+
+
+# ---------------------------------------------------------
+# EP: L1 only
+# ---------------------------------------------------------
+def test_local_cache_hits_until_bumped():
+    cache, load = TieredCache(), Loader()
+
+    assert cache.get_or_load("products:1", load, ["products:1"]) == {"calls": 1}
+    assert cache.get_or_load("products:1", load, ["products:1"]) == {"calls": 1}
+
+    cache.bump("products:1")
+
+    assert cache.get_or_load("products:1", load, ["products:1"]) == {"calls": 2}
+    assert cache.stats()["local_hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_other_namespaces_are_not_invalidated():
+    cache, load = TieredCache(), Loader()
+    cache.get_or_load("products:1", load, ["products:1"])
+
+    cache.bump("products:2", "orders:1")
+
+    cache.get_or_load("products:1", load, ["products:1"])
+    assert load.calls == 1
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache, load = TieredCache(ttl=10, clock=clock), Loader()
+    cache.get_or_load("uom", load)
+
+    clock.now += 10
+
+    cache.get_or_load("uom", load)
+    assert load.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, load = TieredCache(local_max=2), Loader()
+    cache.get_or_load("a", load)
+    cache.get_or_load("b", load)
+    cache.get_or_load("a", load)
+
+    cache.get_or_load("c", load)
+
+    assert cache.stats()["local_entries"] == 2
+    cache.get_or_load("a", load)
+    cache.get_or_load("b", load)
+    assert load.calls == 4
+
+
+@pytest.mark.parametrize("ttl", [0, -1])
+def test_zero_ttl_disables_caching(ttl):
+    cache, load = TieredCache(ttl=ttl), Loader()
+
+    cache.get_or_load("a", load)
+    cache.get_or_load("a", load)
+
+    assert load.calls == 2 and not cache.enabled
+
+
+# ---------------------------------------------------------
+# Decision table: caching is opt-in
+# ---------------------------------------------------------
+@pytest.mark.parametrize("url,ttl,expected", [
+    (None, None, 0),                        # off without a shared tier
+    ("redis://cache:6379/0", None, 300),
+    (None, "60", 60),                       # per-process cache, asked for
+    ("redis://cache:6379/0", "0", 0),
+])
+def test_cache_from_env(monkeypatch, url, ttl, expected):
+    for name, value in [("CACHE_URL", url), ("CACHE_TTL_SECONDS", ttl)]:
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+
+    cache = cache_from_env()
+
+    assert cache.ttl == expected
+    assert (cache.shared is not None) is (url is not None)
+
+
+# ---------------------------------------------------------
+# Decision table: two workers sharing L2
+# ---------------------------------------------------------
+def test_value_built_by_one_worker_is_served_to_another(server):
+    first, second, load = worker(server), worker(server), Loader()
+
+    first.get_or_load("products:1", load, ["products:1"])
+    value = second.get_or_load("products:1", load, ["products:1"])
+
+    assert value == {"calls": 1} and load.calls == 1
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_bump_in_one_worker_invalidates_the_others(server):
+    first, second, load = worker(server), worker(server), Loader()
+    first.get_or_load("products:1", load, ["products:1"])
+    second.get_or_load("products:1", load, ["products:1"])
+
+    second.bump("products:1")
+
+    assert first.get_or_load("products:1", load, ["products:1"]) == {"calls": 2}
+    assert second.get_or_load("products:1", load, ["products:1"]) == {"calls": 2}
+
+
+def test_values_that_are_not_json_stay_local(server):
+    first, second = worker(server), worker(server)
+
+    first.get_or_load("odd", lambda: {1, 2})
+    value = second.get_or_load("odd", lambda: "rebuilt")
+
+    assert value == "rebuilt"
+
+
+def test_unreachable_shared_tier_is_bypassed(server):
+    clock = FakeClock()
+    cache, load = worker(server, clock=clock, retry_after=5), Loader()
+    cache.get_or_load("a", load, ["products:1"])
+    server.stop()
+
+    # Versions cannot be checked, so L1 is not trusted either
+    assert cache.get_or_load("a", load, ["products:1"]) == {"calls": 2}
+    assert cache.get_or_load("a", load, ["products:1"]) == {"calls": 3}
+    cache.bump("products:1")   # kept until the tier is back
+    assert cache.stats()["bypassed"] == 2 and cache.stats()["local_entries"] == 0
+
+
+def test_bump_during_an_outage_is_published_on_recovery(server, monkeypatch):
+    clock = FakeClock()
+    first, load = worker(server, clock=clock, retry_after=5), Loader()
+    second = worker(server)
+    second.get_or_load("a", load, ["products:1"])
+    monkeypatch.setattr(first.shared, "pipeline", lambda commands: (_ for _ in ()).throw(CacheUnavailable("down")))
+
+    first.bump("products:1")
+    first.bump("orders:1")      # within retry_after: not even tried
+    monkeypatch.undo()
+    clock.now += 5
+
+    # The next lookup of the recovered worker publishes both bumps first
+    first.get_or_load("b", Loader(), ["orders:1"])
+    assert second.versions(["products:1", "orders:1"]) == (1, 1)
+    assert second.get_or_load("a", load, ["products:1"]) == {"calls": 2}
+
+
+def test_error_reply_to_a_bump_is_not_raised(server, caplog):
+    cache = worker(server)
+    RespClient.from_url(server.url).set("gsm:v:products:1", "not a number")
+
+    cache.bump("products:1", "orders:1")
+
+    assert "Shared cache unavailable" in caplog.text
+    assert cache.get_or_load("a", Loader(), ["products:1"]) == {"calls": 1}
+    assert cache.stats()["bypassed"] == 1
+
+
+# ---------------------------------------------------------
+# White-box: writes publish a change for their store
+# ---------------------------------------------------------
+@pytest.fixture
+def app(monkeypatch):
+    cache = TieredCache()
+    monkeypatch.setattr(caching, "shared_cache", cache)
+
+    app = Flask(__name__)
+
+    @app.route("/write", methods=["POST"])
+    def write():
+        return jsonify({}), 200
+
+    @app.route("/failed", methods=["POST"])
+    def failed():
+        return jsonify({}), 400
+
+    @app.route("/calc", methods=["POST"])
+    @read_only
+    def calc():
+        return jsonify({}), 200
+
+    caching.init_caching(app)
+    app.cache = cache
+    return app
+
+
+@pytest.mark.parametrize("path,bumped", [
+    ("/write", True),
+    ("/failed", False),
+    ("/calc", False),
+])
+def test_successful_writes_bump_the_store(app, path, bumped):
+    app.test_client().post(path, headers={"X-Store-Id": "1"})
+
+    assert app.cache.versions(caching.store_namespaces(1)) == ((1, 1) if bumped else (0, 0))
+
+
+def test_reseeding_publishes_a_change_for_every_store(monkeypatch):
+    cache = TieredCache()
+    monkeypatch.setattr(initialize_sql, "shared_cache", cache)
+    dialect = SQLiteDialect(":memory:")
+    conn = dialect.connect()
+    conn.cursor().execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    conn.cursor().execute("INSERT INTO products (name, uom_id, price_per_unit, store_id) VALUES ('Pear', 1, 1, 3)")
+
+    initialize_sql.provision(conn, dialect)
+    conn.close()
+
+    assert cache.versions(store_namespaces(1) + store_namespaces(3) + ("uom",)) == (1, 1, 1, 1, 1)
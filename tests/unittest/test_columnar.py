@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import msgpack
+import pytest
+from flask import Flask
+
+from backend.web import columnar
+from backend.web.columnar import UnsupportedFormat, columnar_response, listing_format
+from backend.web.json_provider import FastJSONProvider
+
+COLUMNS = ["order_id", "customer_name", "datetime"]
+ROWS = [(1, "Alice", datetime(2025, 1, 1, 10, 0)), (2, "Bob", datetime(2025, 1, 2, 9, 30))]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+# ---------------------------------------------------------
+# Decision table: format negotiation
+# ---------------------------------------------------------
+@pytest.mark.parametrize("query,accept,expected", [
+    ("", None, None),
+    ("?format=json", None, None),
+    ("?format=columnar", None, "columnar"),
+    ("?format=msgpack", None, "msgpack"),
+    ("", "application/msgpack", "msgpack"),
+    ("", "application/x-msgpack, application/json;q=0.5", "msgpack"),
+    ("", "application/json, application/msgpack;q=0.5", None),
+    ("", "*/*", None),
+    ("?format=columnar", "application/msgpack", "columnar"),   # explicit query wins
+])
+def test_listing_format(app, query, accept, expected):
+    headers = {"Accept": accept} if accept else {}
+    with app.test_request_context(f"/getOrders{query}", headers=headers):
+        assert listing_format() == expected
+
+
+def test_unknown_format_is_rejected(app):
+    with app.test_request_context("/getOrders?format=xml"):
+        with pytest.raises(UnsupportedFormat):
+            listing_format()
+
+
+def test_msgpack_unavailable(app, monkeypatch):
+    monkeypatch.setattr(columnar, "msgpack", None)
+
+    with app.test_request_context("/getOrders", headers={"Accept": "application/msgpack"}):
+        assert listing_format() is None
+    with app.test_request_context("/getOrders?format=msgpack"):
+        with pytest.raises(UnsupportedFormat):
+            listing_format()
+
+
+# ---------------------------------------------------------
+# EP: response bodies
+# ---------------------------------------------------------
+def test_columnar_json(app):
+    with app.test_request_context("/getOrders?format=columnar"):
+        response = columnar_response(COLUMNS, ROWS, "columnar")
+
+    assert response.mimetype == "application/json"
+    assert "Accept" in response.headers["Vary"]
+    assert response.get_json() == {
+        "columns": COLUMNS,
+        "rows": [[1, "Alice", "2025-01-01T10:00:00"], [2, "Bob", "2025-01-02T09:30:00"]],
+    }
+
+
+def test_msgpack(app):
+    with app.test_request_context("/getOrders?format=msgpack"):
+        response = columnar_response(COLUMNS, ROWS, "msgpack")
+
+    assert response.mimetype == "application/msgpack"
+    body = msgpack.unpackb(response.get_data())
+    assert body["columns"] == COLUMNS
+    assert body["rows"][1] == [2, "Bob", "2025-01-02T09:30:00"]
+
+
+def test_columnar_is_smaller_than_objects(app):
+    rows = [(i, f"Customer {i}", datetime(2025, 1, 1)) for i in range(100)]
+    objects = [dict(zip(COLUMNS, row)) for row in rows]
+
+    with app.test_request_context("/"):
+        as_objects = app.json.response(objects).get_data()
+        as_columns = columnar_response(COLUMNS, rows, "columnar").get_data()
+        as_msgpack = columnar_response(COLUMNS, rows, "msgpack").get_data()
+
+    assert len(as_msgpack) < len(as_columns) < len(as_objects)
@@ -0,0 +1,145 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from flask import Flask, Response, jsonify
+
+from backend.web import compression
+from backend.web.compression import compress, compress_stream, init_compression, negotiate
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route("/big")
+    def big():
+        return jsonify([{"product_id": i, "name": f"Product {i}"} for i in range(200)])
+
+    @app.route("/small")
+    def small():
+        return jsonify({"status": "ok"})
+
+    @app.route("/stream")
+    def stream():
+        return Response((f'{{"row": {i}}}\n' for i in range(100)), mimetype="application/json")
+
+    @app.route("/binary")
+    def binary():
+        return Response(b"\x00" * 5000, mimetype="application/octet-stream")
+
+    return app.test_client()
+
+
+def decode(response):
+    data = response.get_data()
+    encoding = response.headers.get("Content-Encoding")
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    return data
+
+
+# ---------------------------------------------------------
+# Decision table: negotiation
+# ---------------------------------------------------------
+@pytest.mark.parametrize("header,expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("identity", None),
+    ("*", "br"),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate("br, gzip") == "gzip"
+    assert negotiate("br") is None
+
+
+# ---------------------------------------------------------
+# White-box: codecs
+# ---------------------------------------------------------
+@pytest.mark.parametrize("encoding,decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_round_trip(encoding, decompress):
+    data = b'{"a": 1}' * 500
+    assert decompress(compress(data, encoding)) == data
+
+
+@pytest.mark.parametrize("encoding,decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_stream_round_trip(encoding, decompress):
+    chunks = [b"first,", "second,", b"third"]
+    assert decompress(b"".join(compress_stream(chunks, encoding))) == b"first,second,third"
+
+
+def test_gzip_level_is_configurable(monkeypatch):
+    data = json.dumps([{"n": i, "v": str(i) * 3} for i in range(2000)]).encode()
+
+    monkeypatch.setenv("COMPRESS_GZIP_LEVEL", "1")
+    fast = compress(data, "gzip")
+    monkeypatch.setenv("COMPRESS_GZIP_LEVEL", "9")
+    small = compress(data, "gzip")
+
+    assert len(small) < len(fast)
+
+
+# ---------------------------------------------------------
+# EP / BVA: Flask responses
+# ---------------------------------------------------------
+@pytest.mark.parametrize("accept", ["gzip", "br"])
+def test_large_json_is_compressed(client, accept):
+    response = client.get("/big", headers={"Accept-Encoding": accept})
+
+    assert response.headers["Content-Encoding"] == accept
+    assert int(response.headers["Content-Length"]) == len(response.get_data())
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(json.loads(decode(response))) == 200
+
+
+def test_without_accept_encoding_nothing_changes(client):
+    response = client.get("/big")
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.get_json()) == 200
+
+
+def test_small_body_is_not_compressed(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_min_bytes_is_configurable(client, monkeypatch):
+    monkeypatch.setenv("COMPRESS_MIN_BYTES", "1")
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_streamed_response_is_compressed_incrementally(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert decode(response).count(b"\n") == 100
+
+
+def test_non_compressible_type_is_left_alone(client):
+    response = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert "Vary" not in response.headers
+
+
+def test_disabled(client, monkeypatch):
+    monkeypatch.setenv("COMPRESS_ENABLED", "0")
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
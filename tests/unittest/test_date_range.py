@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pytest
+
+from backend.web.date_range import parse_date_range
+
+
+# ---------------------------------------------------------
+# EP: accepted ranges
+# ---------------------------------------------------------
+@pytest.mark.parametrize("values,expected", [
+    ({}, (None, None)),
+    ({"from": "2025-01-01"}, (datetime(2025, 1, 1), None)),
+    ({"to": "2025-01-31"}, (None, datetime(2025, 2, 1))),                    # whole last day
+    ({"from": "2025-01-01T08:30", "to": "2025-01-01T09:00"},
+     (datetime(2025, 1, 1, 8, 30), datetime(2025, 1, 1, 9, 0))),
+    ({"from": "", "to": ""}, (None, None)),
+])
+def test_naive_values(values, expected):
+    assert parse_date_range(values) == expected
+
+
+def test_offsets_are_converted_to_utc():
+    start, end = parse_date_range({"from": "2025-01-01T10:00:00+02:00", "to": "2025-01-01T12:00:00Z"})
+
+    assert (start, end) == (datetime(2025, 1, 1, 8, 0), datetime(2025, 1, 1, 12, 0))
+    assert start.tzinfo is None and end.tzinfo is None
+
+
+# ---------------------------------------------------------
+# Decision table: rejected ranges
+# ---------------------------------------------------------
+@pytest.mark.parametrize("values", [
+    {"from": "2025-01-01T00:00:00+02:00", "to": "2025-01-31"},    # offset on one bound only
+    {"from": "2025-01-01", "to": "2025-01-31T00:00:00Z"},
+    {"from": "2025-02-01", "to": "2025-01-01"},
+    {"from": "2025-01-01T10:00:00+00:00", "to": "2025-01-01T11:00:00+02:00"},  # BVA: after UTC, from >= to
+    {"from": "yesterday"},
+])
+def test_invalid_ranges_raise(values):
+    with pytest.raises(ValueError):
+        parse_date_range(values)
@@ -0,0 +1,248 @@
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+
+from backend.dao.demand_stats_dao import refresh_demand_stats, rebuild_demand_stats
+from backend.services.revenue_calculator import calculate_revenue_and_profit
+
+
+# ---------------------------------------------------------
+# Mock connection: fetchall = watermark (before and under the lock),
+# existing stats, daily sales
+# ---------------------------------------------------------
+def mock_connection(stats_rows, daily_rows):
+    conn = MagicMock()
+    cursor = MagicMock()
+    conn.cursor.return_value = cursor
+    watermark = min((row[4] for row in stats_rows), default=None)
+    cursor.fetchall.side_effect = [[(watermark,)], [(watermark,)], stats_rows, daily_rows]
+    return conn, cursor
+
+
+def written_rows(cursor):
+    sql, rows = cursor.executemany.call_args.args
+    assert "REPLACE INTO product_demand_stats" in sql
+    return {row[0]: row for row in rows}
+
+
+# ---------------------------------------------------------
+# EP: first refresh builds stats from full history
+# ---------------------------------------------------------
+def test_first_refresh_scans_full_history():
+    conn, cursor = mock_connection([], [
+        (1, date(2025, 1, 1), 4),
+        (1, date(2025, 1, 3), 8),
+    ])
+
+    count = refresh_demand_stats(conn, through=date(2025, 1, 4))
+
+    assert count == 1
+    sql, params = cursor.execute.call_args.args
+    assert "GROUP BY product_id, sale_date" in sql and "orders_archive" in sql
+    assert params == (date(2025, 1, 5),) * 2   # no lower bound on first run
+
+    row = written_rows(cursor)[1]
+    # 4 days observed (Jan 1-4), two of them without sales
+    assert row[1] == 4
+    assert row[2] == 12
+    assert row[3] == 80
+    assert row[4] == 3                      # mean
+    assert row[5] == pytest.approx(11.0)    # 80/4 - 3^2
+    assert row[6] == date(2025, 1, 4)
+    conn.commit.assert_called_once()
+
+
+# ---------------------------------------------------------
+# EP: incremental refresh only scans after the watermark
+# ---------------------------------------------------------
+def test_incremental_refresh_adds_new_days():
+    conn, cursor = mock_connection(
+        [(1, 4, 12.0, 80.0, date(2025, 1, 4))],
+        [(1, date(2025, 1, 6), 6)]
+    )
+
+    refresh_demand_stats(conn, through=date(2025, 1, 6))
+
+    sql, params = cursor.execute.call_args.args
+    assert "o.datetime >= %s" in sql
+    assert params == (date(2025, 1, 7), date(2025, 1, 5)) * 2
+
+    row = written_rows(cursor)[1]
+    assert row[1] == 6          # Jan 5 (no sales) + Jan 6
+    assert row[2] == 18
+    assert row[3] == 116
+
+
+def test_existing_product_without_new_sales_counts_zero_days():
+    """EP - days without sales lower the mean"""
+    conn, cursor = mock_connection(
+        [(1, 2, 10.0, 50.0, date(2025, 1, 2))],
+        []
+    )
+
+    refresh_demand_stats(conn, through=date(2025, 1, 4))
+
+    row = written_rows(cursor)[1]
+    assert row[1] == 4
+    assert row[4] == 2.5
+
+
+# ---------------------------------------------------------
+# BVA: watermark already at the target day = no scan
+# ---------------------------------------------------------
+def test_refresh_is_noop_when_up_to_date():
+    conn, cursor = mock_connection(
+        [(1, 4, 12.0, 80.0, date(2025, 1, 4))],
+        []
+    )
+
+    count = refresh_demand_stats(conn, through=date(2025, 1, 4))
+
+    assert count == 0
+    cursor.execute.assert_called_once()     # only the watermark read
+    cursor.executemany.assert_not_called()
+    conn.commit.assert_not_called()
+
+
+def test_refresh_with_no_history_writes_nothing():
+    conn, cursor = mock_connection([], [])
+
+    assert refresh_demand_stats(conn, through=date(2025, 1, 4)) == 0
+    cursor.executemany.assert_not_called()
+
+
+# ---------------------------------------------------------
+# Decision table: simulation uses learned demand when present
+# ---------------------------------------------------------
+@pytest.mark.parametrize("mean,std,expected_daily", [
+    (0.0, 0.0, 0),      # learned: never sells
+    (3.0, 0.0, 3),      # learned: exactly 3 per day
+    (None, None, None), # no stats: default model
+])
+def test_simulation_uses_learned_demand(mean, std, expected_daily):
+    products = [{
+        "name": "Milk",
+        "quantity": 1000,
+        "price_per_unit": 1.0,
+        "selling_price": 2.0,
+        "demand_mean": mean,
+        "demand_std": std,
+    }]
+
+    result = calculate_revenue_and_profit(products, days=10, seed=1)
+    sold = result["details"][0]["sold_units"]
+
+    if expected_daily is None:
+        assert 0 <= sold <= 1000
+    else:
+        assert sold == expected_daily * 10
+
+
+# ---------------------------------------------------------
+# White-box: archived orders stay part of the history
+# ---------------------------------------------------------
+def test_rebuild_after_archiving_keeps_history():
+    from datetime import datetime
+    from backend.db.dialects import SQLiteDialect
+    from backend.services.order_archiver import archive_orders_before
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    cursor.execute("INSERT INTO products (name, uom_id, price_per_unit) VALUES ('Apple', 1, 1.0)")
+    for day, units in [(1, 4), (3, 8)]:
+        cursor.execute(
+            "INSERT INTO orders (customer_name, total_price, datetime) VALUES ('x', 1.0, %s)",
+            (datetime(2025, 1, day, 12),),
+        )
+        cursor.execute(
+            "INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES (%s, 1, %s, 1.0)",
+            (cursor.lastrowid, units),
+        )
+    conn.commit()
+    archive_orders_before(conn, datetime(2025, 1, 2))
+
+    rebuild_demand_stats(conn, through=date(2025, 1, 4))
+
+    cursor.execute("SELECT days_observed, units_sum FROM product_demand_stats")
+    assert cursor.fetchone() == (4, 12)
+    # The MIN() watermark read as text by SQLite still ends the refresh early
+    assert refresh_demand_stats(conn, through=date(2025, 1, 4)) == 0
+    conn.close()
+
+
+# ---------------------------------------------------------
+# White-box: writers of the statistics
+# ---------------------------------------------------------
+def sqlite_history(sales):
+    """Connection to an in-memory database with Apple sales [(day of Jan 2025, units), ...]."""
+    from datetime import datetime
+    from backend.db.dialects import SQLiteDialect
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    cursor.execute("INSERT INTO products (name, uom_id, price_per_unit) VALUES ('Apple', 1, 1.0)")
+    order_ids = []
+    for day, units in sales:
+        cursor.execute(
+            "INSERT INTO orders (customer_name, total_price, datetime) VALUES ('x', 1.0, %s)",
+            (datetime(2025, 1, day, 12),),
+        )
+        order_ids.append(cursor.lastrowid)
+        cursor.execute(
+            "INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES (%s, 1, %s, 1.0)",
+            (cursor.lastrowid, units),
+        )
+    conn.commit()
+    return conn, order_ids
+
+
+def stats_of(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT days_observed, units_sum, units_sq_sum FROM product_demand_stats")
+    return cursor.fetchone()
+
+
+def test_failed_rebuild_keeps_the_old_stats(monkeypatch):
+    from backend.dao import demand_stats_dao
+
+    conn, _ = sqlite_history([(1, 4), (3, 8)])
+    refresh_demand_stats(conn, through=date(2025, 1, 4))
+    monkeypatch.setattr(demand_stats_dao, "daily_sales_query", lambda lower_bound: "SELECT broken FROM")
+
+    with pytest.raises(Exception):
+        rebuild_demand_stats(conn, through=date(2025, 1, 4))
+
+    # Delete and recompute are one transaction
+    assert stats_of(conn) == (4, 12, 80)
+    conn.close()
+
+
+def test_deleted_orders_are_subtracted():
+    from backend.dao.order_dao import delete_orders
+
+    # Jan 3 has two orders (8 + 2 units), Jan 5 is not folded in yet
+    conn, order_ids = sqlite_history([(1, 4), (3, 8), (3, 2), (5, 6)])
+    refresh_demand_stats(conn, through=date(2025, 1, 4))
+    assert stats_of(conn) == (4, 14, 116)
+
+    delete_orders(conn, [order_ids[1], order_ids[3]])
+
+    # Same as recomputing from the remaining orders
+    assert stats_of(conn) == (4, 6, 20)
+    rebuild_demand_stats(conn, through=date(2025, 1, 4))
+    assert stats_of(conn) == (4, 6, 20)
+    conn.close()
+
+
+def test_stats_lock_row_is_created_on_first_use():
+    conn, _ = sqlite_history([(1, 4)])
+    cursor = conn.cursor()
+
+    for _ in range(2):
+        rebuild_demand_stats(conn, through=date(2025, 1, 4))
+
+    cursor.execute("SELECT lock_id, generation FROM demand_stats_lock")
+    assert cursor.fetchall() == [(1, 2)]
+    conn.close()
@@ -0,0 +1,286 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from backend.dao.order_dao import add_order
+from backend.dao.order_details_dao import get_order_details
+from backend.dao.products_dao import get_all_products, insert_new_product
+from backend.dao.uom_dao import get_all_uoms
+from backend.db import dialects
+from backend.db.dialects import MySQLDialect, SQLiteDialect, get_dialect, translate_sql
+from backend.db.schema import clear_tables
+
+
+@pytest.fixture(params=["memory", "file"])
+def sqlite(request, tmp_path):
+    path = ":memory:" if request.param == "memory" else str(tmp_path / "gsm.db")
+    dialect = SQLiteDialect(path)
+    conn = dialect.connect()
+    conn.cursor().execute("INSERT INTO uom (uom_name) VALUES (%s)", ("kg",))
+    yield dialect, conn
+    conn.close()
+
+
+# ---------------------------------------------------------
+# EP: placeholder translation
+# ---------------------------------------------------------
+@pytest.mark.parametrize("sql,expected", [
+    ("SELECT * FROM t WHERE a = %s AND b = %s", "SELECT * FROM t WHERE a = ? AND b = ?"),
+    ("INSERT INTO t VALUES (%(id)s, %(name)s)", "INSERT INTO t VALUES (:id, :name)"),
+    ("SELECT * FROM t WHERE name LIKE 'A%%' AND id = %s", "SELECT * FROM t WHERE name LIKE 'A%' AND id = ?"),
+    ("SELECT 1", "SELECT 1"),
+])
+def test_translate_sql(sql, expected):
+    assert translate_sql(sql) == expected
+
+
+# ---------------------------------------------------------
+# White-box: DAOs on SQLite
+# ---------------------------------------------------------
+def test_dao_round_trip(sqlite):
+    dialect, conn = sqlite
+
+    product_id = insert_new_product(conn, {"name": "Apple", "uom_id": 1, "price_per_unit": 1.5, "quantity": 10})
+    order_id = add_order(conn, {
+        "customer_name": "Ann",
+        "total_price": 6.0,
+        "order_details": [{"product_id": product_id, "quantity": 2, "total_price": 6.0}],
+    })
+
+    [product] = get_all_products(conn)
+    assert product["quantity"] == 8
+    assert product["uom_name"] == "kg"
+
+    [detail] = get_order_details(conn, order_id)
+    assert detail["product_name"] == "Apple"
+    assert isinstance(detail["datetime"], datetime)
+
+
+def test_connections_share_the_database(sqlite):
+    dialect, conn = sqlite
+
+    other = dialect.connect()
+    assert get_all_uoms(other) == [{"uom_id": 1, "uom_name": "kg"}]
+    other.close()
+
+
+def test_date_columns_are_converted(sqlite):
+    dialect, conn = sqlite
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute(
+        "INSERT INTO product_demand_stats VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        (1, 7, 14.0, 30.0, 2.0, 0.3, date(2025, 1, 7)),
+    )
+    cursor.execute("SELECT updated_through FROM product_demand_stats")
+    assert cursor.fetchone() == {"updated_through": date(2025, 1, 7)}
+
+
+def test_foreign_keys_are_enforced(sqlite):
+    dialect, conn = sqlite
+
+    with pytest.raises(Exception):
+        conn.cursor().execute(
+            "INSERT INTO products (name, uom_id, price_per_unit) VALUES (%s, %s, %s)", ("X", 99, 1.0)
+        )
+
+
+def test_clear_tables_restarts_ids(sqlite):
+    dialect, conn = sqlite
+    cursor = conn.cursor()
+
+    clear_tables(cursor, dialect)
+    cursor.execute("INSERT INTO uom (uom_name) VALUES (%s)", ("each",))
+
+    assert cursor.lastrowid == 1
+
+
+# ---------------------------------------------------------
+# Decision table: dialect selection
+# ---------------------------------------------------------
+@pytest.mark.parametrize("backend,expected", [("mysql", "mysql"), ("SQLite", "sqlite"), (None, "mysql")])
+def test_get_dialect(monkeypatch, backend, expected):
+    monkeypatch.setattr(dialects, "_dialect", None)
+    if backend is None:
+        monkeypatch.delenv("DB_BACKEND", raising=False)
+    else:
+        monkeypatch.setenv("DB_BACKEND", backend)
+
+    assert get_dialect().name == expected
+    assert get_dialect() is get_dialect()
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(dialects, "_dialect", None)
+    monkeypatch.setenv("DB_BACKEND", "oracle")
+
+    with pytest.raises(ValueError):
+        get_dialect()
+
+
+def test_mysql_requires_credentials(monkeypatch):
+    monkeypatch.delenv("MYSQL_USER", raising=False)
+
+    with pytest.raises(ValueError):
+        dialects.MySQLDialect().connect()
+
+
+# ---------------------------------------------------------
+# Decision table: MySQL connection pool
+# ---------------------------------------------------------
+@pytest.fixture
+def mysql_env(monkeypatch):
+    monkeypatch.setenv("MYSQL_USER", "gsm")
+    monkeypatch.setenv("MYSQL_PASSWORD", "secret")
+    monkeypatch.setenv("MYSQL_DB", "gsm")
+    return monkeypatch
+
+
+def test_mysql_connections_come_from_one_pool(mysql_env):
+    from mysql.connector import pooling
+
+    created = []
+
+    class FakePool:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+        def get_connection(self):
+            return "pooled"
+
+    mysql_env.setattr(pooling, "MySQLConnectionPool", FakePool)
+    dialect = dialects.MySQLDialect()
+
+    assert dialect.connect() == "pooled"
+    assert dialect.connect() == "pooled"
+    assert len(created) == 1
+    assert created[0]["pool_size"] == 10
+    # Prepared statements must survive the connection going back to the pool
+    assert created[0]["pool_reset_session"] is False
+
+
+def test_mysql_exhausted_pool_opens_a_plain_connection(mysql_env):
+    import mysql.connector
+    from mysql.connector import pooling
+    from mysql.connector.errors import PoolError
+
+    class ExhaustedPool:
+        def __init__(self, **kwargs):
+            pass
+
+        def get_connection(self):
+            raise PoolError("Failed getting connection; pool exhausted")
+
+    mysql_env.setattr(pooling, "MySQLConnectionPool", ExhaustedPool)
+    mysql_env.setattr(mysql.connector, "connect", lambda **kwargs: ("direct", kwargs["database"]))
+
+    assert dialects.MySQLDialect().connect() == ("direct", "gsm")
+
+
+def test_mysql_pool_size_zero_disables_pooling(mysql_env):
+    import mysql.connector
+    from mysql.connector import pooling
+
+    mysql_env.setenv("MYSQL_POOL_SIZE", "0")
+    mysql_env.setattr(pooling, "MySQLConnectionPool", None)
+    mysql_env.setattr(mysql.connector, "connect", lambda **kwargs: "direct")
+
+    assert dialects.MySQLDialect().connect() == "direct"
+
+
+# ---------------------------------------------------------
+# Decision table: read replicas
+# ---------------------------------------------------------
+@pytest.fixture
+def replica_pools(mysql_env):
+    """Fake pools that hand out their host; hosts in `down` refuse connections."""
+    from mysql.connector import pooling
+    from mysql.connector.errors import InterfaceError
+
+    state = {"down": set(), "created": []}
+
+    class FakePool:
+        def __init__(self, **kwargs):
+            if kwargs["host"] in state["down"]:
+                raise InterfaceError("Can't connect to MySQL server")
+            self.host = kwargs["host"]
+            state["created"].append(kwargs["pool_name"])
+
+        def get_connection(self):
+            return self.host
+
+    mysql_env.setattr(pooling, "MySQLConnectionPool", FakePool)
+    mysql_env.setenv("MYSQL_REPLICA_HOSTS", "replica-a, replica-b:3307")
+    return state
+
+
+def test_replica_hosts(monkeypatch):
+    monkeypatch.setenv("MYSQL_REPLICA_HOSTS", "a, b:3307,,")
+
+    assert dialects.replica_hosts() == [("a", 3306), ("b", 3307)]
+
+
+def test_replicas_are_used_round_robin(replica_pools):
+    dialect = dialects.MySQLDialect()
+
+    assert [dialect.connect_replica() for _ in range(3)] == ["replica-a", "replica-b", "replica-a"]
+    assert dialect.connect() == "127.0.0.1"
+    assert len(replica_pools["created"]) == 3          # one pool per host
+
+
+def test_unreachable_replica_is_skipped(replica_pools):
+    replica_pools["down"].add("replica-a")
+    dialect = dialects.MySQLDialect()
+
+    assert [dialect.connect_replica() for _ in range(2)] == ["replica-b", "replica-b"]
+
+
+def test_reads_fall_back_to_the_primary(replica_pools):
+    replica_pools["down"].update({"replica-a", "replica-b"})
+
+    assert dialects.MySQLDialect().connect_replica() == "127.0.0.1"
+
+
+def test_without_replicas_reads_use_the_primary(replica_pools, monkeypatch):
+    monkeypatch.delenv("MYSQL_REPLICA_HOSTS")
+
+    assert dialects.MySQLDialect().connect_replica() == "127.0.0.1"
+
+
+def test_added_column_is_created_on_old_tables():
+    """White-box: a products table from before reorder_threshold gets the column"""
+    dialect = SQLiteDialect(":memory:")
+    target, uri = dialect._target()
+    raw = sqlite3.connect(target, uri=uri)
+    raw.execute("CREATE TABLE uom (uom_id INTEGER PRIMARY KEY AUTOINCREMENT, uom_name VARCHAR(45) NOT NULL)")
+    raw.execute("""
+        CREATE TABLE products (
+            product_id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR(100) NOT NULL, uom_id INT NOT NULL,
+            price_per_unit DOUBLE NOT NULL, selling_price DOUBLE NOT NULL DEFAULT 0, quantity INT NOT NULL DEFAULT 0
+        )
+    """)
+    raw.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    raw.execute("INSERT INTO products (name, uom_id, price_per_unit) VALUES ('Apple', 1, 1.0)")
+    raw.commit()
+
+    conn = dialect.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT reorder_threshold FROM products")
+
+    assert cursor.fetchall() == [(0,)]
+    conn.close()
+    raw.close()
+
+
+@pytest.mark.parametrize("existing,altered", [(0, True), (1, False)])
+def test_mysql_adds_missing_column_only(existing, altered):
+    from unittest.mock import MagicMock
+
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (existing,)
+
+    MySQLDialect().add_column(cursor, "products", "reorder_threshold", "INT NOT NULL DEFAULT 0")
+
+    statements = [c.args[0] for c in cursor.execute.call_args_list]
+    assert any(s.startswith("ALTER TABLE products ADD COLUMN reorder_threshold") for s in statements) is altered
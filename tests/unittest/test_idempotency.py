@@ -0,0 +1,218 @@
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask, jsonify, request
+
+from backend.db.dialects import SQLiteDialect
+from backend.db.instrumented import InstrumentedConnection
+from backend.web import idempotency
+from backend.web.idempotency import complete_later, idempotent
+
+
+@pytest.fixture
+def db(monkeypatch):
+    dialect = SQLiteDialect(":memory:")
+    anchor = dialect.connect()
+    monkeypatch.setattr(idempotency, "get_sql_connection", lambda: InstrumentedConnection(dialect.connect()))
+    monkeypatch.setattr(idempotency, "_last_purge", 0.0)
+
+    def query(sql, params=()):
+        return anchor.cursor().execute(sql, params).fetchall()
+    query.execute = lambda sql, params=(): anchor.cursor().execute(sql, params)
+    yield query
+    anchor.close()
+
+
+@pytest.fixture
+def app(db):
+    app = Flask(__name__)
+    app.calls = []
+    app.pending = {}
+
+    @app.route("/write", methods=["POST"])
+    @idempotent
+    def write():
+        app.calls.append(request.get_json())
+        status = request.get_json().get("status", 200)
+        return jsonify({"call": len(app.calls)}), status
+
+    @app.route("/boom", methods=["POST"])
+    @idempotent
+    def boom():
+        app.calls.append(1)
+        raise RuntimeError("write failed")
+
+    @app.route("/slow", methods=["POST"])
+    @idempotent
+    def slow():
+        future = Future()
+        app.pending["future"] = future
+        complete_later(future, lambda f: (200, {"order_id": f.result()}))
+        return jsonify({"error": "timeout"}), 504
+
+    return app
+
+
+def post(client, path="/write", key="key-1", body=None):
+    headers = {"Idempotency-Key": key} if key is not None else {}
+    return client.post(path, json=body or {}, headers=headers)
+
+
+# ---------------------------------------------------------
+# EP: first request runs, retries are replayed
+# ---------------------------------------------------------
+def test_retry_is_answered_from_the_stored_response(app):
+    client = app.test_client()
+
+    first = post(client)
+    retry = post(client)
+
+    assert first.get_json() == retry.get_json() == {"call": 1}
+    assert retry.status_code == first.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(app.calls) == 1
+
+
+def test_client_errors_are_replayed(app):
+    client = app.test_client()
+
+    post(client, body={"status": 400})
+    retry = post(client, body={"status": 400})
+
+    assert retry.status_code == 400
+    assert len(app.calls) == 1
+
+
+def test_requests_without_key_always_run(app):
+    client = app.test_client()
+
+    post(client, key=None)
+    post(client, key=None)
+
+    assert len(app.calls) == 2
+
+
+def test_different_keys_run_separately(app):
+    client = app.test_client()
+
+    post(client, key="a")
+    post(client, key="b")
+
+    assert len(app.calls) == 2
+
+
+# ---------------------------------------------------------
+# Decision table: key states
+# ---------------------------------------------------------
+def test_key_reused_for_other_request_is_rejected(app):
+    client = app.test_client()
+
+    post(client, body={"customer": "A"})
+    response = post(client, body={"customer": "B"})
+
+    assert response.status_code == 422
+    assert len(app.calls) == 1
+
+
+def test_unfinished_claim_is_not_run_again(app, db):
+    """Decision table - a claim without response, even past the lock timeout, is never re-run"""
+    client = app.test_client()
+    post(client)
+    db.execute("UPDATE idempotency_keys SET status_code = NULL, created_at = ?",
+               (datetime.now() - timedelta(minutes=5),))
+
+    response = post(client)
+
+    assert response.status_code == 409
+    assert "may have been applied" in response.get_json()["error"]
+    assert len(app.calls) == 1
+
+
+def test_failed_response_store_does_not_repeat_the_write(app, db, monkeypatch):
+    """White-box - the write committed but its response could not be stored"""
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(idempotency, "save_idempotent_response", fail)
+    client = app.test_client()
+
+    assert post(client).status_code == 200
+    assert post(client).status_code == 409
+
+    db.execute("UPDATE idempotency_keys SET created_at = ?", (datetime.now() - timedelta(minutes=5),))
+    assert post(client).status_code == 409
+    assert len(app.calls) == 1
+
+
+def test_expired_key_runs_again(app, db):
+    client = app.test_client()
+    post(client)
+    db.execute("UPDATE idempotency_keys SET created_at = ?", (datetime.now() - timedelta(days=2),))
+
+    post(client)
+
+    assert len(app.calls) == 2
+
+
+def test_server_errors_are_not_stored(app, db):
+    client = app.test_client()
+
+    post(client, body={"status": 500})
+    post(client, body={"status": 500})
+
+    assert len(app.calls) == 2
+    assert db("SELECT COUNT(*) FROM idempotency_keys") == [(0,)]
+
+
+def test_exception_releases_the_key(app, db):
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    client = app.test_client()
+
+    assert post(client, path="/boom").status_code == 500
+    assert post(client, path="/boom").status_code == 500
+
+    assert len(app.calls) == 2
+    assert db("SELECT COUNT(*) FROM idempotency_keys") == [(0,)]
+
+
+# ---------------------------------------------------------
+# BVA: key length
+# ---------------------------------------------------------
+@pytest.mark.parametrize("key,status", [
+    ("", 400),
+    ("x", 200),
+    ("x" * 255, 200),
+    ("x" * 256, 400),
+])
+def test_key_length(app, key, status):
+    assert post(app.test_client(), key=key).status_code == status
+
+
+# ---------------------------------------------------------
+# White-box: expiry and deferred responses
+# ---------------------------------------------------------
+def test_expired_keys_are_purged(app, db):
+    db.execute(
+        "INSERT INTO idempotency_keys (idempotency_key, endpoint, request_hash, status_code, created_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ("old", "write", "x", 200, datetime.now() - timedelta(days=2)),
+    )
+
+    post(app.test_client())
+
+    assert db("SELECT idempotency_key FROM idempotency_keys") == [("key-1",)]
+
+
+def test_deferred_response_is_stored_when_the_work_finishes(app):
+    client = app.test_client()
+
+    assert post(client, path="/slow").status_code == 504
+    assert post(client, path="/slow").status_code == 409     # still running
+
+    app.pending["future"].set_result(42)
+    retry = post(client, path="/slow")
+
+    assert retry.status_code == 200
+    assert retry.get_json() == {"order_id": 42}
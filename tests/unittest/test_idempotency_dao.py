@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from backend.dao.idempotency_dao import (
+    claim_idempotency_key,
+    delete_expired_idempotency_keys,
+    get_idempotency_record,
+    release_idempotency_key,
+    save_idempotent_response,
+)
+
+NOW = datetime(2025, 1, 1, 12, 0)
+
+
+def mock_connection():
+    conn = MagicMock()
+    cursor = MagicMock()
+    conn.cursor.return_value = cursor
+    return conn, cursor
+
+
+# ---------------------------------------------------------
+# EP: claiming a key
+# ---------------------------------------------------------
+def test_claim_inserts_and_commits():
+    conn, cursor = mock_connection()
+
+    assert claim_idempotency_key(conn, "k1", "api_add_order", "abc", NOW) is True
+
+    sql, params = cursor.execute.call_args.args
+    assert "INSERT INTO idempotency_keys" in sql
+    assert params == ("k1", "api_add_order", "abc", NOW)
+    conn.commit.assert_called_once()
+
+
+def test_claim_of_taken_key_returns_false():
+    """Decision table: duplicate key + existing row -> False"""
+    conn, cursor = mock_connection()
+    cursor.execute.side_effect = [Exception("Duplicate entry"), None]
+    cursor.fetchone.return_value = {"request_hash": "abc", "status_code": None}
+
+    assert claim_idempotency_key(conn, "k1", "api_add_order", "abc", NOW) is False
+    conn.commit.assert_not_called()
+
+
+def test_claim_reraises_other_errors():
+    """Decision table: insert error + no row -> the error is not a duplicate"""
+    conn, cursor = mock_connection()
+    cursor.execute.side_effect = [RuntimeError("table missing"), None]
+    cursor.fetchone.return_value = None
+
+    with pytest.raises(RuntimeError):
+        claim_idempotency_key(conn, "k1", "api_add_order", "abc", NOW)
+
+
+# ---------------------------------------------------------
+# White-box: lookups and updates
+# ---------------------------------------------------------
+def test_get_record_filters_by_key_and_endpoint():
+    conn, cursor = mock_connection()
+    cursor.fetchone.return_value = {"status_code": 200}
+
+    assert get_idempotency_record(conn, "k1", "api_add_order") == {"status_code": 200}
+    conn.cursor.assert_called_once_with(dictionary=True)
+    assert cursor.execute.call_args.args[1] == ("k1", "api_add_order")
+
+
+def test_save_response_updates_the_claim():
+    conn, cursor = mock_connection()
+
+    save_idempotent_response(conn, "k1", "api_add_order", 200, "application/json", '{"order_id":1}')
+
+    sql, params = cursor.execute.call_args.args
+    assert "UPDATE idempotency_keys" in sql
+    assert params == (200, "application/json", '{"order_id":1}', "k1", "api_add_order")
+    conn.commit.assert_called_once()
+
+
+def test_release_deletes_the_row():
+    conn, cursor = mock_connection()
+
+    release_idempotency_key(conn, "k1", "api_add_order")
+
+    assert "DELETE FROM idempotency_keys" in cursor.execute.call_args.args[0]
+    conn.commit.assert_called_once()
+
+
+def test_expired_keys_are_deleted_by_creation_time():
+    conn, cursor = mock_connection()
+    cursor.rowcount = 3
+
+    assert delete_expired_idempotency_keys(conn, NOW) == 3
+    sql, params = cursor.execute.call_args.args
+    assert "created_at < %s" in sql and params == (NOW,)
@@ -0,0 +1,62 @@
+import pytest
+
+from backend.db import initialize_sql
+from backend.db.dialects import SQLiteDialect
+
+
+@pytest.fixture
+def dialect(tmp_path):
+    dialect = SQLiteDialect(str(tmp_path / "gsm.db"))
+    conn = dialect.connect()
+    initialize_sql.provision(conn, dialect)
+    conn.close()
+    return dialect
+
+
+def count(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+# ---------------------------------------------------------
+# Decision table: provisioning vs. migrating
+# ---------------------------------------------------------
+@pytest.mark.parametrize("migrate,orders", [
+    (True, 3),      # live data is kept
+    (False, 2),     # cleared and seeded again
+])
+def test_migrate_keeps_the_data(dialect, migrate, orders):
+    conn = dialect.connect()
+    conn.cursor().execute(
+        "INSERT INTO orders (customer_name, total_price, datetime) VALUES ('Live', 1, '2025-03-01 10:00:00')"
+    )
+    conn.commit()
+
+    (initialize_sql.migrate if migrate else initialize_sql.provision)(conn, dialect)
+
+    assert count(conn, "orders") == orders
+    conn.close()
+
+
+def test_migrate_adds_what_is_missing(dialect):
+    conn = dialect.connect()
+    cursor = conn.cursor()
+    cursor.execute("DROP INDEX idx_orders_datetime")
+    cursor.execute("DROP TABLE idempotency_keys")
+    conn.commit()
+
+    initialize_sql.migrate(conn, dialect)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('idx_orders_datetime', 'idempotency_keys')")
+    assert sorted(row[0] for row in cursor.fetchall()) == ["idempotency_keys", "idx_orders_datetime"]
+    assert count(conn, "products") == len(initialize_sql.PRODUCTS)
+    conn.close()
+
+
+def test_migrate_flag_selects_the_migration(dialect, monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setattr(initialize_sql, "get_dialect", lambda: dialect)
+    monkeypatch.setattr(initialize_sql, "provision", lambda conn, d: pytest.fail("provision must not run"))
+
+    initialize_sql.main(["--migrate"])
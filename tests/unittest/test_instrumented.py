@@ -0,0 +1,185 @@
+import pytest
+from unittest.mock import MagicMock
+
+from backend.db.instrumented import (
+    InstrumentedConnection,
+    add_query_observer,
+    remove_query_observer,
+)
+
+
+@pytest.fixture
+def observed():
+    calls = []
+
+    def observer(record):
+        calls.append((record.seconds, record.operation, record.rows))
+
+    add_query_observer(observer)
+    yield calls
+    remove_query_observer(observer)
+
+
+def mock_connection():
+    raw = MagicMock()
+    cursor = MagicMock()
+    raw.cursor.return_value = cursor
+    return InstrumentedConnection(raw), raw, cursor
+
+
+# ---------------------------------------------------------
+# EP: statements and fetches are reported
+# ---------------------------------------------------------
+def test_execute_is_forwarded_and_reported(observed):
+    conn, raw, cursor = mock_connection()
+
+    c = conn.cursor(dictionary=True)
+    c.execute("SELECT 1", (1,))
+    assert observed == []       # still open until the result is consumed
+    c.close()
+
+    raw.cursor.assert_called_once_with(dictionary=True)
+    cursor.execute.assert_called_once_with("SELECT 1", (1,))
+    assert observed[0][1] == "SELECT 1"
+    assert observed[0][0] >= 0
+
+
+def test_execute_without_params_does_not_forward_none(observed):
+    conn, raw, cursor = mock_connection()
+
+    conn.cursor().execute("SELECT 1")
+
+    cursor.execute.assert_called_once_with("SELECT 1")
+
+
+def test_next_execute_finishes_previous_statement(observed):
+    conn, raw, cursor = mock_connection()
+
+    c = conn.cursor()
+    c.execute("UPDATE t SET a = 1")
+    c.execute("UPDATE t SET b = 2")
+
+    assert [o[1] for o in observed] == ["UPDATE t SET a = 1"]
+
+
+def test_fetchall_reports_row_count(observed):
+    conn, raw, cursor = mock_connection()
+    cursor.fetchall.return_value = [{"a": 1}, {"a": 2}]
+
+    c = conn.cursor()
+    c.execute("SELECT a FROM t")
+    assert c.fetchall() == [{"a": 1}, {"a": 2}]
+
+    assert observed[-1][1:] == ("SELECT a FROM t", 2)
+
+
+@pytest.mark.parametrize("row,expected", [(None, 0), ({"a": 1}, 1)])
+def test_fetchone_row_count(observed, row, expected):
+    """BVA - empty and single-row fetches"""
+    conn, raw, cursor = mock_connection()
+    cursor.fetchone.return_value = row
+
+    c = conn.cursor()
+    c.execute("SELECT a FROM t")
+    assert c.fetchone() == row
+    c.close()
+    assert observed[-1][2] == expected
+
+
+def test_iteration_reports_once_with_row_count(observed):
+    conn, raw, cursor = mock_connection()
+    cursor.__iter__.return_value = [(1,), (2,), (3,)]
+
+    c = conn.cursor()
+    c.execute("SELECT x FROM t")
+    assert list(c) == [(1,), (2,), (3,)]
+
+    assert len(observed) == 1
+    assert observed[-1][2] == 3
+
+
+def test_failed_execute_is_still_reported(observed):
+    conn, raw, cursor = mock_connection()
+    cursor.execute.side_effect = RuntimeError("syntax error")
+
+    with pytest.raises(RuntimeError):
+        conn.cursor().execute("SELEC 1")
+
+    assert observed[0][1] == "SELEC 1"
+
+
+# ---------------------------------------------------------
+# White-box: attributes pass through
+# ---------------------------------------------------------
+def test_attributes_pass_through():
+    conn, raw, cursor = mock_connection()
+    cursor.lastrowid = 42
+    cursor.rowcount = 3
+
+    c = conn.cursor()
+    assert c.lastrowid == 42
+    assert c.rowcount == 3
+
+    conn.close()
+    raw.close.assert_called_once()
+
+
+# ---------------------------------------------------------
+# Decision table: closing with an open transaction
+# ---------------------------------------------------------
+@pytest.mark.parametrize("in_transaction,rolled_back", [
+    (True, 1),      # must not reach the pooled connection's next user
+    (False, 0),
+])
+def test_close_rolls_back_an_open_transaction(in_transaction, rolled_back):
+    conn, raw, cursor = mock_connection()
+    raw.in_transaction = in_transaction
+
+    conn.close()
+
+    assert raw.rollback.call_count == rolled_back
+    raw.close.assert_called_once()
+
+
+def test_failed_rollback_still_closes(caplog):
+    conn, raw, cursor = mock_connection()
+    raw.in_transaction = True
+    raw.rollback.side_effect = RuntimeError("Lost connection")
+
+    conn.close()
+
+    raw.close.assert_called_once()
+    assert "Rollback on close failed" in caplog.text
+
+
+def test_commit_is_reported(observed):
+    conn, raw, cursor = mock_connection()
+
+    conn.commit()
+
+    raw.commit.assert_called_once()
+    assert observed[0][1] == "COMMIT"
+
+
+def test_commit_finishes_open_statements_first(observed):
+    conn, raw, cursor = mock_connection()
+
+    conn.cursor().execute("INSERT INTO t VALUES (%s)", (1,))
+    conn.commit()
+
+    assert [o[1] for o in observed] == ["INSERT INTO t VALUES (%s)", "COMMIT"]
+
+
+def test_record_carries_params_and_raw_connection():
+    conn, raw, cursor = mock_connection()
+    records = []
+    add_query_observer(records.append)
+    try:
+        c = conn.cursor()
+        c.execute("SELECT a FROM t WHERE id = %s", (7,))
+        c.fetchall()
+    finally:
+        remove_query_observer(records.append)
+
+    assert records[0].params == (7,)
+    assert records[0].connection is raw
@@ -0,0 +1,88 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.web import json_provider
+from backend.web.json_provider import FastJSONProvider, dumps_bytes
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+# ---------------------------------------------------------
+# EP: value types
+# ---------------------------------------------------------
+@pytest.mark.parametrize("value,expected", [
+    (datetime(2025, 1, 1, 10, 0, 0), '"2025-01-01T10:00:00"'),
+    (date(2025, 1, 1), '"2025-01-01"'),
+    (Decimal("12.50"), '"12.50"'),
+    ({1: "a"}, '{"1":"a"}'),
+    ("Børge", '"Børge"'),
+])
+def test_value_encoding(value, expected):
+    assert dumps_bytes(value).decode() == expected
+
+
+def test_dataclasses_are_encoded():
+    @dataclass
+    class Point:
+        x: int
+        y: int
+
+    assert json.loads(dumps_bytes(Point(1, 2))) == {"x": 1, "y": 2}
+
+
+def test_unknown_types_raise():
+    with pytest.raises(TypeError):
+        dumps_bytes(object())
+
+
+def test_keys_keep_insertion_order():
+    assert dumps_bytes({"b": 1, "a": 2}) == b'{"b":1,"a":2}'
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    """White-box - both encoders produce the same bytes"""
+    payload = [{"order_id": 1, "datetime": datetime(2025, 1, 2, 14, 30), "total": 45.0, "name": "Sine"}]
+    fast = dumps_bytes(payload)
+
+    monkeypatch.setattr(json_provider, "orjson", None)
+    fallback = json.dumps(payload, default=json_provider.json_default, separators=(",", ":"),
+                          ensure_ascii=False).encode()
+
+    assert fast == fallback
+
+
+# ---------------------------------------------------------
+# White-box: Flask integration
+# ---------------------------------------------------------
+def test_jsonify_uses_provider(app):
+    with app.app_context():
+        response = jsonify([{"datetime": datetime(2025, 1, 1, 10, 0)}])
+
+    assert response.mimetype == "application/json"
+    assert response.get_json() == [{"datetime": "2025-01-01T10:00:00"}]
+
+
+def test_returned_dicts_use_provider(app):
+    @app.route("/d")
+    def d():
+        return {"when": date(2025, 1, 1)}
+
+    assert app.test_client().get("/d").get_json() == {"when": "2025-01-01"}
+
+
+def test_dumps_with_options_uses_stdlib(app):
+    assert app.json.dumps({"a": date(2025, 1, 1)}, indent=2) == '{\n  "a": "2025-01-01"\n}'
+
+
+def test_loads(app):
+    assert app.json.loads('{"a": [1, 2]}') == {"a": [1, 2]}
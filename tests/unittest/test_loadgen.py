@@ -0,0 +1,136 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tests.stress_performance_tests.loadgen import (
+    Recorder,
+    Scenario,
+    build_scenarios,
+    configure,
+    parse_args,
+    percentile,
+    run,
+)
+
+
+@pytest.fixture
+def server():
+    """Local backend stand-in: /fail answers 500, everything else 200."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            length = int(self.headers.get("Content-Length", 0))
+            received.append((self.command, self.path, self.rfile.read(length)))
+            body = b"{}"
+            self.send_response(500 if self.path == "/fail" else 200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1], received
+    httpd.shutdown()
+    httpd.server_close()
+
+
+# ---------------------------------------------------------
+# BVA: percentiles
+# ---------------------------------------------------------
+@pytest.mark.parametrize("pct,expected", [(50, 50), (95, 95), (99, 99), (100, 100)])
+def test_percentile_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 101)), pct) == expected
+
+
+def test_percentile_of_no_samples():
+    assert percentile([], 95) == 0.0
+
+
+def test_recorder_summary():
+    recorder = Recorder()
+    for ms in (10, 20, 30, 40):
+        recorder.record("GET /x", ms / 1000, ok=ms != 40)
+
+    [row] = recorder.summary(elapsed=2.0)
+
+    assert row["requests"] == 4
+    assert row["errors"] == 1
+    assert row["throughput"] == 2.0
+    assert row["p50_ms"] == pytest.approx(20)
+    assert row["p99_ms"] == pytest.approx(40)
+
+
+# ---------------------------------------------------------
+# EP: scenario configuration
+# ---------------------------------------------------------
+def test_scenarios_match_jmeter_plan():
+    scenarios = build_scenarios()
+
+    assert sorted(scenarios) == ["S1", "S2", "S3", "S4", "S5"]
+    assert (scenarios["S1"].users, scenarios["S1"].ramp, scenarios["S1"].duration) == (50, 30, 300)
+    assert (scenarios["S4"].users, scenarios["S4"].loops, scenarios["S4"].duration) == (15, 5, None)
+    assert [r[2] for r in scenarios["S5"].requests] == ["/getProducts", "/api/calc/revenue", "/api/calc/spend"]
+
+
+def test_order_burst_uses_unique_customers():
+    [(_, _, _, body_fn)] = build_scenarios()["S4"].requests
+    assert body_fn()["customer_name"] != body_fn()["customer_name"]
+
+
+def test_scale_and_overrides():
+    selected = configure(parse_args(["-s", "S1", "-s", "S4", "--scale", "0.1", "--loops", "2"]))
+
+    s1, s4 = selected
+    assert (s1.users, s1.ramp, s1.duration) == (5, 3.0, 30.0)
+    assert (s4.users, s4.loops) == (2, 2)
+
+
+# ---------------------------------------------------------
+# White-box: running against a local server
+# ---------------------------------------------------------
+def test_loop_scenario_sends_every_request(server):
+    port, received = server
+    scenario = Scenario("T", "test", users=3, ramp=0, loops=2, requests=[
+        ("GET /a", "GET", "/a", None),
+        ("POST /b", "POST", "/b", lambda: {"n": 1}),
+    ])
+
+    recorder, _ = run([scenario], "127.0.0.1", port)
+
+    rows = {r["endpoint"]: r for r in recorder.summary(1.0)}
+    assert rows["GET /a"]["requests"] == 6
+    assert rows["POST /b"]["requests"] == 6
+    assert json.loads([body for m, p, body in received if p == "/b"][0]) == {"n": 1}
+
+
+def test_timed_scenario_stops_and_counts_errors(server):
+    port, _ = server
+    scenario = Scenario("T", "test", users=2, ramp=0.1, duration=0.3, requests=[
+        ("GET /fail", "GET", "/fail", None),
+    ])
+
+    recorder, elapsed = run([scenario], "127.0.0.1", port)
+
+    [row] = recorder.summary(elapsed)
+    assert row["requests"] > 0
+    assert row["errors"] == row["requests"]
+    assert elapsed < 2
+
+
+def test_unreachable_server_counts_errors():
+    scenario = Scenario("T", "test", users=1, ramp=0, loops=1, requests=[("GET /a", "GET", "/a", None)])
+
+    recorder, _ = run([scenario], "127.0.0.1", 1)
+
+    [row] = recorder.summary(1.0)
+    assert row["errors"] == 1
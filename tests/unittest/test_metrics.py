@@ -0,0 +1,232 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+from backend.monitoring.metrics import (
+    MetricsRegistry,
+    SnapshotStore,
+    render_prometheus,
+    merge_snapshots,
+)
+from backend.monitoring import metrics
+
+
+def finished(registry, route="/getProducts", status=200, duration=0.02, db=0.01, ser=0.001):
+    registry.request_started(route)
+    registry.request_finished(route, "GET", status, duration, db, ser)
+
+
+# ---------------------------------------------------------
+# EP: counters, gauges and histograms
+# ---------------------------------------------------------
+def test_counts_requests_per_status():
+    registry = MetricsRegistry()
+    finished(registry)
+    finished(registry)
+    finished(registry, status=500)
+
+    requests, in_flight, _ = merge_snapshots([registry.snapshot()])
+
+    assert requests[("/getProducts", "GET", "200")] == 2
+    assert requests[("/getProducts", "GET", "500")] == 1
+    assert in_flight["/getProducts"] == 0
+
+
+def test_in_flight_gauge():
+    registry = MetricsRegistry()
+    registry.request_started("/getOrders")
+    registry.request_started("/getOrders")
+
+    _, in_flight, _ = merge_snapshots([registry.snapshot()])
+    assert in_flight["/getOrders"] == 2
+
+
+@pytest.mark.parametrize("duration,first_bucket_hit", [
+    (0.005, 0),     # BVA - exactly on a bucket bound counts in that bucket
+    (0.0051, 1),
+    (100, None),    # above every bucket: only +Inf
+])
+def test_histogram_bucket_boundaries(duration, first_bucket_hit):
+    registry = MetricsRegistry()
+    finished(registry, duration=duration)
+
+    _, _, histograms = merge_snapshots([registry.snapshot()])
+    series = histograms["gsm_http_request_duration_seconds"][("/getProducts", "GET")]
+    buckets = series[:len(registry.buckets)]
+
+    hits = [i for i, count in enumerate(buckets) if count]
+    assert (hits[0] if hits else None) == first_bucket_hit
+    assert series[-1] == 1
+    assert series[-2] == pytest.approx(duration)
+
+
+# ---------------------------------------------------------
+# Prometheus text format
+# ---------------------------------------------------------
+def test_render_prometheus_format():
+    registry = MetricsRegistry()
+    finished(registry, route='/a"b')
+
+    text = render_prometheus([registry.snapshot()])
+
+    assert "# TYPE gsm_http_requests_total counter" in text
+    assert 'gsm_http_requests_total{route="/a\\"b",method="GET",status="200"} 1' in text
+    assert 'gsm_http_request_db_seconds_bucket{route="/a\\"b",method="GET",le="+Inf"} 1' in text
+    assert "gsm_http_request_serialization_seconds_count" in text
+    assert text.endswith("\n")
+
+
+def test_merge_sums_processes():
+    a, b = MetricsRegistry(), MetricsRegistry()
+    finished(a)
+    finished(b)
+    finished(b)
+
+    requests, _, histograms = merge_snapshots([a.snapshot(), b.snapshot()])
+
+    assert requests[("/getProducts", "GET", "200")] == 3
+    assert histograms["gsm_http_request_duration_seconds"][("/getProducts", "GET")][-1] == 3
+
+
+# ---------------------------------------------------------
+# Multi-process snapshot files
+# ---------------------------------------------------------
+def test_snapshot_store_merges_other_processes(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    registry = MetricsRegistry()
+    finished(registry)
+
+    other = MetricsRegistry()
+    other.request_started("/getOrders")
+    snap = other.snapshot()
+    snap["pid"] = os.getppid()   # a live process other than ours
+    (tmp_path / "metrics_other.json").write_text(json.dumps(snap))
+
+    requests, in_flight, _ = merge_snapshots(store.load_all(registry))
+
+    assert requests[("/getProducts", "GET", "200")] == 1
+    assert in_flight["/getOrders"] == 1
+
+
+def test_snapshot_store_drops_gauges_of_dead_processes(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+
+    dead = MetricsRegistry()
+    finished(dead)
+    dead.request_started("/getOrders")
+    snap = dead.snapshot()
+    snap["pid"] = 2 ** 22 + 12345   # beyond pid_max, never alive
+    (tmp_path / "metrics_dead.json").write_text(json.dumps(snap))
+
+    requests, in_flight, _ = merge_snapshots(store.load_all(MetricsRegistry()))
+
+    assert requests[("/getProducts", "GET", "200")] == 1   # counters survive
+    assert "/getOrders" not in in_flight
+
+
+def test_exited_snapshots_are_folded_into_retired_totals(tmp_path):
+    """White-box - files of exited workers are removed once their counters are kept"""
+    store = SnapshotStore(str(tmp_path))
+
+    for name in ("a", "b"):
+        dead = MetricsRegistry()
+        finished(dead)
+        snap = dead.snapshot()
+        snap["pid"] = 2 ** 22 + 12345
+        (tmp_path / f"metrics_{name}.json").write_text(json.dumps(snap))
+
+    requests, _, histograms = merge_snapshots(store.load_all(MetricsRegistry()))
+    assert requests[("/getProducts", "GET", "200")] == 2
+    assert sorted(p.name for p in tmp_path.glob("metrics_*.json")) == ["metrics_retired.json"]
+
+    # Reading again neither loses nor double counts them
+    requests, _, histograms = merge_snapshots(store.load_all(MetricsRegistry()))
+    assert requests[("/getProducts", "GET", "200")] == 2
+    assert histograms["gsm_http_request_duration_seconds"][("/getProducts", "GET")][-1] == 2
+
+
+def test_reused_pid_does_not_overwrite_exited_worker(tmp_path):
+    """Decision table - same pid, older start: the older snapshot is an exited worker"""
+    store = SnapshotStore(str(tmp_path))
+
+    old = MetricsRegistry()
+    finished(old)
+    old.request_started("/getOrders")
+    snap = {**old.snapshot(), "pid": os.getppid(), "process_id": "old", "started_at": 1.0}
+    (tmp_path / "metrics_old.json").write_text(json.dumps(snap))
+
+    new = MetricsRegistry()
+    finished(new)
+    snap = {**new.snapshot(), "pid": os.getppid(), "process_id": "new", "started_at": 2.0}
+    (tmp_path / "metrics_new.json").write_text(json.dumps(snap))
+
+    requests, in_flight, _ = merge_snapshots(store.load_all(MetricsRegistry()))
+
+    assert requests[("/getProducts", "GET", "200")] == 2
+    assert "/getOrders" not in in_flight
+    assert not (tmp_path / "metrics_old.json").exists()
+    assert (tmp_path / "metrics_new.json").exists()
+
+
+def test_forked_process_gets_its_own_snapshot_file(tmp_path, monkeypatch):
+    """White-box - the process id is renewed when the pid changes"""
+    store = SnapshotStore(str(tmp_path))
+    parent = store.identity()
+
+    monkeypatch.setattr(os, "getpid", lambda: parent[0] + 1)
+    child = store.identity()
+
+    assert child[1] != parent[1]
+    assert child[0] == parent[0] + 1
+
+
+def test_flush_is_throttled(tmp_path):
+    store = SnapshotStore(str(tmp_path), flush_interval=60)
+    registry = MetricsRegistry()
+
+    store.maybe_flush(registry)
+    path = tmp_path / f"metrics_{store.identity()[1]}.json"
+    assert path.exists()
+
+    finished(registry)
+    store.maybe_flush(registry)
+    assert json.loads(path.read_text())["requests"] == []
+
+    store.maybe_flush(registry, force=True)
+    assert json.loads(path.read_text())["requests"] != []
+
+
+def test_exit_flush_ignores_the_interval(tmp_path, monkeypatch):
+    """White-box - worker_exit / atexit write the counts the throttle held back"""
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    monkeypatch.setenv("METRICS_FLUSH_SECONDS", "60")
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    store = metrics._snapshot_store()
+    store.maybe_flush(registry)
+    finished(registry)
+
+    metrics.flush_metrics()
+
+    snap = json.loads((tmp_path / f"metrics_{store.identity()[1]}.json").read_text())
+    assert snap["requests"] != []
+
+
+# ---------------------------------------------------------
+# EP: platforms without fcntl
+# ---------------------------------------------------------
+def test_metrics_import_without_fcntl():
+    code = "import sys; sys.modules['fcntl'] = None; import backend.app"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_without_file_locks_metrics_stay_in_process(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+
+    assert metrics._snapshot_store() is None
@@ -0,0 +1,172 @@
+import pytest
+from datetime import date, datetime
+
+from backend.dao.order_details_dao import get_order_details
+from backend.dao.order_list_dao import get_all_orders, get_recent_orders
+from backend.db.dialects import SQLiteDialect
+from backend.services import order_archiver
+from backend.services.cache import TieredCache, store_namespaces
+from backend.services.order_archiver import (
+    archive_cutoff,
+    archive_orders_before,
+    count_orders_before,
+)
+
+CUTOFF = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def conn():
+    dialect = SQLiteDialect(":memory:")
+    conn = dialect.connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    cursor.execute("INSERT INTO products (name, uom_id, price_per_unit) VALUES ('Apple', 1, 2.0)")
+    # Orders 1-5 in 2024, 6-7 in 2025, two items each
+    for month, order_id in zip([3, 6, 9, 11, 12, 13, 14], range(1, 8)):
+        placed = datetime(2024 + (month - 1) // 12, (month - 1) % 12 + 1, 15)
+        cursor.execute(
+            "INSERT INTO orders (customer_name, total_price, datetime) VALUES (%s, %s, %s)",
+            (f"Customer {order_id}", 4.0, placed),
+        )
+        cursor.executemany(
+            "INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES (%s, 1, 1, 2.0)",
+            [(order_id,), (order_id,)],
+        )
+    yield conn
+    conn.close()
+
+
+def count(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+# ---------------------------------------------------------
+# BVA: cutoff
+# ---------------------------------------------------------
+@pytest.mark.parametrize("today,keep_months,expected", [
+    (date(2025, 6, 20), 0, datetime(2025, 6, 1)),
+    (date(2025, 6, 20), 5, datetime(2025, 1, 1)),
+    (date(2025, 6, 20), 6, datetime(2024, 12, 1)),
+    (date(2025, 1, 1), 12, datetime(2024, 1, 1)),
+])
+def test_archive_cutoff(today, keep_months, expected):
+    assert archive_cutoff(today, keep_months) == expected
+
+
+def test_negative_keep_months_is_rejected():
+    with pytest.raises(ValueError):
+        archive_cutoff(date(2025, 6, 20), -1)
+
+
+# ---------------------------------------------------------
+# EP: moving orders
+# ---------------------------------------------------------
+def test_orders_before_cutoff_are_moved(conn):
+    assert count_orders_before(conn, CUTOFF) == 5
+
+    totals = archive_orders_before(conn, CUTOFF, chunk_size=2)
+
+    assert totals == {"orders": 5, "order_details": 10, "chunks": 3}
+    assert (count(conn, "orders"), count(conn, "order_details")) == (2, 4)
+    assert (count(conn, "orders_archive"), count(conn, "order_details_archive")) == (5, 10)
+
+
+def test_second_run_has_nothing_to_do(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    assert archive_orders_before(conn, CUTOFF) == {"orders": 0, "order_details": 0, "chunks": 0}
+
+
+def test_progress_is_reported_per_chunk(conn):
+    seen = []
+
+    archive_orders_before(conn, CUTOFF, chunk_size=4, progress=lambda t: seen.append(t["orders"]))
+
+    assert seen == [4, 5]
+
+
+def test_each_chunk_publishes_a_change_for_its_stores(conn, monkeypatch):
+    cache = TieredCache()
+    monkeypatch.setattr(order_archiver, "shared_cache", cache)
+    conn.cursor().execute("UPDATE orders SET store_id = 2 WHERE order_id = 5")
+
+    archive_orders_before(conn, CUTOFF, chunk_size=2)
+
+    # Chunks [1, 2], [3, 4] and [5]
+    assert cache.versions(store_namespaces(1)) == (2, 2)
+    assert cache.versions(store_namespaces(2)) == (1, 1)
+
+
+def test_failed_chunk_is_rolled_back(conn):
+    # The second order of the first chunk collides with an archived one
+    conn.cursor().execute(
+        "INSERT INTO orders_archive (order_id, customer_name, total_price, datetime) VALUES (2, 'x', 0, %s)",
+        (datetime(2020, 1, 1),),
+    )
+
+    with pytest.raises(Exception):
+        archive_orders_before(conn, CUTOFF, chunk_size=2)
+
+    assert (count(conn, "orders"), count(conn, "order_details")) == (7, 14)
+    assert (count(conn, "orders_archive"), count(conn, "order_details_archive")) == (1, 0)
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_invalid_chunk_size(conn, chunk_size):
+    with pytest.raises(ValueError):
+        archive_orders_before(conn, CUTOFF, chunk_size=chunk_size)
+
+
+# ---------------------------------------------------------
+# Decision table: DAOs read the archive transparently
+# ---------------------------------------------------------
+def test_listing_without_range_includes_archive(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    orders = get_all_orders(conn)
+
+    assert [o["order_id"] for o in orders] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_range_from_the_beginning_includes_archive(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    orders = get_all_orders(conn, start=datetime(2000, 1, 1))
+
+    assert [o["order_id"] for o in orders] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_recent_range_only_reads_hot_table(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    orders = get_all_orders(conn, start=CUTOFF)
+
+    assert [o["order_id"] for o in orders] == [7, 6]
+
+
+def test_range_spanning_the_cutoff(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    orders = get_all_orders(conn, start=datetime(2024, 12, 1), end=datetime(2025, 2, 1))
+
+    assert [o["order_id"] for o in orders] == [6, 5]
+
+
+def test_recent_orders_continue_in_archive(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    orders = get_recent_orders(conn, limit=3)
+
+    assert [o["order_id"] for o in orders] == [7, 6, 5]
+
+
+def test_archived_order_details(conn):
+    archive_orders_before(conn, CUTOFF)
+
+    details = get_order_details(conn, 2)
+
+    assert len(details) == 2
+    assert details[0]["product_name"] == "Apple"
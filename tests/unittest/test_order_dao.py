@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, call
 from datetime import datetime
-from backend.dao.order_dao import add_order
+from backend.dao.order_dao import add_order, delete_orders
 
 # ---------------------------------------------------------
 # Builder to make a fake DB connection + cursor
@@ -190,4 +190,160 @@ def test_edit_order_to_remove_all_details():
 
     assert any("UPDATE orders" in str(c) for c in cursor.execute.mock_calls)
 
-    conn.commit.assert_called_once()
\ No newline at end of file
+    conn.commit.assert_called_once()
+
+# ---------------------------------------------------------
+# BULK DELETE
+# ---------------------------------------------------------
+@pytest.fixture
+def sqlite_conn():
+    from backend.db.dialects import SQLiteDialect
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    cursor.executemany(
+        "INSERT INTO products (name, uom_id, price_per_unit, quantity) VALUES (%s, 1, 1.0, 100)",
+        [("Apple",), ("Pear",)],
+    )
+    # Orders 1-5 on Jan 1-5, each with 2 apples and 1 pear
+    for day in range(1, 6):
+        cursor.execute(
+            "INSERT INTO orders (customer_name, total_price, datetime) VALUES ('Load test', 3.0, %s)",
+            (datetime(2025, 1, day, 12),),
+        )
+        cursor.executemany(
+            "INSERT INTO order_details (order_id, product_id, quantity, total_price) VALUES (%s, %s, %s, 1.0)",
+            [(day, 1, 2), (day, 2, 1)],
+        )
+    yield conn
+    conn.close()
+
+
+def table_count(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def stock(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT quantity FROM products ORDER BY product_id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_delete_orders_by_ids_in_chunks(sqlite_conn):
+    """EP: ids are deleted chunk by chunk; unknown ids are not counted"""
+    totals = delete_orders(sqlite_conn, order_ids=[1, 2, 3, 999], chunk_size=2)
+
+    assert totals == {"orders": 3, "order_details": 6, "products_restocked": 0, "chunks": 2}
+    assert table_count(sqlite_conn, "orders") == 2
+    assert table_count(sqlite_conn, "order_details") == 4
+    assert stock(sqlite_conn) == [100, 100]
+
+
+def test_delete_orders_by_range(sqlite_conn):
+    """BVA: [start, end) - the order at `end` stays"""
+    totals = delete_orders(sqlite_conn, start=datetime(2025, 1, 2), end=datetime(2025, 1, 4, 12), chunk_size=1)
+
+    assert totals["orders"] == 2 and totals["chunks"] == 2
+    cursor = sqlite_conn.cursor()
+    cursor.execute("SELECT order_id FROM orders ORDER BY order_id")
+    assert [row[0] for row in cursor.fetchall()] == [1, 4, 5]
+
+
+def test_delete_orders_restores_stock_once_per_product(sqlite_conn):
+    totals = delete_orders(sqlite_conn, order_ids=[1, 2, 2, 3], restore_stock=True)
+
+    assert totals["products_restocked"] == 2
+    assert stock(sqlite_conn) == [106, 103]
+
+
+def test_failed_chunk_is_rolled_back(sqlite_conn):
+    """White-box: the restore, both deletes and the commit form one transaction"""
+    sqlite_conn.cursor().execute(
+        "CREATE TRIGGER fail BEFORE DELETE ON orders WHEN old.order_id = 2 "
+        "BEGIN SELECT RAISE(ABORT, 'locked'); END"
+    )
+
+    with pytest.raises(Exception):
+        delete_orders(sqlite_conn, order_ids=[1, 2, 3], restore_stock=True, chunk_size=2)
+
+    assert table_count(sqlite_conn, "order_details") == 10
+    assert stock(sqlite_conn) == [100, 100]
+
+
+@pytest.mark.parametrize("selection", [
+    {"order_ids": [1, 2, 4]},
+    {"start": datetime(2025, 1, 1), "end": datetime(2025, 1, 3)},
+])
+def test_delete_orders_includes_archived_orders(sqlite_conn, selection):
+    """EP: ids and ranges reach orders moved to the archive, like /getOrders"""
+    from backend.services.order_archiver import archive_orders_before
+
+    archive_orders_before(sqlite_conn, datetime(2025, 1, 2))    # order 1
+
+    totals = delete_orders(sqlite_conn, restore_stock=True, **selection)
+
+    assert totals["orders"] == len(selection.get("order_ids", [1, 2]))
+    assert table_count(sqlite_conn, "orders_archive") == table_count(sqlite_conn, "order_details_archive") == 0
+    assert stock(sqlite_conn)[0] == 100 + 2 * totals["orders"]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"start": datetime(2025, 1, 1)},
+    {"order_ids": [1], "start": datetime(2025, 1, 1), "end": datetime(2025, 1, 2)},
+    {"order_ids": [1], "chunk_size": 0},
+])
+def test_delete_orders_invalid_arguments(kwargs):
+    """Decision table: exactly one selection, positive chunk size"""
+    conn, cursor = mock_connection()
+
+    with pytest.raises(ValueError):
+        delete_orders(conn, **kwargs)
+
+    cursor.execute.assert_not_called()
+
+
+# ---------------------------------------------------------
+# STORES
+# ---------------------------------------------------------
+def test_add_order_rejects_products_of_another_store(sqlite_conn):
+    """EP: an order may only contain products of its own store"""
+    sqlite_conn.cursor().execute("UPDATE products SET store_id = 2 WHERE product_id = 2")
+    order = {"customer_name": "Bob", "total_price": 2.0, "order_details": [
+        {"product_id": 1, "quantity": 1, "total_price": 1.0},
+        {"product_id": 2, "quantity": 1, "total_price": 1.0},
+    ]}
+
+    with pytest.raises(ValueError, match=r"\[2\]"):
+        add_order(sqlite_conn, order, store_id=1)
+
+    assert table_count(sqlite_conn, "orders") == 5
+
+
+def test_add_order_records_the_store(sqlite_conn):
+    order = {"customer_name": "Bob", "total_price": 1.0,
+             "order_details": [{"product_id": 1, "quantity": 1, "total_price": 1.0}]}
+
+    order_id = add_order(sqlite_conn, order, store_id=1)
+
+    cursor = sqlite_conn.cursor()
+    cursor.execute("SELECT store_id FROM orders WHERE order_id = %s", (order_id,))
+    assert cursor.fetchone()[0] == 1
+    cursor.execute("SELECT store_id FROM order_details WHERE order_id = %s", (order_id,))
+    assert [row[0] for row in cursor.fetchall()] == [1]
+
+
+def test_delete_orders_skips_other_stores(sqlite_conn):
+    """Decision table: ids and ranges only match orders of the given store"""
+    sqlite_conn.cursor().execute("UPDATE orders SET store_id = 2 WHERE order_id IN (2, 3)")
+
+    by_ids = delete_orders(sqlite_conn, order_ids=[1, 2], store_id=1)
+    by_range = delete_orders(sqlite_conn, start=datetime(2025, 1, 1), end=datetime(2025, 1, 6), store_id=2)
+
+    assert (by_ids["orders"], by_range["orders"]) == (1, 2)
+    cursor = sqlite_conn.cursor()
+    cursor.execute("SELECT order_id FROM orders ORDER BY order_id")
+    assert [row[0] for row in cursor.fetchall()] == [4, 5]
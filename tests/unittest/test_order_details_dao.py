@@ -1,6 +1,16 @@
 import pytest
+from datetime import datetime
 from unittest.mock import MagicMock, call
-from backend.dao.order_details_dao import get_order_details
+from backend.dao import order_details_dao
+from backend.dao.order_details_dao import ARCHIVED_ORDER_DETAILS_QUERY, get_order_details
+
+
+@pytest.fixture(autouse=True)
+def archive(monkeypatch):
+    """Empty archive unless a test sets archive.boundary."""
+    state = MagicMock(boundary=None)
+    monkeypatch.setattr(order_details_dao, "archive_boundary", lambda conn, store_id=None: state.boundary)
+    return state
 
 
 # ---------------------------------------------------------
@@ -113,3 +123,27 @@ def test_get_order_details_order_exists_but_no_items():
 
     assert result == []
     cursor.execute.assert_called_once()
+
+
+# ---------------------------------------------------------
+# Decision Table: archived orders
+# ---------------------------------------------------------
+def test_archived_order_is_read_from_archive(archive):
+    archive.boundary = datetime(2024, 12, 31)
+    conn, cursor = mock_connection()
+    cursor.fetchall.side_effect = [[], [{"order_id": 3, "product_name": "Apple"}]]
+
+    result = get_order_details(conn, 3)
+
+    assert result == [{"order_id": 3, "product_name": "Apple"}]
+    assert cursor.execute.call_args == call(ARCHIVED_ORDER_DETAILS_QUERY, (3,))
+
+
+def test_current_order_never_reads_archive(archive):
+    archive.boundary = datetime(2024, 12, 31)
+    conn, cursor = mock_connection()
+    cursor.fetchall.return_value = [{"order_id": 30}]
+
+    get_order_details(conn, 30)
+
+    cursor.execute.assert_called_once()
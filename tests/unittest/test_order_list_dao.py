@@ -1,6 +1,25 @@
 import pytest
+from datetime import datetime
 from unittest.mock import MagicMock, call
-from backend.dao.order_list_dao import get_all_orders, get_recent_orders
+from backend.dao import order_list_dao
+from backend.services.cache import TieredCache, store_namespaces
+from backend.dao.order_list_dao import archive_boundary as real_archive_boundary
+from backend.dao.order_list_dao import (
+    ARCHIVED_RECENT_ORDERS_QUERY,
+    get_all_orders,
+    get_all_orders_columns,
+    get_recent_orders,
+    orders_range_query,
+    recent_orders_query,
+)
+
+
+@pytest.fixture(autouse=True)
+def archive(monkeypatch):
+    """Empty archive unless a test sets archive.boundary."""
+    state = MagicMock(boundary=None)
+    monkeypatch.setattr(order_list_dao, "archive_boundary", lambda conn, store_id=None: state.boundary)
+    return state
 
 
 # ---------------------------------------------------------
@@ -108,3 +127,150 @@ def test_get_recent_orders_invalid_limits(limit):
 
     with pytest.raises(Exception):
         get_recent_orders(conn, limit=limit)
+
+
+# ---------------------------------------------------------
+# White-box: columnar listing uses a plain tuple cursor
+# ---------------------------------------------------------
+def test_get_all_orders_columns():
+    conn, cursor = mock_connection()
+    rows = [(1, "Alice", 15.0, "2025-01-01")]
+    cursor.fetchall.return_value = rows
+    cursor.description = [("order_id",), ("customer_name",), ("total_price",), ("datetime",)]
+
+    columns, result = get_all_orders_columns(conn)
+
+    assert columns == ["order_id", "customer_name", "total_price", "datetime"]
+    assert result is rows
+    conn.cursor.assert_called_once_with()
+
+
+# ---------------------------------------------------------
+# Decision table: when the archive is read
+# ---------------------------------------------------------
+ARCHIVED_UNTIL = datetime(2024, 12, 31, 18, 0)
+
+
+@pytest.mark.parametrize("start,end,reads_archive", [
+    (None, None, True),                          # unbounded listing: everything
+    (datetime(2024, 6, 1), None, True),          # range starts in the archive
+    (ARCHIVED_UNTIL, None, True),                # BVA: starts at the newest archived order
+    (datetime(2025, 1, 1), None, False),         # only recent orders
+    (None, datetime(2024, 1, 1), True),
+])
+def test_get_all_orders_reads_archive_only_when_range_reaches_it(archive, start, end, reads_archive):
+    archive.boundary = ARCHIVED_UNTIL
+    conn, cursor = mock_connection()
+
+    get_all_orders(conn, start=start, end=end)
+
+    sql, params = cursor.execute.call_args.args
+    assert ("orders_archive" in sql) is reads_archive
+    expected = tuple(v for v in (start, end) if v is not None)
+    assert params == (expected * 2 if reads_archive else expected or None)
+
+
+def test_get_all_orders_without_archive_uses_plain_query():
+    conn, cursor = mock_connection()
+
+    get_all_orders(conn)
+
+    sql, params = cursor.execute.call_args.args
+    assert sql is order_list_dao.ALL_ORDERS_QUERY and params is None
+
+
+def test_range_queries_are_built_once():
+    """White-box: the same string object is reused for prepared statements"""
+    assert orders_range_query(True, False, True) is orders_range_query(True, False, True)
+
+
+@pytest.mark.parametrize("start,end", [
+    ("2025-01-01", None),
+    (datetime(2025, 2, 1), datetime(2025, 1, 1)),
+    (datetime(2025, 1, 1), datetime(2025, 1, 1)),
+])
+def test_invalid_ranges_are_rejected(start, end):
+    conn, cursor = mock_connection()
+
+    with pytest.raises(ValueError):
+        get_all_orders(conn, start=start, end=end)
+
+
+def test_recent_orders_continue_in_archive(archive):
+    archive.boundary = ARCHIVED_UNTIL
+    conn, cursor = mock_connection()
+    cursor.fetchall.side_effect = [[{"order_id": 9}], [{"order_id": 3}, {"order_id": 2}]]
+
+    result = get_recent_orders(conn, limit=3)
+
+    assert result == [{"order_id": 9}, {"order_id": 3}, {"order_id": 2}]
+    assert cursor.execute.call_args == call(ARCHIVED_RECENT_ORDERS_QUERY, (2,))
+
+
+def test_recent_orders_skip_archive_when_hot_table_has_enough(archive):
+    archive.boundary = ARCHIVED_UNTIL
+    conn, cursor = mock_connection()
+    cursor.fetchall.return_value = [{"order_id": 2}, {"order_id": 1}]
+
+    get_recent_orders(conn, limit=2)
+
+    cursor.execute.assert_called_once()
+
+
+# ---------------------------------------------------------
+# Decision table: store scope
+# ---------------------------------------------------------
+@pytest.mark.parametrize("start,boundary,expected_params", [
+    (None, None, (2,)),
+    (datetime(2025, 1, 1), None, (2, datetime(2025, 1, 1))),
+    (datetime(2024, 6, 1), ARCHIVED_UNTIL, (2, datetime(2024, 6, 1)) * 2),
+])
+def test_get_all_orders_filters_by_store(archive, start, boundary, expected_params):
+    archive.boundary = boundary
+    conn, cursor = mock_connection()
+
+    get_all_orders(conn, start=start, store_id=2)
+
+    sql, params = cursor.execute.call_args.args
+    assert sql.count("store_id = %s") == (2 if boundary else 1)
+    assert params == expected_params
+
+
+def test_unbounded_listing_without_archive_stays_on_hot_table(archive):
+    """BVA - nothing archived yet, no UNION"""
+    archive.boundary = None
+    conn, cursor = mock_connection()
+
+    get_all_orders(conn, store_id=2)
+
+    sql, params = cursor.execute.call_args.args
+    assert "orders_archive" not in sql and params == (2,)
+
+
+def test_store_boundary_is_cached_until_its_orders_change(monkeypatch):
+    """White-box - one boundary query per store until a write bumps its namespaces"""
+    cache = TieredCache(ttl=60)
+    monkeypatch.setattr(order_list_dao, "shared_cache", cache)
+    conn, cursor = mock_connection()
+    cursor.fetchall.return_value = [(ARCHIVED_UNTIL,)]
+
+    assert real_archive_boundary(conn, 2) == ARCHIVED_UNTIL
+    assert real_archive_boundary(conn, 2) == ARCHIVED_UNTIL
+    assert cursor.execute.call_args_list == [call(order_list_dao.STORE_ARCHIVE_BOUNDARY_QUERY, (2,))]
+
+    cache.bump(*store_namespaces(2))
+    assert real_archive_boundary(conn, 2) == ARCHIVED_UNTIL
+    assert cursor.execute.call_count == 2
+
+
+def test_recent_orders_of_a_store_continue_in_its_archive(archive):
+    archive.boundary = ARCHIVED_UNTIL
+    conn, cursor = mock_connection()
+    cursor.fetchall.side_effect = [[{"order_id": 9}], []]
+
+    get_recent_orders(conn, limit=3, store_id=2)
+
+    assert cursor.execute.call_args_list == [
+        call(recent_orders_query("orders"), (2, 3)),
+        call(recent_orders_query("orders_archive"), (2, 2)),
+    ]
@@ -0,0 +1,220 @@
+import pytest
+from unittest.mock import MagicMock
+
+from backend.db.dialects import SQLiteDialect
+from backend.db.instrumented import InstrumentedConnection
+from backend.services import order_writer as order_writer_module
+from backend.services.cache import TieredCache, store_namespaces
+from backend.services.order_writer import OrderQueueFull, OrderWriter, validate_order
+
+
+def order(name="John", product_id=1, quantity=2):
+    return {
+        "customer_name": name,
+        "total_price": 10.0,
+        "order_details": [{"product_id": product_id, "quantity": quantity, "total_price": 10.0}],
+    }
+
+
+@pytest.fixture
+def sqlite_connect():
+    """connect() for an in-memory database with one product; counts COMMITs."""
+    dialect = SQLiteDialect(":memory:")
+    setup = dialect.connect()
+    cursor = setup.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES (%s)", ("kg",))
+    cursor.execute(
+        "INSERT INTO products (name, uom_id, price_per_unit, selling_price, quantity) VALUES (%s, 1, 1, 2, 100)",
+        ("Apple",),
+    )
+    commits = []
+
+    def connect():
+        conn = InstrumentedConnection(dialect.connect())
+        commit = conn.commit
+
+        def counted_commit():
+            commits.append(1)
+            return commit()
+        conn.commit = counted_commit
+        return conn
+
+    connect.commits = commits
+    connect.query = lambda sql: setup.cursor().execute(sql).fetchall()
+    yield connect
+    setup.close()
+
+
+def queued_writer(connect, **kwargs):
+    """A writer whose thread is not started, so batches can be drained by hand."""
+    writer = OrderWriter(connect, **kwargs)
+    writer._ensure_thread = lambda: None
+    return writer
+
+
+# ---------------------------------------------------------
+# EP: validation before queueing
+# ---------------------------------------------------------
+@pytest.mark.parametrize("bad", [
+    {**order(), "customer_name": ""},
+    {**order(), "order_details": "none"},
+    {**order(), "total_price": "abc"},
+    {**order(), "order_details": [{"product_id": "x", "quantity": 1, "total_price": 1}]},
+    {**order(), "order_details": [{"product_id": 1, "quantity": 1}]},
+])
+def test_invalid_orders_are_rejected(bad):
+    with pytest.raises(ValueError):
+        validate_order(bad)
+
+
+def test_valid_order_passes():
+    validate_order(order())
+
+
+# ---------------------------------------------------------
+# White-box: batching
+# ---------------------------------------------------------
+def test_batches_are_bounded_by_max_batch(sqlite_connect):
+    writer = queued_writer(sqlite_connect, max_batch=2, max_wait=0)
+    for i in range(5):
+        writer.submit(order(f"C{i}"))
+
+    assert [len(writer._next_batch()) for _ in range(3)] == [2, 2, 1]
+
+
+def test_batch_is_committed_once(sqlite_connect):
+    writer = queued_writer(sqlite_connect, max_batch=10)
+    futures = [writer.submit(order(f"C{i}")) for i in range(4)]
+
+    writer.write_batch(writer._next_batch())
+
+    assert [f.result(timeout=1) for f in futures] == [1, 2, 3, 4]
+    assert len(sqlite_connect.commits) == 1
+    assert sqlite_connect.query("SELECT quantity FROM products") == [(92,)]
+    assert writer.stats()["batches"] == 1 and writer.stats()["largest_batch"] == 4
+
+
+def test_failed_order_is_rolled_back_alone(sqlite_connect):
+    writer = queued_writer(sqlite_connect)
+    good = writer.submit(order("Good"))
+    bad = writer.submit(order("Bad", product_id=999))   # violates the products foreign key
+    also_good = writer.submit(order("Also good"))
+
+    writer.write_batch(writer._next_batch())
+
+    assert good.result(timeout=1) and also_good.result(timeout=1)
+    with pytest.raises(Exception):
+        bad.result(timeout=1)
+    assert sqlite_connect.query("SELECT customer_name FROM orders ORDER BY order_id") == [("Good",), ("Also good",)]
+    assert sqlite_connect.query("SELECT quantity FROM products") == [(96,)]
+    assert writer.stats()["failed"] == 1
+
+
+def test_commit_failure_fails_the_whole_batch():
+    conn = MagicMock()
+    conn.commit.side_effect = RuntimeError("disk full")
+    writer = queued_writer(lambda: conn)
+    futures = [writer.submit(order()), writer.submit(order())]
+
+    writer.write_batch(writer._next_batch())
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+    conn.rollback.assert_called_once()
+    conn.close.assert_called_once()
+
+
+def test_connection_failure_fails_the_whole_batch():
+    def connect():
+        raise ConnectionError("database down")
+
+    writer = queued_writer(connect)
+    future = writer.submit(order())
+
+    writer.write_batch(writer._next_batch())
+
+    with pytest.raises(ConnectionError):
+        future.result(timeout=1)
+
+
+# ---------------------------------------------------------
+# BVA: queue capacity
+# ---------------------------------------------------------
+def test_full_queue_rejects_orders(sqlite_connect):
+    writer = queued_writer(sqlite_connect, max_queue=2)
+    writer.submit(order())
+    writer.submit(order())
+
+    with pytest.raises(OrderQueueFull):
+        writer.submit(order())
+
+
+def test_max_batch_must_be_positive(sqlite_connect):
+    with pytest.raises(ValueError):
+        OrderWriter(sqlite_connect, max_batch=0)
+
+
+# ---------------------------------------------------------
+# EP: background thread
+# ---------------------------------------------------------
+def test_background_writer_resolves_futures(sqlite_connect):
+    writer = OrderWriter(sqlite_connect, max_wait=0.05)
+    futures = [writer.submit(order(f"C{i}")) for i in range(3)]
+
+    assert sorted(f.result(timeout=5) for f in futures) == [1, 2, 3]
+    writer.shutdown()
+    assert writer.stats()["orders"] == 3
+
+
+# ---------------------------------------------------------
+# Decision table: stores and shards
+# ---------------------------------------------------------
+def test_each_order_is_written_for_its_own_store(sqlite_connect):
+    writer = queued_writer(sqlite_connect, max_wait=0)
+    mine = writer.submit(order("Mine"), store_id=1)
+    other = writer.submit(order("Other"), store_id=2)    # the product belongs to store 1
+
+    writer.write_batch(writer._next_batch())
+
+    assert mine.result() > 0
+    with pytest.raises(ValueError):
+        other.result()
+    assert sqlite_connect.query("SELECT customer_name, store_id FROM orders") == [("Mine", 1)]
+
+
+@pytest.mark.parametrize("fail_commit", [False, True])
+def test_commit_publishes_a_change_for_the_stores_written(sqlite_connect, monkeypatch, fail_commit):
+    """Also for orders whose request timed out: the cache must not outlive the write"""
+    cache = TieredCache()
+    monkeypatch.setattr(order_writer_module, "shared_cache", cache)
+
+    def connect():
+        conn = sqlite_connect()
+        if fail_commit:
+            conn.commit = MagicMock(side_effect=RuntimeError("disk full"))
+        return conn
+
+    writer = queued_writer(connect, max_wait=0)
+    writer.submit(order("Mine"), store_id=1)
+    writer.submit(order("Other"), store_id=2)    # rejected, nothing written for store 2
+
+    writer.write_batch(writer._next_batch())
+
+    assert cache.versions(store_namespaces(1)) == ((0, 0) if fail_commit else (1, 1))
+    assert cache.versions(store_namespaces(2)) == (0, 0)
+
+
+def test_writers_are_shared_per_shard(monkeypatch):
+    """BVA - any number of store ids needs only one writer per configured database"""
+    from backend.services import order_writer as module
+
+    monkeypatch.setenv("STORE_SHARDS", "7=db-b:3307")
+    monkeypatch.setattr(module, "_writers", {None: module.order_writer})
+
+    writers = {id(module.writer_for(store_id)) for store_id in range(1, 500)}
+
+    assert len(writers) == len(module._writers) == 2
+    assert module.writer_for(1) is module.writer_for(499) is module.order_writer
+    assert module.writer_for(7) is module.writer_for(7)
+    assert module.writer_for(7) is not module.order_writer
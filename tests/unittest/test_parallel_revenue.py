@@ -0,0 +1,97 @@
+import pytest
+
+from backend.services import parallel_revenue
+from backend.services.parallel_revenue import run_revenue_simulation
+from backend.services.revenue_calculator import calculate_revenue_and_profit, chunk_products, chunk_seed
+
+
+def make_products(n):
+    return [{
+        "name": f"P{i}",
+        "quantity": 20 + i % 50,
+        "price_per_unit": 1.0 + i % 3,
+        "selling_price": 2.5 + i % 4,
+    } for i in range(n)]
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """Force the pool path with two workers and a low threshold."""
+    monkeypatch.setattr(parallel_revenue, "REVENUE_PROCESSES", 2)
+    monkeypatch.setattr(parallel_revenue, "REVENUE_PARALLEL_MIN_PRODUCTS", 1)
+    yield
+    parallel_revenue.shutdown_pool()
+
+
+# ---------------------------------------------------------
+# Chunking helpers
+# ---------------------------------------------------------
+@pytest.mark.parametrize("n,size,expected", [
+    (0, 250, []),
+    (1, 250, [1]),
+    (250, 250, [250]),
+    (251, 250, [250, 1]),
+])
+def test_chunk_products_boundaries(n, size, expected):
+    """BVA - chunk sizes at and around the chunk boundary"""
+    chunks = chunk_products(make_products(n), size)
+    assert [len(c) for c in chunks] == expected
+
+
+def test_chunk_seeds_are_distinct_per_chunk():
+    """EP - every chunk gets its own stream"""
+    assert chunk_seed(7, 0) != chunk_seed(7, 1)
+    assert chunk_seed(7, 0) == chunk_seed(7, 0)
+
+
+# ---------------------------------------------------------
+# Pool execution
+# ---------------------------------------------------------
+def test_parallel_matches_serial_for_same_seed(small_pool):
+    """Decision table - seeded results do not depend on where chunks run"""
+    products = make_products(600)
+
+    serial = calculate_revenue_and_profit(products, days=10, seed=42)
+    parallel = run_revenue_simulation(products, days=10, seed=42)
+
+    assert parallel == serial
+
+
+def test_parallel_keeps_product_order(small_pool):
+    """White-box - chunks are merged back in input order"""
+    products = make_products(520)
+
+    result = run_revenue_simulation(products, days=3, seed=1)
+
+    assert [d["product"] for d in result["details"]] == [p["name"] for p in products]
+    assert result["summary"]["total_units_sold"] == sum(d["sold_units"] for d in result["details"])
+
+
+def test_parallel_reports_progress(small_pool):
+    """EP - progress reaches the full product count"""
+    products = make_products(300)
+    calls = []
+
+    run_revenue_simulation(products, days=2, seed=5, progress=lambda done, total: calls.append((done, total)))
+
+    assert calls[-1] == (300, 300)
+
+
+def test_parallel_validates_arguments(small_pool):
+    """EP - invalid days are rejected before any work is queued"""
+    with pytest.raises(ValueError):
+        run_revenue_simulation(make_products(10), days=0, seed=1)
+
+
+def test_small_catalog_skips_pool(monkeypatch):
+    """BVA - below the threshold the pool is never created"""
+    monkeypatch.setattr(parallel_revenue, "REVENUE_PROCESSES", 4)
+    monkeypatch.setattr(parallel_revenue, "REVENUE_PARALLEL_MIN_PRODUCTS", 100)
+
+    def fail():
+        raise AssertionError("pool should not be used")
+
+    monkeypatch.setattr(parallel_revenue, "_get_pool", fail)
+
+    result = run_revenue_simulation(make_products(99), days=2, seed=3)
+    assert len(result["details"]) == 99
@@ -0,0 +1,203 @@
+from unittest.mock import MagicMock
+
+from mysql.connector.pooling import PooledMySQLConnection
+
+from backend.dao.order_dao import INSERT_ORDER_ITEM_QUERY, REDUCE_STOCK_QUERY, add_order
+from backend.dao.products_dao import GET_ALL_PRODUCTS_QUERY, get_all_products
+from backend.db.dialects import SQLiteDialect
+from backend.db.instrumented import InstrumentedConnection, add_query_observer, remove_query_observer
+from backend.db.prepared import prepared_statement_count, statement_cursor
+
+
+class FakePreparedCursor:
+    """Records what a mysql-connector prepared cursor would be asked to do."""
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.executed = []
+        self.rows = []
+        self.closed = False
+        self.lastrowid = None
+
+    def execute(self, operation, params=None):
+        self.executed.append((operation, params))
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeMySQLConnection:
+    def __init__(self):
+        self.connection_id = 1
+        self.text_cursor = MagicMock()
+        self.prepared = []
+
+    def cmd_stmt_prepare(self, statement):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def cursor(self, prepared=False, dictionary=False):
+        if not prepared:
+            return self.text_cursor
+        cursor = FakePreparedCursor(dictionary)
+        self.prepared.append(cursor)
+        return cursor
+
+
+class FakePooledConnection(PooledMySQLConnection):
+    """The pool's proxy, around a fake instead of a live connection."""
+
+    def __init__(self, cnx):
+        self._cnx = cnx
+
+    def close(self):
+        pass
+
+
+def pooled(cnx=None):
+    cnx = cnx or FakeMySQLConnection()
+    return InstrumentedConnection(FakePooledConnection(cnx)), cnx
+
+
+# ---------------------------------------------------------
+# White-box: one prepared cursor per statement and session
+# ---------------------------------------------------------
+def test_cursor_is_prepared_once_per_pooled_connection():
+    cnx = FakeMySQLConnection()
+
+    # Two requests checking out the same pooled connection
+    for _ in range(2):
+        conn, _ = pooled(cnx)
+        statement_cursor(conn, GET_ALL_PRODUCTS_QUERY).execute(GET_ALL_PRODUCTS_QUERY)
+        conn.close()
+
+    assert len(cnx.prepared) == 1
+    assert len(cnx.prepared[0].executed) == 2
+    assert prepared_statement_count(conn) == 1
+
+
+def test_dictionary_and_tuple_cursors_are_separate():
+    conn, cnx = pooled()
+
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY)
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY, dictionary=True)
+
+    assert [c.dictionary for c in cnx.prepared] == [False, True]
+
+
+def test_reconnected_session_prepares_again():
+    conn, cnx = pooled()
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY)
+
+    cnx.connection_id = 2       # the pool reconnected the connection
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY)
+
+    assert len(cnx.prepared) == 2
+    assert prepared_statement_count(conn) == 1
+
+
+def test_close_keeps_the_statement_prepared():
+    conn, cnx = pooled()
+
+    cursor = statement_cursor(conn, GET_ALL_PRODUCTS_QUERY)
+    cursor.execute(GET_ALL_PRODUCTS_QUERY)
+    cursor.close()
+
+    assert not cnx.prepared[0].closed
+
+
+def test_prepared_statements_are_reported_to_observers():
+    seen = []
+
+    def observer(record):
+        seen.append(record.operation)
+
+    add_query_observer(observer)
+    try:
+        get_all_products(pooled()[0])
+    finally:
+        remove_query_observer(observer)
+
+    assert seen == [GET_ALL_PRODUCTS_QUERY]
+
+
+# ---------------------------------------------------------
+# Decision table: when a plain cursor is used instead
+# ---------------------------------------------------------
+def test_plain_cursor_for_unwrapped_connections():
+    conn = MagicMock()
+
+    assert statement_cursor(conn, GET_ALL_PRODUCTS_QUERY, dictionary=True) is conn.cursor.return_value
+    conn.cursor.assert_called_once_with(dictionary=True)
+
+
+def test_plain_cursor_for_connections_outside_the_pool():
+    cnx = FakeMySQLConnection()
+    conn = InstrumentedConnection(cnx)
+
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY).execute(GET_ALL_PRODUCTS_QUERY)
+
+    assert cnx.prepared == []
+    cnx.text_cursor.execute.assert_called_once()
+
+
+def test_plain_cursor_when_disabled(monkeypatch):
+    monkeypatch.setenv("MYSQL_PREPARED", "0")
+    conn, cnx = pooled()
+
+    statement_cursor(conn, GET_ALL_PRODUCTS_QUERY)
+
+    assert cnx.prepared == []
+
+
+def test_sqlite_uses_plain_cursors():
+    conn = InstrumentedConnection(SQLiteDialect(":memory:").connect())
+
+    assert get_all_products(conn) == []
+    assert prepared_statement_count(conn) == 0
+
+
+# ---------------------------------------------------------
+# EP: DAOs run their hot statements prepared
+# ---------------------------------------------------------
+def test_get_all_products_maps_prepared_rows():
+    conn, cnx = pooled()
+    # Cursor objects are created on first use, so seed the rows through a first call
+    get_all_products(conn)
+    cnx.prepared[0].rows = [(1, "Apple", 1, 2.5, 5.0, 100, "kg")]
+
+    products = get_all_products(conn)
+
+    assert products[0]["name"] == "Apple"
+    assert len(cnx.prepared) == 1
+
+
+def test_add_order_prepares_item_statements():
+    conn, cnx = pooled()
+    order = {
+        "customer_name": "John",
+        "total_price": 20.0,
+        "order_details": [
+            {"product_id": 1, "quantity": 2, "total_price": 10},
+            {"product_id": 2, "quantity": 1, "total_price": 10},
+        ],
+    }
+
+    add_order(conn, order)
+    add_order(conn, order)
+
+    by_statement = {c.executed[0][0]: c for c in cnx.prepared}
+    assert set(by_statement) == {INSERT_ORDER_ITEM_QUERY, REDUCE_STOCK_QUERY}
+    assert len(by_statement[INSERT_ORDER_ITEM_QUERY].executed) == 4
+    assert by_statement[REDUCE_STOCK_QUERY].executed[0][1] == (2.0, 1)
@@ -2,7 +2,11 @@ import pytest
 from unittest.mock import MagicMock
 
 from backend.dao.products_dao import (
+    LOW_STOCK_QUERY,
+    STORE_LOW_STOCK_QUERY,
     get_all_products,
+    get_all_products_columns,
+    get_low_stock_products,
     insert_new_product,
     delete_product,
     update_product
@@ -22,6 +26,21 @@ def mock_connection():
 # -------------------------------------------------
 # GET ALL PRODUCTS
 # -------------------------------------------------
+def test_get_all_products_columns_returns_cursor_tuples(mock_connection):
+    """White-box: columnar listing passes the fetched tuples through untouched"""
+    conn, cursor = mock_connection
+    rows = [(1, "Apple", 1, 2.5, 5.0, 100, "kg")]
+    cursor.fetchall.return_value = rows
+    cursor.description = [(name,) for name in
+                          ("product_id", "name", "uom_id", "price_per_unit", "selling_price", "quantity", "uom_name")]
+
+    columns, result = get_all_products_columns(conn)
+
+    assert columns[0] == "product_id" and columns[-1] == "uom_name"
+    assert result is rows
+    conn.cursor.assert_called_once_with()
+
+
 def test_get_all_products_returns_list(mock_connection):
     """EP: Valid DB rows are converted to dicts correctly"""
     conn, cursor = mock_connection
@@ -254,3 +273,145 @@ def test_update_product_rejects_large_quantity(mock_connection):
 
     with pytest.raises(ValueError):
         update_product(conn, product)
+
+
+# -------------------------------------------------------
+# LOW STOCK / REORDER THRESHOLD
+# -------------------------------------------------------
+def test_get_low_stock_products_adds_reorder_quantity(mock_connection):
+    """EP: every returned product gets the units missing to its threshold"""
+    conn, cursor = mock_connection
+    cursor.fetchall.return_value = [
+        {"product_id": 3, "name": "Milk", "quantity": 2, "reorder_threshold": 10, "uom_name": "litre"},
+        {"product_id": 1, "name": "Apple", "quantity": 5, "reorder_threshold": 5, "uom_name": "kg"},
+    ]
+
+    products = get_low_stock_products(conn)
+
+    assert [p["reorder_quantity"] for p in products] == [8, 0]
+    query = cursor.execute.call_args.args[0]
+    assert "(p.quantity - p.reorder_threshold) <= 0" in query
+
+
+def test_insert_product_with_reorder_threshold(mock_connection):
+    conn, cursor = mock_connection
+
+    insert_new_product(conn, {
+        "name": "Milk", "uom_id": 3, "price_per_unit": 1.0, "quantity": 10, "reorder_threshold": "4",
+    })
+
+    query, data = cursor.execute.call_args.args
+    assert "reorder_threshold" in query
+    assert data == ("Milk", 3, 1.0, 1.5, 10, 4)
+
+
+def test_update_product_without_threshold_keeps_it(mock_connection):
+    """Decision table: threshold not sent -> column not touched"""
+    conn, cursor = mock_connection
+
+    update_product(conn, {
+        "product_id": 7, "name": "Milk", "uom_id": 3, "price_per_unit": 1.0, "quantity": 10,
+    })
+
+    query, _ = cursor.execute.call_args.args
+    assert "reorder_threshold" not in query
+
+
+def test_update_product_sets_threshold(mock_connection):
+    conn, cursor = mock_connection
+
+    update_product(conn, {
+        "product_id": 7, "name": "Milk", "uom_id": 3, "price_per_unit": 1.0, "quantity": 10,
+        "reorder_threshold": 0,
+    })
+
+    query, data = cursor.execute.call_args.args
+    assert "reorder_threshold = %s" in query
+    assert data == ("Milk", 3, 1.0, 1.5, 10, 0, 7)
+
+
+@pytest.mark.parametrize("threshold", [-1, "abc"])
+def test_invalid_reorder_threshold_is_rejected(mock_connection, threshold):
+    """BVA: thresholds start at 0"""
+    conn, cursor = mock_connection
+
+    with pytest.raises(ValueError):
+        insert_new_product(conn, {
+            "name": "Milk", "uom_id": 3, "price_per_unit": 1.0, "quantity": 10,
+            "reorder_threshold": threshold,
+        })
+    conn.commit.assert_not_called()
+
+
+def test_low_stock_query_uses_the_index():
+    """White-box: SQLite answers /lowStock from idx_products_stock_margin"""
+    from backend.db.dialects import SQLiteDialect
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + LOW_STOCK_QUERY)
+    plan = " ".join(row[3] for row in cursor.fetchall())
+    conn.close()
+
+    assert "idx_products_stock_margin" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+# -------------------------------------------------
+# STORES
+# -------------------------------------------------
+@pytest.fixture
+def two_stores():
+    from backend.db.dialects import SQLiteDialect
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO uom (uom_name) VALUES ('kg')")
+    cursor.executemany(
+        "INSERT INTO products (name, uom_id, price_per_unit, quantity, reorder_threshold, store_id) "
+        "VALUES (%s, 1, 1.0, %s, 10, %s)",
+        [("Apple", 5, 1), ("Pear", 50, 1), ("Apple", 0, 2)],
+    )
+    yield conn
+    conn.close()
+
+
+def test_listings_are_scoped_to_the_store(two_stores):
+    """EP: each store sees only its own products"""
+    assert [p["product_id"] for p in get_all_products(two_stores, store_id=1)] == [1, 2]
+    assert [p["product_id"] for p in get_all_products(two_stores, store_id=2)] == [3]
+    assert get_all_products(two_stores, store_id=3) == []
+    assert len(get_all_products(two_stores)) == 3
+
+
+def test_low_stock_is_scoped_to_the_store(two_stores):
+    assert [p["product_id"] for p in get_low_stock_products(two_stores, store_id=1)] == [1]
+    assert [p["product_id"] for p in get_low_stock_products(two_stores, store_id=2)] == [3]
+
+
+def test_writes_do_not_touch_other_stores(two_stores):
+    """Decision table: delete/update match product_id and store_id"""
+    assert delete_product(two_stores, 3, store_id=1) == 0
+    assert update_product(two_stores, {
+        "product_id": 3, "name": "Plum", "uom_id": 1, "price_per_unit": 1.0, "quantity": 1,
+    }, store_id=1) == 0
+
+    new_id = insert_new_product(two_stores, {
+        "name": "Kiwi", "uom_id": 1, "price_per_unit": 1.0, "quantity": 1,
+    }, store_id=2)
+
+    assert [p["product_id"] for p in get_all_products(two_stores, store_id=2)] == [3, new_id]
+
+
+def test_store_low_stock_query_uses_the_index():
+    """White-box: the store-scoped /lowStock reads idx_products_store_stock_margin"""
+    from backend.db.dialects import SQLiteDialect
+
+    conn = SQLiteDialect(":memory:").connect()
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN QUERY PLAN " + STORE_LOW_STOCK_QUERY.replace("%s", "?"), (1,))
+    plan = " ".join(row[3] for row in cursor.fetchall())
+    conn.close()
+
+    assert "idx_products_store_stock_margin" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,103 @@
+import cProfile
+import os
+import pstats
+
+import pytest
+
+from backend.monitoring.profiling import (
+    is_authorized,
+    list_profiles,
+    profile_as_text,
+    save_profile,
+    should_profile,
+)
+
+
+def busy():
+    return sum(i * i for i in range(1000))
+
+
+def make_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    busy()
+    profiler.disable()
+    return profiler
+
+
+# ---------------------------------------------------------
+# Decision table: which requests are profiled
+# ---------------------------------------------------------
+@pytest.mark.parametrize("headers,rate,token,expected", [
+    ({}, 0.0, None, False),                       # nothing asked
+    ({"X-Profile": "1"}, 0.0, None, True),        # header, no token configured
+    ({"X-Profile": "0"}, 0.0, None, False),
+    ({"X-Profile": "s3cret"}, 0.0, "s3cret", True),
+    ({"X-Profile": "1"}, 0.0, "s3cret", False),   # wrong token
+    ({}, 1.0, None, True),                        # always sampled
+])
+def test_should_profile(headers, rate, token, expected):
+    assert should_profile(headers, sample_rate=rate, token=token) is expected
+
+
+@pytest.mark.parametrize("headers,token,local,expected", [
+    ({"X-Profile": "1"}, None, True, True),
+    ({"X-Profile": "1"}, None, False, False),        # remote caller without a token
+    ({"X-Profile": "s3cret"}, "s3cret", False, True),
+    ({"X-Profile": "1"}, "s3cret", True, False),     # local callers need the token too
+])
+def test_header_trigger_is_restricted(headers, token, local, expected):
+    assert should_profile(headers, sample_rate=0.0, token=token, local=local) is expected
+
+
+@pytest.mark.parametrize("headers,token,local,expected", [
+    ({}, None, True, True),
+    ({}, None, False, False),
+    ({"X-Profile": "s3cret"}, "s3cret", False, True),
+    ({"X-Profile": "s3cre"}, "s3cret", True, False),
+    ({}, "s3cret", True, False),
+])
+def test_is_authorized(headers, token, local, expected):
+    assert is_authorized(headers, token, local) is expected
+
+
+def test_sampling_uses_rate():
+    """BVA - draws just below and at the rate"""
+    assert should_profile({}, sample_rate=0.1, rand=lambda: 0.099) is True
+    assert should_profile({}, sample_rate=0.1, rand=lambda: 0.1) is False
+
+
+# ---------------------------------------------------------
+# White-box: storage and listing
+# ---------------------------------------------------------
+def test_save_profile_writes_stats_and_metadata(tmp_path):
+    name = save_profile(make_profile(), str(tmp_path), "/getOrder/<int:order_id>", "GET", 200, 0.0123)
+
+    assert name.endswith("_GET_getOrder_int_order_id.prof")
+    stats = pstats.Stats(str(tmp_path / name))
+    assert any(func[2] == "busy" for func in stats.stats)
+
+    [meta] = list_profiles(str(tmp_path))
+    assert meta["name"] == name
+    assert meta["route"] == "/getOrder/<int:order_id>"
+    assert meta["status"] == 200
+    assert meta["duration_ms"] == pytest.approx(12.3)
+
+
+def test_only_newest_profiles_are_kept(tmp_path):
+    for route in ("/a", "/b", "/c"):
+        save_profile(make_profile(), str(tmp_path), route, "GET", 200, 0.01, max_files=2)
+
+    routes = [p["route"] for p in list_profiles(str(tmp_path))]
+    assert len(routes) == 2
+    assert "/a" not in routes
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_list_profiles_of_missing_directory(tmp_path):
+    assert list_profiles(str(tmp_path / "missing")) == []
+
+
+def test_profile_as_text_lists_functions(tmp_path):
+    name = save_profile(make_profile(), str(tmp_path), "/x", "GET", 200, 0.01)
+    assert "busy" in profile_as_text(str(tmp_path / name))
@@ -0,0 +1,147 @@
+import logging
+
+import pytest
+from unittest.mock import MagicMock
+
+from backend.db.instrumented import QueryRecord
+from backend.db.query_stats import QueryStats, fingerprint, params_shape
+
+
+def make_record(operation, seconds, rows=0, params=None, connection=None):
+    record = QueryRecord(operation, params, connection)
+    record.seconds = seconds
+    record.rows = rows
+    return record
+
+
+# ---------------------------------------------------------
+# EP: fingerprinting
+# ---------------------------------------------------------
+@pytest.mark.parametrize("sql,expected", [
+    ("SELECT * FROM orders WHERE order_id = %s", "SELECT * FROM orders WHERE order_id = ?"),
+    ("SELECT * FROM orders WHERE order_id = 42", "SELECT * FROM orders WHERE order_id = ?"),
+    ("SELECT * FROM t WHERE name = 'Apple'", "SELECT * FROM t WHERE name = ?"),
+    ("SELECT * FROM t WHERE id IN (%s, %s, %s)", "SELECT * FROM t WHERE id IN (...)"),
+    ("SELECT  a\n   FROM t1", "SELECT a FROM t1"),
+    ("INSERT INTO t (a, b) VALUES (%(a)s, %(b)s)", "INSERT INTO t (a, b) VALUES (?, ?)"),
+])
+def test_fingerprint(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_in_lists_of_different_length_share_a_fingerprint():
+    assert fingerprint("DELETE FROM t WHERE id IN (1, 2)") == fingerprint("DELETE FROM t WHERE id IN (%s)")
+
+
+@pytest.mark.parametrize("params,expected", [
+    (None, "()"),
+    ((1, "x", 2.5), "(int, str, float)"),
+    ({"id": 1}, "{id: int}"),
+    ([(1, 2), (3, 4)], "2 x (int, int)"),
+])
+def test_params_shape_has_types_only(params, expected):
+    assert params_shape(params) == expected
+
+
+# ---------------------------------------------------------
+# White-box: aggregation and top-N
+# ---------------------------------------------------------
+def test_calls_with_different_values_are_grouped():
+    stats = QueryStats(slow_threshold=10)
+    stats.record(make_record("SELECT * FROM t WHERE id = 1", 0.01, rows=1))
+    stats.record(make_record("SELECT * FROM t WHERE id = 2", 0.03, rows=1))
+
+    [top] = stats.top()
+    assert top["calls"] == 2
+    assert top["rows"] == 2
+    assert top["max_seconds"] == pytest.approx(0.03)
+    assert top["avg_seconds"] == pytest.approx(0.02)
+
+
+@pytest.mark.parametrize("sort,first", [
+    ("total", "SELECT * FROM many"),
+    ("max", "SELECT * FROM spiky"),
+    ("avg", "SELECT * FROM spiky"),
+])
+def test_top_sort_orders(sort, first):
+    stats = QueryStats(slow_threshold=10)
+    for _ in range(10):
+        stats.record(make_record("SELECT * FROM many", 0.05))
+    stats.record(make_record("SELECT * FROM spiky", 0.3))
+
+    assert stats.top(1, sort)[0]["fingerprint"] == first
+
+
+def test_top_rejects_unknown_sort():
+    with pytest.raises(ValueError):
+        QueryStats().top(sort="rows")
+
+
+def test_reset_clears_stats():
+    stats = QueryStats(slow_threshold=10)
+    stats.record(make_record("SELECT 1", 0.01))
+    stats.reset()
+    assert stats.top() == []
+
+
+# ---------------------------------------------------------
+# Decision table: slow-query log and EXPLAIN
+# ---------------------------------------------------------
+def test_fast_query_is_not_logged(caplog):
+    stats = QueryStats(slow_threshold=0.2)
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        stats.record(make_record("SELECT 1", 0.1))
+    assert caplog.records == []
+
+
+def test_slow_select_is_logged_with_shape_and_plan(caplog):
+    raw = MagicMock()
+    raw.cursor.return_value.fetchall.return_value = [(1, "SIMPLE", "orders", "ALL")]
+    stats = QueryStats(slow_threshold=0.2)
+
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        stats.record(make_record("SELECT * FROM orders WHERE customer_name = %s", 0.5,
+                                 params=("secret",), connection=raw))
+
+    message = caplog.records[0].getMessage()
+    assert "(str)" in message
+    assert "secret" not in message
+    assert "EXPLAIN" in message and "ALL" in message
+    raw.cursor.return_value.execute.assert_called_once_with(
+        "EXPLAIN SELECT * FROM orders WHERE customer_name = %s", ("secret",)
+    )
+
+
+def test_explain_is_rate_limited_per_fingerprint(caplog):
+    raw = MagicMock()
+    raw.cursor.return_value.fetchall.return_value = []
+    stats = QueryStats(slow_threshold=0.2, explain_interval=60)
+
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        for i in range(3):
+            stats.record(make_record(f"SELECT * FROM t WHERE id = {i}", 0.5, connection=raw))
+
+    assert len(caplog.records) == 3
+    assert raw.cursor.return_value.execute.call_count == 1
+
+
+def test_slow_write_is_logged_without_explain(caplog):
+    raw = MagicMock()
+    stats = QueryStats(slow_threshold=0.2)
+
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        stats.record(make_record("UPDATE products SET stock = 0", 0.5, connection=raw))
+
+    assert len(caplog.records) == 1
+    raw.cursor.assert_not_called()
+
+
+def test_failing_explain_does_not_raise(caplog):
+    raw = MagicMock()
+    raw.cursor.side_effect = RuntimeError("connection lost")
+    stats = QueryStats(slow_threshold=0.2)
+
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        stats.record(make_record("SELECT 1", 0.5, connection=raw))
+
+    assert "unavailable" in caplog.records[0].getMessage()
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.web import read_routing
+from backend.web.read_routing import COOKIE, init_read_routing, read_connection, read_only
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(read_routing, "get_sql_connection", lambda store_id=None: "primary")
+    monkeypatch.setattr(read_routing, "get_read_connection", lambda store_id=None: "replica")
+
+    app = Flask(__name__)
+
+    @app.route("/read")
+    def read():
+        return jsonify({"connection": read_connection()})
+
+    @app.route("/write", methods=["POST", "DELETE"])
+    def write():
+        return jsonify({}), 200
+
+    @app.route("/failed", methods=["POST"])
+    def failed():
+        return jsonify({}), 400
+
+    @app.route("/calc", methods=["POST"])
+    @read_only
+    def calc():
+        return jsonify({}), 200
+
+    init_read_routing(app)
+    return app
+
+
+def connection_used(client):
+    return client.get("/read").get_json()["connection"]
+
+
+# ---------------------------------------------------------
+# EP: reads go to the replica, writes open a primary window
+# ---------------------------------------------------------
+def test_reads_use_the_replica(app):
+    assert connection_used(app.test_client()) == "replica"
+
+
+@pytest.mark.parametrize("method", ["post", "delete"])
+def test_reads_after_a_write_use_the_primary(app, method):
+    client = app.test_client()
+
+    response = getattr(client, method)("/write")
+
+    assert COOKIE in response.headers["Set-Cookie"]
+    assert connection_used(client) == "primary"
+
+
+def test_other_clients_keep_using_the_replica(app):
+    app.test_client().post("/write")
+
+    assert connection_used(app.test_client()) == "replica"
+
+
+# ---------------------------------------------------------
+# Decision table: which responses open the window
+# ---------------------------------------------------------
+@pytest.mark.parametrize("path,method", [
+    ("/failed", "post"),     # rejected write
+    ("/calc", "post"),       # @read_only
+    ("/read", "get"),
+])
+def test_no_window_without_a_write(app, path, method):
+    client = app.test_client()
+
+    response = getattr(client, method)(path)
+
+    assert "Set-Cookie" not in response.headers
+    assert connection_used(client) == "replica"
+
+
+def test_window_zero_disables_the_cookie(app, monkeypatch):
+    monkeypatch.setenv("READ_YOUR_WRITES_SECONDS", "0")
+
+    assert "Set-Cookie" not in app.test_client().post("/write").headers
+
+
+# ---------------------------------------------------------
+# BVA: window expiry
+# ---------------------------------------------------------
+@pytest.mark.parametrize("offset,expected", [
+    (-1, "replica"),
+    (30, "primary"),
+])
+def test_window_expiry(app, offset, expected):
+    client = app.test_client()
+    client.set_cookie(COOKIE, str(time.time() + offset))
+
+    assert connection_used(client) == expected
+
+
+def test_malformed_cookie_is_ignored(app):
+    client = app.test_client()
+    client.set_cookie(COOKIE, "soon")
+
+    assert connection_used(client) == "replica"
+
+
+def test_outside_a_request_reads_use_the_replica(app):
+    assert read_connection() == "replica"
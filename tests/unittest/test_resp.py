@@ -0,0 +1,161 @@
+import io
+import pytest
+
+from backend.services.resp import (
+    CacheUnavailable,
+    RespClient,
+    RespError,
+    encode_command,
+    read_reply,
+)
+from backend.services.resp_server import RespServer, Store
+
+
+@pytest.fixture
+def server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = RespClient.from_url(server.url)
+    yield client
+    client.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------------------------------------------
+# EP: protocol encoding
+# ---------------------------------------------------------
+def test_commands_are_arrays_of_bulk_strings():
+    assert encode_command("SET", "k", 12) == b"*3\r\n$3\r\nSET\r\n$1\r\nk\r\n$2\r\n12\r\n"
+
+
+@pytest.mark.parametrize("raw,expected", [
+    (b"+OK\r\n", "OK"),
+    (b":42\r\n", 42),
+    (b"$3\r\na\r\n\r\n", b"a\r\n"),   # bulk strings are binary safe
+    (b"$-1\r\n", None),
+    (b"*2\r\n$1\r\na\r\n$-1\r\n", [b"a", None]),
+])
+def test_replies_are_parsed(raw, expected):
+    assert read_reply(io.BytesIO(raw)) == expected
+
+
+def test_error_replies_are_returned_as_errors():
+    reply = read_reply(io.BytesIO(b"-ERR boom\r\n"))
+    assert isinstance(reply, RespError) and str(reply) == "ERR boom"
+
+
+def test_truncated_reply():
+    with pytest.raises(CacheUnavailable):
+        read_reply(io.BytesIO(b"$5\r\nab"))
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("redis://cache", ("cache", 6379, 0, None)),
+    ("redis://:s%40cret@cache:6380/2", ("cache", 6380, 2, "s@cret")),
+])
+def test_from_url(url, expected):
+    client = RespClient.from_url(url)
+    assert (client.host, client.port, client.db, client.password) == expected
+
+
+def test_unsupported_url_scheme():
+    with pytest.raises(ValueError):
+        RespClient.from_url("http://cache:6379")
+
+
+# ---------------------------------------------------------
+# EP: client against the stand-in server
+# ---------------------------------------------------------
+def test_round_trip(client):
+    assert client.ping()
+    assert client.set("a", b"1") == "OK"
+    assert client.get("a") == b"1"
+    assert client.mget(["a", "missing"]) == [b"1", None]
+    assert client.incr("n") == 1 and client.incr("n") == 2
+    assert client.delete("a", "n", "missing") == 2
+    assert client.get("a") is None
+
+
+def test_pipeline_keeps_reply_order(client):
+    replies = client.pipeline([("INCR", "x"), ("INCR", "x"), ("GET", "x")])
+    assert replies == [1, 2, b"2"]
+
+
+def test_server_errors_are_raised(client):
+    client.set("text", b"abc")
+
+    with pytest.raises(RespError):
+        client.incr("text")
+    with pytest.raises(RespError):
+        client.execute("NOPE")
+
+    assert client.ping()   # the connection stays usable
+
+
+def test_unreachable_server():
+    server = RespServer().start()
+    server.stop()
+    client = RespClient.from_url(server.url, timeout=0.2)
+
+    with pytest.raises(CacheUnavailable):
+        client.ping()
+
+
+def test_client_reconnects_after_the_connection_broke(server, client):
+    client.set("a", b"1")
+    server.drop_connections()
+
+    with pytest.raises(CacheUnavailable):
+        client.get("a")
+    assert client.get("a") == b"1"
+
+
+# ---------------------------------------------------------
+# BVA: expiry in the stand-in keyspace
+# ---------------------------------------------------------
+def test_keys_expire():
+    clock = FakeClock()
+    store = Store(clock)
+    store.execute([b"SET", b"a", b"1", b"PX", b"1500"])
+    store.execute([b"SET", b"b", b"1", b"EX", b"1"])
+
+    clock.now += 1.0
+    assert store.execute([b"MGET", b"a", b"b"]) == [b"1", None]
+    clock.now += 0.5
+    assert store.execute([b"GET", b"a"]) is None
+
+
+def test_set_nx_and_invalid_options():
+    store = Store()
+    assert store.execute([b"SET", b"a", b"1", b"NX"]) == "OK"
+    assert store.execute([b"SET", b"a", b"2", b"NX"]) is None
+    assert isinstance(store.execute([b"SET", b"a", b"1", b"PX", b"0"]), RespError)
+    assert isinstance(store.execute([b"SET", b"a", b"1", b"KEEPTTL"]), RespError)
+    assert isinstance(store.execute([b"GET"]), RespError)
+
+
+def test_expired_keys_are_swept(monkeypatch):
+    from backend.services import resp_server
+
+    monkeypatch.setattr(resp_server, "SWEEP_EVERY", 3)
+    clock = FakeClock()
+    store = Store(clock)
+    store.execute([b"SET", b"old", b"1", b"PX", b"10"])
+    clock.now += 1
+
+    store.execute([b"SET", b"a", b"1"])
+    store.execute([b"SET", b"b", b"1"])
+
+    assert len(store) == 2
@@ -0,0 +1,103 @@
+import pytest
+
+from backend.services.revenue_analytic import (
+    expected_sales_table,
+    expected_sales,
+    calculate_expected_revenue_and_profit,
+)
+from backend.services.revenue_calculator import calculate_revenue_and_profit
+
+
+def product(quantity, mean=None, std=None):
+    return {
+        "name": "Test",
+        "quantity": quantity,
+        "price_per_unit": 1.0,
+        "selling_price": 3.0,
+        "demand_mean": mean,
+        "demand_std": std,
+    }
+
+
+# ---------------------------------------------------------
+# Expected daily sales table
+# ---------------------------------------------------------
+def test_table_is_deterministic_for_zero_std():
+    """EP - std = 0 sells exactly int(mean) units"""
+    table = expected_sales_table(3.0, 0.0)
+    assert table[-1] == 3
+    assert expected_sales(table, 2) == 2     # capped by stock
+    assert expected_sales(table, 10) == 3
+
+
+@pytest.mark.parametrize("stock,expected", [
+    (0, 0.0),       # BVA - empty stock
+    (-1, 0.0),      # BVA - negative expected stock
+    (1.5, 1.5),     # interpolates between integer stock levels
+])
+def test_expected_sales_stock_boundaries(stock, expected):
+    table = expected_sales_table(5.0, 0.0)
+    assert expected_sales(table, stock) == pytest.approx(expected)
+
+
+def test_table_is_monotonic_and_bounded_by_mean():
+    """White-box - E[min(D, s)] grows with s and never exceeds E[D]"""
+    table = expected_sales_table(5.0, 2.0)
+    assert all(a <= b for a, b in zip(table, table[1:]))
+    assert table[-1] <= 5.0
+
+
+def test_negative_mean_never_sells():
+    """BVA - demand entirely below zero"""
+    assert expected_sales_table(-3.0, 0.5)[-1] == pytest.approx(0.0, abs=1e-9)
+
+
+# ---------------------------------------------------------
+# Projection
+# ---------------------------------------------------------
+def test_unbounded_stock_sells_mean_every_day():
+    """EP - with ample stock total = days * E[D]"""
+    table = expected_sales_table(5.0, 2.0)
+    result = calculate_expected_revenue_and_profit([product(100000)], days=30)
+
+    assert result["details"][0]["sold_units"] == pytest.approx(30 * table[-1], abs=0.01)
+
+
+def test_stock_caps_expected_sales():
+    """BVA - never sells more than the initial stock"""
+    result = calculate_expected_revenue_and_profit([product(12, 3.0, 0.0)], days=10)
+    detail = result["details"][0]
+
+    assert detail["sold_units"] == 12
+    assert detail["remaining_stock"] == 0
+    assert detail["revenue"] == 36
+    assert detail["profit"] == 24
+
+
+def test_close_to_sampled_average():
+    """Decision table - analytic result matches the mean of many sampled runs"""
+    p = product(200)
+    runs = [
+        calculate_revenue_and_profit([p], days=14, seed=s)["details"][0]["sold_units"]
+        for s in range(1, 301)
+    ]
+    sampled_mean = sum(runs) / len(runs)
+
+    expected = calculate_expected_revenue_and_profit([p], days=14)["details"][0]["sold_units"]
+
+    assert expected == pytest.approx(sampled_mean, rel=0.03)
+
+
+def test_summary_totals_match_details():
+    products = [product(50), product(5, 2.0, 1.0)]
+    result = calculate_expected_revenue_and_profit(products, days=7)
+
+    assert result["summary"]["total_units_sold"] == pytest.approx(
+        sum(d["sold_units"] for d in result["details"]), abs=0.01
+    )
+
+
+@pytest.mark.parametrize("days", [0, -1, 1.5, None])
+def test_invalid_days_raises(days):
+    with pytest.raises(ValueError):
+        calculate_expected_revenue_and_profit([product(10)], days=days)
@@ -0,0 +1,97 @@
+import gc
+import os
+import pytest
+
+from backend.serve import (
+    parse_args, build_options, load_app, default_workers, cache_warning, configure_revenue_pool,
+)
+
+
+# ---------------------------------------------------------
+# EP: defaults and overrides
+# ---------------------------------------------------------
+def test_default_options(monkeypatch):
+    for name in ["GSM_BIND", "GSM_WORKERS", "GSM_THREADS", "GSM_MAX_REQUESTS"]:
+        monkeypatch.delenv(name, raising=False)
+
+    options = build_options(parse_args([]))
+
+    assert options["bind"] == "0.0.0.0:5050"
+    assert options["workers"] == default_workers()
+    assert options["threads"] == 4
+    assert options["worker_class"] == "gthread"
+    assert options["preload_app"] is True
+    assert options["max_requests"] == 10000
+
+
+def test_cli_overrides_environment(monkeypatch):
+    monkeypatch.setenv("GSM_WORKERS", "2")
+
+    assert build_options(parse_args([]))["workers"] == 2
+    assert build_options(parse_args(["--workers", "6"]))["workers"] == 6
+
+
+@pytest.mark.parametrize("flag,key,value", [
+    ("--threads", "threads", 16),
+    ("--max-requests", "max_requests", 0),   # BVA - recycling disabled
+    ("--timeout", "timeout", 120),
+])
+def test_numeric_flags(flag, key, value):
+    assert build_options(parse_args([flag, str(value)]))[key] == value
+
+
+# ---------------------------------------------------------
+# White-box: app is preloaded and the GC frozen
+# ---------------------------------------------------------
+def test_load_app_freezes_gc():
+    try:
+        app = load_app()
+        assert app.name == "backend.app"
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+# ---------------------------------------------------------
+# Decision table: per-process cache with several workers
+# ---------------------------------------------------------
+@pytest.mark.parametrize("workers,cache_url,ttl,warns", [
+    (4, None, None, False),                     # caching off
+    (4, None, "300", True),
+    (4, None, "0", False),
+    (4, "redis://cache:6379/0", "300", False),
+    (1, None, "300", False),
+])
+def test_cache_warning(monkeypatch, workers, cache_url, ttl, warns):
+    for name, value in [("CACHE_URL", cache_url), ("CACHE_TTL_SECONDS", ttl)]:
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+
+    assert (cache_warning({"workers": workers}) is not None) is warns
+
+
+# ---------------------------------------------------------
+# BVA: revenue processes per worker
+# ---------------------------------------------------------
+@pytest.mark.parametrize("cpus,workers,expected", [
+    (8, 4, 2),
+    (8, 17, 1),     # default workers: simulations stay in the worker
+    (8, 1, 8),
+    (1, 3, 1),
+])
+def test_revenue_pool_shares_the_cpus(monkeypatch, cpus, workers, expected):
+    # Registered first, so that the value set below is removed afterwards
+    monkeypatch.setenv("REVENUE_PROCESSES", "")
+    monkeypatch.delenv("REVENUE_PROCESSES")
+    monkeypatch.setattr("os.cpu_count", lambda: cpus)
+
+    assert configure_revenue_pool({"workers": workers}) == expected
+    assert os.environ["REVENUE_PROCESSES"] == str(expected)
+
+
+def test_explicit_revenue_processes_are_kept(monkeypatch):
+    monkeypatch.setenv("REVENUE_PROCESSES", "3")
+
+    assert configure_revenue_pool({"workers": 4}) == 3
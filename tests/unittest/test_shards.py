@@ -0,0 +1,64 @@
+import pytest
+
+from backend.db.shards import all_shards, default_store_id, shard_for, store_shards, validate_store_id
+
+
+# ---------------------------------------------------------
+# EP: STORE_SHARDS parsing
+# ---------------------------------------------------------
+def test_shards_are_parsed(monkeypatch):
+    monkeypatch.setenv("STORE_SHARDS", " 1=db-a, 2=db-a,3=db-b:3307 ,")
+
+    assert store_shards() == {1: ("db-a", 3306), 2: ("db-a", 3306), 3: ("db-b", 3307)}
+
+
+def test_unset_means_a_single_database(monkeypatch):
+    monkeypatch.delenv("STORE_SHARDS", raising=False)
+
+    assert store_shards() == {}
+    assert shard_for(1) is None
+    assert all_shards() == [None]
+
+
+@pytest.mark.parametrize("value", ["1=", "x=db-a", "1=db-a:port"])
+def test_malformed_entries_are_rejected(monkeypatch, value):
+    monkeypatch.setenv("STORE_SHARDS", value)
+
+    with pytest.raises(ValueError):
+        store_shards()
+
+
+# ---------------------------------------------------------
+# Decision table: routing
+# ---------------------------------------------------------
+@pytest.mark.parametrize("store_id,expected", [
+    (1, ("db-a", 3306)),
+    (3, ("db-b", 3307)),
+    (4, None),         # not listed: default server
+    (None, None),
+])
+def test_shard_for(monkeypatch, store_id, expected):
+    monkeypatch.setenv("STORE_SHARDS", "1=db-a,2=db-a,3=db-b:3307")
+
+    assert shard_for(store_id) == expected
+
+
+def test_all_shards_lists_each_server_once(monkeypatch):
+    monkeypatch.setenv("STORE_SHARDS", "3=db-b:3307,1=db-a,2=db-a")
+
+    assert all_shards() == [None, ("db-a", 3306), ("db-b", 3307)]
+
+
+# ---------------------------------------------------------
+# BVA: store ids
+# ---------------------------------------------------------
+@pytest.mark.parametrize("store_id", [0, -1, True, "1", 1.0])
+def test_invalid_store_ids(store_id):
+    with pytest.raises(ValueError):
+        validate_store_id(store_id)
+
+
+def test_default_store(monkeypatch):
+    assert default_store_id() == 1
+    monkeypatch.setenv("DEFAULT_STORE_ID", "7")
+    assert default_store_id() == 7
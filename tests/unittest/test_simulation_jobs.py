@@ -0,0 +1,201 @@
+import threading
+import time
+import pytest
+
+from backend.db.dialects import SQLiteDialect
+from backend.services.simulation_jobs import DatabaseJobStore, JobQueueFull, MemoryJobStore, SimulationJobManager
+
+
+def wait_for(manager, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job and job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached status {status}")
+
+
+# ---------------------------------------------------------
+# EP: job lifecycle
+# ---------------------------------------------------------
+def test_job_runs_and_stores_result():
+    """EP - a submitted job finishes with its result and full progress"""
+    manager = SimulationJobManager(max_workers=1, max_queue=2)
+
+    def work(x, progress):
+        progress(1, 2)
+        progress(2, 2)
+        return {"value": x * 2}
+
+    job_id = manager.submit(work, 21)
+    job = wait_for(manager, job_id, "done")
+
+    assert job["result"] == {"value": 42}
+    assert job["progress"] == 1.0
+    assert job["finished_at"] is not None
+    manager.shutdown()
+
+
+def test_failing_job_reports_error():
+    """EP - exceptions are captured as a failed job, not raised"""
+    manager = SimulationJobManager(max_workers=1, max_queue=2)
+
+    def work(progress):
+        raise ValueError("boom")
+
+    job_id = manager.submit(work)
+    job = wait_for(manager, job_id, "failed")
+
+    assert job["error"] == "boom"
+    assert job["result"] is None
+    manager.shutdown()
+
+
+def test_unknown_job_returns_none():
+    """EP - unknown ids are not found"""
+    manager = SimulationJobManager()
+    assert manager.get("does-not-exist") is None
+
+
+def test_progress_is_reported_while_running():
+    """White-box - progress callback updates the job snapshot"""
+    manager = SimulationJobManager(max_workers=1, max_queue=2)
+    halfway = threading.Event()
+    release = threading.Event()
+
+    def work(progress):
+        progress(1, 4)
+        halfway.set()
+        release.wait(5)
+        return None
+
+    job_id = manager.submit(work)
+    assert halfway.wait(5)
+
+    job = manager.get(job_id)
+    assert job["status"] == "running"
+    assert job["progress"] == 0.25
+
+    release.set()
+    wait_for(manager, job_id, "done")
+    manager.shutdown()
+
+
+# ---------------------------------------------------------
+# BVA: bounded queue
+# ---------------------------------------------------------
+def test_queue_full_rejects_submission():
+    """BVA - submitting beyond max_queue pending jobs raises JobQueueFull"""
+    manager = SimulationJobManager(max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    def work(progress):
+        release.wait(5)
+
+    manager.submit(work)
+    manager.submit(work)
+
+    with pytest.raises(JobQueueFull):
+        manager.submit(work)
+
+    release.set()
+    manager.shutdown()
+
+
+def test_finished_jobs_free_queue_slots():
+    """BVA - finished jobs no longer count against the queue bound"""
+    manager = SimulationJobManager(max_workers=1, max_queue=1)
+
+    first = manager.submit(lambda progress: 1)
+    wait_for(manager, first, "done")
+
+    second = manager.submit(lambda progress: 2)
+    assert wait_for(manager, second, "done")["result"] == 2
+    manager.shutdown()
+
+
+# ---------------------------------------------------------
+# Decision table: retention
+# ---------------------------------------------------------
+def test_results_expire_after_ttl():
+    """Decision table - finished job past its TTL is purged"""
+    manager = SimulationJobManager(max_workers=1, max_queue=1, result_ttl=0)
+
+    job_id = manager.submit(lambda progress: 1)
+    deadline = time.time() + 5
+    while manager.get(job_id) is not None and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert manager.get(job_id) is None
+    manager.shutdown()
+
+
+@pytest.mark.parametrize("max_workers,max_queue", [(0, 1), (2, 1)])
+def test_invalid_configuration_raises(max_workers, max_queue):
+    """EP - invalid executor bounds are rejected"""
+    with pytest.raises(ValueError):
+        SimulationJobManager(max_workers=max_workers, max_queue=max_queue)
+
+
+# ---------------------------------------------------------
+# EP: shared job store across worker processes
+# ---------------------------------------------------------
+def test_job_submitted_on_one_manager_is_polled_on_another(tmp_path):
+    """EP - a job run by one worker is visible to a worker sharing its database"""
+    dialect = SQLiteDialect(str(tmp_path / "jobs.db"))
+    running = SimulationJobManager(max_workers=1, max_queue=2, store=DatabaseJobStore(dialect.connect))
+    polling = SimulationJobManager(max_workers=1, max_queue=2, store=DatabaseJobStore(dialect.connect))
+
+    release = threading.Event()
+
+    def work(progress):
+        progress(1, 2)
+        release.wait(5)
+        return {"summary": {"total_revenue": 12.5}, "details": [1, 2]}
+
+    job_id = running.submit(work)
+    job = wait_for(polling, job_id, "running")
+    assert job["progress"] == 0.5
+
+    release.set()
+    job = wait_for(polling, job_id, "done")
+    assert job["result"] == {"summary": {"total_revenue": 12.5}, "details": [1, 2]}
+    assert job["progress"] == 1.0
+    running.shutdown()
+
+
+def test_database_store_purges_expired_jobs(tmp_path):
+    """Decision table - expired rows are deleted on the next submission"""
+    dialect = SQLiteDialect(str(tmp_path / "jobs.db"))
+    store = DatabaseJobStore(dialect.connect)
+    manager = SimulationJobManager(max_workers=1, max_queue=2, result_ttl=0, store=store)
+
+    first = manager.submit(lambda progress: 1)
+    deadline = time.time() + 5
+    while (store.get(first) or {}).get("status") != "done" and time.time() < deadline:
+        time.sleep(0.01)
+
+    manager.submit(lambda progress: 2)
+    assert store.get(first) is None
+    manager.shutdown()
+
+
+def test_progress_writes_are_throttled():
+    """White-box - progress_interval limits how often progress is stored"""
+    store = MemoryJobStore()
+    writes = []
+    update = store.update
+    store.update = lambda job_id, fields: (writes.append(fields), update(job_id, fields))
+    manager = SimulationJobManager(max_workers=1, max_queue=1, store=store, progress_interval=60)
+
+    def work(progress):
+        for done in range(1, 101):
+            progress(done, 100)
+        return 1
+
+    job_id = manager.submit(work)
+    wait_for(manager, job_id, "done")
+
+    assert sum("progress" in fields and fields.get("status") is None for fields in writes) == 1
+    manager.shutdown()
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+
+from backend.dao.simulation_jobs_dao import delete_finished_jobs, get_job, insert_job, update_job
+
+
+def mock_connection():
+    conn = MagicMock()
+    cursor = MagicMock()
+    conn.cursor.return_value = cursor
+    return conn, cursor
+
+
+JOB = {
+    "job_id": "a" * 32,
+    "status": "queued",
+    "progress": 0.0,
+    "submitted_at": 100.0,
+    "started_at": None,
+    "finished_at": None,
+    "result": None,
+    "error": None,
+}
+
+
+# ---------------------------------------------------------
+# EP: writing jobs
+# ---------------------------------------------------------
+def test_insert_job_writes_every_column_and_commits():
+    conn, cursor = mock_connection()
+
+    insert_job(conn, JOB)
+
+    sql, params = cursor.execute.call_args.args
+    assert "INSERT INTO simulation_jobs" in sql
+    assert params == ("a" * 32, "queued", 0.0, 100.0, None, None, None, None)
+    conn.commit.assert_called_once()
+
+
+def test_update_job_sets_only_given_columns():
+    conn, cursor = mock_connection()
+    cursor.rowcount = 1
+
+    assert update_job(conn, "a" * 32, {"status": "running", "started_at": 101.0}) == 1
+
+    sql, params = cursor.execute.call_args.args
+    assert "SET status = %s, started_at = %s WHERE job_id = %s" in sql
+    assert params == ("running", 101.0, "a" * 32)
+    conn.commit.assert_called_once()
+
+
+def test_update_job_ignores_unknown_columns():
+    """BVA - nothing to set means no statement"""
+    conn, cursor = mock_connection()
+
+    assert update_job(conn, "a" * 32, {"job_id": "b", "unknown": 1}) == 0
+    cursor.execute.assert_not_called()
+
+
+# ---------------------------------------------------------
+# EP: reading and purging
+# ---------------------------------------------------------
+def test_get_job_uses_dictionary_cursor():
+    conn, cursor = mock_connection()
+    cursor.fetchone.return_value = JOB
+
+    assert get_job(conn, "a" * 32) == JOB
+    conn.cursor.assert_called_once_with(dictionary=True)
+    assert cursor.execute.call_args.args[1] == ("a" * 32,)
+
+
+def test_delete_finished_jobs_uses_cutoff():
+    conn, cursor = mock_connection()
+    cursor.rowcount = 3
+
+    assert delete_finished_jobs(conn, 500.0) == 3
+    sql, params = cursor.execute.call_args.args
+    assert "finished_at < %s" in sql
+    assert params == (500.0,)
+    conn.commit.assert_called_once()
@@ -0,0 +1,171 @@
+import threading
+import pytest
+
+from backend.services.weather import WeatherCache, WeatherUnavailable
+
+PAYLOAD = {"cod": 200, "name": "Copenhagen", "main": {"temp": 15.5}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeUpstream:
+    def __init__(self, result=(200, PAYLOAD)):
+        self.calls = 0
+        self.result = result
+        self.error = None
+        self.gate = None
+
+    def __call__(self, city):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def setup():
+    clock = FakeClock()
+    upstream = FakeUpstream()
+    cache = WeatherCache(upstream, ttl=60, stale_ttl=300, clock=clock)
+    return cache, upstream, clock
+
+
+def wait_until_idle(cache):
+    for event in list(cache._inflight.values()):
+        event.wait(5)
+
+
+# ---------------------------------------------------------
+# EP: fresh entries come from the cache
+# ---------------------------------------------------------
+def test_first_call_is_miss_then_hit(setup):
+    cache, upstream, clock = setup
+
+    assert cache.get("Copenhagen") == (200, PAYLOAD, "MISS")
+    assert cache.get("Copenhagen") == (200, PAYLOAD, "HIT")
+    assert upstream.calls == 1
+
+
+def test_city_key_is_case_insensitive(setup):
+    cache, upstream, clock = setup
+
+    cache.get("Copenhagen")
+    assert cache.get(" copenhagen ")[2] == "HIT"
+    assert upstream.calls == 1
+
+
+# ---------------------------------------------------------
+# BVA: TTL boundaries
+# ---------------------------------------------------------
+def test_entry_just_before_ttl_is_hit(setup):
+    cache, upstream, clock = setup
+    cache.get("Copenhagen")
+
+    clock.now += 59.9
+    assert cache.get("Copenhagen")[2] == "HIT"
+
+
+def test_stale_entry_served_while_refreshing(setup):
+    cache, upstream, clock = setup
+    cache.get("Copenhagen")
+
+    clock.now += 60
+    assert cache.get("Copenhagen")[2] == "STALE"
+    wait_until_idle(cache)
+
+    assert upstream.calls == 2
+    assert cache.get("Copenhagen")[2] == "HIT"
+
+
+def test_entry_past_stale_window_is_refetched(setup):
+    cache, upstream, clock = setup
+    cache.get("Copenhagen")
+
+    clock.now += 360
+    assert cache.get("Copenhagen")[2] == "MISS"
+    assert upstream.calls == 2
+
+
+# ---------------------------------------------------------
+# Decision table: upstream failures
+# ---------------------------------------------------------
+def test_failure_without_cache_raises(setup, caplog):
+    cache, upstream, clock = setup
+    upstream.error = TimeoutError("slow upstream")
+
+    with pytest.raises(WeatherUnavailable):
+        cache.get("Copenhagen")
+    assert "Weather refresh for 'Copenhagen' failed: slow upstream" in caplog.text
+
+
+def test_failed_refresh_keeps_serving_stale(setup):
+    cache, upstream, clock = setup
+    cache.get("Copenhagen")
+
+    upstream.error = TimeoutError("slow upstream")
+    clock.now += 120
+    assert cache.get("Copenhagen") == (200, PAYLOAD, "STALE")
+    wait_until_idle(cache)
+    assert cache.get("Copenhagen") == (200, PAYLOAD, "STALE")
+
+
+def test_not_found_is_cached_for_the_negative_ttl():
+    """BVA - a 404 for an unknown city is kept briefly and never served stale"""
+    clock, upstream = FakeClock(), FakeUpstream((404, {"cod": "404", "message": "city not found"}))
+    cache = WeatherCache(upstream, ttl=60, stale_ttl=300, clock=clock, negative_ttl=10)
+
+    assert cache.get("Atlantis")[0] == 404
+    clock.now += 9.9
+    assert cache.get("Atlantis")[2] == "HIT"
+    clock.now += 0.1
+    assert cache.get("Atlantis")[2] == "MISS"
+    assert upstream.calls == 2
+
+
+@pytest.mark.parametrize("status", [401, 429])
+def test_other_error_statuses_are_not_cached(setup, status):
+    cache, upstream, clock = setup
+    upstream.result = (status, {"cod": status})
+
+    assert cache.get("Copenhagen")[:2] == (status, {"cod": status})
+    assert cache.get("Copenhagen")[2] == "MISS"
+    assert upstream.calls == 2
+
+
+def test_least_recently_used_city_is_dropped():
+    cache = WeatherCache(FakeUpstream(), max_entries=2)
+    cache.get("Aarhus")
+    cache.get("Odense")
+    cache.get("Aarhus")
+
+    cache.get("Copenhagen")
+
+    assert list(cache._entries) == ["aarhus", "copenhagen"]
+
+
+# ---------------------------------------------------------
+# White-box: concurrent misses share one upstream call
+# ---------------------------------------------------------
+def test_concurrent_misses_fetch_once(setup):
+    cache, upstream, clock = setup
+    upstream.gate = threading.Event()
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get("Copenhagen"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    upstream.gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert upstream.calls == 1
+    assert len(results) == 5
+    assert all(r[1] == PAYLOAD for r in results)